@@ -15,10 +15,15 @@
 from __future__ import absolute_import
 
 import etcd3
+import structlog
+
+log = structlog.get_logger()
 
 
 class EtcdStore(object):
 
+    MAX_TXN_OPS = 128       # etcd server default for --max-txn-ops
+
     def __init__(self, host, port, path_prefix):
         self._etcd = etcd3.client(host=host, port=port)
         self.host = host
@@ -35,6 +40,31 @@ class EtcdStore(object):
     def set(self, key, value):
         self._etcd.put(self.make_path(key), value)
 
+    def set_many(self, items, deletes=None):
+        """
+        Set (and delete) several keys using transactions of up to MAX_TXN_OPS
+        operations each. The operations are applied in order, puts first and
+        deletes last. Beyond MAX_TXN_OPS operations they span several
+        transactions, so a failure may leave only the first ones applied, but
+        no key is deleted before all puts are done.
+
+        :param items: (list) (key, value) pairs, in the order to write them
+        :param deletes: (list) Keys to delete, if any
+        """
+        ops = [self._etcd.transactions.put(self.make_path(key), value)
+               for key, value in items]
+        ops.extend(self._etcd.transactions.delete(self.make_path(key))
+                   for key in deletes or [])
+
+        if len(ops) > EtcdStore.MAX_TXN_OPS:
+            log.debug('set-many-split', operations=len(ops),
+                      transactions=-(-len(ops) // EtcdStore.MAX_TXN_OPS))
+
+        for index in range(0, len(ops), EtcdStore.MAX_TXN_OPS):
+            self._etcd.transaction(compare=[],
+                                   success=ops[index:index + EtcdStore.MAX_TXN_OPS],
+                                   failure=[])
+
     def delete(self, key):
         success = self._etcd.delete(self.make_path(key))
         return success
@@ -16,8 +16,9 @@
 from __future__ import absolute_import
 import arrow
 import structlog
+from time import time
 from twisted.internet.task import LoopingCall
-from twisted.internet.defer import inlineCallbacks, returnValue
+from twisted.internet.defer import inlineCallbacks, returnValue, Deferred, DeferredList
 from voltha_protos.events_pb2 import Event, EventType, EventCategory, EventSubCategory, DeviceEvent, EventHeader
 import six
 
@@ -40,8 +41,15 @@ log = structlog.get_logger()
 class AdapterEvents:
     """
     Class for managing Events within a given Device Handler instance
+
+    If 'batch_delay' is set, events are queued and submitted together every
+    'batch_delay' seconds instead of one at a time. At most 'max_pending' events
+    are queued, further events are dropped until the queue is submitted.
     """
-    def __init__(self, core_proxy, device_id, logical_device_id, serial_number):
+    DEFAULT_MAX_PENDING = 1024
+
+    def __init__(self, core_proxy, device_id, logical_device_id, serial_number,
+                 batch_delay=0, max_pending=DEFAULT_MAX_PENDING, clock=None):
         """
         Adapter event manager initializer
 
@@ -49,6 +57,10 @@ class AdapterEvents:
         :param device_id: (str) Device handler's unique device id
         :param logical_device_id: (str) Logical Device that the device is a member of
         :param serial_number: (str) Serial number of the device(OLT) that created this instance
+        :param batch_delay: (float) Seconds to queue events before submitting them,
+                                    0 to submit each event when sent
+        :param max_pending: (int) Maximum queued events, 0 for no limit
+        :param clock: (IReactorTime) Reactor to schedule the batches on, for tests
         """
         self.lc = None
         self.type_version = "0.1"
@@ -58,6 +70,35 @@ class AdapterEvents:
         self.logical_device_id = logical_device_id
         self.adapter_name = core_proxy.listening_topic
         self.log = structlog.get_logger(device_id=device_id)
+        self._id_prefix = 'voltha.{}.{}.'.format(self.adapter_name, device_id)
+        self._header_templates = dict()     # (type, category, sub-category, event) -> EventHeader
+
+        if clock is None:
+            from twisted.internet import reactor
+            clock = reactor
+
+        self._batch_delay = batch_delay
+        self._max_pending = max_pending
+        self._clock = clock
+        self._pending = list()          # (Event, Deferred)
+        self._batch_call = None
+        self._statistics = {
+            'sent': 0,                  # Events submitted
+            'batches': 0,
+            'dropped': 0,               # Events dropped, queue full
+            'filtered': 0,              # Events suppressed by an event filter
+            'send-failures': 0,
+        }
+
+    @property
+    def statistics(self):
+        """ Event submission counters """
+        return dict(self._statistics)
+
+    @property
+    def pending(self):
+        """ Number of events queued for the next batch """
+        return len(self._pending)
 
     def format_id(self, event):
         """
@@ -68,21 +109,41 @@ class AdapterEvents:
 
         :return: (str) Event ID
         """
-        return 'voltha.{}.{}.{}'.format(self.adapter_name,
-                                        self.device_id, event)
+        return self._id_prefix + event
 
-    def get_event_header(self, _type, category, sub_category, event, raised_ts):
+    def get_event_header(self, _type, category, sub_category, event, raised_ts,
+                         reported_ts=None):
         """
+        Create an event header. The constant fields of each type of event are
+        only formatted once, into a template copied for every header.
+
+        :param _type: (EventType) Event type
+        :param category: (EventCategory) Event category
+        :param sub_category: (EventSubCategory) Event sub-category
+        :param event: (str) The name of the event such as 'Discover' or 'LOS'
+        :param raised_ts: (int) UTC seconds the event was raised
+        :param reported_ts: (float) UTC seconds the event is reported, the current
+                                    time if None. Events sent together can share
+                                    one time sample.
 
-        :return: (dict) Event header
+        :return: (EventHeader) Event header
         """
-        hdr = EventHeader(id=self.format_id(event),
-                           category=category,
-                           sub_category=sub_category,
-                           type=_type,
-                           type_version=self.type_version)
-        hdr.raised_ts.FromSeconds(raised_ts),
-        hdr.reported_ts.GetCurrentTime()
+        key = (_type, category, sub_category, event)
+        template = self._header_templates.get(key)
+        if template is None:
+            template = self._header_templates[key] = EventHeader(id=self.format_id(event),
+                                                                 category=category,
+                                                                 sub_category=sub_category,
+                                                                 type=_type,
+                                                                 type_version=self.type_version)
+        if reported_ts is None:
+            reported_ts = time()
+
+        hdr = EventHeader()
+        hdr.CopyFrom(template)
+        hdr.raised_ts.seconds = int(raised_ts)
+        hdr.reported_ts.seconds = int(reported_ts)
+        hdr.reported_ts.nanos = int((reported_ts - int(reported_ts)) * 1e9)
         return hdr
 
     @inlineCallbacks
@@ -97,6 +158,11 @@ class AdapterEvents:
         try:
             self.log.debug('send_event')
 
+            # Events suppressed by the adapter's event filters are never built or sent
+            if self.core_proxy.filter_alarm(self.device_id, event_header, event_body):
+                self._statistics['filtered'] += 1
+                return
+
             if event_header.type == EventType.DEVICE_EVENT:
                event = Event(header=event_header, device_event=event_body)
             elif event_header.type == EventType.KPI_EVENT:
@@ -107,13 +173,61 @@ class AdapterEvents:
                event = Event(header=event_header, config_event=event_body)
 
             if event is not None:
-               yield self.core_proxy.submit_event(event)
+                if self._batch_delay > 0:
+                    yield self._queue_event(event)
+                else:
+                    self._statistics['sent'] += 1
+                    yield self.core_proxy.submit_event(event)
 
         except Exception as e:
             self.log.exception('failed-to-send-event', e=e)
             raise
         log.debug('event-sent-to-kafka', event_type=event_header.type)
 
+    def _queue_event(self, event):
+        if 0 < self._max_pending <= len(self._pending):
+            self._statistics['dropped'] += 1
+            self.log.debug('event-dropped', pending=len(self._pending))
+            return None
+
+        d = Deferred()
+        self._pending.append((event, d))
+
+        if self._batch_call is None:
+            self._batch_call = self._clock.callLater(self._batch_delay, self.flush)
+        return d
+
+    def flush(self):
+        """
+        Submit the queued events now
+
+        :return: (Deferred) Fires when all queued events have been submitted
+        """
+        call, self._batch_call = self._batch_call, None
+        if call is not None and call.active():
+            call.cancel()
+
+        batch, self._pending = self._pending, list()
+        if not len(batch):
+            return DeferredList([])
+
+        self._statistics['batches'] += 1
+        self._statistics['sent'] += len(batch)
+        submitted = list()
+
+        for event, d in batch:
+            submit = self.core_proxy.submit_event(event)
+            submit.addErrback(self._submit_failed)
+            submit.chainDeferred(d)
+            submitted.append(d)
+
+        return DeferredList(submitted, consumeErrors=True)
+
+    def _submit_failed(self, reason):
+        self._statistics['send-failures'] += 1
+        self.log.error('event-submit-failed', reason=reason)
+        return reason
+
 
 
 class DeviceEventBase(object):
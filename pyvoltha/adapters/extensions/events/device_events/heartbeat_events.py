@@ -13,15 +13,16 @@
 # limitations under the License.
 from __future__ import absolute_import
 from voltha_protos.events_pb2 import EventCategory, EventSubCategory
-from adapter_events import DeviceEventBase
+from pyvoltha.adapters.extensions.events.adapter_events import DeviceEventBase
 
 
 class HeartbeatEvent(DeviceEventBase):
-    def __init__(self, event_mgr, raised_ts, object_type='olt', heartbeat_misses=0):
+    def __init__(self, event_mgr, raised_ts, object_type='olt', heartbeat_misses=0,
+                 sub_category=EventSubCategory.PON):
         super(HeartbeatEvent, self).__init__(event_mgr, raised_ts, object_type,
                                              event='Heartbeat',
                                              category=EventCategory.EQUIPMENT,
-                                             sub_category=ventSubCategory.PON)
+                                             sub_category=sub_category)
         self._misses = heartbeat_misses
 
     def get_context_data(self):
@@ -0,0 +1,42 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from voltha_protos.events_pb2 import EventCategory, EventSubCategory
+from pyvoltha.adapters.extensions.events.adapter_events import DeviceEventBase
+
+
+class PmThresholdCrossingEvent(DeviceEventBase):
+    def __init__(self, event_mgr, raised_ts, group_name, counter, instance,
+                 value, threshold, rate=False, object_type='onu',
+                 sub_category=EventSubCategory.ONU):
+        super(PmThresholdCrossingEvent, self).__init__(event_mgr, raised_ts, object_type,
+                                                       event='PM_THRESHOLD_CROSSING',
+                                                       category=EventCategory.COMMUNICATION,
+                                                       sub_category=sub_category)
+        self._group_name = group_name
+        self._counter = counter
+        self._instance = instance
+        self._value = value
+        self._threshold = threshold
+        self._rate = rate
+
+    def get_context_data(self):
+        context = {'pm-group': self._group_name,
+                   'pm-counter': self._counter,
+                   'threshold-type': 'rate' if self._rate else 'absolute',
+                   'threshold': self._threshold,
+                   'value': self._value}
+        context.update(self._instance)
+        return context
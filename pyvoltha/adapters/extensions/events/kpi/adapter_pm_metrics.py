@@ -14,11 +14,48 @@
 
 from __future__ import absolute_import, division
 import structlog
-import arrow
+from time import time
+from operator import attrgetter
 from twisted.internet.task import LoopingCall
 from voltha_protos.events_pb2 import KpiEvent2, KpiEventType, MetricInformation, MetricMetaData
 from voltha_protos.events_pb2 import Event, EventType, EventCategory, EventSubCategory
 from voltha_protos.device_pb2 import PmConfig
+import six
+
+
+class _ExtractionPlan(object):
+    """
+    Precompiled collection of a PM group from objects of one class: the context
+    and enabled metric names the class provides and a single getter for all of them.
+    Names the first object did not provide are kept so that objects that do provide
+    them can be detected.
+    """
+    __slots__ = ('context', 'metrics', 'missing', 'getter')
+
+    def __init__(self, group, names, config):
+        metric_types = (PmConfig.COUNTER, PmConfig.GAUGE, PmConfig.STATE)
+        context, metrics, missing = [], [], []
+
+        for (metric, _) in sorted(names):
+            pm_config = config[metric]
+            if pm_config.type == PmConfig.CONTEXT:
+                (context if hasattr(group, metric) else missing).append(metric)
+
+            elif pm_config.type in metric_types and pm_config.enabled:
+                (metrics if hasattr(group, metric) else missing).append(metric)
+
+        self.context = tuple(context)
+        self.metrics = tuple(metrics)
+        self.missing = tuple(missing)
+
+        attributes = self.context + self.metrics
+        if len(attributes) == 1:
+            getter = attrgetter(attributes[0])
+            self.getter = lambda obj: (getter(obj),)
+        elif len(attributes):
+            self.getter = attrgetter(*attributes)
+        else:
+            self.getter = lambda obj: ()
 
 
 class AdapterPmMetrics(object):
@@ -32,6 +69,26 @@ class AdapterPmMetrics(object):
     DEFAULT_FREQUENCY_KEY = 'default-collection-frequency'
     DEFAULT_COLLECTION_FREQUENCY = 15 * 10      # 1/10ths of a second
 
+    # If provided, the KPI slices are published through this (shared) KpiEventAggregator
+    # in batched events instead of one event per collection
+    KPI_AGGREGATOR_KEY = 'kpi-aggregator'
+
+    # If provided, collected counters are also recorded in this (shared) PmStore so
+    # deltas and threshold crossings of all devices can be computed in one pass
+    PM_STORE_KEY = 'pm-store'
+
+    # If provided, collected counters are evaluated by this (shared) TcaEngine for
+    # threshold crossings. Its PmStore is used if no 'pm-store' is provided.
+    TCA_ENGINE_KEY = 'tca-engine'
+
+    # If provided, a dictionary of group name -> {counter name: width in bits} for the
+    # counters narrower than 64 bits, so the PmStore handles their wraparound
+    COUNTER_WIDTHS_KEY = 'counter-widths'
+
+    # If provided, the IReactorTime the collections are scheduled on instead of
+    # the global reactor, for tests
+    CLOCK_KEY = 'clock'
+
     # If the collection object has a property of the following name, it will be used
     # to retrieve the UTC Collection Timestamp (UTC seconds since epoch). If the collection
     # object does not support this attribute, the current time will be used. If the attribute
@@ -39,6 +96,9 @@ class AdapterPmMetrics(object):
     # for collection.
     TIMESTAMP_ATTRIBUTE = 'timestamp'
 
+    # Groups due within this many seconds of a collection are collected with it
+    DUE_TOLERANCE = 0.1
+
     def __init__(self, event_mgr, core_proxy, device_id, logical_device_id, serial_number,
                  grouped=False, freq_override=False, **kwargs):
         """
@@ -67,7 +127,33 @@ class AdapterPmMetrics(object):
         self.grouped = grouped
         self.freq_override = grouped and freq_override
         self.lc = None
+        self._collection_callback = None    # Collection function if groups are scheduled
+        self._collection_call = None        # DelayedCall of the next group collection
         self.pm_group_metrics = dict()      # name -> PmGroupConfig
+        self._group_next_collection = dict()    # name -> UTC seconds group is next due
+        self._extraction_plans = dict()         # (group name, object class) -> _ExtractionPlan
+        self.kpi_aggregator = kwargs.get(AdapterPmMetrics.KPI_AGGREGATOR_KEY)
+        self.pm_store = kwargs.get(AdapterPmMetrics.PM_STORE_KEY)
+        self.tca_engine = kwargs.get(AdapterPmMetrics.TCA_ENGINE_KEY)
+        self.counter_widths = {group_name: dict(widths) for group_name, widths in
+                               six.iteritems(kwargs.get(AdapterPmMetrics.COUNTER_WIDTHS_KEY)
+                                             or dict())}
+
+        self._clock = kwargs.get(AdapterPmMetrics.CLOCK_KEY)
+        if self._clock is None:
+            from twisted.internet import reactor
+            self._clock = reactor
+
+        if self.tca_engine is not None:
+            if self.pm_store is None:
+                self.pm_store = self.tca_engine.pm_store
+            self.tca_engine.add_device(device_id, event_mgr,
+                                       sub_category=self._sub_category)
+
+    @property
+    def kpis_suppressed(self):
+        """ True if only threshold crossings and summaries are published """
+        return self.tca_engine is not None and self.tca_engine.suppress_kpis
 
     def update(self, pm_config):
         # TODO: Move any common steps into base class
@@ -80,20 +166,138 @@ class AdapterPmMetrics(object):
         """
         Start the collection loop for an adapter if the frequency > 0
 
+        If group frequencies can be overridden, each collection is scheduled for
+        the time the next group is due instead of running on a fixed period.
+
         :param callback: (callable) Function to call to collect PM data
         """
         self.log.info("starting-pm-collection", device_name=self.name, default_freq=self.default_freq)
         if callback is None:
             callback = self.collect_and_publish_metrics
 
+        if self.freq_override:
+            self._collection_callback = callback
+            if self.default_freq > 0 and self._collection_call is None:
+                self._collect_and_schedule()
+            return
+
         if self.lc is None:
             self.lc = LoopingCall(callback)
+            self.lc.clock = self._clock
 
         if self.default_freq > 0:
-            self.lc.start(interval=self.default_freq / 10)
+            self.lc.start(interval=self.collection_interval)
+
+    @property
+    def collection_interval(self):
+        """ Seconds between collections at the default frequency """
+        return self.default_freq / 10
+
+    def next_collection_delay(self, now=None):
+        """
+        Seconds until the next enabled group is due. Groups that have not been
+        collected yet are collected along with the next one due.
+
+        :param now: (float) Current UTC time (seconds since the epoch)
+        :return: (float) Delay, the default collection interval if no group is scheduled
+        """
+        now = self._clock.seconds() if now is None else now
+        groups = self.collection_groups()
+        due = [next_collection for name, next_collection in six.iteritems(self._group_next_collection)
+               if name in groups and groups[name].enabled]
+
+        if not due:
+            return self.collection_interval
+
+        return max(0, min(due) - now)
+
+    def _collect_and_schedule(self):
+        self._collection_call = None
+        self._collection_callback()
+
+        if self._collection_callback is not None:       # Not stopped by the callback
+            self._collection_call = self._clock.callLater(self.next_collection_delay(),
+                                                          self._collect_and_schedule)
+
+    def collection_groups(self):
+        """
+        PM groups collected by the collections of this manager. Derived classes
+        that delegate collection to encapsulated managers should include their groups.
+
+        :return: (dict) Group name -> PmGroupConfig
+        """
+        return self.pm_group_metrics
+
+    def due_groups(self, now=None):
+        """
+        Get the PM groups to collect now and schedule their next collection
+
+        :param now: (float) Current UTC time (seconds since the epoch)
+        :return: (set) Names of the enabled groups that are due, or None to collect
+                       all groups on every collection (group frequencies are not overridden)
+        """
+        if not self.freq_override:
+            return None
+
+        now = self._clock.seconds() if now is None else now
+        due = set()
+
+        for name, group in six.iteritems(self.collection_groups()):
+            if not group.enabled:
+                continue
+
+            next_collection = self._group_next_collection.get(name)
+            if next_collection is None or now + AdapterPmMetrics.DUE_TOLERANCE >= next_collection:
+                freq = group.group_freq if group.group_freq > 0 else self.default_freq
+                self._group_next_collection[name] = now + freq / 10
+                due.add(name)
+
+        return due
+
+    def update_group(self, group_config, group):
+        """
+        Apply the NBI configuration of a PM group. The group frequency is only
+        changed if frequencies can be overridden and applies from the next
+        collection of the group.
+
+        :param group_config: (PmGroupConfig) Group configuration of this manager
+        :param group: (PmGroupConfig) Requested group configuration
+        """
+        group_config.enabled = group.enabled
+
+        if self.freq_override and group.group_freq > 0:
+            group_config.group_freq = group.group_freq
+
+        self.config_changed()
+
+    def config_changed(self):
+        """
+        The PM configuration has changed. Extraction plans are recompiled on
+        their next use.
+        """
+        self._extraction_plans.clear()
+
+    def restart_collector(self):
+        """ Restart a running collection loop, for instance after a frequency change """
+        if self._collection_call is not None:
+            self._collection_call.cancel()
+            self._collection_call = None
+            if self.default_freq > 0:
+                self._collection_call = self._clock.callLater(self.next_collection_delay(),
+                                                              self._collect_and_schedule)
+
+        elif self.lc is not None and self.lc.running:
+            self.lc.stop()
+            if self.default_freq > 0:
+                self.lc.start(interval=self.collection_interval)
 
     def stop_collector(self):
         """ Stop the collection loop"""
+        self._collection_callback = None
+        if self._collection_call is not None:
+            self._collection_call.cancel()
+            self._collection_call = None
+
         if self.lc is not None and self.default_freq > 0:
             self.lc.stop()
 
@@ -119,23 +323,34 @@ class AdapterPmMetrics(object):
         if group is None:
             return None
 
-        metrics = dict()
-        context = dict()
+        # The metric names and configuration of a group are fixed until the next
+        # configuration update, so what to extract is compiled once per object class
+        key = (group_name, type(group))
+        plan = self._extraction_plans.get(key)
+        if plan is None:
+            plan = self._extraction_plans[key] = _ExtractionPlan(group, names, config)
 
-        now = getattr(group, AdapterPmMetrics.TIMESTAMP_ATTRIBUTE) \
-            if hasattr(group, AdapterPmMetrics.TIMESTAMP_ATTRIBUTE) \
-            else arrow.utcnow().float_timestamp
+        if hasattr(group, AdapterPmMetrics.TIMESTAMP_ATTRIBUTE):
+            now = getattr(group, AdapterPmMetrics.TIMESTAMP_ATTRIBUTE)
+            if now is None:
+                return None     # No metrics available at this time for collection
+        else:
+            now = time()
 
-        if now is None:
-            return None     # No metrics available at this time for collection
+        try:
+            values = plan.getter(group)
+            if any(hasattr(group, metric) for metric in plan.missing):
+                raise AttributeError('more attributes than planned')
 
-        for (metric, t) in names:
-            if config[metric].type == PmConfig.CONTEXT and hasattr(group, metric):
-                context[metric] = str(getattr(group, metric))
+        except AttributeError:
+            # Object does not provide the same attributes as others of its class
+            context, metrics = self._extract_metrics(group, names, config)
 
-            elif config[metric].type in (PmConfig.COUNTER, PmConfig.GAUGE, PmConfig.STATE):
-                if config[metric].enabled and hasattr(group, metric):
-                    metrics[metric] = getattr(group, metric)
+        else:
+            num_context = len(plan.context)
+            context = {metric: str(value) for metric, value in
+                       zip(plan.context, values[:num_context])}
+            metrics = dict(zip(plan.metrics, values[num_context:]))
 
         # Check length of metric data. Will be zero if if/when individual group
         # metrics can be disabled and all are (or or not supported by the
@@ -143,6 +358,10 @@ class AdapterPmMetrics(object):
         if len(metrics) == 0:
             return None
 
+        if self.pm_store is not None:
+            key = (self.device_id,) + tuple(sorted(context.items()))
+            self.store_metrics(group_name, key, config, metrics, now)
+
         return MetricInformation(metadata=MetricMetaData(title=group_name,
                                                          ts=now,
                                                          logical_device_id=self.logical_device_id,
@@ -151,7 +370,47 @@ class AdapterPmMetrics(object):
                                                          context=context),
                                  metrics=metrics)
 
-    def collect_metrics(self, data=None):
+    @staticmethod
+    def _extract_metrics(group, names, config):
+        metrics = dict()
+        context = dict()
+
+        for (metric, t) in names:
+            if config[metric].type == PmConfig.CONTEXT and hasattr(group, metric):
+                context[metric] = str(getattr(group, metric))
+
+            elif config[metric].type in (PmConfig.COUNTER, PmConfig.GAUGE, PmConfig.STATE):
+                if config[metric].enabled and hasattr(group, metric):
+                    metrics[metric] = getattr(group, metric)
+
+        return context, metrics
+
+    def store_metrics(self, table_name, key, config, metrics, timestamp, period=None):
+        """
+        Record the counters of collected metrics in the PM store
+
+        :param table_name: (str) PM store table, typically the group name
+        :param key: (tuple) Instance key, the device ID followed by the instance context
+        :param config: (dict) Metric name -> PMConfig of the group
+        :param metrics: (dict) Metric name -> collected value
+        :param timestamp: (float) Collection time (seconds since the epoch)
+        :param period: (int/float) Seconds per interval if the counters restart
+                                   every interval, None if cumulative
+
+        Counter widths of the table are taken from 'counter_widths', counters not
+        listed there are 64 bits wide.
+        """
+        table = self.pm_store.table(table_name)
+        if table is None:
+            counters = sorted(metric for metric, config_item in config.items()
+                              if config_item.type == PmConfig.COUNTER)
+            table = self.pm_store.add_table(table_name, counters,
+                                            widths=self.counter_widths.get(table_name),
+                                            cumulative=period is None,
+                                            period=period)
+        table.update(key, metrics, timestamp)
+
+    def collect_metrics(self, data=None, groups=None):
         """
         Collect metrics for this adapter.
 
@@ -164,14 +423,13 @@ class AdapterPmMetrics(object):
         that contains a single individual metric or list of metrics if this is a
         group metric.
 
-        This method is called for each adapter at a fixed frequency.
-        TODO: Currently all group metrics are collected on a single timer tick.
-              This needs to be fixed as independent group or instance collection is
-              desirable.
+        This method is called for each adapter on every collection. If group
+        frequencies are overridden, only the groups due are requested.
 
         :param data: (list) Existing list of collected metrics (MetricInformation).
                             This is provided to allow derived classes to call into
                             further encapsulated classes.
+        :param groups: (set) Names of the groups to collect, None for all groups
 
         :return: (list) metadata and metrics pairs - see description above
         """
@@ -180,9 +438,12 @@ class AdapterPmMetrics(object):
     def collect_and_publish_metrics(self):
         """ Request collection of all enabled metrics and publish them """
         try:
-            data = self.collect_metrics()
-            raised_ts = arrow.utcnow().timestamp
-            self.publish_metrics(data, raised_ts)
+            groups = self.due_groups()
+            if groups is not None and not groups:
+                return      # No group due yet
+
+            data = self.collect_metrics(groups=groups)
+            self.publish_metrics(data, int(time()))
 
         except Exception as e:
             self.log.exception('failed-to-collect-kpis', e=e)
@@ -199,19 +460,29 @@ class AdapterPmMetrics(object):
                             to convert to a KPIEvent and publish
         """
         self.log.debug('publish-metrics', data=data)
-        event_header = self.event_mgr.get_event_header(EventType.KPI_EVENT2,
-                                                       self._category,
-                                                       self._sub_category,
-                                                       self._event,
-                                                       raised_ts)
+        if self.kpis_suppressed:
+            return
+
+        if self.kpi_aggregator is not None:
+            if len(data):
+                self.kpi_aggregator.add(data, self._category, self._sub_category, self._event)
+            return
+
         if len(data):
             try:
+                now = time()
+                event_header = self.event_mgr.get_event_header(EventType.KPI_EVENT2,
+                                                               self._category,
+                                                               self._sub_category,
+                                                               self._event,
+                                                               raised_ts,
+                                                               reported_ts=now)
                 # TODO: Existing adapters use the KpiEvent, if/when all existing
                 #       adapters use the shared KPI library, we may want to
                 #       deprecate the KPIEvent
                 event_body = KpiEvent2(
                              type=KpiEventType.slice,
-                             ts=arrow.utcnow().float_timestamp,
+                             ts=now,
                              slice_data=data
                              )
                 self.event_mgr.send_event(event_header, event_body)
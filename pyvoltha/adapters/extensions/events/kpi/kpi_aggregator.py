@@ -0,0 +1,239 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+import structlog
+from collections import OrderedDict
+from time import time
+from twisted.internet.defer import DeferredList
+from voltha_protos.events_pb2 import KpiEvent2, KpiEventType
+from voltha_protos.events_pb2 import EventType, EventCategory, EventSubCategory
+
+log = structlog.get_logger()
+
+
+def publish_slices(slice_data, now, kpi_aggregator=None, event_mgr=None,
+                   category=EventCategory.EQUIPMENT, sub_category=EventSubCategory.ONU,
+                   event='KPI_EVENT', statistics=None):
+    """
+    Publish KPI slices through a KpiEventAggregator if one is provided, otherwise
+    in a single KpiEvent2 sent through an event manager. A failed send is logged
+    and counted, it is not passed on.
+
+    :param slice_data: (list) MetricInformation instances
+    :param now: (float) Time of the slices (seconds since the epoch)
+    :param kpi_aggregator: (KpiEventAggregator) Aggregator to add the slices to
+    :param event_mgr: (AdapterEvents) Event manager used if there is no aggregator
+    :param category: (EventCategory) Event header category
+    :param sub_category: (EventSubCategory) Event header sub-category
+    :param event: (str) Event name of the event header ID
+    :param statistics: (dict) Counters of the publisher. Its 'send-failures'
+                              counter is incremented when the event is not sent
+    :return: (Deferred) Fires when the event has been submitted, None if the
+                        slices were added to the aggregator or not published
+    """
+    if kpi_aggregator is not None:
+        kpi_aggregator.add(slice_data, category, sub_category, event)
+        return None
+
+    if event_mgr is None:
+        return None
+
+    def send_failed(reason):
+        if statistics is not None:
+            statistics['send-failures'] = statistics.get('send-failures', 0) + 1
+        log.error('kpi-slices-send-failed', slices=len(slice_data), reason=reason)
+
+    event_header = event_mgr.get_event_header(EventType.KPI_EVENT2,
+                                              category,
+                                              sub_category,
+                                              event,
+                                              int(now),
+                                              reported_ts=now)
+    event_body = KpiEvent2(type=KpiEventType.slice, ts=now, slice_data=slice_data)
+
+    d = event_mgr.send_event(event_header, event_body)
+    d.addErrback(send_failed)
+    return d
+
+
+class _Batch(object):
+    __slots__ = ('slices', 'bytes')
+
+    def __init__(self):
+        self.slices = list()
+        self.bytes = 0
+
+
+class KpiEventAggregator(object):
+    """
+    KPI publication aggregator
+
+    PM managers of many devices can share an aggregator. Instead of sending one
+    KpiEvent2 for each PM group or PM interval collected, the slice data
+    (MetricInformation) is held for a short time and sent in batched KpiEvent2
+    events. Each event holds at most 'max_slices' slices and 'max_bytes' bytes
+    of serialized slices.
+
+    Slices are batched per event header (category, sub-category and event name),
+    so managers of different device types can share an aggregator. A batch is
+    sent as soon as it is full. Otherwise pending slices are sent 'max_delay'
+    seconds after the first one was added.
+    """
+    DEFAULT_MAX_DELAY = 1.0             # Seconds
+    DEFAULT_MAX_SLICES = 256            # MetricInformation per KpiEvent2
+    DEFAULT_MAX_BYTES = 256 * 1024      # Serialized slice bytes per KpiEvent2, 0 for no limit
+
+    def __init__(self, event_mgr, category=EventCategory.EQUIPMENT,
+                 sub_category=EventSubCategory.ONU, event='KPI_EVENT',
+                 max_delay=DEFAULT_MAX_DELAY, max_slices=DEFAULT_MAX_SLICES,
+                 max_bytes=DEFAULT_MAX_BYTES, clock=None):
+        """
+        Class initializer
+
+        :param event_mgr: (AdapterEvents) Event manager used to create the event
+                                          headers and send the batched events
+        :param category: (EventCategory) Default event header category
+        :param sub_category: (EventSubCategory) Default event header sub-category
+        :param event: (str) Default event name of the event header ID
+        :param max_delay: (float) Seconds to hold slices before sending them, 0 to
+                                  send on every add
+        :param max_slices: (int) Maximum slices per event
+        :param max_bytes: (int) Maximum serialized slice bytes per event, 0 for no limit
+        :param clock: (IReactorTime) Reactor to schedule the flushes on, for tests
+        """
+        assert max_delay >= 0, 'Delay cannot be negative'
+        assert max_slices > 0, 'At least one slice per event is required'
+
+        if clock is None:
+            from twisted.internet import reactor
+            clock = reactor
+
+        self.log = structlog.get_logger()
+        self._event_mgr = event_mgr
+        self._category = category
+        self._sub_category = sub_category
+        self._event = event
+        self._max_delay = max_delay
+        self._max_slices = max_slices
+        self._max_bytes = max_bytes
+        self._clock = clock
+
+        self._pending = OrderedDict()     # (category, sub-category, event) -> _Batch
+        self._flush_call = None
+        self._statistics = {
+            'slices': 0,            # Slices added
+            'events': 0,            # KpiEvent2 events sent
+            'send-failures': 0,
+        }
+
+    def __str__(self):
+        return 'KpiEventAggregator: pending: {}, max-slices: {}, max-delay: {}'.\
+            format(self.pending, self._max_slices, self._max_delay)
+
+    @property
+    def pending(self):
+        """ Number of slices waiting to be sent """
+        return sum(len(batch.slices) for batch in self._pending.values())
+
+    @property
+    def statistics(self):
+        """ Aggregator counters """
+        return dict(self._statistics)
+
+    def add(self, slice_data, category=None, sub_category=None, event=None):
+        """
+        Add slice data to send
+
+        :param slice_data: (list) MetricInformation instances
+        :param category: (EventCategory) Event header category, None for the default
+        :param sub_category: (EventSubCategory) Event header sub-category, None for the default
+        :param event: (str) Event name of the event header ID, None for the default
+        """
+        key = (self._category if category is None else category,
+               self._sub_category if sub_category is None else sub_category,
+               self._event if event is None else event)
+
+        for info in slice_data:
+            size = info.ByteSize() if self._max_bytes else 0
+            batch = self._pending.get(key)
+
+            if batch is None:
+                batch = self._pending[key] = _Batch()
+
+            elif batch.bytes + size > self._max_bytes > 0:
+                self._send_batch(key)
+                batch = self._pending[key] = _Batch()
+
+            batch.slices.append(info)
+            batch.bytes += size
+            self._statistics['slices'] += 1
+
+            if len(batch.slices) >= self._max_slices:
+                self._send_batch(key)
+
+        if len(self._pending):
+            if self._max_delay == 0:
+                self.flush()
+
+            elif self._flush_call is None:
+                self._flush_call = self._clock.callLater(self._max_delay, self._on_timer)
+
+    def flush(self):
+        """
+        Send all pending slices now
+
+        :return: (Deferred) Fires when the events sent have been submitted
+        """
+        self._cancel_flush_call()
+        sent = [self._send_batch(key) for key in list(self._pending.keys())]
+        return DeferredList(sent)
+
+    def stop(self):
+        """ Send what is pending and stop """
+        return self.flush()
+
+    def _on_timer(self):
+        self._flush_call = None
+        self.flush()
+
+    def _cancel_flush_call(self):
+        call, self._flush_call = self._flush_call, None
+        if call is not None and call.active():
+            call.cancel()
+
+    def _send_batch(self, key):
+        # Limits are enforced as slices are added, so all pending slices fit
+        batch = self._pending.pop(key)
+        category, sub_category, event = key
+
+        now = time()
+        event_header = self._event_mgr.get_event_header(EventType.KPI_EVENT2,
+                                                        category,
+                                                        sub_category,
+                                                        event,
+                                                        int(now),
+                                                        reported_ts=now)
+        event_body = KpiEvent2(type=KpiEventType.slice,
+                               ts=now,
+                               slice_data=batch.slices)
+
+        self._statistics['events'] += 1
+        d = self._event_mgr.send_event(event_header, event_body)
+        d.addErrback(self._send_failed, len(batch.slices))
+        return d
+
+    def _send_failed(self, reason, slices):
+        self._statistics['send-failures'] += 1
+        self.log.error('kpi-batch-send-failed', slices=slices, reason=reason)
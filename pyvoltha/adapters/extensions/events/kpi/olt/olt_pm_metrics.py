@@ -14,6 +14,7 @@
 
 from __future__ import absolute_import, division
 from voltha_protos.device_pb2 import PmConfig, PmConfigs, PmGroupConfig
+from voltha_protos.events_pb2 import EventSubCategory
 from pyvoltha.adapters.extensions.events.kpi.adapter_pm_metrics import AdapterPmMetrics
 import six
 
@@ -47,6 +48,9 @@ class OltPmMetrics(AdapterPmMetrics):
         super(OltPmMetrics, self).__init__(event_mgr, core_proxy, device_id, logical_device_id, serial_number,
                                            grouped=grouped, freq_override=freq_override,
                                            **kwargs)
+        if self.tca_engine is not None:
+            self.tca_engine.add_device(device_id, event_mgr, object_type='olt',
+                                       sub_category=EventSubCategory.OLT)
 
         # PM Config Types are COUNTER, GAUGE, and STATE
         self.nni_pm_names = {
@@ -120,22 +124,24 @@ class OltPmMetrics(AdapterPmMetrics):
 
     def update(self, pm_config):
         try:
-            # TODO: Test frequency override capability for a particular group
+            interval = self.collection_interval
+
             if self.default_freq != pm_config.default_freq:
-                # Update the callback to the new frequency.
                 self.default_freq = pm_config.default_freq
-                self.lc.stop()
-                self.lc.start(interval=self.default_freq / 10)
 
             if pm_config.grouped:
                 for group in pm_config.groups:
                     group_config = self.pm_group_metrics.get(group.group_name)
                     if group_config is not None:
-                        group_config.enabled = group.enabled
+                        self.update_group(group_config, group)
             else:
                 msg = 'There are no independent OLT metrics, only group metrics at this time'
                 raise NotImplemented(msg)
 
+            if interval != self.collection_interval:
+                # Update the callback to the new frequency.
+                self.restart_collector()
+
         except Exception as e:
             self.log.exception('update-failure', e=e)
             raise
@@ -232,7 +238,7 @@ class OltPmMetrics(AdapterPmMetrics):
 
         return pm_config
 
-    def collect_metrics(self, data=None):
+    def collect_metrics(self, data=None, groups=None):
         """
         Collect metrics for this adapter.
 
@@ -241,22 +247,27 @@ class OltPmMetrics(AdapterPmMetrics):
         that contains a single individual metric or list of metrics if this is a
         group metric.
 
-        This method is called for each adapter at a fixed frequency.
-        TODO: Currently all group metrics are collected on a single timer tick.
-              This needs to be fixed as independent group or instance collection is
-              desirable.
+        This method is called for each adapter on every collection. Only the
+        ports and ONUs needed by the groups due are walked.
 
         :param data: (list) Existing list of collected metrics (MetricInformation).
                             This is provided to allow derived classes to call into
                             further encapsulated classes.
+        :param groups: (set) Names of the groups to collect, None for all groups
 
         :return: (list) metadata and metrics pairs - see description above
         """
         if data is None:
             data = list()
 
+        def collect(group_name):
+            group = self.pm_group_metrics.get(group_name)
+            return group is not None and group.enabled and (groups is None or group_name in groups)
+
+        collect_pon, collect_onu, collect_gem = collect('PON'), collect('ONU'), collect('GEM')
+
         group_name = 'Ethernet'
-        if self.pm_group_metrics[group_name].enabled:
+        if collect(group_name):
             for port in self._nni_ports:
                 group_data = self.collect_group_metrics(group_name,
                                                         port,
@@ -265,9 +276,12 @@ class OltPmMetrics(AdapterPmMetrics):
                 if group_data is not None:
                     data.append(group_data)
 
+        if not (collect_pon or collect_onu or collect_gem):
+            return data
+
         for port in self._pon_ports:
             group_name = 'PON'
-            if self.pm_group_metrics[group_name].enabled:
+            if collect_pon:
                 group_data = self.collect_group_metrics(group_name,
                                                         port,
                                                         self.pon_pm_names,
@@ -275,11 +289,14 @@ class OltPmMetrics(AdapterPmMetrics):
                 if group_data is not None:
                     data.append(group_data)
 
+            if not (collect_onu or collect_gem):
+                continue
+
             for onu_id in port.onu_ids:
                 onu = port.onu(onu_id)
                 if onu is not None:
                     group_name = 'ONU'
-                    if self.pm_group_metrics[group_name].enabled:
+                    if collect_onu:
                         group_data = self.collect_group_metrics(group_name,
                                                                 onu,
                                                                 self.onu_pm_names,
@@ -288,11 +305,11 @@ class OltPmMetrics(AdapterPmMetrics):
                             data.append(group_data)
 
                     group_name = 'GEM'
-                    if self.pm_group_metrics[group_name].enabled:
+                    if collect_gem:
                         for gem in onu.gem_ports:
                             if not gem.multicast:
                                 group_data = self.collect_group_metrics(group_name,
-                                                                        onu,
+                                                                        gem,
                                                                         self.gem_pm_names,
                                                                         self.gem_metrics_config)
                                 if group_data is not None:
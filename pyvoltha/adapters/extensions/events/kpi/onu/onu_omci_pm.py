@@ -109,13 +109,15 @@ class OnuOmciPmMetrics(AdapterPmMetrics):
         self.omci_uni_metrics_config = {m: PmConfig(name=m, type=t, enabled=True)
                                         for (m, t) in self.omci_uni_pm_names}
 
+        interval_kwargs = {AdapterPmMetrics.KPI_AGGREGATOR_KEY: self.kpi_aggregator,
+                           AdapterPmMetrics.PM_STORE_KEY: self.pm_store,
+                           AdapterPmMetrics.TCA_ENGINE_KEY: self.tca_engine}
         self.openomci_interval_pm = OnuPmIntervalMetrics(event_mgr, core_proxy, device_id, logical_device_id,
-                                                         serial_number)
+                                                         serial_number, **interval_kwargs)
 
         self.last_collect_optical_metrics = None
 
     def update(self, pm_config):
-        # TODO: Test frequency override capability for a particular group
         if self.default_freq != pm_config.default_freq:
             # Update the callback to the new frequency.
             self.default_freq = pm_config.default_freq
@@ -126,7 +128,7 @@ class OnuOmciPmMetrics(AdapterPmMetrics):
             for group in pm_config.groups:
                 group_config = self.pm_group_metrics.get(group.group_name)
                 if group_config is not None:
-                    group_config.enabled = group.enabled
+                    self.update_group(group_config, group)
         else:
             msg = 'There are on independent OMCI metrics, only group metrics at this time'
             raise NotImplemented(msg)
@@ -170,7 +172,7 @@ class OnuOmciPmMetrics(AdapterPmMetrics):
         # Also create OMCI Interval PM configs
         return self.openomci_interval_pm.make_proto(pm_config)
 
-    def collect_metrics(self, data=None):
+    def collect_metrics(self, data=None, groups=None):
         """
         Collect metrics for this adapter.
 
@@ -179,14 +181,13 @@ class OnuOmciPmMetrics(AdapterPmMetrics):
         that contains a single individual metric or list of metrics if this is a
         group metric.
 
-        This method is called for each adapter at a fixed frequency.
-        TODO: Currently all group metrics are collected on a single timer tick.
-              This needs to be fixed as independent group or instance collection is
-              desirable.
+        This method is called for each adapter on every collection. If group
+        frequencies are overridden, only the groups due are requested.
 
         :param data: (list) Existing list of collected metrics (MetricInformation).
                             This is provided to allow derived classes to call into
                             further encapsulated classes.
+        :param groups: (set) Names of the groups to collect, None for all groups
 
         :return: (list) metadata and metrics pairs - see description above
         """
@@ -197,7 +198,7 @@ class OnuOmciPmMetrics(AdapterPmMetrics):
 
         if self._omci_cc is not None:
             group_name = OnuOmciPmMetrics.OMCI_CC_GROUP_NAME
-            if self.pm_group_metrics[group_name].enabled:
+            if self.pm_group_metrics[group_name].enabled and (groups is None or group_name in groups):
                 group_data = self.collect_group_metrics(group_name,
                                                         self._omci_cc,
                                                         self.omci_cc_pm_names,
@@ -206,8 +207,11 @@ class OnuOmciPmMetrics(AdapterPmMetrics):
                     data.append(group_data)
 
             # Optical and UNI data is collected on a per-port basis
-            data.extend(self.collect_optical_metrics())
-            data.extend(self.collect_uni_status_metrics())
+            if groups is None or OnuOmciPmMetrics.OPTICAL_GROUP_NAME in groups:
+                data.extend(self.collect_optical_metrics())
+
+            if groups is None or OnuOmciPmMetrics.UNI_STATUS_GROUP_NAME in groups:
+                data.extend(self.collect_uni_status_metrics())
 
         return data
 
@@ -245,7 +249,8 @@ class OnuOmciPmMetrics(AdapterPmMetrics):
                 metrics = dict()
                 data = self._omci_onu_device.query_mib(class_id=AniG.class_id,
                                                        instance_id=entity_id,
-                                                       attributes=ani_g_items)
+                                                       attributes=ani_g_items,
+                                                       read_only=True)
                 if len(data):
                     if 'optical_signal_level' in data:
                         metrics['receive_power'] = data['optical_signal_level']
@@ -299,14 +304,16 @@ class OnuOmciPmMetrics(AdapterPmMetrics):
                 metrics = dict()
                 data = self._omci_onu_device.query_mib(class_id=UniG.class_id,
                                                        instance_id=entity_id,
-                                                       attributes=uni_g_items)
+                                                       attributes=uni_g_items,
+                                                       read_only=True)
                 if len(data):
                     if 'administrative_state' in data:
                         metrics['uni_admin_state'] = data['administrative_state']
 
                 data = self._omci_onu_device.query_mib(class_id=PptpEthernetUni.class_id,
                                                        instance_id=entity_id,
-                                                       attributes=pptp_items)
+                                                       attributes=pptp_items,
+                                                       read_only=True)
                 if len(data):
                     if 'administrative_state' in data:
                         metrics['pptp_admin_state'] = data['administrative_state']
@@ -13,7 +13,7 @@
 # limitations under the License.
 
 from __future__ import absolute_import, division
-import arrow
+from time import time
 from twisted.internet.defer import inlineCallbacks, returnValue
 from voltha_protos.device_pb2 import PmConfig, PmGroupConfig
 from voltha_protos.events_pb2 import KpiEvent2, MetricInformation, MetricMetaData, KpiEventType
@@ -28,6 +28,7 @@ from pyvoltha.adapters.extensions.omci.omci_entities import \
     GemPortNetworkCtpMonitoringHistoryData, XgPonTcPerformanceMonitoringHistoryData, \
     XgPonDownstreamPerformanceMonitoringHistoryData, \
     XgPonUpstreamPerformanceMonitoringHistoryData
+from pyvoltha.adapters.extensions.omci.omci_entities import entity_id_to_class_map
 import six
 
 
@@ -58,11 +59,17 @@ class OnuPmIntervalMetrics(AdapterPmMetrics):
     TRANS_CONV_HISTORY_ENABLED = False
     XGPON_DOWNSTREAM_HISTORY = False
     XGPON_UPSTREAM_HISTORY = False
+    INTERVAL_PERIOD = 15 * 60       # Seconds, interval counters restart every period
 
     def __init__(self, event_mgr, core_proxy, device_id, logical_device_id, serial_number, **kwargs):
         super(OnuPmIntervalMetrics, self).__init__(event_mgr, core_proxy, device_id, logical_device_id, serial_number,
                                                    grouped=True, freq_override=False,
                                                    **kwargs)
+        # Counter widths from the OMCI attribute sizes, unless given by the adapter
+        for group_name, widths in six.iteritems(OnuPmIntervalMetrics.omci_counter_widths()):
+            widths.update(self.counter_widths.get(group_name, dict()))
+            self.counter_widths[group_name] = widths
+
         ethernet_bridge_history = {
             ('class_id', PmConfig.CONTEXT),
             ('entity_id', PmConfig.CONTEXT),
@@ -207,6 +214,24 @@ class OnuPmIntervalMetrics(AdapterPmMetrics):
             XgPonUpstreamPerformanceMonitoringHistoryData.class_id: self._xgpon_upstream_history_config
         }
 
+    @staticmethod
+    def omci_counter_widths():
+        """
+        Get the width of the PM History ME counters from their OMCI attribute
+        sizes. Groups of several MEs use the widest attribute of each name.
+
+        :return: (dict) Group name -> {counter name: width in bits}
+        """
+        widths = dict()
+        for class_id, group_name in six.iteritems(OnuPmIntervalMetrics.ME_ID_INFO):
+            group_widths = widths.setdefault(group_name, dict())
+            for attribute in entity_id_to_class_map[class_id].attributes:
+                size = getattr(attribute.field, 'sz', None)
+                if size:
+                    name = attribute.field.name
+                    group_widths[name] = max(group_widths.get(name, 0), size * 8)
+        return widths
+
     def update(self, pm_config):
         """
         Update the PM Configuration.
@@ -347,8 +372,8 @@ class OnuPmIntervalMetrics(AdapterPmMetrics):
         self.log.debug('publish-metrics')
 
         try:
-            # Locate config
-            now = arrow.utcnow()
+            # Locate config. One time sample for the slice and its event.
+            now = time()
             class_id = interval_data['class_id']
             config = self._configs.get(class_id)
             group = self.pm_group_metrics.get(OnuPmIntervalMetrics.ME_ID_INFO.get(class_id, ''))
@@ -356,10 +381,9 @@ class OnuPmIntervalMetrics(AdapterPmMetrics):
             if config is not None and group is not None and group.enabled:
                 # Extract only the metrics we need to publish
                 metrics = dict()
+                interval_period = OnuPmIntervalMetrics.INTERVAL_PERIOD
                 context = {
-                    'interval_start_time': str(now.replace(minute=int(now.minute / 15) * 15,
-                                                           second=0,
-                                                           microsecond=0).timestamp)
+                    'interval_start_time': str(int(now // interval_period * interval_period))
                 }
                 for metric, config_item in config.items():
                     if config_item.type == PmConfig.CONTEXT and metric in interval_data:
@@ -370,23 +394,35 @@ class OnuPmIntervalMetrics(AdapterPmMetrics):
                           config_item.enabled):
                         metrics[metric] = interval_data[metric]
 
-                if len(metrics):
+                if len(metrics) and self.pm_store is not None:
+                    key = (self.device_id, class_id, interval_data.get('entity_id'))
+                    self.store_metrics(group.group_name, key, config, metrics,
+                                       now,
+                                       period=OnuPmIntervalMetrics.INTERVAL_PERIOD)
+
+                if len(metrics) and not self.kpis_suppressed:
                     metadata = MetricMetaData(title=group.group_name,
-                                              ts=now.float_timestamp,
+                                              ts=now,
                                               logical_device_id=self.logical_device_id,
                                               serial_no=self.serial_number,
                                               device_id=self.device_id,
                                               context=context)
                     slice_data = [MetricInformation(metadata=metadata, metrics=metrics)]
-                    raised_ts = arrow.utcnow().timestamp
+
+                    if self.kpi_aggregator is not None:
+                        self.kpi_aggregator.add(slice_data, self._category,
+                                                self._sub_category, self._event)
+                        return
+
                     event_header = self.event_mgr.get_event_header(EventType.KPI_EVENT2,
                                                                    self._category,
                                                                    self._sub_category,
                                                                    self._event,
-                                                                   raised_ts)
+                                                                   int(now),
+                                                                   reported_ts=now)
 
                     event_body = KpiEvent2(type=KpiEventType.slice,
-                                          ts=now.float_timestamp,
+                                          ts=now,
                                           slice_data=slice_data)
 
                     self.log.debug('Sending-onu-metrics-to-kafka')
@@ -83,19 +83,16 @@ class OnuPmMetrics(AdapterPmMetrics):
                                         **kwargs)
 
     def update(self, pm_config):
+        interval = self.collection_interval
         try:
-            # TODO: Test frequency override capability for a particular group
             if self.default_freq != pm_config.default_freq:
-                # Update the callback to the new frequency.
                 self.default_freq = pm_config.default_freq
-                self.stop_collector()
-                self.start_collector()
 
             if pm_config.grouped:
                 for group in pm_config.groups:
                     group_config = self.pm_group_metrics.get(group.group_name)
                     if group_config is not None:
-                        group_config.enabled = group.enabled
+                        self.update_group(group_config, group)
             else:
                 msg = 'There are no independent ONU metrics, only group metrics at this time'
                 raise NotImplemented(msg)
@@ -106,6 +103,16 @@ class OnuPmMetrics(AdapterPmMetrics):
 
         self.omci_pm.update(pm_config)
 
+        if interval != self.collection_interval:
+            # Update the callback to the new frequency.
+            self.restart_collector()
+
+    def collection_groups(self):
+        # OMCI groups are collected along with the groups of this manager
+        groups = dict(self.omci_pm.collection_groups())
+        groups.update(self.pm_group_metrics)
+        return groups
+
     def make_proto(self, pm_config=None):
         if pm_config is None:
             pm_config = PmConfigs(id=self.device_id,
@@ -142,7 +149,7 @@ class OnuPmMetrics(AdapterPmMetrics):
         pm_config = self.omci_pm.make_proto(pm_config)
         return pm_config
 
-    def collect_metrics(self, data=None):
+    def collect_metrics(self, data=None, groups=None):
         """
         Collect metrics for this adapter.
 
@@ -151,14 +158,13 @@ class OnuPmMetrics(AdapterPmMetrics):
         that contains a single individual metric or list of metrics if this is a
         group metric.
 
-        This method is called for each adapter at a fixed frequency.
-        TODO: Currently all group metrics are collected on a single timer tick.
-              This needs to be fixed as independent group or instance collection is
-              desirable.
+        This method is called for each adapter on every collection. If group
+        frequencies are overridden, only the groups due are requested.
 
         :param data: (list) Existing list of collected metrics (MetricInformation).
                             This is provided to allow derived classes to call into
                             further encapsulated classes.
+        :param groups: (set) Names of the groups to collect, None for all groups
 
         :return: (list) metadata and metrics pairs - see description above
         """
@@ -169,4 +175,4 @@ class OnuPmMetrics(AdapterPmMetrics):
         # if self._heartbeat is not None:
         #     data.extend(self.collect_metrics(self._heartbeat, self.health_pm_names,
         #                                      self.health_metrics_config))
-        return self.omci_pm.collect_metrics(data=data)
+        return self.omci_pm.collect_metrics(data=data, groups=groups)
@@ -0,0 +1,411 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Array backed store of PM counters
+
+Counter values of a PM group (or PM class) are kept for all devices in one
+table with a row (slot) per device/entity instance and a column per counter.
+Deltas, rates and threshold crossings of all instances updated since the last
+pass are then computed in one operation per table instead of per counter.
+
+NumPy is used if it is installed. Otherwise the same operations are performed
+with plain Python lists.
+"""
+from __future__ import absolute_import, division
+import structlog
+import six
+from six.moves import range
+
+try:
+    import numpy
+except ImportError:             # Optional, pure Python fallback
+    numpy = None
+
+
+class PmTableDeltas(object):
+    """
+    Counter deltas of the instances of a PM table updated since the previous pass
+
+    Per-counter values are NumPy arrays if NumPy is installed, otherwise lists,
+    in the order of 'keys'.
+    """
+    __slots__ = ('name', 'keys', 'counters', '_index', '_deltas', '_elapsed')
+
+    def __init__(self, name, keys, counters, index, deltas, elapsed):
+        self.name = name
+        self.keys = keys
+        self.counters = counters
+        self._index = index
+        self._deltas = deltas           # instances x counters
+        self._elapsed = elapsed         # seconds per instance
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __str__(self):
+        return 'PmTableDeltas: {}, instances: {}'.format(self.name, len(self.keys))
+
+    @property
+    def elapsed(self):
+        """ Seconds between the samples of each instance """
+        return self._elapsed
+
+    def delta(self, counter):
+        """
+        Deltas of a counter
+
+        :param counter: (str) Counter name
+        :return: (sequence) Delta of each instance
+        """
+        col = self._index[counter]
+        if numpy is not None and isinstance(self._deltas, numpy.ndarray):
+            return self._deltas[:, col]
+        return [row[col] for row in self._deltas]
+
+    def rate(self, counter):
+        """
+        Per-second rates of a counter
+
+        :param counter: (str) Counter name
+        :return: (sequence) Rate of each instance, 0.0 if no time elapsed
+        """
+        deltas = self.delta(counter)
+
+        if numpy is not None and isinstance(deltas, numpy.ndarray):
+            elapsed = self._elapsed
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                return numpy.where(elapsed > 0, deltas / numpy.where(elapsed > 0, elapsed, 1), 0.0)
+
+        return [delta / elapsed if elapsed > 0 else 0.0
+                for delta, elapsed in zip(deltas, self._elapsed)]
+
+    def crossings(self, thresholds):
+        """
+        Find the deltas at or above a threshold
+
+        :param thresholds: (dict) Counter name -> threshold value. Counters not
+                                  in this table are ignored
+        :return: (list) (key, counter, delta) tuples
+        """
+        crossed = []
+        for counter, threshold in six.iteritems(thresholds):
+            if counter not in self._index:
+                continue
+
+            deltas = self.delta(counter)
+
+            if numpy is not None and isinstance(deltas, numpy.ndarray):
+                rows = numpy.flatnonzero(deltas >= threshold).tolist()
+                values = deltas[rows].tolist()
+            else:
+                rows = [row for row, delta in enumerate(deltas) if delta >= threshold]
+                values = [deltas[row] for row in rows]
+
+            crossed.extend((self.keys[row], counter, value) for row, value in zip(rows, values))
+
+        return crossed
+
+    def items(self):
+        """
+        Deltas per instance
+
+        :return: (generator) (key, {counter: delta}) tuples
+        """
+        deltas = self._deltas.tolist() if numpy is not None and \
+            isinstance(self._deltas, numpy.ndarray) else self._deltas
+
+        for key, row in zip(self.keys, deltas):
+            yield key, dict(zip(self.counters, row))
+
+
+class PmCounterTable(object):
+    """
+    Counters of one PM group or class for all device/entity instances
+
+    For cumulative counters, the delta of an instance is the difference from its
+    previous sample, modulo the counter width so 32 and 64-bit wraparounds are
+    handled. For interval counters (such as those of the OMCI PM history MEs
+    that restart every 15 minutes) the delta is the sampled value itself.
+    """
+    DEFAULT_WIDTH = 64          # Bits
+    INITIAL_SLOTS = 64
+
+    def __init__(self, name, counters, widths=None, cumulative=True, period=None):
+        """
+        Class initializer
+
+        :param name: (str) Table name, typically the PM group name
+        :param counters: (list) Counter names
+        :param widths: (dict) Counter name -> width in bits, if not DEFAULT_WIDTH
+        :param cumulative: (bool) True if counters only increase (and wrap), False
+                                  for counters of a fixed period
+        :param period: (int/float) Seconds per sample of non-cumulative counters
+        """
+        assert cumulative or period, 'Non-cumulative counters require a period'
+
+        self.log = structlog.get_logger()
+        self.name = name
+        self.counters = tuple(counters)
+        self._index = {counter: col for col, counter in enumerate(self.counters)}
+        self._cumulative = cumulative
+        self._period = period
+
+        widths = widths or dict()
+        masks = [(1 << widths.get(counter, PmCounterTable.DEFAULT_WIDTH)) - 1
+                 for counter in self.counters]
+        self._masks = numpy.array(masks, dtype=numpy.uint64) if numpy is not None else masks
+
+        self._slots = dict()            # key -> slot
+        self._keys = list()             # slot -> key, None if free
+        self._free = list()
+        self._capacity = 0
+
+        self._current = None            # slot x counter values
+        self._previous = None
+        self._time = None               # slot -> time of current sample
+        self._prev_time = None
+        self._sampled = None            # slot -> has previous sample
+        self._updated = None            # slot -> updated since last pass
+        self._grow(PmCounterTable.INITIAL_SLOTS)
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __str__(self):
+        return 'PmCounterTable: {}, counters: {}, instances: {}'.format(
+            self.name, len(self.counters), len(self._slots))
+
+    @property
+    def cumulative(self):
+        return self._cumulative
+
+    def _grow(self, capacity):
+        old, self._capacity = self._capacity, capacity
+        columns = len(self.counters)
+        self._keys.extend([None] * (capacity - old))
+        self._free.extend(range(capacity - 1, old - 1, -1))
+
+        if numpy is not None:
+            def resize(values, shape, dtype):
+                grown = numpy.zeros(shape, dtype=dtype)
+                if values is not None:
+                    grown[:old] = values
+                return grown
+
+            self._current = resize(self._current, (capacity, columns), numpy.uint64)
+            self._previous = resize(self._previous, (capacity, columns), numpy.uint64)
+            self._time = resize(self._time, capacity, numpy.float64)
+            self._prev_time = resize(self._prev_time, capacity, numpy.float64)
+            self._sampled = resize(self._sampled, capacity, bool)
+            self._updated = resize(self._updated, capacity, bool)
+        else:
+            added = capacity - old
+            if self._current is None:
+                self._current, self._previous = [], []
+                self._time, self._prev_time, self._sampled, self._updated = [], [], [], []
+
+            self._current.extend([0] * columns for _ in range(added))
+            self._previous.extend([0] * columns for _ in range(added))
+            self._time.extend([0.0] * added)
+            self._prev_time.extend([0.0] * added)
+            self._sampled.extend([False] * added)
+            self._updated.extend([False] * added)
+
+    def update(self, key, values, timestamp):
+        """
+        Record a sample of an instance
+
+        :param key: (tuple) Instance key, the first item is the device ID
+        :param values: (dict) Counter name -> value. Other names are ignored.
+                              Cumulative counters not given keep their last value,
+                              non-cumulative ones are zero
+        :param timestamp: (float) Sample time (seconds since the epoch)
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            if not self._free:
+                self._grow(self._capacity * 2)
+            slot = self._free.pop()
+            self._slots[key] = slot
+            self._keys[slot] = key
+
+        if not self._cumulative:
+            self._current[slot] = 0 if numpy is not None else [0] * len(self.counters)
+
+        row = self._current[slot]
+
+        index, masks = self._index, self._masks
+        for counter, value in six.iteritems(values):
+            col = index.get(counter)
+            if col is not None:
+                row[col] = int(value) & int(masks[col])
+
+        self._time[slot] = timestamp
+        self._updated[slot] = True
+
+    def remove(self, key):
+        """
+        Remove an instance
+
+        :param key: (tuple) Instance key
+        """
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            self._keys[slot] = None
+            self._sampled[slot] = False
+            self._updated[slot] = False
+            self._free.append(slot)
+
+    def remove_device(self, device_id):
+        """
+        Remove all instances of a device
+
+        :param device_id: (str) Device ID
+        """
+        for key in [key for key in self._slots if key[0] == device_id]:
+            self.remove(key)
+
+    def process(self):
+        """
+        Compute the deltas of all instances updated since the previous pass. The
+        first sample of a cumulative counter instance only sets its baseline.
+
+        :return: (PmTableDeltas) Deltas, None if no instance was updated
+        """
+        if numpy is not None:
+            return self._process_arrays()
+
+        slots = [slot for slot, updated in enumerate(self._updated) if updated]
+        if not slots:
+            return None
+
+        for slot in slots:
+            self._updated[slot] = False
+
+        if self._cumulative:
+            ready = [slot for slot in slots if self._sampled[slot]]
+            deltas = [[(cur - prev) & mask for cur, prev, mask in
+                       zip(self._current[slot], self._previous[slot], self._masks)]
+                      for slot in ready]
+            elapsed = [self._time[slot] - self._prev_time[slot] for slot in ready]
+
+            for slot in slots:
+                self._previous[slot][:] = self._current[slot]
+                self._prev_time[slot] = self._time[slot]
+                self._sampled[slot] = True
+        else:
+            ready = slots
+            deltas = [list(self._current[slot]) for slot in ready]
+            elapsed = [float(self._period)] * len(ready)
+
+        return PmTableDeltas(self.name, [self._keys[slot] for slot in ready],
+                             self.counters, self._index, deltas, elapsed)
+
+    def _process_arrays(self):
+        slots = numpy.flatnonzero(self._updated)
+        if not len(slots):
+            return None
+
+        self._updated[slots] = False
+        current = self._current[slots]
+
+        if self._cumulative:
+            sampled = self._sampled[slots]
+            ready = slots[sampled]
+
+            # Unsigned subtraction wraps modulo 2**64, then mask to the counter width
+            deltas = (current[sampled] - self._previous[ready]) & self._masks
+            elapsed = self._time[ready] - self._prev_time[ready]
+
+            self._previous[slots] = current
+            self._prev_time[slots] = self._time[slots]
+            self._sampled[slots] = True
+        else:
+            ready = slots
+            deltas = current
+            elapsed = numpy.full(len(ready), float(self._period))
+
+        return PmTableDeltas(self.name, [self._keys[slot] for slot in ready.tolist()],
+                             self.counters, self._index, deltas, elapsed)
+
+
+class PmStore(object):
+    """
+    PM counter tables shared by the PM managers of many devices
+
+    PM managers record their samples in the store when created with the
+    'pm-store' keyword argument. A single 'process' pass then computes the
+    deltas of all devices, for instance for threshold crossing detection.
+    """
+    def __init__(self):
+        self.log = structlog.get_logger()
+        self._tables = dict()           # name -> PmCounterTable
+
+    def __str__(self):
+        return 'PmStore: tables: {}, vectorised: {}'.format(len(self._tables), self.vectorised)
+
+    @property
+    def vectorised(self):
+        """ True if NumPy arrays are used """
+        return numpy is not None
+
+    def table(self, name):
+        """
+        Get a table
+
+        :param name: (str) Table name
+        :return: (PmCounterTable) Table, None if not found
+        """
+        return self._tables.get(name)
+
+    def add_table(self, name, counters, widths=None, cumulative=True, period=None):
+        """
+        Add a table, or get it if it already exists
+
+        :param name: (str) Table name, typically the PM group name
+        :param counters: (list) Counter names
+        :param widths: (dict) Counter name -> width in bits
+        :param cumulative: (bool) True if counters only increase (and wrap)
+        :param period: (int/float) Seconds per sample of non-cumulative counters
+
+        :return: (PmCounterTable) Table
+        """
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = PmCounterTable(name, counters, widths=widths,
+                                                        cumulative=cumulative,
+                                                        period=period)
+        return table
+
+    def process(self):
+        """
+        Compute the deltas of all tables
+
+        :return: (dict) Table name -> PmTableDeltas, for tables with updates
+        """
+        results = dict()
+        for name, table in six.iteritems(self._tables):
+            deltas = table.process()
+            if deltas is not None:
+                results[name] = deltas
+        return results
+
+    def remove_device(self, device_id):
+        """
+        Remove all instances of a device from all tables
+
+        :param device_id: (str) Device ID
+        """
+        for table in six.itervalues(self._tables):
+            table.remove_device(device_id)
@@ -0,0 +1,336 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Threshold crossing alerts (TCA) on PM counters
+
+The engine evaluates configured thresholds against the counter deltas of a
+PmStore and sends a PmThresholdCrossingEvent through the event manager
+(AdapterEvents) of the device when a threshold is crossed, and again when the
+counter falls back below its clear value.
+
+In KPI suppression mode the PM managers sharing the engine stop publishing
+their collected KPIs. Only the threshold crossing events and a per-table
+summary of each evaluation pass are published.
+"""
+from __future__ import absolute_import, division
+import structlog
+from time import time
+import six
+from twisted.internet.task import LoopingCall
+from voltha_protos.events_pb2 import MetricInformation, MetricMetaData
+from voltha_protos.events_pb2 import EventSubCategory
+from pyvoltha.adapters.extensions.events.device_events.pm_threshold_crossing_event import \
+    PmThresholdCrossingEvent
+from pyvoltha.adapters.extensions.events.kpi.pm_store import PmStore, numpy
+from pyvoltha.adapters.extensions.events.kpi.kpi_aggregator import publish_slices
+
+
+class PmThreshold(object):
+    """
+    Threshold on the delta (absolute) or per-second rate of a PM counter
+
+    A crossing is raised when the value reaches 'raise_value'. It is only cleared
+    once the value falls below 'clear_value', which provides hysteresis if it is
+    lower than the raise value.
+    """
+    __slots__ = ('group_name', 'counter', 'raise_value', 'clear_value', 'rate')
+
+    def __init__(self, group_name, counter, raise_value, clear_value=None, rate=False):
+        """
+        Class initializer
+
+        :param group_name: (str) PM group (PmStore table) name
+        :param counter: (str) Counter name
+        :param raise_value: (int/float) Value at or above which the crossing is raised
+        :param clear_value: (int/float) Value below which a raised crossing is
+                                        cleared, the raise value if None
+        :param rate: (bool) If True, the per-second rate is compared instead of the
+                            delta since the previous sample (or of the interval)
+        """
+        clear_value = raise_value if clear_value is None else clear_value
+        assert clear_value <= raise_value, 'Clear value cannot exceed the raise value'
+
+        self.group_name = group_name
+        self.counter = counter
+        self.raise_value = raise_value
+        self.clear_value = clear_value
+        self.rate = rate
+
+    def __str__(self):
+        return 'PmThreshold: {}.{}, raise: {}, clear: {}, rate: {}'.format(
+            self.group_name, self.counter, self.raise_value, self.clear_value, self.rate)
+
+    @property
+    def key(self):
+        return self.group_name, self.counter, self.rate
+
+
+class TcaEngine(object):
+    """
+    Threshold crossing alert engine shared by the PM managers of many devices
+
+    PM managers created with the 'tca-engine' keyword argument record their
+    counters in the PmStore of the engine and register the event manager of their
+    device. The engine owns the 'process' passes of that PmStore.
+    """
+    DEFAULT_INTERVAL = 60           # Seconds between evaluation passes
+    SUMMARY_TITLE = '{}_Summary'
+
+    def __init__(self, pm_store=None, event_mgr=None, kpi_aggregator=None,
+                 suppress_kpis=False, clock=None):
+        """
+        Class initializer
+
+        :param pm_store: (PmStore) Counter store to evaluate, a new one if None
+        :param event_mgr: (AdapterEvents) Adapter level event manager used to publish
+                                          the summaries in KPI suppression mode
+        :param kpi_aggregator: (KpiEventAggregator) If provided, summaries are
+                                                    published through it instead
+        :param suppress_kpis: (bool) If True, PM managers sharing this engine only
+                                     publish threshold crossings and summaries
+        :param clock: (IReactorTime) Reactor to run the evaluation loop on, for tests
+        """
+        self.log = structlog.get_logger()
+        self.pm_store = pm_store if pm_store is not None else PmStore()
+        self._event_mgr = event_mgr
+        self._kpi_aggregator = kpi_aggregator
+        self._suppress_kpis = suppress_kpis
+        self._clock = clock
+        self._lc = None
+
+        self._thresholds = dict()       # group name -> {key: PmThreshold}
+        self._raised = dict()           # threshold key -> {instance key: value}
+        self._devices = dict()          # device ID -> (event_mgr, object type, sub-category)
+        self._statistics = {
+            'passes': 0,
+            'instances': 0,             # Instances evaluated
+            'raised': 0,                # Crossing events sent
+            'cleared': 0,
+            'summaries': 0,
+            'send-failures': 0,         # Summary events that could not be sent
+        }
+
+    def __str__(self):
+        return 'TcaEngine: thresholds: {}, raised: {}, suppress-kpis: {}'.format(
+            sum(len(t) for t in six.itervalues(self._thresholds)),
+            sum(len(r) for r in six.itervalues(self._raised)),
+            self._suppress_kpis)
+
+    @property
+    def suppress_kpis(self):
+        """ True if the PM managers should only publish crossings and summaries """
+        return self._suppress_kpis
+
+    @suppress_kpis.setter
+    def suppress_kpis(self, value):
+        self._suppress_kpis = value
+
+    @property
+    def statistics(self):
+        """ Engine counters """
+        return dict(self._statistics)
+
+    @property
+    def raised(self):
+        """
+        Raised threshold crossings
+
+        :return: (list) (PmThreshold key, instance key, value) tuples
+        """
+        return [(key, instance, value) for key, raised in six.iteritems(self._raised)
+                for instance, value in six.iteritems(raised)]
+
+    def add_threshold(self, threshold):
+        """
+        Add or replace a threshold. A replaced threshold keeps its raised crossings.
+
+        :param threshold: (PmThreshold) Threshold to evaluate
+        """
+        self._thresholds.setdefault(threshold.group_name, dict())[threshold.key] = threshold
+        self._raised.setdefault(threshold.key, dict())
+
+    def remove_threshold(self, group_name, counter, rate=False):
+        """
+        Remove a threshold. Its raised crossings are dropped without being cleared.
+
+        :param group_name: (str) PM group name
+        :param counter: (str) Counter name
+        :param rate: (bool) True for the rate threshold of the counter
+        """
+        key = (group_name, counter, rate)
+        self._thresholds.get(group_name, dict()).pop(key, None)
+        self._raised.pop(key, None)
+
+    def add_device(self, device_id, event_mgr, object_type='onu',
+                   sub_category=EventSubCategory.ONU):
+        """
+        Register the event manager used to send the crossings of a device
+
+        :param device_id: (str) Device ID
+        :param event_mgr: (AdapterEvents) Event manager of the device
+        :param object_type: (str) Type of device, such as 'olt' or 'onu'
+        :param sub_category: (EventSubCategory) Event sub-category
+        """
+        self._devices[device_id] = (event_mgr, object_type, sub_category)
+
+    def remove_device(self, device_id):
+        """
+        Remove a device, its counters and its raised crossings
+
+        :param device_id: (str) Device ID
+        """
+        self._devices.pop(device_id, None)
+        self.pm_store.remove_device(device_id)
+
+        for raised in six.itervalues(self._raised):
+            for instance in [instance for instance in raised if instance[0] == device_id]:
+                del raised[instance]
+
+    def start(self, interval=DEFAULT_INTERVAL):
+        """
+        Start periodic evaluation passes
+
+        :param interval: (int/float) Seconds between passes
+        """
+        if self._lc is None:
+            self._lc = LoopingCall(self.process)
+            if self._clock is not None:
+                self._lc.clock = self._clock
+
+        if not self._lc.running:
+            self._lc.start(interval, now=False)
+
+    def stop(self):
+        """ Stop the periodic evaluation passes """
+        if self._lc is not None and self._lc.running:
+            self._lc.stop()
+
+    def process(self):
+        """
+        Compute the deltas of the PmStore and evaluate the thresholds of each table
+
+        :return: (list) Crossing events sent (PmThresholdCrossingEvent)
+        """
+        events = list()
+        summaries = list()
+        now = time()
+
+        try:
+            for name, deltas in six.iteritems(self.pm_store.process()):
+                self._statistics['instances'] += len(deltas)
+
+                for threshold in six.itervalues(self._thresholds.get(name, dict())):
+                    events.extend(self._evaluate(threshold, deltas, now))
+
+                if self._suppress_kpis and len(deltas):
+                    summaries.append(self._summary(deltas, now))
+
+            self._statistics['passes'] += 1
+
+            if len(summaries):
+                self._publish_summaries(summaries, now)
+
+        except Exception as e:
+            self.log.exception('tca-process-failed', e=e)
+
+        return events
+
+    def _evaluate(self, threshold, deltas, now):
+        if threshold.counter not in deltas.counters:
+            return []
+
+        values = deltas.rate(threshold.counter) if threshold.rate \
+            else deltas.delta(threshold.counter)
+        raised = self._raised[threshold.key]
+        events = list()
+
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            crossed = numpy.flatnonzero(values >= threshold.raise_value).tolist()
+            values = values.tolist()
+        else:
+            crossed = [row for row, value in enumerate(values) if value >= threshold.raise_value]
+
+        keys = deltas.keys
+        for row in crossed:
+            if keys[row] not in raised:
+                raised[keys[row]] = values[row]
+                events.append(self._send(threshold, keys[row], values[row], True, now))
+
+        if len(raised):
+            rows = {key: row for row, key in enumerate(keys)}
+
+            for key in list(raised):
+                row = rows.get(key)
+                if row is not None and values[row] < threshold.clear_value:
+                    del raised[key]
+                    events.append(self._send(threshold, key, values[row], False, now))
+
+        return [event for event in events if event is not None]
+
+    def _send(self, threshold, key, value, raised, now):
+        self._statistics['raised' if raised else 'cleared'] += 1
+        device = self._devices.get(key[0])
+
+        if device is None or device[0] is None:
+            self.log.debug('tca-no-event-manager', device_id=key[0], threshold=str(threshold))
+            return None
+
+        event_mgr, object_type, sub_category = device
+        event = PmThresholdCrossingEvent(event_mgr, int(now), threshold.group_name,
+                                         threshold.counter, self._instance_context(key),
+                                         value,
+                                         threshold.raise_value if raised else threshold.clear_value,
+                                         rate=threshold.rate, object_type=object_type,
+                                         sub_category=sub_category)
+        try:
+            event.send(raised)
+
+        except Exception as e:
+            self.log.exception('tca-send-failed', device_id=key[0], e=e)
+
+        return event
+
+    @staticmethod
+    def _instance_context(key):
+        # Keys of polled groups are the device ID and context (name, value) pairs,
+        # other tables (such as the OpenOMCI intervals) use plain values
+        instance = key[1:]
+        if all(isinstance(item, tuple) and len(item) == 2 for item in instance):
+            return dict(instance)
+        return {'instance': ':'.join(str(item) for item in instance)}
+
+    def _summary(self, deltas, now):
+        metrics = dict()
+        for counter in deltas.counters:
+            values = deltas.delta(counter)
+            if numpy is not None and isinstance(values, numpy.ndarray):
+                metrics[counter + '_sum'] = float(values.sum())
+                metrics[counter + '_max'] = float(values.max())
+            else:
+                metrics[counter + '_sum'] = float(sum(values))
+                metrics[counter + '_max'] = float(max(values))
+
+        raised = sum(len(self._raised[key]) for key in
+                     self._thresholds.get(deltas.name, dict()))
+        context = {'instances': str(len(deltas)), 'raised': str(raised)}
+
+        return MetricInformation(metadata=MetricMetaData(title=TcaEngine.SUMMARY_TITLE.format(deltas.name),
+                                                         ts=now,
+                                                         context=context),
+                                 metrics=metrics)
+
+    def _publish_summaries(self, summaries, now):
+        self._statistics['summaries'] += len(summaries)
+        publish_slices(summaries, now, kpi_aggregator=self._kpi_aggregator,
+                       event_mgr=self._event_mgr, statistics=self._statistics)
@@ -0,0 +1,320 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Adapter-wide aggregation of device heartbeat and connectivity state
+
+Device handlers report the heartbeats and (OMCI) connectivity of their devices
+to a single LivenessAggregator. A device event (HeartbeatEvent or
+ConnectivityLossEvent) is only sent through the event manager of the device
+when its state changes. On a fixed cadence, the aggregator publishes one
+summary slice for all its devices instead of one periodic message per device.
+"""
+from __future__ import absolute_import
+import structlog
+from time import time
+import six
+from twisted.internet.task import LoopingCall
+from voltha_protos.events_pb2 import MetricInformation, MetricMetaData
+from voltha_protos.events_pb2 import EventSubCategory
+from pyvoltha.adapters.extensions.events.device_events.heartbeat_events import HeartbeatEvent
+from pyvoltha.adapters.extensions.events.device_events.connectivity_event import \
+    ConnectivityLossEvent
+from pyvoltha.adapters.extensions.events.kpi.kpi_aggregator import publish_slices
+from pyvoltha.adapters.extensions.omci.omci_cc import OMCI_CC, RxEvent, CONNECTED_KEY
+
+
+class _DeviceLiveness(object):
+    __slots__ = ('event_mgr', 'object_type', 'sub_category', 'alive', 'connected',
+                 'last_heartbeat', 'misses', 'subscription')
+
+    def __init__(self, event_mgr, object_type, sub_category, now):
+        self.event_mgr = event_mgr
+        self.object_type = object_type
+        self.sub_category = sub_category
+        self.alive = True
+        self.connected = True
+        self.last_heartbeat = now
+        self.misses = 0
+        self.subscription = None        # (event bus, OMCI connectivity subscription)
+
+
+class LivenessAggregator(object):
+    """
+    Heartbeat and connectivity state of the devices of an adapter
+
+    Heartbeats are reported with 'heartbeat()', either on every heartbeat
+    received (with 'heartbeat_timeout' set, a device that has not reported for
+    that long is declared down on the next pass) or with the result of each
+    heartbeat check. Connectivity is reported with 'connectivity()', or followed
+    on the OMCI_CC event bus of the device with 'watch_omci()'.
+    """
+    DEFAULT_INTERVAL = 60           # Seconds between summaries
+    MAX_LISTED = 64                 # Device IDs listed in each summary context field
+    SUMMARY_TITLE = 'Liveness_Summary'
+
+    def __init__(self, event_mgr=None, kpi_aggregator=None, heartbeat_timeout=None,
+                 sub_category=EventSubCategory.ONU, clock=None):
+        """
+        Class initializer
+
+        :param event_mgr: (AdapterEvents) Adapter level event manager used to publish
+                                          the summaries
+        :param kpi_aggregator: (KpiEventAggregator) If provided, summaries are
+                                                    published through it instead
+        :param heartbeat_timeout: (int/float) Seconds without a heartbeat after which
+                                              a device is down, None to only rely on
+                                              the reported heartbeat results
+        :param sub_category: (EventSubCategory) Event sub-category of the summaries
+        :param clock: (IReactorTime) Reactor to run the summary loop on, for tests
+        """
+        assert heartbeat_timeout is None or heartbeat_timeout > 0, \
+            'Heartbeat timeout must be positive'
+
+        self.log = structlog.get_logger()
+        self._event_mgr = event_mgr
+        self._kpi_aggregator = kpi_aggregator
+        self._heartbeat_timeout = heartbeat_timeout
+        self._sub_category = sub_category
+        self._clock = clock
+        self._lc = None
+
+        self._devices = dict()          # device ID -> _DeviceLiveness
+        self._down = set()              # Devices with failed heartbeats
+        self._unreachable = set()       # Devices without connectivity
+        self._transitions = {'raised': 0, 'cleared': 0}     # Since the last summary
+        self._statistics = {
+            'heartbeats': 0,
+            'raised': 0,                # Device events sent
+            'cleared': 0,
+            'summaries': 0,
+            'send-failures': 0,         # Summary events that could not be sent
+        }
+
+    def __str__(self):
+        return 'LivenessAggregator: devices: {}, down: {}, unreachable: {}'.format(
+            len(self._devices), len(self._down), len(self._unreachable))
+
+    def __len__(self):
+        return len(self._devices)
+
+    @property
+    def statistics(self):
+        """ Aggregator counters """
+        return dict(self._statistics)
+
+    @property
+    def down(self):
+        """ IDs of the devices whose heartbeat failed """
+        return set(self._down)
+
+    @property
+    def unreachable(self):
+        """ IDs of the devices without connectivity """
+        return set(self._unreachable)
+
+    def _now(self):
+        return self._clock.seconds() if self._clock is not None else time()
+
+    def add_device(self, device_id, event_mgr, object_type='onu',
+                   sub_category=EventSubCategory.ONU):
+        """
+        Register a device, initially alive and reachable
+
+        :param device_id: (str) Device ID
+        :param event_mgr: (AdapterEvents) Event manager of the device
+        :param object_type: (str) Type of device, such as 'olt' or 'onu'
+        :param sub_category: (EventSubCategory) Event sub-category of its events
+        """
+        self.remove_device(device_id)
+        self._devices[device_id] = _DeviceLiveness(event_mgr, object_type, sub_category,
+                                                   self._now())
+
+    def remove_device(self, device_id):
+        """
+        Remove a device. No event is sent for its current state.
+
+        :param device_id: (str) Device ID
+        """
+        device = self._devices.pop(device_id, None)
+        self._down.discard(device_id)
+        self._unreachable.discard(device_id)
+
+        if device is not None and device.subscription is not None:
+            event_bus, subscription = device.subscription
+            event_bus.unsubscribe(subscription)
+
+    def heartbeat(self, device_id, alive=True):
+        """
+        Record a heartbeat (or heartbeat check) of a device
+
+        :param device_id: (str) Device ID
+        :param alive: (bool) False if the heartbeat was missed
+        """
+        device = self._devices.get(device_id)
+        if device is None:
+            return
+
+        self._statistics['heartbeats'] += 1
+
+        if alive:
+            device.last_heartbeat = self._now()
+            device.misses = 0
+            if not device.alive:
+                device.alive = True
+                self._down.discard(device_id)
+                self._send(HeartbeatEvent(device.event_mgr, int(self._now()),
+                                          object_type=device.object_type,
+                                          sub_category=device.sub_category), False)
+        else:
+            device.misses += 1
+            self._heartbeat_failed(device_id, device)
+
+    def connectivity(self, device_id, connected):
+        """
+        Record the connectivity of a device
+
+        :param device_id: (str) Device ID
+        :param connected: (bool) True if the device is reachable
+        """
+        device = self._devices.get(device_id)
+        if device is None or device.connected == connected:
+            return
+
+        device.connected = connected
+        if connected:
+            self._unreachable.discard(device_id)
+        else:
+            self._unreachable.add(device_id)
+
+        self._send(ConnectivityLossEvent(device.event_mgr, int(self._now()),
+                                         object_type=device.object_type,
+                                         sub_category=device.sub_category), not connected)
+
+    def watch_omci(self, device_id, event_bus):
+        """
+        Follow the OMCI connectivity of a device until it is removed
+
+        :param device_id: (str) Device ID, already added
+        :param event_bus: (EventBusClient) Event bus of the OMCI_CC of the device
+        """
+        device = self._devices.get(device_id)
+        if device is None or device.subscription is not None:
+            return
+
+        def on_connectivity(_topic, msg):
+            self.connectivity(device_id, msg[CONNECTED_KEY])
+
+        topic = OMCI_CC.event_bus_topic(device_id, RxEvent.Connectivity)
+        device.subscription = (event_bus, event_bus.subscribe(topic, on_connectivity))
+
+    def start(self, interval=DEFAULT_INTERVAL):
+        """
+        Start publishing periodic summaries
+
+        :param interval: (int/float) Seconds between summaries
+        """
+        if self._lc is None:
+            self._lc = LoopingCall(self.process)
+            if self._clock is not None:
+                self._lc.clock = self._clock
+
+        if not self._lc.running:
+            self._lc.start(interval, now=False)
+
+    def stop(self):
+        """ Stop the periodic summaries """
+        if self._lc is not None and self._lc.running:
+            self._lc.stop()
+
+    def process(self):
+        """
+        Check the heartbeat timeouts and publish a summary of all devices
+
+        :return: (MetricInformation) Summary published, None on failure
+        """
+        try:
+            now = self._now()
+            if self._heartbeat_timeout is not None:
+                self._check_timeouts(now)
+
+            summary = self._summary(now)
+            self._publish_summary(summary, now)
+            return summary
+
+        except Exception as e:
+            self.log.exception('liveness-process-failed', e=e)
+            return None
+
+    def _check_timeouts(self, now):
+        timeout = self._heartbeat_timeout
+
+        for device_id, device in six.iteritems(self._devices):
+            elapsed = now - device.last_heartbeat
+            if device.alive and elapsed >= timeout:
+                device.misses = int(elapsed // timeout)
+                self._heartbeat_failed(device_id, device)
+
+    def _heartbeat_failed(self, device_id, device):
+        if device.alive:
+            device.alive = False
+            self._down.add(device_id)
+            self._send(HeartbeatEvent(device.event_mgr, int(self._now()),
+                                      object_type=device.object_type,
+                                      heartbeat_misses=device.misses,
+                                      sub_category=device.sub_category), True)
+
+    def _send(self, event, raised):
+        self._statistics['raised' if raised else 'cleared'] += 1
+        self._transitions['raised' if raised else 'cleared'] += 1
+
+        if event.event_mgr is None:
+            return
+
+        try:
+            event.send(raised)
+
+        except Exception as e:
+            self.log.exception('liveness-send-failed', e=e)
+
+    @staticmethod
+    def _listed(device_ids):
+        listed = sorted(device_ids)[:LivenessAggregator.MAX_LISTED]
+        if len(device_ids) > len(listed):
+            listed.append('...')
+        return ','.join(listed)
+
+    def _summary(self, now):
+        transitions, self._transitions = self._transitions, {'raised': 0, 'cleared': 0}
+        metrics = {
+            'devices': float(len(self._devices)),
+            'alive': float(len(self._devices) - len(self._down)),
+            'heartbeat_failed': float(len(self._down)),
+            'unreachable': float(len(self._unreachable)),
+            'raised': float(transitions['raised']),
+            'cleared': float(transitions['cleared']),
+        }
+        context = {
+            'heartbeat-failed': self._listed(self._down),
+            'unreachable': self._listed(self._unreachable),
+        }
+        return MetricInformation(metadata=MetricMetaData(title=LivenessAggregator.SUMMARY_TITLE,
+                                                         ts=now,
+                                                         context=context),
+                                 metrics=metrics)
+
+    def _publish_summary(self, summary, now):
+        self._statistics['summaries'] += 1
+        publish_slices([summary], now, kpi_aggregator=self._kpi_aggregator,
+                       event_mgr=self._event_mgr, sub_category=self._sub_category,
+                       statistics=self._statistics)
@@ -0,0 +1,242 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Per-device OMCI alarm state table that filters the alarm transitions sent as events
+"""
+from __future__ import absolute_import
+import structlog
+from collections import OrderedDict
+from twisted.internet import reactor
+
+
+class _AlarmState(object):
+    __slots__ = ('reported', 'target', 'call')
+
+    def __init__(self, reported):
+        self.reported = reported        # Last state sent
+        self.target = reported          # Latest state of the alarm bit
+        self.call = None                # Pending debounce/hold-down/rate-limit timer
+
+
+class AlarmStateTable(object):
+    """
+    Debounce, duplicate suppression and rate limiting of the alarm events of an ONU
+
+    Each alarm (class ID, entity ID, alarm number) has a reported state (the last
+    event sent) and a target state (the latest alarm bit). A raise is sent once
+    the alarm has stayed raised for 'raise_delay' seconds, a clear once it has
+    stayed cleared for 'clear_delay' seconds (hold-down). An alarm that returns
+    to its reported state before then is not sent at all. With a delay of 0 (the
+    default) the transition is sent from 'update' itself, so a raise followed
+    by a clear in the same reactor turn sends both events.
+
+    If 'max_rate' is set, at most 'max_rate' events per second (with bursts of up
+    to 'burst' events) are sent. Alarms over the limit wait for the rate to allow
+    them and only their latest state is sent.
+    """
+    DEFAULT_RAISE_DELAY = 0         # Seconds an alarm must stay raised before it is sent
+    DEFAULT_CLEAR_DELAY = 0         # Seconds an alarm must stay cleared before it is sent
+    DEFAULT_MAX_RATE = 0            # Events per second, 0 for no limit
+    DEFAULT_BURST = 16              # Events sent back-to-back before the rate applies
+
+    def __init__(self, device_id, send, raise_delay=DEFAULT_RAISE_DELAY,
+                 clear_delay=DEFAULT_CLEAR_DELAY, max_rate=DEFAULT_MAX_RATE,
+                 burst=DEFAULT_BURST, clock=None):
+        """
+        Class initializer
+
+        :param device_id: (str) ONU Device ID
+        :param send: (callable) Called with (class_id, entity_id, alarm_number, raised)
+                                to send the event of an alarm transition
+        :param raise_delay: (int/float) Debounce seconds of raised alarms
+        :param clear_delay: (int/float) Hold-down seconds of cleared alarms
+        :param max_rate: (int/float) Maximum events per second, 0 for no limit
+        :param burst: (int) Maximum events sent back-to-back when under the rate
+        :param clock: (IReactorTime) Reactor to schedule the timers on, for tests
+        """
+        assert raise_delay >= 0 and clear_delay >= 0, 'Delays cannot be negative'
+        assert max_rate >= 0, 'Rate cannot be negative'
+        assert burst >= 1, 'Burst must allow at least one event'
+
+        self.log = structlog.get_logger(device_id=device_id)
+        self._device_id = device_id
+        self._send = send
+        self._raise_delay = raise_delay
+        self._clear_delay = clear_delay
+        self._max_rate = max_rate
+        self._burst = burst
+        self._clock = clock or reactor
+
+        self._alarms = dict()           # (class_id, entity_id, alarm_number) -> _AlarmState
+        self._limited = OrderedDict()   # Alarms waiting for the rate limit, oldest first
+        self._drain_call = None
+        self._tokens = float(burst)
+        self._last_refill = self._clock.seconds()
+        self._statistics = {
+            'raised': 0,                # Raise events sent
+            'cleared': 0,               # Clear events sent
+            'duplicates': 0,            # Transitions to the state already pending or reported
+            'suppressed': 0,            # Transitions that reverted within their delay
+            'rate-limited': 0,          # Events delayed by the rate limit
+            'dropped': 0,               # Rate-limited events that reverted before sent
+        }
+
+    def __str__(self):
+        return 'AlarmStateTable: Device ID: {}, alarms: {}, rate-limited: {}'.format(
+            self._device_id, len(self._alarms), len(self._limited))
+
+    @property
+    def statistics(self):
+        """ Filter counters """
+        return dict(self._statistics)
+
+    @property
+    def pending(self):
+        """ Number of alarm transitions not yet sent """
+        return sum(1 for state in self._alarms.values() if state.target != state.reported)
+
+    def is_raised(self, class_id, entity_id, alarm_number):
+        """
+        Get the reported state of an alarm
+
+        :return: (bool) True if the last event sent for the alarm is a raise
+        """
+        state = self._alarms.get((class_id, entity_id, alarm_number))
+        return state is not None and state.reported
+
+    def update(self, class_id, entity_id, alarm_number, raised):
+        """
+        Record an alarm bit transition
+
+        :param class_id: (int) Class ID of the Alarm ME
+        :param entity_id: (int) Entity ID of the Alarm
+        :param alarm_number: (int) Alarm number (bit)
+        :param raised: (bool) True if the alarm is now raised, False if cleared
+        """
+        key = (class_id, entity_id, alarm_number)
+        state = self._alarms.get(key)
+
+        if state is None:
+            # First transition seen, the alarm was in the other state
+            state = self._alarms[key] = _AlarmState(not raised)
+
+        if state.target == raised:
+            self._statistics['duplicates'] += 1
+            return
+
+        state.target = raised
+
+        if state.call is not None and key not in self._limited:
+            # Reverted within its debounce/hold-down delay
+            self._cancel(state)
+            self._statistics['suppressed'] += 1
+            return
+
+        if key in self._limited:
+            return      # Latest state is sent (or dropped) when the rate allows
+
+        delay = self._raise_delay if raised else self._clear_delay
+        if delay > 0:
+            state.call = self._clock.callLater(delay, self._expire, key)
+        else:
+            self._expire(key)
+
+    def remove(self, class_id=None, entity_id=None):
+        """
+        Forget the alarms of an ME instance, class or all alarms. Their pending
+        transitions are not sent.
+
+        :param class_id: (int) Class ID, None for all classes
+        :param entity_id: (int) Entity ID, None for all instances
+        """
+        for key in [key for key in self._alarms
+                    if (class_id is None or key[0] == class_id) and
+                    (entity_id is None or key[1] == entity_id)]:
+            self._cancel(self._alarms.pop(key))
+            self._limited.pop(key, None)
+
+    def stop(self):
+        """ Cancel all pending transitions """
+        self.remove()
+        call, self._drain_call = self._drain_call, None
+        if call is not None and call.active():
+            call.cancel()
+
+    @staticmethod
+    def _cancel(state):
+        call, state.call = state.call, None
+        if call is not None and call.active():
+            call.cancel()
+
+    def _refill(self):
+        now = self._clock.seconds()
+        self._tokens = min(float(self._burst),
+                           self._tokens + (now - self._last_refill) * self._max_rate)
+        self._last_refill = now
+
+    def _expire(self, key):
+        state = self._alarms.get(key)
+        if state is None:
+            return
+
+        state.call = None
+        if self._max_rate > 0:
+            self._refill()
+            if self._tokens < 1 or len(self._limited):
+                self._statistics['rate-limited'] += 1
+                self._limited[key] = True
+                self._schedule_drain()
+                return
+
+            self._tokens -= 1
+
+        self._emit(key, state)
+
+    def _emit(self, key, state):
+        state.reported = state.target
+        self._statistics['raised' if state.reported else 'cleared'] += 1
+        try:
+            self._send(key[0], key[1], key[2], state.reported)
+
+        except Exception as e:
+            self.log.exception('alarm-send-failure', class_id=key[0], entity_id=key[1],
+                               alarm_number=key[2], e=e)
+
+    def _schedule_drain(self):
+        if self._drain_call is None or not self._drain_call.active():
+            delay = max(0.0, (1 - self._tokens) / self._max_rate)
+            self._drain_call = self._clock.callLater(delay, self._drain)
+
+    def _drain(self):
+        self._drain_call = None
+        self._refill()
+
+        while len(self._limited) and self._tokens >= 1:
+            key, _ = self._limited.popitem(last=False)
+            state = self._alarms.get(key)
+
+            if state is None:
+                continue
+
+            if state.target == state.reported:
+                self._statistics['dropped'] += 1
+                continue
+
+            self._tokens -= 1
+            self._emit(key, state)
+
+        if len(self._limited):
+            self._schedule_drain()
@@ -0,0 +1,319 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+OpenOMCI agent-wide scheduling of periodic MIB audits and resynchronizations
+"""
+from __future__ import absolute_import
+import random
+import structlog
+from collections import deque
+from twisted.internet import reactor
+from twisted.internet.defer import Deferred
+import six
+
+
+class ScheduledAudit(object):
+    """
+    Handle to a scheduled audit. Like a twisted DelayedCall it can be
+    cancelled and has a 'called' attribute, so state machines can treat it like
+    any other of their pending deferred operations.
+    """
+    __slots__ = ('scheduler', 'device_id', 'time', 'bucket', 'called', 'cancelled',
+                 '_call', '_callback', '_args')
+
+    def __init__(self, scheduler, device_id, time, bucket, callback, args):
+        self.scheduler = scheduler
+        self.device_id = device_id
+        self.time = time
+        self.bucket = bucket
+        self.called = False
+        self.cancelled = False
+        self._call = None
+        self._callback = callback
+        self._args = args
+
+    def getTime(self):
+        return self.time
+
+    def active(self):
+        return not (self.called or self.cancelled)
+
+    def cancel(self):
+        if self.active():
+            self.cancelled = True
+            self.scheduler._remove(self)
+            call, self._call = self._call, None
+            if call is not None and call.active():
+                call.cancel()
+
+    def _fire(self):
+        self._call = None
+        if self.active():
+            self.called = True
+            self.scheduler._remove(self)
+            self._callback(*self._args)
+
+
+class MibAuditScheduler(object):
+    """
+    Spread the periodic MIB audits of all ONUs managed by an OpenOMCI agent
+    over the audit interval and limit the number of concurrent MIB
+    resynchronizations on each PON.
+
+    After an OLT reboot, all ONUs reach the MIB in-sync state at about the same
+    time. Rather than auditing exactly 'audit delay' seconds after that (and so
+    keep auditing in lockstep), each audit is placed in the least loaded time
+    bucket of its allowed window, with ties broken at random:
+
+        o The first audit of an ONU may be placed anywhere in the next audit
+          interval.
+        o Later audits keep the ONU's phase, placed within +/- jitter of one
+          interval after the previous audit.
+    """
+    DEFAULT_RESOLUTION = 1.0            # Seconds per scheduling bucket
+    DEFAULT_JITTER = 0.1                # Fraction of the audit interval
+    DEFAULT_MAX_RESYNCS_PER_PON = 4     # Concurrent MIB resyncs per OLT PON
+
+    def __init__(self, clock=None, resolution=DEFAULT_RESOLUTION,
+                 jitter=DEFAULT_JITTER, max_resyncs_per_pon=DEFAULT_MAX_RESYNCS_PER_PON,
+                 rng=None):
+        """
+        Class initialization
+
+        :param clock: (IReactorTime) Reactor or clock (tests) to use
+        :param resolution: (float) Width (seconds) of a scheduling time bucket
+        :param jitter: (float) Fraction (0..1) of the audit interval an audit
+                               may move from its nominal time to balance load
+        :param max_resyncs_per_pon: (int) Maximum concurrent MIB resynchronizations
+                                          on a single PON. Zero for no limit
+        :param rng: (random.Random) Random number source (tests)
+        """
+        assert resolution > 0, 'Resolution must be greater than zero'
+        assert 0.0 <= jitter <= 1.0, 'Jitter is a fraction of the audit interval'
+        assert max_resyncs_per_pon >= 0, 'Resync limit cannot be negative'
+
+        self.log = structlog.get_logger()
+        self.reactor = clock if clock is not None else reactor
+        self._resolution = resolution
+        self._jitter = jitter
+        self._max_resyncs = max_resyncs_per_pon
+        self._random = rng or random.Random()
+
+        self._audits = dict()           # device-id -> ScheduledAudit
+        self._last_audit = dict()       # device-id -> time of last audit
+        self._bucket_load = dict()      # bucket -> number of scheduled audits
+
+        self._resyncs = dict()          # pon-key -> set of device-ids resyncing
+        self._resync_waiting = dict()   # pon-key -> deque of (device-id, deferred)
+        self._resync_pon = dict()       # device-id -> pon-key (running or waiting)
+        self._resyncs_delayed = 0
+
+    def __str__(self):
+        return 'MibAuditScheduler: Audits: {}, Resyncs: {}, Waiting: {}'.format(
+            len(self._audits), self.resyncs_running, self.resyncs_waiting)
+
+    @property
+    def resyncs_running(self):
+        return sum(len(devices) for devices in six.itervalues(self._resyncs))
+
+    @property
+    def resyncs_waiting(self):
+        return sum(len(waiting) for waiting in six.itervalues(self._resync_waiting))
+
+    @property
+    def resyncs_delayed(self):
+        """ Number of resync requests that had to wait for a free PON slot """
+        return self._resyncs_delayed
+
+    @property
+    def schedule(self):
+        """
+        Currently scheduled audits
+
+        :return: (list) (time, device-id) tuples in order of audit time
+        """
+        return sorted((audit.time, device_id)
+                      for device_id, audit in six.iteritems(self._audits))
+
+    def bucket_load(self):
+        """
+        Number of scheduled audits per time bucket
+
+        :return: (dict) bucket start time -> number of audits
+        """
+        return {bucket * self._resolution: load
+                for bucket, load in six.iteritems(self._bucket_load)}
+
+    def schedule_audit(self, device_id, interval, callback, *args):
+        """
+        Schedule the next MIB audit of an ONU. Any audit already scheduled for
+        the ONU is cancelled
+
+        :param device_id: (str) ONU Device ID
+        :param interval: (int/float) Audit interval (seconds)
+        :param callback: (callable) Called with '*args' when the audit is due
+
+        :return: (ScheduledAudit) Cancellable audit handle
+        """
+        assert interval > 0, 'Audit interval must be greater than zero'
+        self.cancel_audit(device_id)
+
+        now = self.reactor.seconds()
+        last = self._last_audit.get(device_id)
+
+        window = interval * self._jitter
+
+        if last is None or last + interval + window < now + self._resolution:
+            # First audit (or phase lost), anywhere in the next interval
+            earliest, latest = now, now + interval
+        else:
+            nominal = last + interval
+            earliest, latest = nominal - window, nominal + window
+
+        earliest = max(earliest, now + self._resolution)
+        latest = max(latest, earliest)
+
+        first = int(earliest // self._resolution)
+        last_bucket = int(latest // self._resolution)
+        buckets = range(first, last_bucket + 1)
+        least = min(self._bucket_load.get(b, 0) for b in buckets)
+        bucket = self._random.choice([b for b in buckets
+                                      if self._bucket_load.get(b, 0) == least])
+
+        start = max(bucket * self._resolution, earliest)
+        end = min((bucket + 1) * self._resolution, latest)
+        when = self._random.uniform(start, max(start, end))
+
+        audit = ScheduledAudit(self, device_id, when, bucket, callback, args)
+        self._bucket_load[bucket] = least + 1
+        self._audits[device_id] = audit
+        audit._call = self.reactor.callLater(when - now, audit._fire)
+        return audit
+
+    def cancel_audit(self, device_id):
+        """
+        Cancel any scheduled audit of an ONU
+
+        :param device_id: (str) ONU Device ID
+        """
+        audit = self._audits.get(device_id)
+        if audit is not None:
+            audit.cancel()
+
+    def _remove(self, audit):
+        if self._audits.get(audit.device_id) is audit:
+            del self._audits[audit.device_id]
+
+        if audit.called:
+            self._last_audit[audit.device_id] = audit.time
+
+        load = self._bucket_load.get(audit.bucket, 0) - 1
+        if load > 0:
+            self._bucket_load[audit.bucket] = load
+        else:
+            self._bucket_load.pop(audit.bucket, None)
+
+    def remove_device(self, device_id):
+        """
+        Forget all scheduling information for an ONU
+
+        :param device_id: (str) ONU Device ID
+        """
+        self.cancel_audit(device_id)
+        self._last_audit.pop(device_id, None)
+        self.release_resync(device_id)
+
+    def acquire_resync(self, device_id, pon_key):
+        """
+        Request permission to run a MIB resynchronization
+
+        :param device_id: (str) ONU Device ID
+        :param pon_key: (hashable) PON the ONU is on, for instance the
+                        (OLT Device ID, channel ID) tuple. If None, the
+                        request is always granted immediately.
+
+        :return: (Deferred) Fires once the resync may start. Cancel it if no
+                 longer needed, otherwise call 'release_resync' once done
+        """
+        d = Deferred(canceller=lambda d: self._on_cancel(device_id, d))
+
+        if pon_key is None or self._max_resyncs == 0:
+            d.callback(device_id)
+            return d
+
+        self.release_resync(device_id)      # At most one outstanding per ONU
+        self._resync_pon[device_id] = pon_key
+        running = self._resyncs.setdefault(pon_key, set())
+
+        if len(running) < self._max_resyncs:
+            running.add(device_id)
+            d.callback(device_id)
+        else:
+            self._resyncs_delayed += 1
+            self._resync_waiting.setdefault(pon_key, deque()).append((device_id, d))
+
+        return d
+
+    def release_resync(self, device_id):
+        """
+        A MIB resynchronization has completed, or is no longer needed
+
+        :param device_id: (str) ONU Device ID
+        """
+        pon_key = self._resync_pon.pop(device_id, None)
+        if pon_key is None:
+            return
+
+        running = self._resyncs.get(pon_key)
+        if running is None or device_id not in running:
+            # Still waiting for a slot
+            for d in self._dequeue(pon_key, device_id):
+                d.cancel()
+            return
+
+        running.discard(device_id)
+        waiting = self._resync_waiting.get(pon_key)
+
+        while waiting and len(running) < self._max_resyncs:
+            next_device, d = waiting.popleft()
+            running.add(next_device)
+            d.callback(next_device)
+
+        if waiting is not None and not waiting:
+            del self._resync_waiting[pon_key]
+        if not running:
+            del self._resyncs[pon_key]
+
+    def _dequeue(self, pon_key, device_id, d=None):
+        """ Remove waiting resync requests of an ONU and return their deferreds """
+        removed = []
+        waiting = self._resync_waiting.get(pon_key)
+
+        if waiting:
+            for entry in list(waiting):
+                if entry[0] == device_id and (d is None or entry[1] is d):
+                    waiting.remove(entry)
+                    removed.append(entry[1])
+
+            if not waiting:
+                del self._resync_waiting[pon_key]
+
+        return removed
+
+    def _on_cancel(self, device_id, d):
+        pon_key = self._resync_pon.get(device_id)
+        if pon_key is not None and self._dequeue(pon_key, device_id, d):
+            del self._resync_pon[device_id]
@@ -0,0 +1,271 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+OpenOMCI agent-wide cache of ONU OMCI capabilities, keyed by ONU model
+"""
+from __future__ import absolute_import
+import json
+import structlog
+from twisted.internet import reactor
+from twisted.internet.defer import inlineCallbacks, returnValue
+import six
+from six.moves.urllib.parse import quote
+
+# ME class IDs used to identify the ONU model
+ONT_G_CLASS_ID = 256
+ONT2_G_CLASS_ID = 257
+SOFTWARE_IMAGE_CLASS_ID = 7
+
+
+class CachedCapabilities(object):
+    """
+    Supported managed entities and message types of an ONU model
+    """
+    __slots__ = ('managed_entities', 'message_types', 'table_sizes', 'timestamp')
+
+    def __init__(self, managed_entities, message_types, table_sizes, timestamp):
+        """
+        :param managed_entities: (frozenset) Supported ME class IDs
+        :param message_types: (frozenset) Supported OMCI message types
+        :param table_sizes: (dict) OMCI ME table attribute name -> size (octets)
+                                   as reported by the ONU
+        :param timestamp: (float) Time the capabilities were read from an ONU
+        """
+        self.managed_entities = frozenset(managed_entities)
+        self.message_types = frozenset(message_types)
+        self.table_sizes = dict(table_sizes or {})
+        self.timestamp = timestamp
+
+    def to_json(self):
+        return json.dumps({
+            'managed-entities': sorted(self.managed_entities),
+            'message-types': sorted(self.message_types),
+            'table-sizes': self.table_sizes,
+            'timestamp': self.timestamp
+        })
+
+    @staticmethod
+    def from_json(value):
+        if isinstance(value, bytes):
+            value = value.decode('ascii')
+        data = json.loads(value)
+        return CachedCapabilities(data['managed-entities'],
+                                  data['message-types'],
+                                  data.get('table-sizes'),
+                                  data.get('timestamp', 0))
+
+
+class OnuCapabilitiesCache(object):
+    """
+    ONUs of the same model report identical OMCI capabilities. The model is
+    identified by the ONT-G vendor ID and hardware version, the ONT2-G equipment
+    ID and OMCC version, and the version of the active software image. Reading
+    the capabilities requires walking the OMCI ME's tables with long
+    Get/Get-Next sequences, so the results of the first ONU of a model are
+    cached and reused for the others.
+
+    Cached entries older than 'max-age' seconds are refreshed by reading the
+    capabilities of the next ONU of that model. If 'validate' is set (off by
+    default), a cached entry is only used after the table sizes reported by the
+    ONU (a single Get per table) match the ones reported when it was cached.
+
+    If a KV store is provided, entries are also persisted so they survive an
+    adapter restart.
+    """
+    BASE_PATH = 'service/voltha/omci_mibs/capabilities'
+    CACHE_PATH = '{}/{}/{}/{}/{}'
+    DEFAULT_MAX_AGE = 24 * 60 * 60      # Seconds, 0 for no refresh
+
+    def __init__(self, kv_store=None, validate=False, max_age=DEFAULT_MAX_AGE, clock=None):
+        """
+        Class initialization
+
+        :param kv_store: (TwistedEtcdStore) Optional KV store to persist entries in
+        :param validate: (bool) Check table sizes before using a cached entry
+        :param max_age: (int/float) Seconds a cached entry is valid, 0 for ever
+        :param clock: (IReactorTime) Reactor or clock (tests) to use
+        """
+        assert max_age >= 0, 'Maximum age cannot be negative'
+
+        self.log = structlog.get_logger()
+        self.reactor = clock if clock is not None else reactor
+        self._kv_store = kv_store
+        self._validate = validate
+        self._max_age = max_age
+        self._entries = dict()          # identity -> CachedCapabilities
+
+        self._hits = 0
+        self._misses = 0
+        self._expired = 0
+        self._invalidated = 0
+
+    def __str__(self):
+        return 'OnuCapabilitiesCache: Entries: {}, Hits: {}, Misses: {}'.format(
+            len(self._entries), self._hits, self._misses)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def validate(self):
+        return self._validate
+
+    @property
+    def max_age(self):
+        return self._max_age
+
+    @property
+    def statistics(self):
+        return {
+            'entries': len(self._entries),
+            'hits': self._hits,
+            'misses': self._misses,
+            'expired': self._expired,
+            'invalidated': self._invalidated
+        }
+
+    @staticmethod
+    def onu_identity(device):
+        """
+        Get the model identity of an ONU from its (synchronized) MIB database
+
+        :param device: (OnuDeviceEntry) ONU device
+        :return: (tuple) (vendor ID, hardware version, equipment ID, OMCC version,
+                         software version) or None if the ONU model cannot be
+                         determined
+        """
+        def as_str(value):
+            if isinstance(value, bytes):
+                value = value.decode('ascii', 'ignore')
+            return value.rstrip('\x00').strip() if isinstance(value, six.string_types) else ''
+
+        try:
+            vendor_id = as_str(device.query_mib_single_attribute(ONT_G_CLASS_ID, 0, 'vendor_id'))
+            hardware_version = as_str(device.query_mib_single_attribute(ONT_G_CLASS_ID, 0,
+                                                                        'version'))
+            equipment_id = as_str(device.query_mib_single_attribute(ONT2_G_CLASS_ID, 0,
+                                                                    'equipment_id'))
+            omcc_version = device.query_mib_single_attribute(ONT2_G_CLASS_ID, 0, 'omcc_version')
+            software_version = ''
+            for instance_id in (0, 1):
+                if device.query_mib_single_attribute(SOFTWARE_IMAGE_CLASS_ID, instance_id,
+                                                     'is_active'):
+                    software_version = as_str(device.query_mib_single_attribute(
+                        SOFTWARE_IMAGE_CLASS_ID, instance_id, 'version'))
+                    break
+
+        except Exception:
+            return None
+
+        if vendor_id and hardware_version and equipment_id and \
+                isinstance(omcc_version, int) and software_version:
+            return vendor_id, hardware_version, equipment_id, omcc_version, software_version
+
+        return None
+
+    def get(self, identity):
+        """
+        Get a cached, unexpired entry from memory
+
+        :param identity: (tuple) ONU model identity
+        :return: (CachedCapabilities) entry or None
+        """
+        entry = self._entries.get(identity)
+
+        if entry is not None and self._max_age and \
+                self.reactor.seconds() - entry.timestamp > self._max_age:
+            self._expired += 1
+            del self._entries[identity]
+            entry = None
+
+        if entry is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+
+        return entry
+
+    @inlineCallbacks
+    def lookup(self, identity):
+        """
+        Get a cached, unexpired entry from memory or, if not found there,
+        from the KV store
+
+        :param identity: (tuple) ONU model identity
+        :return: (Deferred) Fires with the CachedCapabilities entry or None
+        """
+        entry = self._entries.get(identity)
+
+        if entry is None and self._kv_store is not None:
+            try:
+                value = yield self._kv_store.get(self._kv_path(identity))
+                if value:
+                    entry = CachedCapabilities.from_json(value)
+                    self._entries[identity] = entry
+
+            except Exception as e:
+                self.log.warn('capabilities-load-failed', identity=identity, e=e)
+
+        returnValue(self.get(identity))
+
+    def set(self, identity, managed_entities, message_types, table_sizes=None):
+        """
+        Add or replace the capabilities of an ONU model
+
+        :param identity: (tuple) ONU model identity
+        :param managed_entities: (set) Supported ME class IDs
+        :param message_types: (set) Supported OMCI message types
+        :param table_sizes: (dict) OMCI ME table attribute name -> size (octets)
+
+        :return: (CachedCapabilities) New entry
+        """
+        entry = CachedCapabilities(managed_entities, message_types, table_sizes,
+                                   self.reactor.seconds())
+        self._entries[identity] = entry
+
+        if self._kv_store is not None:
+            d = self._kv_store.set(self._kv_path(identity), entry.to_json())
+            d.addErrback(lambda failure: self.log.warn('capabilities-save-failed',
+                                                       identity=identity,
+                                                       reason=failure.getErrorMessage()))
+        return entry
+
+    def invalidate(self, identity):
+        """
+        Drop the cached capabilities of an ONU model, for instance after an
+        ONU of that model reported different ones
+
+        :param identity: (tuple) ONU model identity
+        """
+        if self._entries.pop(identity, None) is not None:
+            self._invalidated += 1
+
+        if self._kv_store is not None:
+            d = self._kv_store.delete(self._kv_path(identity))
+            d.addErrback(lambda failure: self.log.warn('capabilities-delete-failed',
+                                                       identity=identity,
+                                                       reason=failure.getErrorMessage()))
+
+    def clear(self):
+        """ Drop all cached entries from memory """
+        self._entries.clear()
+
+    @staticmethod
+    def _kv_path(identity):
+        # Identity strings are free-form, so each one is escaped into a single
+        # path level. Empty values, which quote() never produces, become '%'.
+        return OnuCapabilitiesCache.CACHE_PATH.format(
+            *(quote(str(value), safe='') or '%' for value in identity))
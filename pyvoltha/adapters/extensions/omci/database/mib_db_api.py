@@ -145,6 +145,26 @@ class MibDbApi(object):
         """
         raise NotImplementedError('Implement this in your derive class')
 
+    def bulk_set(self, device_id, entities):
+        """
+        Set/Create many database values at once, for instance a batch of MIB
+        upload responses. This should only be called by the MIB synchronizer
+        and its related tasks.
+
+        This default implementation calls 'set' for each entity. Derived classes
+        should override it if they can apply a batch more efficiently.
+
+        :param device_id: (str) ONU Device ID
+        :param entities: (iterable) (class_id, entity_id, attributes) tuples
+
+        :returns: (int) Number of instances created or changed
+
+        :raises KeyError: If device does not exist
+        :raises DatabaseStateError: If the database is not enabled
+        """
+        return sum(1 for class_id, entity_id, attributes in entities
+                   if self.set(device_id, class_id, entity_id, attributes))
+
     def delete(self, device_id, class_id, entity_id):
         """
         Delete an entity from the database if it exists
@@ -161,7 +181,8 @@ class MibDbApi(object):
         """
         raise NotImplementedError('Implement this in your derive class')
 
-    def query(self, device_id, class_id=None, instance_id=None, attributes=None):
+    def query(self, device_id, class_id=None, instance_id=None, attributes=None,
+              read_only=False):
         """
         Get database information.
 
@@ -172,6 +193,8 @@ class MibDbApi(object):
         :param class_id:  (int) Managed Entity class ID
         :param instance_id: (int) Managed Entity instance
         :param attributes: (list/set or str) Managed Entity instance's attributes
+        :param read_only: (bool) If True, the caller will not modify the results
+                                 and an immutable, shared view may be returned
 
         :return: (dict) The value(s) requested. If class/inst/attribute is
                         not found, an empty dictionary is returned
@@ -180,6 +203,27 @@ class MibDbApi(object):
         """
         raise NotImplementedError('Implement this in your derive class')
 
+    def generation(self, device_id):
+        """
+        Get the modification generation of an ONU's database. The value changes
+        every time the ONU's database is modified.
+
+        :param device_id: (str) ONU Device ID
+        :return: (int) Generation or None if not supported by this database
+        """
+        return None
+
+    def digests(self, device_id):
+        """
+        Get the content digests of an ONU's ME instances, used to skip equal
+        instances when comparing MIBs (see mib_diff)
+
+        :param device_id: (str) ONU Device ID
+        :return: (dict) (class_id, instance_id) -> digest, or None if not
+                        supported by this database
+        """
+        return None
+
     def on_mib_reset(self, device_id):
         """
         Reset/clear the database for a specific Device
@@ -0,0 +1,628 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+OpenOMCI memory-compact MIB Database
+
+Same behaviour as MibDbVolatileDict, but sized for hosting many thousands of
+ONUs in a single adapter:
+
+    - ME instances are slotted records with integer (microsecond) timestamps
+    - Attribute names are interned and kept in one tuple per distinct set of
+      names. Attribute values are kept in a tuple in the same order
+    - Supported ME and message type sets are shared between ONUs. For ONUs
+      loaded from a MIB template, identical instances and whole ME classes
+      are shared as well. A shared class is copied the first time an ONU
+      modifies or deletes one of its instances
+"""
+from __future__ import absolute_import
+import json
+import six
+from datetime import datetime, timedelta
+from itertools import count
+from weakref import WeakValueDictionary
+from .mib_db_api import *
+from .mib_db_dict import to_db_value, from_db_value, json_converter
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _timestamp(when=None):
+    """ Integer (microseconds since the epoch) timestamp of a UTC datetime """
+    delta = (when or datetime.utcnow()) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _datetime(timestamp):
+    return _EPOCH + timedelta(microseconds=timestamp) if timestamp is not None else None
+
+
+def _intern(value):
+    return six.moves.intern(value) if type(value) is str else value
+
+
+class _Instance(object):
+    """
+    ME instance record. Records are never modified once created, so they can
+    be shared between ONUs. A timestamp of None is the time the ONU's MIB was
+    loaded from a template.
+    """
+    __slots__ = ('created', 'modified', 'names', 'values', '__weakref__')
+
+    def __init__(self, created, modified, names, values):
+        self.created = created
+        self.modified = modified
+        self.names = names
+        self.values = values
+
+
+class _Class(dict):
+    """ Instance ID -> _Instance map of an ME class. Shared when it is frozen """
+    __slots__ = ('frozen', '__weakref__')
+
+    def __init__(self, *args, **kwargs):
+        super(_Class, self).__init__(*args, **kwargs)
+        self.frozen = False
+
+
+class _Device(object):
+    """ ONU record """
+    __slots__ = ('created', 'loaded', 'last_sync', 'mds', 'managed_entities',
+                 'message_types', 'classes')
+
+    def __init__(self, created):
+        self.created = created
+        self.loaded = None              # Template load time
+        self.last_sync = None
+        self.mds = 0
+        self.managed_entities = ()      # ((class_id, name), ...)
+        self.message_types = frozenset()
+        self.classes = dict()           # Class ID -> _Class
+
+
+class MibDbCompactDict(MibDbApi):
+    """
+    Memory-compact in-memory database for ME storage. Data is not persistent
+    across reboots.
+    """
+    CURRENT_VERSION = 1
+
+    def __init__(self, omci_agent):
+        """
+        Class initializer
+        :param omci_agent: (OpenOMCIAgent) OpenOMCI Agent
+        """
+        super(MibDbCompactDict, self).__init__(omci_agent)
+        self._data = dict()             # device_id -> _Device
+        self._generations = count(1)
+        self._generation = dict()       # device_id -> generation of last modification
+
+        # Shared, immutable values
+        self._names = dict()                            # Attribute names -> sorted, interned tuple
+        self._capabilities = dict()                     # Supported ME and message types
+        self._templates = WeakValueDictionary()         # Template instances
+        self._classes = WeakValueDictionary()           # Frozen template classes
+
+    def generation(self, device_id):
+        """
+        Get the modification generation of an ONU's database. The value changes
+        every time the ONU's database is modified.
+
+        :param device_id: (str) ONU Device ID
+        :return: (int) Generation or None if the device is not in the database
+        """
+        return self._generation.get(device_id)
+
+    def _touch(self, device_id):
+        self._generation[device_id] = next(self._generations)
+
+    def add(self, device_id, overwrite=False):
+        """
+        Add a new ONU to database
+
+        :param device_id: (str) Device ID of ONU to add
+        :param overwrite: (bool) Overwrite existing entry if found.
+
+        :raises KeyError: If device already exists and 'overwrite' is False
+        """
+        self.log.debug('add-device', device_id=device_id, overwrite=overwrite)
+
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID should be an string')
+
+        if not self._started:
+            raise DatabaseStateError('The Database is not currently active')
+
+        if not overwrite and device_id in self._data:
+            raise KeyError('Device {} already exists in the database'
+                           .format(device_id))
+
+        now = datetime.utcnow()
+        self._modified = now
+        self._data[device_id] = _Device(_timestamp(now))
+        self._touch(device_id)
+
+    def remove(self, device_id):
+        """
+        Remove an ONU from the database
+
+        :param device_id: (str) Device ID of ONU to remove from database
+        """
+        self.log.debug('remove-device', device_id=device_id)
+
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID should be an string')
+
+        if not self._started:
+            raise DatabaseStateError('The Database is not currently active')
+
+        if device_id in self._data:
+            del self._data[device_id]
+            self._generation.pop(device_id, None)
+            self._modified = datetime.utcnow()
+
+    def on_mib_reset(self, device_id):
+        """
+        Reset/clear the database for a specific Device
+
+        :param device_id: (str) ONU Device ID
+        :raises DatabaseStateError: If the database is not enabled
+        :raises KeyError: If the device does not exist in the database
+        """
+        if not self._started:
+            raise DatabaseStateError('The Database is not currently active')
+
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID should be an string')
+
+        device = self._data[device_id]
+        self._modified = datetime.utcnow()
+
+        device.mds = 0
+        device.loaded = None
+        device.classes = dict()
+        self._touch(device_id)
+
+    def save_mib_data_sync(self, device_id, value):
+        """
+        Save the MIB Data Sync to the database in an easy location to access
+
+        :param device_id: (str) ONU Device ID
+        :param value: (int) Value to save
+        """
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID should be an string')
+
+        if not isinstance(value, int):
+            raise TypeError('MIB Data Sync is an integer')
+
+        if not 0 <= value <= 255:
+            raise ValueError('Invalid MIB-data-sync value {}.  Must be 0..255'.
+                             format(value))
+
+        self._data[device_id].mds = value
+        self._modified = datetime.utcnow()
+        self._touch(device_id)
+
+    def get_mib_data_sync(self, device_id):
+        """
+        Get the MIB Data Sync value last saved to the database for a device
+
+        :param device_id: (str) ONU Device ID
+        :return: (int) The Value or None if not found
+        """
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID should be an string')
+
+        if device_id not in self._data:
+            return None
+
+        return self._data[device_id].mds
+
+    def save_last_sync(self, device_id, value):
+        """
+        Save the Last Sync time to the database in an easy location to access
+
+        :param device_id: (str) ONU Device ID
+        :param value: (DateTime) Value to save
+        """
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID should be an string')
+
+        if not isinstance(value, datetime):
+            raise TypeError('Expected a datetime object, got {}'.
+                            format(type(datetime)))
+
+        self._data[device_id].last_sync = _timestamp(value)
+        self._modified = datetime.utcnow()
+        self._touch(device_id)
+
+    def get_last_sync(self, device_id):
+        """
+        Get the Last Sync Time saved to the database for a device
+
+        :param device_id: (str) ONU Device ID
+        :return: (int) The Value or None if not found
+        """
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID should be an string')
+
+        if device_id not in self._data:
+            return None
+
+        return _datetime(self._data[device_id].last_sync)
+
+    def set(self, device_id, class_id, instance_id, attributes):
+        """
+        Set a database value.  This should only be called by the MIB synchronizer
+        and its related tasks
+
+        :param device_id: (str) ONU Device ID
+        :param class_id: (int) ME Class ID
+        :param instance_id: (int) ME Entity ID
+        :param attributes: (dict) Attribute dictionary
+
+        :returns: (bool) True if the value was saved to the database. False if the
+                         value was identical to the current instance
+
+        :raises KeyError: If device does not exist
+        :raises DatabaseStateError: If the database is not enabled
+        """
+        return self.bulk_set(device_id, [(class_id, instance_id, attributes)]) > 0
+
+    def bulk_set(self, device_id, entities):
+        """
+        Set/Create many database values at once
+
+        :param device_id: (str) ONU Device ID
+        :param entities: (iterable) (class_id, entity_id, attributes) tuples
+
+        :returns: (int) Number of instances created or changed
+
+        :raises KeyError: If device does not exist
+        :raises DatabaseStateError: If the database is not enabled
+        """
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID should be a string')
+
+        if not self._started:
+            raise DatabaseStateError('The Database is not currently active')
+
+        device = self._data[device_id]
+        me_map = self._omci_agent.get_device(device_id).me_map
+        now = _timestamp()
+        changed = 0
+
+        try:
+            for class_id, instance_id, attributes in entities:
+                try:
+                    if self._set_instance(device, me_map, now, class_id, instance_id, attributes):
+                        changed += 1
+
+                except Exception as e:
+                    self.log.error('set-failure', e=e, class_id=class_id,
+                                   instance_id=instance_id, attributes=attributes)
+                    raise
+        finally:
+            if changed:
+                self._modified = _datetime(now)
+                self._touch(device_id)
+
+        return changed
+
+    def _set_instance(self, device, me_map, now, class_id, instance_id, attributes):
+        if not 0 <= class_id <= 0xFFFF:
+            raise ValueError("Invalid Class ID: {}, should be 0..65535".format(class_id))
+
+        if not 0 <= instance_id <= 0xFFFF:
+            raise ValueError("Invalid Instance ID: {}, should be 0..65535".format(instance_id))
+
+        if not isinstance(attributes, dict):
+            raise TypeError("Attributes should be a dictionary")
+
+        class_db = device.classes.get(class_id)
+        instance = class_db.get(instance_id) if class_db is not None else None
+        entity = me_map.get(class_id)
+        values = dict(zip(instance.names, instance.values)) if instance is not None else dict()
+        changed = False
+
+        for attribute, value in attributes.items():
+            assert isinstance(attribute, six.string_types)
+            assert value is not None, "Attribute '{}' value cannot be 'None'".\
+                format(attribute)
+
+            db_value = values.get(attribute)
+            value = to_db_value(entity, attribute, value, db_value)
+
+            assert db_value is None or isinstance(value, type(db_value)), \
+                "New value type for attribute '{}' type is changing from '{}' to '{}'".\
+                format(attribute, type(db_value), type(value))
+
+            if db_value is None or db_value != value:
+                values[attribute] = value
+                changed = True
+
+        if instance is not None and not changed:
+            return False
+
+        names, values = self._shared_attributes(values)
+        created = instance.created if instance is not None else now
+        if created is None:
+            created = device.loaded
+
+        self._owned_class(device, class_id)[instance_id] = _Instance(created, now, names, values)
+        return True
+
+    def _shared_attributes(self, attributes):
+        """ Shared (names, values) tuples for an attribute dictionary """
+        order = tuple(attributes)
+        names = self._names.get(order)
+        if names is None:
+            names = tuple(sorted(six.moves.intern(str(name)) for name in order))
+            names = self._names[order] = self._names.setdefault(names, names)
+
+        return names, tuple(_intern(attributes[name]) for name in names)
+
+    def _owned_class(self, device, class_id):
+        """ Class map of a device that it can modify, copying it if it is shared """
+        class_db = device.classes.get(class_id)
+        if class_db is None:
+            class_db = device.classes[class_id] = _Class()
+
+        elif class_db.frozen:
+            class_db = device.classes[class_id] = _Class(class_db)
+
+        return class_db
+
+    def delete(self, device_id, class_id, instance_id):
+        """
+        Delete an entity from the database if it exists.  If all instances
+        of a class are deleted, the class is deleted as well.
+
+        :param device_id: (str) ONU Device ID
+        :param class_id: (int) ME Class ID
+        :param instance_id: (int) ME Entity ID
+
+        :returns: (bool) True if the instance was found and deleted. False
+                         if it did not exist.
+
+        :raises KeyError: If device does not exist
+        :raises DatabaseStateError: If the database is not enabled
+        """
+        if not self._started:
+            raise DatabaseStateError('The Database is not currently active')
+
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID should be an string')
+
+        if not 0 <= class_id <= 0xFFFF:
+            raise ValueError('class-id is 0..0xFFFF')
+
+        if not 0 <= instance_id <= 0xFFFF:
+            raise ValueError('instance-id is 0..0xFFFF')
+
+        device = self._data[device_id]
+        class_db = device.classes.get(class_id)
+
+        if class_db is None or instance_id not in class_db:
+            return False
+
+        class_db = self._owned_class(device, class_id)
+        del class_db[instance_id]
+
+        if len(class_db) == 0:
+            del device.classes[class_id]
+
+        self._modified = datetime.utcnow()
+        self._touch(device_id)
+        return True
+
+    def query(self, device_id, class_id=None, instance_id=None, attributes=None,
+              read_only=False):
+        """
+        Get database information.
+
+        This method can be used to request information from the database to the detailed
+        level requested
+
+        :param device_id: (str) ONU Device ID
+        :param class_id:  (int) Managed Entity class ID
+        :param instance_id: (int) Managed Entity instance
+        :param attributes: (list/set or str) Managed Entity instance's attributes
+        :param read_only: (bool) Ignored, results are always built on request
+
+        :return: (dict) The value(s) requested. If class/inst/attribute is
+                        not found, an empty dictionary is returned
+        :raises KeyError: If the requested device does not exist
+        :raises DatabaseStateError: If the database is not enabled
+        """
+        self.log.debug('query', device_id=device_id, class_id=class_id,
+                       entity_instance_id=instance_id, attributes=attributes)
+
+        if not self._started:
+            raise DatabaseStateError('The Database is not currently active')
+
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID is a string')
+
+        device = self._data.get(device_id)
+        if device is None:
+            return dict()
+
+        me_map = self._omci_agent.get_device(device_id).me_map
+
+        if class_id is None:
+            return self._device_dict(device_id, device, me_map)
+
+        if not isinstance(class_id, int):
+            raise TypeError('Class ID is an integer')
+
+        class_db = device.classes.get(class_id)
+        if class_db is None:
+            return dict()
+
+        entity = me_map.get(class_id)
+        if instance_id is None:
+            return self._class_dict(device, class_id, class_db, entity)
+
+        if not isinstance(instance_id, int):
+            raise TypeError('Instance ID is an integer')
+
+        instance = class_db.get(instance_id)
+        if instance is None:
+            return dict()
+
+        if attributes is None:
+            return self._instance_dict(device, instance_id, instance, entity)
+
+        if not isinstance(attributes, (six.string_types, list, set)):
+            raise TypeError('Attributes should be a string or list/set of strings')
+
+        if not isinstance(attributes, (list, set)):
+            attributes = [attributes]
+
+        return {attr: self._decode(entity, attr, val)
+                for attr, val in zip(instance.names, instance.values)
+                if attr in attributes}
+
+    def _decode(self, entity, attribute, value):
+        attr_index = entity.attribute_name_to_index_map.get(attribute) \
+            if entity is not None else None
+        eca = entity.attributes[attr_index] if attr_index is not None else None
+        return from_db_value(value, eca, self.log)
+
+    def _instance_dict(self, device, instance_id, instance, entity, decode=True):
+        return {
+            INSTANCE_ID_KEY: instance_id,
+            CREATED_KEY: _datetime(instance.created if instance.created is not None
+                                   else device.loaded),
+            MODIFIED_KEY: _datetime(instance.modified if instance.modified is not None
+                                    else device.loaded),
+            ATTRIBUTES_KEY: {attr: self._decode(entity, attr, val) if decode else val
+                             for attr, val in zip(instance.names, instance.values)}
+        }
+
+    def _class_dict(self, device, class_id, class_db, entity, decode=True):
+        results = {inst_id: self._instance_dict(device, inst_id, instance, entity, decode=decode)
+                   for inst_id, instance in six.iteritems(class_db)}
+        results[CLASS_ID_KEY] = class_id
+        return results
+
+    def _device_dict(self, device_id, device, me_map, decode=True):
+        results = {class_id: self._class_dict(device, class_id, class_db,
+                                              me_map.get(class_id), decode=decode)
+                   for class_id, class_db in six.iteritems(device.classes)}
+        results.update({
+            DEVICE_ID_KEY: device_id,
+            CREATED_KEY: _datetime(device.created),
+            LAST_SYNC_KEY: _datetime(device.last_sync),
+            MDS_KEY: device.mds,
+            VERSION_KEY: MibDbCompactDict.CURRENT_VERSION,
+            ME_KEY: dict(device.managed_entities),
+            MSG_TYPE_KEY: set(device.message_types)
+        })
+        return results
+
+    def update_supported_managed_entities(self, device_id, managed_entities):
+        """
+        Update the supported OMCI Managed Entities for this device
+
+        :param device_id: (str) ONU Device ID
+        :param managed_entities: (set) Managed Entity class IDs
+        """
+        try:
+            device = self._data[device_id]
+            me_map = self._omci_agent.get_device(device_id).me_map
+
+            entities = tuple(sorted((class_id, me_map[class_id].__name__ if class_id in me_map
+                                     else 'UnknownManagedEntity')
+                                    for class_id in managed_entities))
+
+            device.managed_entities = self._capabilities.setdefault(entities, entities)
+            self._modified = datetime.utcnow()
+            self._touch(device_id)
+
+        except Exception as e:
+            self.log.error('set-me-failure', e=e)
+            raise
+
+    def update_supported_message_types(self, device_id, msg_types):
+        """
+        Update the supported OMCI Managed Entities for this device
+
+        :param device_id: (str) ONU Device ID
+        :param msg_types: (set) Message Type values (ints)
+        """
+        try:
+            msg_type_set = frozenset(msg_type.value for msg_type in msg_types)
+            self._data[device_id].message_types = \
+                self._capabilities.setdefault(msg_type_set, msg_type_set)
+            self._modified = datetime.utcnow()
+            self._touch(device_id)
+
+        except Exception as e:
+            self.log.error('set-me-failure', e=e)
+            raise
+
+    def load_from_template(self, device_id, template):
+        """
+        Load a device instance database from a dictionary. Instances and ME
+        classes that are identical to those of ONUs already loaded from the
+        same template are shared with them.
+
+        :param device_id:  (str) ONU Device ID
+        :param template:  (dict) Dictionary of the template read from storage
+        """
+        now = _timestamp()
+        device = _Device(now)
+        device.loaded = now
+
+        for class_id, class_data in six.iteritems(template):
+            if not isinstance(class_id, int):
+                continue
+
+            instances = list()
+            for inst_id, inst_data in six.iteritems(class_data):
+                if isinstance(inst_id, int):
+                    names, values = self._shared_attributes(inst_data.get(ATTRIBUTES_KEY, dict()))
+                    key = (names, values)
+                    try:
+                        instance = self._templates.get(key)
+                        if instance is None:
+                            instance = self._templates[key] = _Instance(None, None, names, values)
+                    except TypeError:
+                        instance = _Instance(None, None, names, values)     # Unhashable
+                    instances.append((inst_id, instance))
+
+            key = (class_id, tuple(sorted((inst_id, id(instance)) for inst_id, instance in instances)))
+            class_db = self._classes.get(key)
+            if class_db is None:
+                class_db = self._classes[key] = _Class(instances)
+                class_db.frozen = True
+
+            device.classes[class_id] = class_db
+
+        self._data[device_id] = device
+        self._modified = datetime.utcnow()
+        self._touch(device_id)
+
+    def dump_to_json(self, device_id):
+        device = self._data.get(device_id)
+        if device is None:
+            return json.dumps(dict(), indent=2)
+
+        me_map = self._omci_agent.get_device(device_id).me_map
+        device_db = self._device_dict(device_id, device, me_map, decode=False)
+        return json.dumps(device_db, default=json_converter, indent=2)
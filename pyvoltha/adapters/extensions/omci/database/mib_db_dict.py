@@ -15,10 +15,120 @@
 #
 from __future__ import absolute_import
 import copy
+from itertools import count
 from .mib_db_api import *
+from .mib_diff import instance_digest
 import json
 import six
 
+try:
+    from types import MappingProxyType
+except ImportError:             # Python 2, views are plain (but still cached) dicts
+    MappingProxyType = dict
+
+
+def json_converter(o):
+    """ JSON encoder for the database values that are not natively serializable """
+    if isinstance(o, datetime):
+        return o.__str__()
+    if isinstance(o, six.binary_type):
+        return o.decode('ascii')
+
+
+def to_db_value(entity, attribute, value, db_value):
+    """
+    Convert an attribute value to the form saved in the MIB database
+
+    :param entity: (EntityClass) ME class, None if not known
+    :param attribute: (str) Attribute name
+    :param value: Attribute value
+    :param db_value: Value currently in the database, None if not set
+    :return: Database value
+    """
+    if entity is not None and isinstance(value, six.string_types):
+        from scapy.fields import StrFixedLenField
+        attr_index = entity.attribute_name_to_index_map[attribute]
+        eca = entity.attributes[attr_index]
+        field = eca.field
+
+        if isinstance(field, StrFixedLenField):
+            from scapy.base_classes import Packet_metaclass
+            if isinstance(field.default, Packet_metaclass) \
+                    and hasattr(field.default, 'json_from_value'):
+                # Value/hex of Packet Class to string
+                value = field.default.json_from_value(value)
+
+    if entity is not None and attribute in entity.attribute_name_to_index_map:
+        attr_index = entity.attribute_name_to_index_map[attribute]
+        eca = entity.attributes[attr_index]
+        field = eca.field
+
+        if hasattr(field, 'to_json'):
+            value = field.to_json(value, db_value)
+
+    # Complex packet types may have an attribute encoded as an object, this
+    # can be check by seeing if there is a to_json() conversion callable
+    # defined
+    if hasattr(value, 'to_json'):
+        value = value.to_json()
+
+    # Other complex packet types may be a repeated list field (FieldListField)
+    elif isinstance(value, (list, dict)):
+        value = json.dumps(value, separators=(',', ':'))
+
+    if isinstance(value, six.string_types):
+        value = value.rstrip('\x00')
+
+    if isinstance(value, six.binary_type):
+        value = value.decode('ascii').rstrip('\x00')
+
+    return value
+
+
+def from_db_value(attr_data, eca, log):
+    """
+    Fix up a database value of a JSON encoded complex attribute
+
+    :param attr_data: Database value
+    :param eca: (EntityClassAttribute) Attribute, None if not known
+    :param log: Logger for decode failures
+    :return: Decoded value, or the database value if it is not JSON encoded
+    """
+    try:
+        if eca is not None and hasattr(eca.field, 'load_json'):
+            try:
+                value = eca.field.load_json(attr_data)
+                return value
+            except ValueError:
+                pass
+
+        if isinstance(attr_data, six.string_types):
+            try:
+                value = json.loads(attr_data)
+                return value
+            except ValueError:
+                pass
+
+        return attr_data
+
+    except Exception as e:
+        log.error('could-not-parse-attribute-returning-as-is', field=eca.field, attr_data=attr_data, e=e)
+        return attr_data
+
+
+def _freeze(value):
+    """ Immutable version of a database value for read-only queries """
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in six.iteritems(value)})
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+DIGESTS_VIEW = 'digests'      # Cache key of the instance digests snapshot
+
 
 class MibDbVolatileDict(MibDbApi):
     """
@@ -40,6 +150,84 @@ class MibDbVolatileDict(MibDbApi):
         """
         super(MibDbVolatileDict, self).__init__(omci_agent)
         self._data = dict()   # device_id -> ME ID -> Inst ID -> Attr Name -> Values
+        self._generations = count(1)
+        self._generation = dict()     # device_id -> generation of last modification
+        self._views = dict()          # device_id -> {None/class/(class, inst): view}
+        self._digests = dict()        # device_id -> {(class, inst): content digest}
+
+    def generation(self, device_id):
+        """
+        Get the modification generation of an ONU's database. The value changes
+        every time the ONU's database is modified.
+
+        :param device_id: (str) ONU Device ID
+        :return: (int) Generation or None if the device is not in the database
+        """
+        return self._generation.get(device_id)
+
+    def digests(self, device_id):
+        """
+        Get the content digests of an ONU's ME instances. The digests are kept
+        up to date as instances are set and deleted, so comparing two MIBs
+        does not need to walk the attributes of instances that are equal.
+
+        :param device_id: (str) ONU Device ID
+        :return: (dict) (class_id, instance_id) -> digest, or None if the device
+                        is not in the database. The dictionary is a read-only
+                        snapshot, it does not change with the database
+        """
+        device_db = self._data.get(device_id)
+        if device_db is None:
+            return None
+
+        views = self._views_for(device_id)
+        view = views.get(DIGESTS_VIEW)
+
+        if view is None:
+            digests = self._digests.get(device_id)
+            if digests is None:
+                digests = self._digests[device_id] = {
+                    (cls_id, inst_id): instance_digest(inst_data[ATTRIBUTES_KEY])
+                    for cls_id, cls_data in six.iteritems(device_db) if isinstance(cls_id, int)
+                    for inst_id, inst_data in six.iteritems(cls_data) if isinstance(inst_id, int)}
+
+            view = views[DIGESTS_VIEW] = MappingProxyType(dict(digests))
+        return view
+
+    def _update_digest(self, device_id, device_db, class_id, instance_id):
+        """ Update the content digest of a changed instance """
+        digests = self._digests.get(device_id)
+
+        if digests is not None:     # Otherwise all are calculated on the next request
+            digests[(class_id, instance_id)] = \
+                instance_digest(device_db[class_id][instance_id][ATTRIBUTES_KEY])
+
+    def _touch(self, device_id, class_id=None, instance_ids=None):
+        """
+        Record a modification of an ONU's database and drop the read-only views
+        that include the modified data
+
+        :param device_id: (str) ONU Device ID
+        :param class_id: (int) ME Class ID of the modified instances, None if
+                               other or all parts of the database were modified
+        :param instance_ids: (iterable) ME Entity IDs of the modified instances
+        """
+        self._generation[device_id] = next(self._generations)
+        views = self._views.get(device_id)
+
+        if views is None:
+            return
+
+        if class_id is None and instance_ids is None:
+            del self._views[device_id]
+            return
+
+        views.pop(None, None)
+        if class_id is not None:
+            views.pop(class_id, None)
+            views.pop(DIGESTS_VIEW, None)
+            for instance_id in instance_ids or ():
+                views.pop((class_id, instance_id), None)
 
     def start(self):
         """
@@ -88,6 +276,8 @@ class MibDbVolatileDict(MibDbApi):
             ME_KEY: dict(),
             MSG_TYPE_KEY: set()
         }
+        self._digests.pop(device_id, None)
+        self._touch(device_id)
 
     def remove(self, device_id):
         """
@@ -105,6 +295,9 @@ class MibDbVolatileDict(MibDbApi):
 
         if device_id in self._data:
             del self._data[device_id]
+            self._generation.pop(device_id, None)
+            self._views.pop(device_id, None)
+            self._digests.pop(device_id, None)
             self._modified = datetime.utcnow()
 
     def on_mib_reset(self, device_id):
@@ -133,6 +326,8 @@ class MibDbVolatileDict(MibDbApi):
             ME_KEY: device_db[ME_KEY],
             MSG_TYPE_KEY: device_db[MSG_TYPE_KEY]
         }
+        self._digests.pop(device_id, None)
+        self._touch(device_id)
 
     def save_mib_data_sync(self, device_id, value):
         """
@@ -153,6 +348,7 @@ class MibDbVolatileDict(MibDbApi):
 
         self._data[device_id][MDS_KEY] = value
         self._modified = datetime.utcnow()
+        self._touch(device_id, instance_ids=())
 
     def get_mib_data_sync(self, device_id):
         """
@@ -185,6 +381,7 @@ class MibDbVolatileDict(MibDbApi):
 
         self._data[device_id][LAST_SYNC_KEY] = value
         self._modified = datetime.utcnow()
+        self._touch(device_id, instance_ids=())
 
     def get_last_sync(self, device_id):
         """
@@ -220,111 +417,136 @@ class MibDbVolatileDict(MibDbApi):
         if not isinstance(device_id, six.string_types):
             raise TypeError('Device ID should be a string')
 
-        if not 0 <= class_id <= 0xFFFF:
-            raise ValueError("Invalid Class ID: {}, should be 0..65535".format(class_id))
+        if not self._started:
+            raise DatabaseStateError('The Database is not currently active')
 
-        if not 0 <= instance_id <= 0xFFFF:
-            raise ValueError("Invalid Instance ID: {}, should be 0..65535".format(instance_id))
+        try:
+            me_map = self._omci_agent.get_device(device_id).me_map
+            device_db = self._data[device_id]
+            changed = self._set_instance(device_db, me_map, datetime.utcnow(),
+                                         class_id, instance_id, attributes)
+            if changed:
+                self._update_digest(device_id, device_db, class_id, instance_id)
+                self._touch(device_id, class_id, (instance_id,))
+            return changed
 
-        if not isinstance(attributes, dict):
-            raise TypeError("Attributes should be a dictionary")
+        except Exception as e:
+            self.log.error('set-failure', e=e, class_id=class_id,
+                           instance_id=instance_id, attributes=attributes)
+            raise
+
+    def bulk_set(self, device_id, entities):
+        """
+        Set/Create many database values at once. The device lookup, validation
+        and timestamp are done once for the whole batch.
+
+        :param device_id: (str) ONU Device ID
+        :param entities: (iterable) (class_id, entity_id, attributes) tuples
+
+        :returns: (int) Number of instances created or changed
+
+        :raises KeyError: If device does not exist
+        :raises DatabaseStateError: If the database is not enabled
+        """
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID should be a string')
 
         if not self._started:
             raise DatabaseStateError('The Database is not currently active')
 
+        device_db = self._data[device_id]
+        me_map = self._omci_agent.get_device(device_id).me_map
         now = datetime.utcnow()
-        try:
-            device_db = self._data[device_id]
-            class_db = device_db.get(class_id)
-            created = False
+        changed = dict()              # class_id -> changed instance IDs
 
-            if class_db is None:
-                device_db[class_id] = {CLASS_ID_KEY: class_id}
+        try:
+            for class_id, instance_id, attributes in entities:
+                try:
+                    if self._set_instance(device_db, me_map, now, class_id, instance_id, attributes):
+                        self._update_digest(device_id, device_db, class_id, instance_id)
+                        changed.setdefault(class_id, list()).append(instance_id)
 
-                class_db = device_db[class_id]
-                self._modified = now
-                created = True
+                except Exception as e:
+                    self.log.error('set-failure', e=e, class_id=class_id,
+                                   instance_id=instance_id, attributes=attributes)
+                    raise
+        finally:
+            for class_id, instance_ids in six.iteritems(changed):
+                self._touch(device_id, class_id, instance_ids)
 
-            instance_db = class_db.get(instance_id)
-            if instance_db is None:
-                class_db[instance_id] = {
-                    INSTANCE_ID_KEY: instance_id,
-                    CREATED_KEY: now,
-                    MODIFIED_KEY: now,
-                    ATTRIBUTES_KEY: dict()
-                }
-                instance_db = class_db[instance_id]
-                self._modified = now
-                created = True
-
-            changed = False
+        return sum(len(instance_ids) for instance_ids in six.itervalues(changed))
 
-            me_map = self._omci_agent.get_device(device_id).me_map
-            entity = me_map.get(class_id)
+    def _set_instance(self, device_db, me_map, now, class_id, instance_id, attributes):
+        """
+        Set a database value of an ONU
 
-            for attribute, value in attributes.items():
-                assert isinstance(attribute, six.string_types)
-                assert value is not None, "Attribute '{}' value cannot be 'None'".\
-                    format(attribute)
+        :param device_db: (dict) ONU's database
+        :param me_map: (dict) ONU's ME class map
+        :param now: (datetime) Timestamp for created/modified values
+        :param class_id: (int) ME Class ID
+        :param instance_id: (int) ME Entity ID
+        :param attributes: (dict) Attribute dictionary
 
-                db_value = instance_db[ATTRIBUTES_KEY].get(attribute) \
-                    if ATTRIBUTES_KEY in instance_db else None
+        :returns: (bool) True if the value was saved to the database. False if the
+                         value was identical to the current instance
+        """
+        if not 0 <= class_id <= 0xFFFF:
+            raise ValueError("Invalid Class ID: {}, should be 0..65535".format(class_id))
 
-                if entity is not None and isinstance(value, six.string_types):
-                    from scapy.fields import StrFixedLenField
-                    attr_index = entity.attribute_name_to_index_map[attribute]
-                    eca = entity.attributes[attr_index]
-                    field = eca.field
+        if not 0 <= instance_id <= 0xFFFF:
+            raise ValueError("Invalid Instance ID: {}, should be 0..65535".format(instance_id))
 
-                    if isinstance(field, StrFixedLenField):
-                        from scapy.base_classes import Packet_metaclass
-                        if isinstance(field.default, Packet_metaclass) \
-                                and hasattr(field.default, 'json_from_value'):
-                            # Value/hex of Packet Class to string
-                            value = field.default.json_from_value(value)
+        if not isinstance(attributes, dict):
+            raise TypeError("Attributes should be a dictionary")
 
-                if entity is not None and attribute in entity.attribute_name_to_index_map:
-                    attr_index = entity.attribute_name_to_index_map[attribute]
-                    eca = entity.attributes[attr_index]
-                    field = eca.field
+        class_db = device_db.get(class_id)
+        created = False
 
-                    if hasattr(field, 'to_json'):
-                        value = field.to_json(value, db_value)
+        if class_db is None:
+            device_db[class_id] = {CLASS_ID_KEY: class_id}
 
-                # Complex packet types may have an attribute encoded as an object, this
-                # can be check by seeing if there is a to_json() conversion callable
-                # defined
-                if hasattr(value, 'to_json'):
-                    value = value.to_json()
+            class_db = device_db[class_id]
+            self._modified = now
+            created = True
+
+        instance_db = class_db.get(instance_id)
+        if instance_db is None:
+            class_db[instance_id] = {
+                INSTANCE_ID_KEY: instance_id,
+                CREATED_KEY: now,
+                MODIFIED_KEY: now,
+                ATTRIBUTES_KEY: dict()
+            }
+            instance_db = class_db[instance_id]
+            self._modified = now
+            created = True
 
-                # Other complex packet types may be a repeated list field (FieldListField)
-                elif isinstance(value, (list, dict)):
-                    value = json.dumps(value, separators=(',', ':'))
+        changed = False
+        entity = me_map.get(class_id)
 
-                if isinstance(value, six.string_types):
-                    value = value.rstrip('\x00')
+        for attribute, value in attributes.items():
+            assert isinstance(attribute, six.string_types)
+            assert value is not None, "Attribute '{}' value cannot be 'None'".\
+                format(attribute)
 
-                if isinstance(value, six.binary_type):
-                    value = value.decode('ascii').rstrip('\x00')
+            db_value = instance_db[ATTRIBUTES_KEY].get(attribute) \
+                if ATTRIBUTES_KEY in instance_db else None
 
-                assert db_value is None or isinstance(value, type(db_value)), \
-                    "New value type for attribute '{}' type is changing from '{}' to '{}'".\
-                    format(attribute, type(db_value), type(value))
+            value = to_db_value(entity, attribute, value, db_value)
 
-                if db_value is None or db_value != value:
-                    instance_db[ATTRIBUTES_KEY][attribute] = value
-                    changed = True
+            assert db_value is None or isinstance(value, type(db_value)), \
+                "New value type for attribute '{}' type is changing from '{}' to '{}'".\
+                format(attribute, type(db_value), type(value))
 
-            if changed:
-                instance_db[MODIFIED_KEY] = now
-                self._modified = now
+            if db_value is None or db_value != value:
+                instance_db[ATTRIBUTES_KEY][attribute] = value
+                changed = True
 
-            return changed or created
+        if changed:
+            instance_db[MODIFIED_KEY] = now
+            self._modified = now
 
-        except Exception as e:
-            self.log.error('set-failure', e=e, class_id=class_id,
-                           instance_id=instance_id, attributes=attributes)
-            raise
+        return changed or created
 
     def delete(self, device_id, class_id, instance_id):
         """
@@ -370,14 +592,17 @@ class MibDbVolatileDict(MibDbApi):
             if len(class_db) == 1:      # Is only 'CLASS_ID_KEY' remaining
                 del device_db[class_id]
 
+            self._digests.get(device_id, dict()).pop((class_id, instance_id), None)
             self._modified = now
+            self._touch(device_id, class_id, (instance_id,))
             return True
 
         except Exception as e:
             self.log.error('delete-failure', e=e)
             raise
 
-    def query(self, device_id, class_id=None, instance_id=None, attributes=None):
+    def query(self, device_id, class_id=None, instance_id=None, attributes=None,
+              read_only=False):
         """
         Get database information.
 
@@ -388,6 +613,9 @@ class MibDbVolatileDict(MibDbApi):
         :param class_id:  (int) Managed Entity class ID
         :param instance_id: (int) Managed Entity instance
         :param attributes: (list/set or str) Managed Entity instance's attributes
+        :param read_only: (bool) If True, return an immutable view that is shared
+                                 with other readers and only rebuilt after the
+                                 ONU's database is modified
 
         :return: (dict) The value(s) requested. If class/inst/attribute is
                         not found, an empty dictionary is returned
@@ -397,6 +625,9 @@ class MibDbVolatileDict(MibDbApi):
         self.log.debug('query', device_id=device_id, class_id=class_id,
                        entity_instance_id=instance_id, attributes=attributes)
 
+        if read_only:
+            return self._query_view(device_id, class_id, instance_id, attributes)
+
         if not self._started:
             raise DatabaseStateError('The Database is not currently active')
 
@@ -440,6 +671,90 @@ class MibDbVolatileDict(MibDbApi):
 
         return results
 
+    def _query_view(self, device_id, class_id, instance_id, attributes):
+        """
+        Read-only query. Views are built from the same deep-copied and fixed-up
+        data a normal query returns, frozen, and cached until the part of the
+        ONU's database they include is modified.
+        """
+        if not self._started:
+            raise DatabaseStateError('The Database is not currently active')
+
+        if not isinstance(device_id, six.string_types):
+            raise TypeError('Device ID is a string')
+
+        if class_id is None:
+            return self._device_view(device_id)
+
+        if not isinstance(class_id, int):
+            raise TypeError('Class ID is an integer')
+
+        # Unknown devices raise a KeyError, as with a normal query
+        self._omci_agent.get_device(device_id)
+
+        if instance_id is None:
+            return self._class_view(device_id, class_id)
+
+        if not isinstance(instance_id, int):
+            raise TypeError('Instance ID is an integer')
+
+        instance_view = self._instance_view(device_id, class_id, instance_id)
+        if attributes is None or len(instance_view) == 0:
+            return instance_view
+
+        if not isinstance(attributes, (six.string_types, list, set)):
+            raise TypeError('Attributes should be a string or list/set of strings')
+
+        if not isinstance(attributes, (list, set)):
+            attributes = [attributes]
+
+        return MappingProxyType({attr: val for attr, val in
+                                 six.iteritems(instance_view[ATTRIBUTES_KEY])
+                                 if attr in attributes})
+
+    def _views_for(self, device_id):
+        if device_id not in self._data:
+            return dict()           # Nothing is cached for unknown devices
+
+        views = self._views.get(device_id)
+        if views is None:
+            views = self._views[device_id] = dict()
+        return views
+
+    def _device_view(self, device_id):
+        views = self._views_for(device_id)
+        view = views.get(None)
+
+        if view is None:
+            device_db = self._data.get(device_id, dict())
+            view = views[None] = MappingProxyType(
+                {key: self._class_view(device_id, key) if isinstance(key, int) else _freeze(value)
+                 for key, value in six.iteritems(device_db)})
+        return view
+
+    def _class_view(self, device_id, class_id):
+        views = self._views_for(device_id)
+        view = views.get(class_id)
+
+        if view is None:
+            class_db = self._data.get(device_id, dict()).get(class_id, dict())
+            view = views[class_id] = MappingProxyType(
+                {key: self._instance_view(device_id, class_id, key) if isinstance(key, int) else value
+                 for key, value in six.iteritems(class_db)})
+        return view
+
+    def _instance_view(self, device_id, class_id, instance_id):
+        views = self._views_for(device_id)
+        view = views.get((class_id, instance_id))
+
+        if view is None:
+            instance_db = self._data.get(device_id, dict()).get(class_id, dict()).get(instance_id, dict())
+            entity = self._omci_agent.get_device(device_id).me_map.get(class_id) \
+                if len(instance_db) else None
+            view = views[(class_id, instance_id)] = \
+                _freeze(self._fix_inst_json_attributes(copy.deepcopy(instance_db), entity))
+        return view
+
     #########################################################################
     # Following routines are used to fix-up JSON encoded complex data. A
     # nice side effect is that the values returned will be a deep-copy of
@@ -471,27 +786,7 @@ class MibDbVolatileDict(MibDbApi):
         return inst_data
 
     def _fix_attr_json_attribute(self, attr_data, eca):
-
-        try:
-            if eca is not None and hasattr(eca.field, 'load_json'):
-                try:
-                    value = eca.field.load_json(attr_data)
-                    return value
-                except ValueError:
-                    pass
-
-            if isinstance(attr_data, six.string_types):
-                try:
-                    value = json.loads(attr_data)
-                    return value
-                except ValueError:
-                    pass
-
-            return attr_data
-
-        except Exception as e:
-            self.log.error('could-not-parse-attribute-returning-as-is', field=eca.field, attr_data=attr_data, e=e)
-            return attr_data
+        return from_db_value(attr_data, eca, self.log)
 
     def update_supported_managed_entities(self, device_id, managed_entities):
         """
@@ -509,6 +804,7 @@ class MibDbVolatileDict(MibDbApi):
 
             device_db[ME_KEY] = entities
             self._modified = now
+            self._touch(device_id, instance_ids=())
 
         except Exception as e:
             self.log.error('set-me-failure', e=e)
@@ -532,6 +828,7 @@ class MibDbVolatileDict(MibDbApi):
             msg_type_set = {msg_type.value for msg_type in msg_types}
             self._data[device_id][MSG_TYPE_KEY] = msg_type_set
             self._modified = now
+            self._touch(device_id, instance_ids=())
 
         except Exception as e:
             self.log.error('set-me-failure', e=e)
@@ -550,16 +847,11 @@ class MibDbVolatileDict(MibDbApi):
         }
         template.update(headerdata)
         self._data[device_id] = template
+        self._digests.pop(device_id, None)
+        self._touch(device_id)
 
     def dump_to_json(self, device_id):
         device_db = self._data.get(device_id, dict())
-
-        def json_converter(o):
-            if isinstance(o, datetime):
-                return o.__str__()
-            if isinstance(o, six.binary_type):
-                return o.decode('ascii')
-
         json_string = json.dumps(device_db, default=json_converter, indent=2)
 
         return json_string
@@ -18,7 +18,7 @@ import json
 from twisted.internet.task import LoopingCall
 from twisted.internet.defer import inlineCallbacks, returnValue
 from .mib_db_api import *
-from .mib_db_dict import MibDbVolatileDict
+from .mib_db_dict import MibDbVolatileDict, json_converter
 from pyvoltha.adapters.common.kvstore.twisted_etcd_store import TwistedEtcdStore
 from pyvoltha.common.utils.registry import registry
 
@@ -26,27 +26,65 @@ LAST_LAZY_WRITE_KEY = 'last_lazy_write'
 DIRTY_DB_KEY = 'dirty_db'
 LAZY_DEFERRED_KEY = 'lazy_deferred'
 PENDING_DELETE = 'pending_delete'
+PENDING_CHANGES_KEY = 'pending_changes'     # (class_id, instance_id) changed since last sync
+SYNC_IN_PROGRESS_KEY = 'sync_in_progress'   # A sync is writing to the KV store
+SNAPSHOT_KEY = 'snapshot'                   # Next sync must write a full snapshot
+SEQUENCE_KEY = 'sequence'                   # Last journal sequence number written
+JOURNAL_ENTRIES_KEY = 'journal_entries'     # Journal entries since the last snapshot
+JOURNAL_BYTES_KEY = 'journal_bytes'         # Journal bytes since the last snapshot
+SNAPSHOT_BYTES_KEY = 'snapshot_bytes'       # Size of the last snapshot
+JOURNAL_SEQUENCE = 'journal_sequence'       # Snapshot key holding the sequence it includes
 CHECK_INTERVAL = 60
 
 
 class MibDbLazyWriteDict(MibDbVolatileDict):
+    """
+    In-memory MIB database that is lazily written to the KV store.
 
+    Each device is stored as a full snapshot plus an append-only journal. A
+    lazy sync only writes the ME instances changed since the previous sync as
+    a new journal entry. The journal is compacted into a new snapshot once it
+    has too many entries or has grown larger than the snapshot itself.
+    """
     # Paths from kv store
     MIB_PATH = 'service/voltha/omci_mibs'
     DEVICE_PATH = '{}'  # .format(device_id)
+    JOURNAL_PATH = '{}/journal/{:010d}'  # .format(device_id, sequence)
 
-    def __init__(self, omci_agent):
+    COMPACT_ENTRIES = 64    # Maximum journal entries before compacting into a snapshot
+
+    def __init__(self, omci_agent, kv_store=None):
         super(MibDbLazyWriteDict, self).__init__(omci_agent)
 
-        self.args = registry('main').get_args()
-        host, port = self.args.etcd.split(':', 1)
-        self._kv_store = TwistedEtcdStore(host, port, MibDbLazyWriteDict.MIB_PATH)
+        if kv_store is None:
+            self.args = registry('main').get_args()
+            host, port = self.args.etcd.split(':', 1)
+            kv_store = TwistedEtcdStore(host, port, MibDbLazyWriteDict.MIB_PATH)
+
+        self._kv_store = kv_store
         self._lazymetadata = dict()
+        self._statistics = {
+            'syncs': 0,
+            'snapshots': 0,
+            'journal-writes': 0,
+            'bytes-written': 0,
+            'last-sync-bytes': 0,
+        }
+
+    @property
+    def statistics(self):
+        """
+        Lazy write statistics. 'last-sync-bytes' is the number of bytes written
+        to the KV store by the most recent sync.
+
+        :return: (dict) Statistics
+        """
+        return dict(self._statistics)
 
     @inlineCallbacks
     def add(self, device_id, overwrite=False):
 
-        existing_db = yield self._load_device_data(device_id)
+        existing_db, sequence, entries = yield self._load_device_data(device_id)
         if existing_db:
             # populate device database if exists in etcd
             self._data[device_id] = existing_db
@@ -54,7 +92,14 @@ class MibDbLazyWriteDict(MibDbVolatileDict):
             self._lazymetadata[device_id] = {
                 LAST_LAZY_WRITE_KEY: now,
                 DIRTY_DB_KEY: False,
-                PENDING_DELETE: False
+                PENDING_DELETE: False,
+                PENDING_CHANGES_KEY: set(),
+                SNAPSHOT_KEY: False,
+                SEQUENCE_KEY: sequence,
+                JOURNAL_ENTRIES_KEY: entries,
+                JOURNAL_BYTES_KEY: 0,
+                SNAPSHOT_BYTES_KEY: 0,
+                SYNC_IN_PROGRESS_KEY: False
             }
             self.log.debug('recovered-device-from-storage', device_id=device_id, metadata=self._lazymetadata[device_id])
         else:
@@ -62,14 +107,25 @@ class MibDbLazyWriteDict(MibDbVolatileDict):
             self._lazymetadata[device_id] = {
                 LAST_LAZY_WRITE_KEY: None,
                 DIRTY_DB_KEY: True,
-                PENDING_DELETE: False
+                PENDING_DELETE: False,
+                PENDING_CHANGES_KEY: set(),
+                SNAPSHOT_KEY: True,
+                SEQUENCE_KEY: 0,
+                JOURNAL_ENTRIES_KEY: 0,
+                JOURNAL_BYTES_KEY: 0,
+                SNAPSHOT_BYTES_KEY: 0,
+                SYNC_IN_PROGRESS_KEY: False
             }
             self.log.debug('add-device-for-lazy-sync', device_id=device_id, metadata=self._lazymetadata[device_id])
 
         self._lazymetadata[device_id][LAZY_DEFERRED_KEY] = LoopingCall(self._check_dirty, device_id)
         self._lazymetadata[device_id][LAZY_DEFERRED_KEY].start(CHECK_INTERVAL, now=False)
 
-        super(MibDbLazyWriteDict, self).add(device_id, overwrite)
+        if existing_db:
+            self._digests.pop(device_id, None)
+            self._touch(device_id)
+        else:
+            super(MibDbLazyWriteDict, self).add(device_id, overwrite)
 
     def remove(self, device_id):
         super(MibDbLazyWriteDict, self).remove(device_id)
@@ -79,7 +135,48 @@ class MibDbLazyWriteDict(MibDbVolatileDict):
 
     def on_mib_reset(self, device_id):
         super(MibDbLazyWriteDict, self).on_mib_reset(device_id)
-        self._lazymetadata[device_id][DIRTY_DB_KEY] = True
+        self._needs_snapshot(device_id)
+
+    def load_from_template(self, device_id, template):
+        super(MibDbLazyWriteDict, self).load_from_template(device_id, template)
+        if device_id in self._lazymetadata:
+            self._needs_snapshot(device_id)
+
+    def set(self, device_id, class_id, instance_id, attributes):
+        changed = super(MibDbLazyWriteDict, self).set(device_id, class_id, instance_id, attributes)
+        if changed:
+            self._journal(device_id, [(class_id, instance_id)])
+        return changed
+
+    def bulk_set(self, device_id, entities):
+        entities = list(entities)
+        changed = super(MibDbLazyWriteDict, self).bulk_set(device_id, entities)
+        if changed:
+            # Unchanged instances in the batch are journaled too. Bulk updates
+            # are MIB uploads, normally written out as a snapshot anyway
+            self._journal(device_id, [(class_id, instance_id)
+                                      for class_id, instance_id, _ in entities])
+        return changed
+
+    def delete(self, device_id, class_id, instance_id):
+        deleted = super(MibDbLazyWriteDict, self).delete(device_id, class_id, instance_id)
+        if deleted:
+            self._journal(device_id, [(class_id, instance_id)])
+        return deleted
+
+    def _journal(self, device_id, instances):
+        """ Record ME instances to write out on the next lazy sync """
+        metadata = self._lazymetadata[device_id]
+        metadata[DIRTY_DB_KEY] = True
+        if not metadata[SNAPSHOT_KEY]:
+            metadata[PENDING_CHANGES_KEY].update(instances)
+
+    def _needs_snapshot(self, device_id):
+        """ Write the whole device out on the next lazy sync """
+        metadata = self._lazymetadata[device_id]
+        metadata[DIRTY_DB_KEY] = True
+        metadata[SNAPSHOT_KEY] = True
+        metadata[PENDING_CHANGES_KEY] = set()
 
     def save_mib_data_sync(self, device_id, value):
         results = super(MibDbLazyWriteDict, self).save_mib_data_sync(device_id, value)
@@ -89,38 +186,175 @@ class MibDbLazyWriteDict(MibDbVolatileDict):
     def _check_dirty(self, device_id):
         if self._lazymetadata[device_id][DIRTY_DB_KEY] is True:
             self.log.debug('dirty-cache-writing-data', device_id=device_id, metadata=self._lazymetadata[device_id])
-            self._sync(device_id)
+            return self._sync(device_id)
         else:
             self.log.debug('clean-cache-checking-later', device_id=device_id, metadata=self._lazymetadata[device_id])
 
     @inlineCallbacks
     def _sync(self, device_id):
-        json = super(MibDbLazyWriteDict, self).dump_to_json(device_id)
+        metadata = self._lazymetadata[device_id]
+
+        if metadata[SYNC_IN_PROGRESS_KEY]:
+            # Still dirty, written out by a later check
+            self.log.debug('sync-in-progress', device_id=device_id)
+            return
+
+        metadata[SYNC_IN_PROGRESS_KEY] = True
+        try:
+            yield self._sync_device(device_id, metadata)
+
+        except Exception as e:
+            # Not raised to the LoopingCall, which would stop checking the device
+            self.log.exception('sync-device-failed', device_id=device_id, e=e)
+
+        finally:
+            metadata[SYNC_IN_PROGRESS_KEY] = False
+
+    @inlineCallbacks
+    def _sync_device(self, device_id, metadata):
         now = datetime.utcnow()
         device_path = self._get_device_path(device_id)
 
-        if self._lazymetadata[device_id][PENDING_DELETE] is True:
+        if metadata[PENDING_DELETE] is True:
             yield self._kv_store.delete(device_path)
-            self.log.debug('removed-synced-data', device_id=device_id, metadata=self._lazymetadata[device_id])
-            d = self._lazymetadata[device_id][LAZY_DEFERRED_KEY]
+            yield self._kv_store.delete_prefix(device_path + '/')
+            self.log.debug('removed-synced-data', device_id=device_id, metadata=metadata)
+            d = metadata[LAZY_DEFERRED_KEY]
             del self._lazymetadata[device_id]
-            d.stop()
-        else:
-            yield self._kv_store.set(device_path, json)
-            self._lazymetadata[device_id][LAST_LAZY_WRITE_KEY] = now
-            self._lazymetadata[device_id][DIRTY_DB_KEY] = False
-            self.log.debug('synced-data', device_id=device_id, metadata=self._lazymetadata[device_id])
+            if d.running:
+                d.stop()
+            return
+
+        # Changes made while the write is in progress go into the next sync
+        changes = metadata[PENDING_CHANGES_KEY]
+        metadata[PENDING_CHANGES_KEY] = set()
+        metadata[DIRTY_DB_KEY] = False
+
+        snapshot = metadata[SNAPSHOT_KEY] or \
+            metadata[JOURNAL_ENTRIES_KEY] >= MibDbLazyWriteDict.COMPACT_ENTRIES or \
+            metadata[JOURNAL_BYTES_KEY] > metadata[SNAPSHOT_BYTES_KEY] > 0
+        try:
+            if snapshot:
+                metadata[SNAPSHOT_KEY] = False
+                written = yield self._write_snapshot(device_id)
+            else:
+                written = yield self._write_journal(device_id, changes)
+
+        except Exception as e:
+            # A failed journal write leaves a gap in the journal sequence that
+            # would stop a reload, so a full snapshot is written next
+            self.log.warn('sync-failed', device_id=device_id, e=e)
+            metadata[DIRTY_DB_KEY] = True
+            metadata[SNAPSHOT_KEY] = True
+            metadata[PENDING_CHANGES_KEY] = set()
+            return
+
+        metadata[LAST_LAZY_WRITE_KEY] = now
+        self._statistics['syncs'] += 1
+        self._statistics['bytes-written'] += written
+        self._statistics['last-sync-bytes'] = written
+        self.log.debug('synced-data', device_id=device_id, snapshot=snapshot,
+                       bytes_written=written, metadata=metadata)
+
+    @inlineCallbacks
+    def _write_snapshot(self, device_id):
+        """
+        Write the full device database. It includes all journal entries
+        written so far, which are then removed.
+
+        :return: (int) Bytes written
+        """
+        metadata = self._lazymetadata[device_id]
+        device_path = self._get_device_path(device_id)
+        sequence = metadata[SEQUENCE_KEY]
+
+        device_db = dict(self._data.get(device_id, dict()))
+        device_db[JOURNAL_SEQUENCE] = sequence
+        data = json.dumps(device_db, default=json_converter)
+
+        yield self._kv_store.set(device_path, data)
+        metadata[JOURNAL_ENTRIES_KEY] = 0
+        metadata[JOURNAL_BYTES_KEY] = 0
+        metadata[SNAPSHOT_BYTES_KEY] = len(data)
+        self._statistics['snapshots'] += 1
+
+        if sequence > 0:
+            # Stale entries are ignored on reload if this fails
+            yield self._kv_store.delete_prefix(device_path + '/journal/')
+
+        returnValue(len(data))
+
+    @inlineCallbacks
+    def _write_journal(self, device_id, changes):
+        """
+        Append a journal entry with the current value of the changed ME
+        instances (None if deleted) and of the device level information
+
+        :return: (int) Bytes written
+        """
+        metadata = self._lazymetadata[device_id]
+        device_db = self._data.get(device_id, dict())
+        sequence = metadata[SEQUENCE_KEY] = metadata[SEQUENCE_KEY] + 1   # Reserved before writing
+
+        entry = {
+            'header': {k: v for k, v in device_db.items() if not isinstance(k, int)},
+            'changes': [(class_id, instance_id, device_db.get(class_id, dict()).get(instance_id))
+                        for class_id, instance_id in changes]
+        }
+        data = json.dumps(entry, default=json_converter)
+
+        yield self._kv_store.set(MibDbLazyWriteDict.JOURNAL_PATH.format(device_id, sequence), data)
+        metadata[JOURNAL_ENTRIES_KEY] += 1
+        metadata[JOURNAL_BYTES_KEY] += len(data)
+        self._statistics['journal-writes'] += 1
+
+        returnValue(len(data))
 
     @inlineCallbacks
     def _load_device_data(self, device_id):
+        """
+        Load the device snapshot and replay its journal
+
+        :return: (dict, int, int) Device database (None if not found), last journal
+                                  sequence number and number of journal entries replayed
+        """
         device_path = self._get_device_path(device_id)
         json = yield self._kv_store.get(device_path)
-        if json:
-            lookupdb = self._load_from_json(json)
-            self.log.debug('looked-up-device', device_path=device_path)
-            returnValue(lookupdb)
-        else:
-            returnValue(None)
+        if not json:
+            returnValue((None, 0, 0))
+
+        lookupdb = self._load_from_json(json)
+        sequence = lookupdb.pop(JOURNAL_SEQUENCE, 0)
+        entries = 0
+
+        while True:
+            entry = yield self._kv_store.get(MibDbLazyWriteDict.JOURNAL_PATH.format(device_id,
+                                                                                    sequence + 1))
+            if not entry:
+                break
+
+            self._replay(lookupdb, self._load_from_json(entry))
+            sequence += 1
+            entries += 1
+
+        self.log.debug('looked-up-device', device_path=device_path, sequence=sequence,
+                       journal_entries=entries)
+        returnValue((lookupdb, sequence, entries))
+
+    @staticmethod
+    def _replay(device_db, entry):
+        """ Apply a journal entry to a device database """
+        device_db.update(entry['header'])
+
+        for class_id, instance_id, instance_data in entry['changes']:
+            if instance_data is not None:
+                class_db = device_db.setdefault(class_id, {CLASS_ID_KEY: class_id})
+                class_db[instance_id] = instance_data
+
+            elif class_id in device_db:
+                device_db[class_id].pop(instance_id, None)
+                if len(device_db[class_id]) == 1:       # Is only 'CLASS_ID_KEY' remaining
+                    del device_db[class_id]
 
     def _load_from_json(self, jsondata):
 
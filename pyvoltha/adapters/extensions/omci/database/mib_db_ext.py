@@ -107,7 +107,9 @@ class MibDbExternal(MibDbApi):
             'get': MibDbStatistic('get'),
             'set': MibDbStatistic('set'),
             'create': MibDbStatistic('create'),
-            'delete': MibDbStatistic('delete')
+            'delete': MibDbStatistic('delete'),
+            'bulk-set': MibDbStatistic('bulk-set'),
+            'load-template': MibDbStatistic('load-template')
         }
         self.args = registry('main').get_args()
         host, port = self.args.etcd.split(':', 1)
@@ -308,6 +310,107 @@ class MibDbExternal(MibDbApi):
                 self.log.debug('db-{}-time'.format(operation), milliseconds=diff.microseconds / 1000)
                 self._statistics[operation].increment(diff.microseconds / 1000)
 
+    def bulk_set(self, device_id, entities):
+        """
+        Set/Create many database values at once.
+
+        The instances are grouped by class so that each class record (and the
+        device record, if new classes are added) is read from and written to the
+        KV store at most once per batch instead of once per instance.
+
+        :param device_id: (str) ONU Device ID
+        :param entities: (iterable) (class_id, entity_id, attributes) tuples
+
+        :returns: (int) Number of instances created or changed
+
+        :raises KeyError: If device does not exist
+        :raises DatabaseStateError: If the database is not enabled
+        """
+        self.log.debug('bulk-set', device_id=device_id)
+
+        start_time = datetime.utcnow()
+        try:
+            if not isinstance(device_id, six.string_types):
+                raise TypeError('Device ID should be a string')
+
+            if not self._started:
+                raise DatabaseStateError('The Database is not currently active')
+
+            classes = dict()        # class-id -> [(entity-id, attributes), ...]
+            class_order = []
+
+            for class_id, entity_id, attributes in entities:
+                if not 0 <= class_id <= 0xFFFF:
+                    raise ValueError("Invalid Class ID: {}, should be 0..65535".format(class_id))
+
+                if not 0 <= entity_id <= 0xFFFF:
+                    raise ValueError("Invalid Instance ID: {}, should be 0..65535".format(entity_id))
+
+                if not isinstance(attributes, dict):
+                    raise TypeError("Attributes should be a dictionary")
+
+                if class_id not in classes:
+                    classes[class_id] = []
+                    class_order.append(class_id)
+                classes[class_id].append((entity_id, attributes))
+
+            changed = 0
+            new_classes = []
+
+            for class_id in class_order:
+                class_path = self._get_class_path(device_id, class_id)
+                class_data = MibClassData()
+                query_data = self._kv_store.get(class_path)
+
+                if query_data is None:
+                    new_classes.append(self._create_new_class(device_id, class_id))
+                    class_data.class_id = class_id
+                else:
+                    class_data.ParseFromString(query_data)
+
+                indexes = {inst.instance_id: index
+                           for index, inst in enumerate(class_data.instances)}
+                modified = query_data is None
+
+                for entity_id, attributes in classes[class_id]:
+                    index = indexes.get(entity_id)
+
+                    if index is None:
+                        indexes[entity_id] = len(class_data.instances)
+                        class_data.instances.extend([self._create_new_instance(device_id, class_id,
+                                                                               entity_id, attributes)])
+                    else:
+                        new_data = self._update_existing_instance(device_id, class_id, entity_id,
+                                                                  attributes, class_data.instances[index])
+                        if new_data is None:
+                            continue
+                        class_data.instances[index].CopyFrom(new_data)
+
+                    modified = True
+                    changed += 1
+
+                if modified:
+                    self._kv_store.set(class_path, class_data.SerializeToString())
+
+            if new_classes:
+                # "Slimmed down" references to the new classes in the device object
+                device_path = self._get_device_path(device_id)
+                dev_data = MibDeviceData()
+                dev_data.ParseFromString(self._kv_store.get(device_path))
+                dev_data.classes.extend(new_classes)
+                self._kv_store.set(device_path, dev_data.SerializeToString())
+
+            return changed
+
+        except Exception as e:
+            self.log.exception('bulk-set-exception', device_id=device_id, e=e)
+            raise
+
+        finally:
+            diff = datetime.utcnow() - start_time
+            self.log.debug('db-bulk-set-time', milliseconds=diff.microseconds / 1000)
+            self._statistics['bulk-set'].increment(diff.microseconds / 1000)
+
     def delete(self, device_id, class_id, entity_id):
         """
         Delete an entity from the database if it exists.  If all instances
@@ -389,7 +492,8 @@ class MibDbExternal(MibDbApi):
             self.log.debug('db-delete-time', milliseconds=diff.microseconds / 1000)
             self._statistics['delete'].increment(diff.microseconds / 1000)
 
-    def query(self, device_id, class_id=None, instance_id=None, attributes=None):
+    def query(self, device_id, class_id=None, instance_id=None, attributes=None,
+              read_only=False):
         """
         Get database information.
 
@@ -400,6 +504,7 @@ class MibDbExternal(MibDbApi):
         :param class_id:  (int) Managed Entity class ID
         :param instance_id: (int) Managed Entity instance
         :param attributes: (list/set or str) Managed Entity instance's attributes
+        :param read_only: (bool) Ignored, results are always decoded from the KV store
 
         :return: (dict) The value(s) requested. If class/inst/attribute is
                         not found, an empty dictionary is returned
@@ -1055,23 +1160,74 @@ class MibDbExternal(MibDbApi):
         return entity.__name__ if entity is not None else 'UnknownManagedEntity'
 
     def load_from_template(self, device_id, template):
-        now = datetime.utcnow()
-        headerdata = {
-            DEVICE_ID_KEY: device_id,
-            CREATED_KEY: now,
-            LAST_SYNC_KEY: None,
-            MDS_KEY: 0,
-            VERSION_KEY: MibDbExternal.CURRENT_VERSION,
-            ME_KEY: dict(),
-            MSG_TYPE_KEY: set()
-        }
-        template.update(headerdata)
+        """
+        Load a device instance database from a dictionary.
+
+        All class records and the new device record are built locally and
+        written to the KV store with one set_many() call. Large templates span
+        several transactions. As with the volatile database, the template
+        replaces the whole device database. Existing classes that are not in
+        the template are deleted once all records are written.
 
-        for cls_id, cls_data in template.items():
-            if isinstance(cls_id, int):
-                for inst_id, inst_data in cls_data.items():
-                    if isinstance(inst_id, int):
-                        self.set(device_id, cls_id, inst_id, template[cls_id][inst_id][ATTRIBUTES_KEY])
+        :param device_id:  (str) ONU Device ID
+        :param template:  (dict) Dictionary of the template read from storage
+
+        :raises KeyError: If device does not exist
+        :raises DatabaseStateError: If the database is not enabled
+        """
+        self.log.debug('load-from-template', device_id=device_id)
+
+        start_time = datetime.utcnow()
+        try:
+            if not isinstance(device_id, six.string_types):
+                raise TypeError('Device ID should be a string')
+
+            if not self._started:
+                raise DatabaseStateError('The Database is not currently active')
+
+            device_path = self._get_device_path(device_id)
+            query_data = self._kv_store.get(device_path)
+            if query_data is None:
+                raise KeyError('Device {} not found in MIB database'.format(device_id))
+
+            old_data = MibDeviceData()
+            old_data.ParseFromString(query_data)
+            dev_data = self._create_new_device(device_id)
+            items = []
+
+            for cls_id, cls_data in template.items():
+                if not isinstance(cls_id, int):
+                    continue
+
+                instances = [self._create_new_instance(device_id, cls_id, inst_id,
+                                                       inst_data[ATTRIBUTES_KEY])
+                             for inst_id, inst_data in cls_data.items()
+                             if isinstance(inst_id, int)]
+
+                class_data = MibClassData(class_id=cls_id, instances=instances)
+                items.append((self._get_class_path(device_id, cls_id),
+                              class_data.SerializeToString()))
+
+                # "Slimmed down" reference to the class in the device object
+                dev_data.classes.extend([self._create_new_class(device_id, cls_id)])
+
+            template_classes = {class_data.class_id for class_data in dev_data.classes}
+            stale = [self._get_class_path(device_id, class_data.class_id)
+                     for class_data in old_data.classes
+                     if class_data.class_id not in template_classes]
+
+            items.append((device_path, dev_data.SerializeToString()))
+            self._kv_store.set_many(items, deletes=stale)
+            self._modified = start_time
+
+        except Exception as e:
+            self.log.exception('load-template-exception', device_id=device_id, e=e)
+            raise
+
+        finally:
+            diff = datetime.utcnow() - start_time
+            self.log.debug('db-load-template-time', milliseconds=diff.microseconds / 1000)
+            self._statistics['load-template'].increment(diff.microseconds / 1000)
 
     def dump_to_json(self, device_id):
         device_db = self.query(device_id)
@@ -0,0 +1,142 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+MIB difference engine
+
+Compares two MIBs in the common MIB Database output dictionary format that is
+returned by the mib 'query' command. Each ME instance has a SHA-1 content
+digest of its attributes. Instances with equal digests are skipped without
+looking at their attributes, and only the instances that changed are walked
+attribute by attribute.
+
+Databases that keep the digests up to date as instances are set (see
+MibDbVolatileDict.digests) can pass them in. Otherwise the attribute
+dictionaries of the instances are compared directly.
+"""
+from __future__ import absolute_import
+from hashlib import sha1
+from pyvoltha.adapters.extensions.omci.database.mib_db_api import ATTRIBUTES_KEY
+import six
+
+
+def instance_digest(attributes):
+    """
+    Get the content digest of an ME instance. The digest is taken over the
+    attributes sorted by name, so instances with the same attribute names and
+    values have the same digest regardless of the order they were set in.
+
+    :param attributes: (dict) Attribute name -> value
+    :return: (str) Hex digest
+    """
+    canonical = repr(sorted(six.iteritems(attributes), key=lambda item: item[0]))
+    return sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def mib_digests(mib):
+    """
+    Calculate the content digests of all ME instances in a MIB
+
+    :param mib: (dict) MIB in the MIB Database query output format
+    :return: (dict) (class_id, instance_id) -> digest
+    """
+    return {(cls_id, inst_id): instance_digest(inst_data.get(ATTRIBUTES_KEY, dict()))
+            for cls_id, cls_data in six.iteritems(mib) if isinstance(cls_id, int)
+            for inst_id, inst_data in six.iteritems(cls_data) if isinstance(inst_id, int)}
+
+
+def lhs_only(lhs, rhs):
+    """
+    Get the ME Class ID and instances that are unique to the lhs MIB
+
+    :param lhs: (dict) Left-hand-side MIB
+    :param rhs: (dict) Right-hand-side MIB
+
+    :return: (list(int,int)) List of tuples where (class_id, inst_id)
+    """
+    results = list()
+
+    for cls_id, cls_data in six.iteritems(lhs):
+        # Skip keys that are not class IDs
+        if not isinstance(cls_id, int):
+            continue
+
+        rhs_cls = rhs.get(cls_id, dict())
+        results.extend([(cls_id, inst_id) for inst_id in cls_data
+                        if isinstance(inst_id, int) and inst_id not in rhs_cls])
+
+    return results
+
+
+def attribute_diffs(lhs, rhs, lhs_digests=None, rhs_digests=None, ignored=None):
+    """
+    Get the ME instances that exist in both MIBs and have different attributes
+
+    :param lhs: (dict) Left-hand-side MIB
+    :param rhs: (dict) Right-hand-side MIB
+    :param lhs_digests: (dict) Instance digests of lhs. If either digest
+                               dictionary is None, the attributes of every
+                               common instance are compared directly
+    :param rhs_digests: (dict) Instance digests of rhs
+    :param ignored: (callable) Called with a class ID, returns the set of
+                               attribute names not to compare for that class
+
+    :return: (list(int,int,str)) List of tuples where (class_id, inst_id, attribute)
+                                 points to the specific ME instance where attributes
+                                 are different
+    """
+    use_digests = lhs_digests is not None and rhs_digests is not None
+    results = list()
+
+    for cls_id, lhs_cls in six.iteritems(lhs):
+        if not isinstance(cls_id, int):
+            continue
+
+        rhs_cls = rhs.get(cls_id)
+        if rhs_cls is None:
+            continue
+
+        ignored_attrs = None
+
+        for inst_id, lhs_inst in six.iteritems(lhs_cls):
+            if not isinstance(inst_id, int) or inst_id not in rhs_cls:
+                continue
+
+            lhs_attributes = lhs_inst[ATTRIBUTES_KEY]
+            rhs_attributes = rhs_cls[inst_id][ATTRIBUTES_KEY]
+
+            if use_digests:
+                digest = lhs_digests.get((cls_id, inst_id))
+                if digest is not None and digest == rhs_digests.get((cls_id, inst_id)):
+                    continue
+
+            elif lhs_attributes == rhs_attributes:
+                continue
+
+            if ignored_attrs is None:
+                ignored_attrs = ignored(cls_id) if ignored is not None else frozenset()
+
+            # Attributes that exist in one MIB, but not the other
+            lhs_names = set(six.iterkeys(lhs_attributes))
+            rhs_names = set(six.iterkeys(rhs_attributes))
+            results.extend([(cls_id, inst_id, attr)
+                            for attr in (lhs_names ^ rhs_names) - ignored_attrs])
+
+            # Common attributes with different values
+            results.extend([(cls_id, inst_id, attr)
+                            for attr in (lhs_names & rhs_names) - ignored_attrs
+                            if lhs_attributes[attr] != rhs_attributes[attr]])
+
+    return results
@@ -18,6 +18,7 @@ OMCI Managed Entity Message support base class
 """
 from __future__ import absolute_import
 from pyvoltha.adapters.extensions.omci.omci import *
+from pyvoltha.adapters.extensions.omci.me_frame_template import MEFrameTemplate
 import six
 
 # abbreviations
@@ -92,12 +93,29 @@ class MEFrame(object):
                                                                               self.entity_class_name)
 
         if access.value in [AA.W.value, AA.SBC.value] and isinstance(attributes, dict):
-            for attr_name, value in six.iteritems(attributes):
-                index = self.entity_class.attribute_name_to_index_map.get(attr_name)
-                attribute = self.entity_class.attributes[index]
-                if not attribute.valid(value):
-                    raise ValueError("Invalid value '{}' for attribute '{}' of '{}".
-                                     format(value, attr_name, self.entity_class_name))
+            self._check_values(attributes)
+
+    def _check_values(self, attributes):
+        validators = self.entity_class.attribute_validators
+        for attr_name, value in six.iteritems(attributes):
+            if not validators[attr_name](value):
+                raise ValueError("Invalid value '{}' for attribute '{}' of '{}".
+                                 format(value, attr_name, self.entity_class_name))
+
+    def _template(self, message, attributes, access=None):
+        """
+        Get the frame template of a request. The attribute names and access are
+        checked once, when the template is created.
+
+        :param message: (OmciMessage) OmciCreate, OmciSet, OmciGet or OmciDelete
+        :param attributes: (iterable) Attribute names of the request
+        :param access: (AttributeAccess) Access to check, None for no check
+        :return: (MEFrameTemplate) Template
+        """
+        check = None if access is None else \
+            (lambda names: self._check_attributes(names, access))
+
+        return MEFrameTemplate.get(self.entity_class, message, attributes, check=check)
 
     @staticmethod
     def _attr_to_data(attributes):
@@ -155,16 +173,10 @@ class MEFrame(object):
         assert len(data) > 0, 'No attributes supplied'
 
         self._check_operation(OP.Create)
-        self._check_attributes(data, AA.Writable)
+        template = self._template(OmciCreate, data, AA.Writable)
+        self._check_values(data)
 
-        return OmciFrame(
-            transaction_id=None,
-            message_type=OmciCreate.message_id,
-            omci_message=OmciCreate(
-                entity_class=getattr(self.entity_class, 'class_id'),
-                entity_id=getattr(self, 'entity_id'),
-                data=data
-            ))
+        return template.frame(getattr(self, 'entity_id'), data)
 
     def delete(self):
         """
@@ -173,13 +185,7 @@ class MEFrame(object):
         """
         self._check_operation(OP.Delete)
 
-        return OmciFrame(
-            transaction_id=None,
-            message_type=OmciDelete.message_id,
-            omci_message=OmciDelete(
-                entity_class=getattr(self.entity_class, 'class_id'),
-                entity_id=getattr(self, 'entity_id')
-            ))
+        return self._template(OmciDelete, ()).frame(getattr(self, 'entity_id'))
 
     def set(self):
         """
@@ -192,17 +198,10 @@ class MEFrame(object):
         assert len(data) > 0, 'No attributes supplied'
 
         self._check_operation(OP.Set)
-        self._check_attributes(data, AA.Writable)
+        template = self._template(OmciSet, data, AA.Writable)
+        self._check_values(data)
 
-        return OmciFrame(
-            transaction_id=None,
-            message_type=OmciSet.message_id,
-            omci_message=OmciSet(
-                entity_class=getattr(self.entity_class, 'class_id'),
-                entity_id=getattr(self, 'entity_id'),
-                attributes_mask=self.entity_class.mask_for(*list(data.keys())),
-                data=data
-            ))
+        return template.frame(getattr(self, 'entity_id'), data)
 
     def get(self):
         """
@@ -217,16 +216,8 @@ class MEFrame(object):
         mask_set = list(data.keys()) if isinstance(data, dict) else data
 
         self._check_operation(OP.Get)
-        self._check_attributes(mask_set, AA.Readable)
 
-        return OmciFrame(
-            transaction_id=None,
-            message_type=OmciGet.message_id,
-            omci_message=OmciGet(
-                entity_class=getattr(self.entity_class, 'class_id'),
-                entity_id=getattr(self, 'entity_id'),
-                attributes_mask=self.entity_class.mask_for(*mask_set)
-            ))
+        return self._template(OmciGet, mask_set, AA.Readable).frame(getattr(self, 'entity_id'))
 
     def reboot(self, reboot_code=0):
         """
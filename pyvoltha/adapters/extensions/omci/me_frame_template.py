@@ -0,0 +1,213 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+Precompiled OMCI request frame templates
+
+A template is built once per (ME class, message type, attribute set). It holds
+the attribute mask and, when all attributes are plain integer fields, a byte
+layout of the baseline OMCI frame. Frames created from a template are still
+normal OmciFrame packets, but are serialized by packing the transaction ID,
+entity ID and attribute values with 'struct' instead of walking the Scapy
+message tree.
+"""
+from __future__ import absolute_import
+import struct
+from scapy.fields import ByteField, ShortField, IntField, LongField, \
+    XByteField, XShortField, XIntField
+from pyvoltha.adapters.extensions.omci.omci_frame import OmciFrame
+from pyvoltha.adapters.extensions.omci.omci_messages import OmciCreate, OmciSet, \
+    OmciGet, OmciDelete
+import pyvoltha.adapters.extensions.omci.omci_entities as omci_entities
+from pyvoltha.adapters.extensions.omci.omci_defs import AttributeAccess
+
+AA = AttributeAccess
+
+# Scapy field types that are packed as-is (no value conversion)
+_FIELD_FORMATS = {
+    ByteField: 'B',
+    XByteField: 'B',
+    ShortField: 'H',
+    XShortField: 'H',
+    IntField: 'I',
+    XIntField: 'I',
+    LongField: 'Q',
+}
+_MESSAGE_LENGTH = 36            # Baseline OMCI message contents
+_OMCI_DEVICE_ID = 0x0a          # Baseline message set
+_OMCI_TRAILER = 0x00000028
+
+
+class TemplateOmciFrame(OmciFrame):
+    """
+    OMCI Frame created from an MEFrameTemplate. Serialization uses the template's
+    byte layout and falls back to Scapy if the frame no longer matches it.
+    """
+    __slots__ = ['template']
+
+    def build(self):
+        template = getattr(self, 'template', None)
+        encoded = template.encode(self) if template is not None else None
+        return encoded if encoded is not None else super(TemplateOmciFrame, self).build()
+
+
+class MEFrameTemplate(object):
+    """ Precompiled request frame of an ME class for one set of attributes """
+    MAX_TEMPLATES = 1024
+
+    _templates = dict()         # (entity class, message, attributes) -> template
+
+    def __init__(self, entity_class, message, attributes):
+        """
+        Class initializer
+
+        :param entity_class: (EntityClass) ME class
+        :param message: (OmciMessage) OmciCreate, OmciSet, OmciGet or OmciDelete
+        :param attributes: (frozenset) Attribute names of the request
+        """
+        self.entity_class = entity_class
+        self.message = message
+        self.attributes = attributes
+        self.mask = entity_class.mask_for(*attributes) if message in (OmciSet, OmciGet) else None
+
+        if message is OmciCreate:
+            # Create frames carry all set-by-create attributes, in ME order
+            fields = [attr.field for attr in entity_class.attributes
+                      if AA.SetByCreate in attr.access and
+                      attr.field.name != 'managed_entity_id']
+
+        elif message is OmciSet:
+            index_map = entity_class.attribute_name_to_index_map
+            fields = [entity_class.attributes[index].field
+                      for index in sorted(index_map[name] for name in attributes)]
+        else:
+            fields = []
+
+        self._fields = [(fld.name, fld.default) for fld in fields]
+        self._struct = self._compile(fields)
+
+    @classmethod
+    def get(cls, entity_class, message, attributes, check=None):
+        """
+        Get the template for a request, creating it if needed
+
+        :param entity_class: (EntityClass) ME class
+        :param message: (OmciMessage) OmciCreate, OmciSet, OmciGet or OmciDelete
+        :param attributes: (iterable) Attribute names of the request
+        :param check: (callable) Called with the attribute names before a new
+                                 template is created. It raises if they are not
+                                 valid for the request, so only valid ones are cached
+
+        :return: (MEFrameTemplate) Template
+        """
+        attributes = frozenset(attributes)
+        key = (entity_class, message, attributes)
+        template = cls._templates.get(key)
+
+        if template is None:
+            if check is not None:
+                check(list(attributes))
+
+            if len(cls._templates) >= cls.MAX_TEMPLATES:
+                cls._templates.clear()
+
+            template = cls._templates[key] = MEFrameTemplate(entity_class, message, attributes)
+
+        return template
+
+    def _compile(self, fields):
+        formats = []
+        for fld in fields:
+            fmt = _FIELD_FORMATS.get(type(fld))
+            if fmt is None:
+                return None             # Encoded by Scapy
+            formats.append(fmt)
+
+        body = 'HH' + ('H' if self.mask is not None else '') + ''.join(formats)
+        padding = _MESSAGE_LENGTH - struct.calcsize('>' + body)
+        if padding < 0:
+            return None
+
+        return struct.Struct('>HBB{}{}xI'.format(body, padding))
+
+    def frame(self, entity_id, data=None):
+        """
+        Create the request frame
+
+        :param entity_id: (int) ME Instance ID
+        :param data: (dict) Attribute values for Create and Set requests
+        :return: (TemplateOmciFrame) OMCI Frame
+        """
+        class_id = self.entity_class.class_id
+
+        if self.message is OmciCreate:
+            message = OmciCreate(entity_class=class_id, entity_id=entity_id, data=data)
+        elif self.message is OmciSet:
+            message = OmciSet(entity_class=class_id, entity_id=entity_id,
+                              attributes_mask=self.mask, data=data)
+        elif self.message is OmciGet:
+            message = OmciGet(entity_class=class_id, entity_id=entity_id,
+                              attributes_mask=self.mask)
+        else:
+            message = OmciDelete(entity_class=class_id, entity_id=entity_id)
+
+        frame = TemplateOmciFrame(transaction_id=None,
+                                  message_type=self.message.message_id,
+                                  omci_message=message)
+        frame.template = self
+        return frame
+
+    def encode(self, frame):
+        """
+        Serialize a frame created from this template
+
+        :param frame: (TemplateOmciFrame) Frame
+        :return: (bytes) Encoded frame, or None if it has to be encoded by Scapy
+        """
+        if self._struct is None:
+            return None
+
+        fields = frame.fields
+        message = fields.get('omci_message')
+
+        # Only frames still as created by this template, and only if the
+        # message is decoded with this ME class (ONUs may use custom MEs)
+        if type(message) is not self.message or \
+                fields.get('message_type') != self.message.message_id or \
+                'omci' in fields or 'omci_trailer' in fields:
+            return None
+
+        msg_fields = message.fields
+        class_id = self.entity_class.class_id
+
+        if msg_fields.get('entity_class') != class_id or \
+                msg_fields.get('attributes_mask') != self.mask or \
+                omci_entities.entity_id_to_class_map.get(class_id) is not self.entity_class:
+            return None
+
+        try:
+            data = msg_fields.get('data') or dict()
+            values = [data.get(name, default) for name, default in self._fields]
+            values = [0 if value is None else value for value in values]   # As Scapy does
+            header = [fields.get('transaction_id') or 0, self.message.message_id,
+                      _OMCI_DEVICE_ID, class_id, msg_fields.get('entity_id') or 0]
+
+            if self.mask is not None:
+                header.append(self.mask)
+
+            return self._struct.pack(*(header + values + [_OMCI_TRAILER]))
+
+        except struct.error:            # Out of range or non-integer values
+            return None
@@ -140,7 +140,7 @@ class OMCI_CC(object):
         self._max_hp_tx_queue = 0     # Maximum size of high priority tx pending queue
         self._max_lp_tx_queue = 0     # Maximum size of low priority tx pending queue
 
-        self.event_bus = EventBusClient()
+        self.event_bus = EventBusClient(clock=self.reactor)
 
         # If a list of custom ME Entities classes were provided, insert them into
         # main class_id to entity map.
@@ -177,6 +177,11 @@ class OMCI_CC(object):
     def enabled(self):
         return self._enabled
 
+    @property
+    def proxy_address(self):
+        """ Proxy address of the ONU, None while the channel is not started """
+        return self._proxy_address
+
     @enabled.setter
     def enabled(self, value):
         """
@@ -287,17 +292,19 @@ class OMCI_CC(object):
         msg = {TX_REQUEST_KEY: None,
                RX_RESPONSE_KEY: rx_frame}
 
+        # Notifications are dropped if the event bus backlog is full, the alarm
+        # and MIB audits recover the state they carry
         if msg_type == EntityOperations.AlarmNotification.value:
             topic = OMCI_CC.event_bus_topic(self._device_id, RxEvent.Alarm_Notification)
-            self.reactor.callLater(0,  self.event_bus.publish, topic, msg)
+            self.event_bus.publish_later(topic, msg)
 
         elif msg_type == EntityOperations.AttributeValueChange.value:
             topic = OMCI_CC.event_bus_topic(self._device_id, RxEvent.AVC_Notification)
-            self.reactor.callLater(0,  self.event_bus.publish, topic, msg)
+            self.event_bus.publish_later(topic, msg)
 
         elif msg_type == EntityOperations.TestResult.value:
             topic = OMCI_CC.event_bus_topic(self._device_id, RxEvent.Test_Result)
-            self.reactor.callLater(0,  self.event_bus.publish, topic, msg)
+            self.event_bus.publish_later(topic, msg, reliable=True)
 
         else:
             self.log.warn('onu-unsupported-autonomous-message', type=msg_type)
@@ -363,7 +370,7 @@ class OMCI_CC(object):
             # have been running consecutive errors
             if self._rx_frames == 0 or self._consecutive_errors != 0:
                 self.log.debug('Consecutive errors for rx', err = self._consecutive_errors)
-                self.reactor.callLater(0, self._publish_connectivity_event, True)
+                self._publish_connectivity_event(True)
 
             self._rx_frames += 1
             self._consecutive_errors = 0
@@ -406,7 +413,7 @@ class OMCI_CC(object):
             # Publish Rx event to listeners in a different task
             self.log.debug('Publish rx event', rx_tid = rx_tid,
                            tx_tid = tx_frame.fields['transaction_id'])
-            reactor.callLater(0, self._publish_rx_frame, tx_frame, rx_frame)
+            self._publish_rx_frame(tx_frame, rx_frame)
 
             # begin success callback chain (will cancel timeout and queue next Tx message)
             self._rx_response[index] = rx_frame
@@ -475,7 +482,8 @@ class OMCI_CC(object):
 
     def _publish_rx_frame(self, tx_frame, rx_frame):
         """
-        Notify listeners of successful response frame
+        Notify listeners of successful response frame. Delivery is queued on
+        the event bus and occurs on a later reactor turn.
         :param tx_frame: (OmciFrame) Original request frame
         :param rx_frame: (OmciFrame) Response frame
         """
@@ -488,11 +496,14 @@ class OMCI_CC(object):
                 msg = {TX_REQUEST_KEY: tx_frame,
                        RX_RESPONSE_KEY: rx_frame}
 
-                self.event_bus.publish(topic=topic, msg=msg)
+                # Responses are never dropped, requesters wait for them
+                self.event_bus.publish_later(topic, msg, reliable=True)
 
     def _publish_connectivity_event(self, connected):
         """
-        Notify listeners of Rx/Tx connectivity over OMCI
+        Notify listeners of Rx/Tx connectivity over OMCI. Delivery is queued
+        on the event bus and only the latest state is delivered if connectivity
+        changes several times before listeners run.
         :param connected: (bool) True if connectivity transitioned from unreachable
                                  to reachable
         """
@@ -500,7 +511,7 @@ class OMCI_CC(object):
             topic = OMCI_CC.event_bus_topic(self._device_id,
                                             RxEvent.Connectivity)
             msg = {CONNECTED_KEY: connected}
-            self.event_bus.publish(topic=topic, msg=msg)
+            self.event_bus.publish_later(topic, msg, coalesce=True, reliable=True)
 
     def flush(self):
         """Flush/cancel in active or pending Tx requests"""
@@ -578,7 +589,7 @@ class OMCI_CC(object):
                     self._rx_timeouts += 1
                     self._consecutive_errors += 1
                     if self._consecutive_errors == 1:
-                        reactor.callLater(0, self._publish_connectivity_event, False)
+                        self._publish_connectivity_event(False)
 
                     self.log.debug('timeout', tx_id=tx_tid, timeout=timeout)
                     value = failure.Failure(TimeoutError(timeout, "Deferred"))
@@ -742,7 +753,7 @@ class OMCI_CC(object):
             self._consecutive_errors += 1
 
             if self._consecutive_errors == 1:
-                self.reactor.callLater(0, self._publish_connectivity_event, False)
+                self._publish_connectivity_event(False)
 
             self.log.exception('send-omci', e=e)
             return fail(result=failure.Failure(e))
@@ -837,12 +848,13 @@ class OMCI_CC(object):
                                        callbackArgs=(high_priority,),
                                        errbackArgs=(tx_tid, high_priority))
 
+                    frame_bytes = bytes(frame)
                     omci_msg = InterAdapterOmciMessage(
-                        message=bytes(frame),
+                        message=frame_bytes,
                         proxy_address=self._proxy_address,
                         connect_status=self._device.connect_status)
 
-                    self.log.debug('sent-omci-msg', tid=tx_tid, omci_msg=hexlify(bytes(frame)))
+                    self.log.debug('sent-omci-msg', tid=tx_tid, omci_msg=hexlify(frame_bytes))
 
                     yield self._adapter_proxy.send_inter_adapter_message(
                         msg=omci_msg,
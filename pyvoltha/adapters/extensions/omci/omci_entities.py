@@ -59,6 +59,7 @@ class EntityClassAttribute(object):
         self._tca = tca
         self._counter = counter
         self._deprecated = deprecated
+        self._validator = None
 
     @property
     def field(self):
@@ -102,26 +103,47 @@ class EntityClassAttribute(object):
         # TODO: As additional Scapy field types are used, add constraints
     }
 
+    @property
+    def validator(self):
+        """
+        Value validator of this attribute, a callable that takes the value and
+        returns True if it is valid. It is built once, on first use.
+        """
+        if self._validator is None:
+            self._validator = self._compile_validator()
+        return self._validator
+
     def valid(self, value):
-        def _isa_lambda_function(v):
-            import inspect
-            return callable(v) and len(inspect.getargspec(v).args) == 1
+        return self.validator(value)
+
+    @staticmethod
+    def _is_single_argument(func):
+        if not callable(func):
+            return False
+        try:
+            getargspec = getattr(inspect, 'getfullargspec', None) or inspect.getargspec
+            return len(getargspec(func).args) == 1
 
+        except TypeError:       # Not introspectable (builtin, ...)
+            return False
+
+    def _compile_validator(self):
         field_type = self.field.__class__.__name__
-        type_check = EntityClassAttribute._type_checker_map.get(field_type,
-                                                                lambda val: True)
 
         # TODO: Currently StrFixedLenField is used heavily for both bit fields as
         #       and other 'byte/octet' related strings that are NOT textual. Until
         #       all of these are corrected, 'StrFixedLenField' cannot test the type
         #       of the value provided
+        type_check = None if field_type == 'StrFixedLenField' else \
+            EntityClassAttribute._type_checker_map.get(field_type)
 
-        if field_type != 'StrFixedLenField' and not type_check(value):
-            return False
+        range_check = self.range_check \
+            if EntityClassAttribute._is_single_argument(self.range_check) else None
 
-        if _isa_lambda_function(self.range_check):
-            return self.range_check(value)
-        return True
+        if type_check is not None and range_check is not None:
+            return lambda val: type_check(val) and range_check(val)
+
+        return type_check or range_check or (lambda val: True)
 
 
 class EntityClassMeta(type):
@@ -136,6 +158,10 @@ class EntityClassMeta(type):
         cls.attribute_name_to_index_map = dict(
             (a._fld.name, idx) for idx, a in enumerate(cls.attributes))
 
+        # and the value validators of the attributes, built once per class
+        cls.attribute_validators = dict(
+            (a._fld.name, a.validator) for a in cls.attributes)
+
 
 class EntityClass(six.with_metaclass(EntityClassMeta, object)):
 
@@ -153,6 +179,9 @@ class EntityClass(six.with_metaclass(EntityClassMeta, object)):
     # will be map of attr_name -> index in attributes, initialized by metaclass
     attribute_name_to_index_map = None
 
+    # will be map of attr_name -> value validator, initialized by metaclass
+    attribute_validators = None
+
     def __init__(self, **kw):
         assert(isinstance(kw, dict))
         for k, v in six.iteritems(kw):
@@ -21,6 +21,11 @@ from .omci_entities import *
 from .database.mib_db_api import *
 from enum import IntEnum
 
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
 
 class OMCCVersion(IntEnum):
     Unknown                 = 0     # Unknown or unsupported version
@@ -101,9 +106,10 @@ class OnuConfiguration(object):
 
             # Get the requested information
             if self._attributes[attr] is None:
-                value = self._onu_device.query_mib(class_id, instance_id=instance_id)
+                value = self._onu_device.query_mib(class_id, instance_id=instance_id,
+                                                   read_only=True)
 
-                if isinstance(value, dict) and len(value) > 0:
+                if isinstance(value, Mapping) and len(value) > 0:
                     self._attributes[attr] = value
 
             return self._attributes[attr]
@@ -132,7 +132,8 @@ class OnuDeviceEntry(object):
                                                                            device_id,
                                                                            alarm_synchronizer_info['tasks'],
                                                                            alarm_db,
-                                                                           advertise_events=advertise)
+                                                                           advertise_events=advertise,
+                                                                           event_filter=alarm_synchronizer_info.get('event-filter'))
             # State machine of downloading image file from server
             downloader_info = support_classes.get('image_downloader')
             image_upgrader_info = support_classes.get('image_upgrader')
@@ -197,6 +198,18 @@ class OnuDeviceEntry(object):
     def omci_cc(self):
         return self._omci_cc
 
+    @property
+    def pon_key(self):
+        """
+        Identify the PON the ONU is on, used to limit concurrent activity per PON
+
+        :return: (tuple) (OLT Device ID, PON channel ID) or None if not known
+        """
+        proxy_address = self._omci_cc.proxy_address
+        if proxy_address is None:
+            return None
+        return proxy_address.device_id, proxy_address.channel_id
+
     @property
     def core_proxy(self):
         return self._core_proxy
@@ -511,7 +524,7 @@ class OnuDeviceEntry(object):
         if self._omci_agent is not None:
             self._omci_agent.remove_device(self._device_id, cleanup=True)
 
-    def query_mib(self, class_id=None, instance_id=None, attributes=None):
+    def query_mib(self, class_id=None, instance_id=None, attributes=None, read_only=False):
         """
         Get MIB database information.
 
@@ -521,6 +534,8 @@ class OnuDeviceEntry(object):
         :param class_id:  (int) Managed Entity class ID
         :param instance_id: (int) Managed Entity instance
         :param attributes: (list or str) Managed Entity instance's attributes
+        :param read_only: (bool) If True, the caller will not modify the results
+                                 and an immutable, shared view may be returned
 
         :return: (dict) The value(s) requested. If class/inst/attribute is
                         not found, an empty dictionary is returned
@@ -530,7 +545,19 @@ class OnuDeviceEntry(object):
                        attributes=attributes)
 
         return self.mib_synchronizer.query_mib(class_id=class_id, instance_id=instance_id,
-                                               attributes=attributes)
+                                               attributes=attributes, read_only=read_only)
+
+    def query_mib_digests(self):
+        """
+        Get the content digests of the MIB database ME instances. Taken along
+        with a read-only query_mib() snapshot, they allow the snapshot to be
+        compared to another MIB without walking the unchanged instances.
+
+        :return: (dict) (class_id, instance_id) -> digest, or None if the
+                        database does not keep instance digests
+        :raises DatabaseStateError: If the database is not enabled
+        """
+        return self.mib_synchronizer.query_mib_digests()
 
     def query_mib_single_attribute(self, class_id, instance_id, attribute):
         """
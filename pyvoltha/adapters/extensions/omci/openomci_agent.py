@@ -28,6 +28,7 @@ from pyvoltha.adapters.extensions.omci.tasks.sync_time_task import SyncTimeTask
 from pyvoltha.adapters.extensions.omci.state_machines.alarm_sync import AlarmSynchronizer
 from pyvoltha.adapters.extensions.omci.tasks.alarm_resync_task import AlarmResyncTask
 from pyvoltha.adapters.extensions.omci.database.alarm_db_ext import AlarmDbExternal
+from pyvoltha.adapters.extensions.omci.alarm_state_table import AlarmStateTable
 from pyvoltha.adapters.extensions.omci.tasks.interval_data_task import IntervalDataTask
 from pyvoltha.adapters.extensions.omci.onu_device_entry import OnuDeviceEntry
 from pyvoltha.adapters.extensions.omci.state_machines.omci_onu_capabilities import OnuOmciCapabilities
@@ -38,6 +39,10 @@ from pyvoltha.adapters.extensions.omci.tasks.omci_delete_pm_task import OmciDele
 from pyvoltha.adapters.extensions.omci.state_machines.image_agent import ImageDownloadeSTM, OmciSoftwareImageDownloadSTM
 from pyvoltha.adapters.extensions.omci.tasks.file_download_task import FileDownloadTask
 from pyvoltha.adapters.extensions.omci.tasks.omci_sw_image_upgrade_task import OmciSwImageUpgradeTask
+from pyvoltha.adapters.extensions.omci.tasks.task_watchdog import TaskWatchdog
+from pyvoltha.adapters.extensions.omci.audit_scheduler import MibAuditScheduler
+from pyvoltha.adapters.extensions.omci.pm_collection_scheduler import PmCollectionScheduler
+from pyvoltha.adapters.extensions.omci.capabilities_cache import OnuCapabilitiesCache
 import six
 
 OpenOmciAgentDefaults = {
@@ -45,6 +50,7 @@ OpenOmciAgentDefaults = {
         'state-machine': MibSynchronizer,  # Implements the MIB synchronization state machine
         'database': MibDbVolatileDict,     # Implements volatile ME MIB database
         # 'database': MibDbExternal,         # Implements persistent ME MIB database
+        # 'database': MibDbCompactDict,      # Implements memory-compact volatile ME MIB database
         'advertise-events': True,          # Advertise events on OpenOMCI event bus
         'audit-delay': 60,                 # Time to wait between MIB audits.  0 to disable audits.
         'tasks': {
@@ -59,6 +65,12 @@ OpenOmciAgentDefaults = {
     'omci-capabilities': {
         'state-machine': OnuOmciCapabilities,   # Implements OMCI capabilities state machine
         'advertise-events': False,              # Advertise events on OpenOMCI event bus
+        'cache': {
+            'enabled': True,        # Share capabilities between ONUs of the same model
+            'validate': False,      # Check ONU table sizes before using cached capabilities
+            'max-age': OnuCapabilitiesCache.DEFAULT_MAX_AGE,  # Seconds, 0 for no refresh
+            'persist': False,       # Also save the cache in the KV store
+        },
         'tasks': {
             'get-capabilities': OnuCapabilitiesTask # Get supported ME and Commands
         }
@@ -77,6 +89,12 @@ OpenOmciAgentDefaults = {
         'state-machine': AlarmSynchronizer,    # Implements the Alarm sync state machine
         'database': AlarmDbExternal,           # For any State storage needs
         'advertise-events': True,              # Advertise events on OpenOMCI event bus
+        'event-filter': {
+            'raise-delay': AlarmStateTable.DEFAULT_RAISE_DELAY,  # Seconds raised before sent
+            'clear-delay': AlarmStateTable.DEFAULT_CLEAR_DELAY,  # Seconds cleared before sent
+            'max-rate': AlarmStateTable.DEFAULT_MAX_RATE,        # Events/second per ONU, 0 for no limit
+            'burst': AlarmStateTable.DEFAULT_BURST,
+        },
         'tasks': {
             'alarm-resync': AlarmResyncTask
         }
@@ -125,6 +143,19 @@ class OpenOMCIAgent(object):
         self._devices = dict()       # device-id -> DeviceEntry
         self._event_bus = None
 
+        # Single watchdog timer for all running tasks of all ONUs
+        self._task_watchdog = TaskWatchdog(clock=self.reactor)
+
+        # Spreads periodic MIB audits of all ONUs and limits concurrent resyncs
+        self._audit_scheduler = MibAuditScheduler(clock=self.reactor)
+
+        # Spreads PM interval collections of all ONUs and limits concurrent ones per PON
+        self._pm_collection_scheduler = PmCollectionScheduler(clock=self.reactor)
+
+        # OMCI capabilities shared by ONUs of the same model
+        self._capabilities_cache = self._mk_capabilities_cache(
+            support_classes.get('omci-capabilities', {}).get('cache'))
+
         # OMCI related databases are on a per-agent basis. State machines and tasks
         # are per ONU Vendore
         #
@@ -141,6 +172,47 @@ class OpenOMCIAgent(object):
         """ Return a reference to the VOLTHA Core component"""
         return self._core_proxy
 
+    @property
+    def task_watchdog(self):
+        """ Shared watchdog for OpenOMCI tasks """
+        return self._task_watchdog
+
+    @property
+    def audit_scheduler(self):
+        """ Agent-wide MIB audit/resync scheduler """
+        return self._audit_scheduler
+
+    @property
+    def pm_collection_scheduler(self):
+        """ Agent-wide PM interval collection scheduler """
+        return self._pm_collection_scheduler
+
+    @property
+    def capabilities_cache(self):
+        """ Agent-wide ONU OMCI capabilities cache, None if disabled """
+        return self._capabilities_cache
+
+    def _mk_capabilities_cache(self, config):
+        if not config or not config.get('enabled', False):
+            return None
+
+        kv_store = None
+        if config.get('persist', False):
+            try:
+                from pyvoltha.common.utils.registry import registry
+                from pyvoltha.adapters.common.kvstore.twisted_etcd_store import TwistedEtcdStore
+
+                host, port = registry('main').get_args().etcd.split(':', 1)
+                kv_store = TwistedEtcdStore(host, port, OnuCapabilitiesCache.BASE_PATH)
+
+            except Exception as e:
+                self.log.warn('capabilities-cache-not-persisted', e=e)
+
+        return OnuCapabilitiesCache(kv_store=kv_store,
+                                    validate=config.get('validate', False),
+                                    max_age=config.get('max-age', OnuCapabilitiesCache.DEFAULT_MAX_AGE),
+                                    clock=self.reactor)
+
     @property
     def database_class(self):
         return self._mib_database_cls
@@ -269,6 +341,8 @@ class OpenOMCIAgent(object):
 
             if cleanup:
                 del self._devices[device_id]
+                self._audit_scheduler.remove_device(device_id)
+                self._pm_collection_scheduler.remove_device(device_id)
 
     def device_ids(self):
         """
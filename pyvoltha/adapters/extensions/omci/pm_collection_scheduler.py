@@ -0,0 +1,327 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""
+OpenOMCI agent-wide scheduling of 15-minute PM interval collections
+"""
+from __future__ import absolute_import
+import heapq
+import itertools
+import zlib
+import structlog
+from collections import OrderedDict
+from twisted.internet import reactor
+from twisted.internet.defer import Deferred
+import six
+
+
+class PmCollectionScheduler(object):
+    """
+    Spread the PM history interval collections of all ONUs managed by an
+    OpenOMCI agent and limit the number of concurrent collections on each PON.
+
+    Intervals are numbered from the epoch, so interval 'n' covers the
+    'INTERVAL' seconds starting at 'n * INTERVAL' seconds. The data of an
+    interval can be read from the ONU PM history MEs until the following
+    interval completes.
+
+    Each ONU collects at a fixed offset into the next interval: 'min_delay'
+    plus a fraction of the skew window derived from a hash of its device ID.
+    The collections of all ONUs are spread over the window and each ONU keeps
+    the same offset from one interval to the next, across adapter restarts.
+
+    When more ONUs of a PON are due than may collect at once, the ones whose
+    collection has been due the longest go first.
+    """
+    INTERVAL = 15 * 60                      # Seconds per PM interval
+    DEFAULT_MIN_DELAY = 60                  # Seconds into the interval before collecting
+    DEFAULT_MAX_COLLECTIONS_PER_PON = 8     # Concurrent collections per OLT PON
+    DEFAULT_HISTORY = 8                     # Intervals of statistics kept
+
+    def __init__(self, clock=None, min_delay=DEFAULT_MIN_DELAY,
+                 max_collections_per_pon=DEFAULT_MAX_COLLECTIONS_PER_PON,
+                 history=DEFAULT_HISTORY):
+        """
+        Class initialization
+
+        :param clock: (IReactorTime) Reactor or clock (tests) to use
+        :param min_delay: (int/float) Seconds after an interval completes before
+                                      any ONU collects it
+        :param max_collections_per_pon: (int) Maximum concurrent interval collections
+                                              on a single PON. Zero for no limit
+        :param history: (int) Number of intervals to keep statistics for
+        """
+        assert 0 <= min_delay < PmCollectionScheduler.INTERVAL, 'Invalid minimum delay'
+        assert max_collections_per_pon >= 0, 'Collection limit cannot be negative'
+        assert history > 0, 'At least one interval of statistics is required'
+
+        self.log = structlog.get_logger()
+        self.reactor = clock if clock is not None else reactor
+        self._min_delay = min_delay
+        self._max_collections = max_collections_per_pon
+        self._history = history
+
+        self._collections = dict()      # pon-key -> set of device-ids collecting
+        self._waiting = dict()          # pon-key -> heap of (due, seq, device-id, deferred)
+        self._sequence = itertools.count()
+        self._device_info = dict()      # device-id -> (pon-key, interval, due) while active
+        self._last_collected = dict()   # device-id -> last interval collected
+        self._missed = dict()           # device-id -> number of intervals missed
+        self._collections_delayed = 0
+
+        # interval -> {'collected': n, 'missed': n, 'latency': total, 'max-latency': max}
+        self._interval_stats = OrderedDict()
+
+    def __str__(self):
+        return 'PmCollectionScheduler: Collecting: {}, Waiting: {}'.format(
+            self.collections_running, self.collections_waiting)
+
+    @property
+    def collections_running(self):
+        return sum(len(devices) for devices in six.itervalues(self._collections))
+
+    @property
+    def collections_waiting(self):
+        return sum(len(waiting) for waiting in six.itervalues(self._waiting))
+
+    @property
+    def collections_delayed(self):
+        """ Number of collection requests that had to wait for a free PON slot """
+        return self._collections_delayed
+
+    def interval(self, when=None):
+        """
+        Number of the interval in progress
+
+        :param when: (float) Time (seconds since the epoch), default is now
+        :return: (int) Interval number
+        """
+        when = self.reactor.seconds() if when is None else when
+        return int(when // PmCollectionScheduler.INTERVAL)
+
+    def offset(self, device_id, skew):
+        """
+        Collection offset of an ONU into an interval
+
+        :param device_id: (str) ONU Device ID
+        :param skew: (int/float) Seconds past 'min_delay' collections are spread over
+        :return: (float) Seconds after the start of an interval to collect the
+                         previous one
+        """
+        fraction = (zlib.crc32(device_id.encode('utf-8')) & 0xffffffff) / float(1 << 32)
+        skew = max(0, min(skew, PmCollectionScheduler.INTERVAL - self._min_delay - 1))
+        return self._min_delay + fraction * skew
+
+    def next_collection(self, device_id, skew):
+        """
+        Get the next interval collection of an ONU
+
+        :param device_id: (str) ONU Device ID
+        :param skew: (int/float) Seconds past 'min_delay' collections are spread over
+        :return: (tuple) (interval number, collection time in seconds since the epoch)
+        """
+        current = self.interval()
+        start = (current + 1) * PmCollectionScheduler.INTERVAL
+        return current, start + self.offset(device_id, skew)
+
+    def acquire_collection(self, device_id, pon_key, interval, due=None):
+        """
+        Request permission to collect a PM interval
+
+        :param device_id: (str) ONU Device ID
+        :param pon_key: (hashable) PON the ONU is on, for instance the
+                        (OLT Device ID, channel ID) tuple. If None, the
+                        request is not limited
+        :param interval: (int) Interval number to collect
+        :param due: (float) Time the collection was due, default is now. Requests
+                            that have been due the longest are granted first
+
+        :return: (Deferred) Fires once the collection may start. Call
+                 'release_collection' once done or no longer needed
+        """
+        due = self.reactor.seconds() if due is None else due
+        d = Deferred(canceller=lambda d: self._on_cancel(device_id, d))
+
+        self.release_collection(device_id, collected=False)   # At most one per ONU
+        self._device_info[device_id] = (pon_key, interval, due)
+
+        if pon_key is None or self._max_collections == 0:
+            d.callback(device_id)
+            return d
+
+        running = self._collections.setdefault(pon_key, set())
+
+        if len(running) < self._max_collections:
+            running.add(device_id)
+            d.callback(device_id)
+        else:
+            self._collections_delayed += 1
+            heapq.heappush(self._waiting.setdefault(pon_key, []),
+                           (due, next(self._sequence), device_id, d))
+        return d
+
+    def release_collection(self, device_id, collected=True):
+        """
+        A PM interval collection has completed, or is no longer needed
+
+        :param device_id: (str) ONU Device ID
+        :param collected: (bool) True if the interval was collected. Collections
+                                 that complete after the data was replaced by the
+                                 next interval are counted as missed.
+        """
+        info = self._device_info.pop(device_id, None)
+        if info is None:
+            return
+
+        pon_key, interval, due = info
+
+        if collected:
+            self._record(device_id, interval, due)
+
+        if pon_key is None or self._max_collections == 0:
+            return
+
+        running = self._collections.get(pon_key)
+        if running is None or device_id not in running:
+            # Still waiting for a slot
+            for d in self._dequeue(pon_key, device_id):
+                d.cancel()
+            return
+
+        running.discard(device_id)
+        waiting = self._waiting.get(pon_key)
+
+        while waiting and len(running) < self._max_collections:
+            _, _, next_device, d = heapq.heappop(waiting)
+            running.add(next_device)
+            d.callback(next_device)
+
+        if waiting is not None and not waiting:
+            del self._waiting[pon_key]
+        if not running:
+            del self._collections[pon_key]
+
+    def remove_device(self, device_id):
+        """
+        Forget all scheduling information for an ONU
+
+        :param device_id: (str) ONU Device ID
+        """
+        self.release_collection(device_id, collected=False)
+        self._last_collected.pop(device_id, None)
+        self._missed.pop(device_id, None)
+
+    def missed_intervals(self, device_id=None):
+        """
+        Number of intervals not collected in time
+
+        :param device_id: (str) ONU Device ID, None for all ONUs
+        :return: (int) Missed intervals
+        """
+        if device_id is not None:
+            return self._missed.get(device_id, 0)
+        return sum(six.itervalues(self._missed))
+
+    def interval_statistics(self, interval=None):
+        """
+        Collection statistics of recent intervals
+
+        :param interval: (int) Interval number, None for all intervals kept
+        :return: (dict) interval number -> {'collected': (int), 'missed': (int),
+                        'average-latency': (float), 'max-latency': (float)} where
+                        the latencies are the seconds from when a collection was
+                        due until it completed. If 'interval' is given, only the
+                        dictionary for that interval (None if unknown)
+        """
+        def summary(stats):
+            collected = stats['collected']
+            return {
+                'collected': collected,
+                'missed': stats['missed'],
+                'average-latency': stats['latency'] / collected if collected else 0.0,
+                'max-latency': stats['max-latency'],
+            }
+        if interval is not None:
+            stats = self._interval_stats.get(interval)
+            return summary(stats) if stats is not None else None
+
+        return {number: summary(stats) for number, stats in six.iteritems(self._interval_stats)}
+
+    def _stats(self, interval):
+        stats = self._interval_stats.get(interval)
+        if stats is None:
+            stats = self._interval_stats[interval] = {'collected': 0, 'missed': 0,
+                                                      'latency': 0.0, 'max-latency': 0.0}
+            # Keep only the most recent intervals
+            while len(self._interval_stats) > self._history:
+                oldest = min(self._interval_stats)
+                del self._interval_stats[oldest]
+        return stats
+
+    def _record(self, device_id, interval, due):
+        now = self.reactor.seconds()
+        last = self._last_collected.get(device_id)
+        missed = 0
+
+        # Intervals skipped since the last collection
+        if last is not None and interval > last + 1:
+            missed += interval - last - 1
+            for skipped in range(max(last + 1, interval - self._history), interval):
+                self._stats(skipped)['missed'] += 1
+
+        # Too late, the ONU has already replaced the data with the next interval
+        if self.interval(now) > interval + 1:
+            missed += 1
+            self._stats(interval)['missed'] += 1
+        else:
+            latency = max(0.0, now - due)
+            stats = self._stats(interval)
+            stats['collected'] += 1
+            stats['latency'] += latency
+            stats['max-latency'] = max(stats['max-latency'], latency)
+
+        if last is None or interval > last:
+            self._last_collected[device_id] = interval
+
+        if missed:
+            self._missed[device_id] = self._missed.get(device_id, 0) + missed
+            self.log.info('pm-intervals-missed', device_id=device_id, interval=interval,
+                          missed=missed)
+
+    def _dequeue(self, pon_key, device_id, d=None):
+        """ Remove waiting collection requests of an ONU and return their deferreds """
+        removed = []
+        waiting = self._waiting.get(pon_key)
+
+        if waiting:
+            keep = []
+            for entry in waiting:
+                if entry[2] == device_id and (d is None or entry[3] is d):
+                    removed.append(entry[3])
+                else:
+                    keep.append(entry)
+
+            if keep:
+                heapq.heapify(keep)
+                self._waiting[pon_key] = keep
+            else:
+                del self._waiting[pon_key]
+
+        return removed
+
+    def _on_cancel(self, device_id, d):
+        info = self._device_info.get(device_id)
+        if info is not None and info[0] is not None and self._dequeue(info[0], device_id, d):
+            del self._device_info[device_id]
@@ -24,6 +24,7 @@ from pyvoltha.adapters.extensions.omci.omci_cc import OmciCCRxEvents, OMCI_CC, R
 from pyvoltha.adapters.extensions.omci.omci_messages import OmciGetAllAlarmsResponse
 from pyvoltha.adapters.extensions.omci.omci_frame import OmciFrame
 from pyvoltha.adapters.extensions.omci.database.alarm_db_ext import AlarmDbExternal
+from pyvoltha.adapters.extensions.omci.alarm_state_table import AlarmStateTable
 from pyvoltha.adapters.extensions.omci.database.mib_db_api import ATTRIBUTES_KEY
 from pyvoltha.adapters.extensions.omci.omci_entities import CircuitPack, PptpEthernetUni, OntG, AniG
 
@@ -67,7 +68,8 @@ class AlarmSynchronizer(object):
                  transitions=DEFAULT_TRANSITIONS,
                  initial_state='disabled',
                  timeout_delay=DEFAULT_TIMEOUT_RETRY,
-                 audit_delay=DEFAULT_AUDIT_DELAY):
+                 audit_delay=DEFAULT_AUDIT_DELAY,
+                 event_filter=None):
         """
         Class initialization
 
@@ -84,6 +86,8 @@ class AlarmSynchronizer(object):
         :param audit_delay: (int) Seconds between Alarm audits while in sync. Set to
                                   zero to disable audit. An operator can request
                                   an audit manually by calling 'self.audit_alarm'
+        :param event_filter: (dict) Alarm event filter settings, see AlarmStateTable:
+                                    'raise-delay', 'clear-delay', 'max-rate' and 'burst'
         """
 
         self.log = structlog.get_logger(device_id=device_id)
@@ -108,6 +112,14 @@ class AlarmSynchronizer(object):
         self._last_alarm_sequence_value = 0
         self._device_in_db = False
 
+        event_filter = event_filter or dict()
+        self._alarm_states = AlarmStateTable(
+            device_id, self._send_alarm,
+            raise_delay=event_filter.get('raise-delay', AlarmStateTable.DEFAULT_RAISE_DELAY),
+            clear_delay=event_filter.get('clear-delay', AlarmStateTable.DEFAULT_CLEAR_DELAY),
+            max_rate=event_filter.get('max-rate', AlarmStateTable.DEFAULT_MAX_RATE),
+            burst=event_filter.get('burst', AlarmStateTable.DEFAULT_BURST))
+
         self._event_bus = EventBusClient()
         self._omci_cc_subscriptions = {               # RxEvent.enum -> Subscription Object
             RxEvent.Get_ALARM_Get: None,
@@ -157,6 +169,11 @@ class AlarmSynchronizer(object):
     def device_id(self):
         return self._device_id
 
+    @property
+    def alarm_statistics(self):
+        """ Alarm event filter counters (sent, duplicate, suppressed and dropped events) """
+        return self._alarm_states.statistics
+
     @property
     def last_alarm_sequence(self):
         return self._last_alarm_sequence_value
@@ -215,6 +232,7 @@ class AlarmSynchronizer(object):
         self.advertise(AlarmOpenOmciEventType.state_change, self.state)
 
         self._cancel_deferred()
+        self._alarm_states.stop()
 
         task, self._current_task = self._current_task, None
         if task is not None:
@@ -495,12 +513,19 @@ class AlarmSynchronizer(object):
                             previously_raised=previously_raised, currently_raised=currently_raised,
                             newly_cleared=newly_cleared, newly_raised=newly_raised)
 
-            # Generate the set/clear alarms now
+            # The alarm state table sends the set/clear alarms once their debounce
+            # or hold-down delay expires and the event rate allows
             for alarm_number in newly_cleared:
-                reactor.callLater(0, self.clear_alarm, class_id, entity_id, alarm_number)
+                self._alarm_states.update(class_id, entity_id, alarm_number, False)
 
             for alarm_number in newly_raised:
-                reactor.callLater(0, self.raise_alarm, class_id, entity_id, alarm_number)
+                self._alarm_states.update(class_id, entity_id, alarm_number, True)
+
+    def _send_alarm(self, class_id, entity_id, alarm_number, raised):
+        if raised:
+            self.raise_alarm(class_id, entity_id, alarm_number)
+        else:
+            self.clear_alarm(class_id, entity_id, alarm_number)
 
     def get_alarm_description(self, class_id, alarm_number):
         """
@@ -81,6 +81,7 @@ class MibSynchronizer(object):
     DEFAULT_AUDIT_DELAY = 60       # Periodic tick to audit the MIB Data Sync
     DEFAULT_RESYNC_DELAY = 300     # Periodically force a resync
     DEFAULT_RESYNC_FAIL_LIMIT = 5  # Number of times to try to resync an existing onu before force resetting.
+    UPLOAD_BATCH_SIZE = 64         # MIB upload responses saved per database update
 
     def __init__(self, agent, device_id, mib_sync_tasks, db,
                  advertise_events=False,
@@ -133,6 +134,7 @@ class MibSynchronizer(object):
         self._advertise_events = advertise_events
 
         self._deferred = None
+        self._resync_slot = None   # Deferred while waiting/holding a PON resync slot
         self._current_task = None  # TODO: Support multiple running tasks after v.2.0 release
         self._task_deferred = None
         self._mib_data_sync = 0
@@ -140,6 +142,7 @@ class MibSynchronizer(object):
         self._device_in_db = False
         self._next_resync = None
         self._failed_resync_count = 0
+        self._upload_batch = []    # (class_id, entity_id, attributes) not yet saved
 
         self._on_olt_only_diffs = None
         self._on_onu_only_diffs = None
@@ -208,6 +211,13 @@ class MibSynchronizer(object):
             except:
                 pass
 
+    def _release_resync_slot(self):
+        d, self._resync_slot = self._resync_slot, None
+        if d is not None:
+            if not d.called:
+                d.cancel()
+            self._agent.audit_scheduler.release_resync(self._device_id)
+
     def __str__(self):
         return 'MIBSynchronizer: Device ID: {}, State:{}'.format(self._device_id, self.state)
 
@@ -285,6 +295,7 @@ class MibSynchronizer(object):
         self.advertise(OpenOmciEventType.state_change, self.state)
 
         self._cancel_deferred()
+        self._release_resync_slot()
         if self._device is not None:
             self._device.mib_db_in_sync = False
 
@@ -424,6 +435,7 @@ class MibSynchronizer(object):
             self.log.debug('mib-upload-success', results=results)
             self._current_task = None
             self._next_resync = datetime.utcnow() + timedelta(seconds=self._resync_delay)
+            self._save_upload_batch()
 
             # DEBUG: Dump raw json db:
             jsondb = self._database.dump_to_json(self.device_id)
@@ -437,12 +449,37 @@ class MibSynchronizer(object):
             self._deferred = reactor.callLater(self._timeout_delay, self.timeout)
 
         self._device.mib_db_in_sync = False
+        self._upload_batch = []
         self._current_task = self._upload_task(self._agent, self._device_id)
 
         self.log.debug('starting-mib-upload', task=self._current_task)
         self._task_deferred = self._device.task_runner.queue_task(self._current_task)
         self._task_deferred.addCallbacks(success, failure)
 
+    def on_exit_uploading(self):
+        """
+        Save any MIB upload responses received after the upload task completed
+        """
+        self._save_upload_batch()
+
+    def _save_upload_batch(self):
+        batch, self._upload_batch = self._upload_batch, []
+        if not batch:
+            return
+
+        try:
+            self._database.bulk_set(self._device_id, batch)
+
+        except Exception as e:
+            self.log.warn('upload-batch', e=e, size=len(batch))
+
+            for class_id, entity_id, attributes in batch:
+                try:
+                    self._database.set(self._device_id, class_id, entity_id, attributes)
+
+                except Exception as e:
+                    self.log.exception('upload-next', e=e, class_id=class_id, entity_id=entity_id)
+
     def on_enter_examining_mds(self):
         """
         Create a simple task to fetch the MIB Data Sync value and
@@ -482,8 +519,11 @@ class MibSynchronizer(object):
         self.last_mib_db_sync = datetime.utcnow()
         self._device.mib_db_in_sync = True
 
+        # Audits of all ONUs are spread over the audit interval by the agent
         if self._audit_delay > 0:
-            self._deferred = reactor.callLater(self._audit_delay, self.audit_mib)
+            self._deferred = self._agent.audit_scheduler.schedule_audit(self._device_id,
+                                                                        self._audit_delay,
+                                                                        self.audit_mib)
 
     def on_enter_out_of_sync(self):
         """
@@ -571,12 +611,15 @@ class MibSynchronizer(object):
         """
         Perform a resynchronization of the MIB database
 
-        First calculate any differences
+        First calculate any differences. The number of concurrent resynchronizations
+        on a PON is limited by the agent, so this may have to wait for others to
+        complete first.
         """
         self.advertise(OpenOmciEventType.state_change, self.state)
 
         def success(results):
             self.log.debug('resync-success', results=results)
+            self._release_resync_slot()
 
             on_olt_only = results.get('on-olt-only')
             on_onu_only = results.get('on-onu-only')
@@ -605,6 +648,7 @@ class MibSynchronizer(object):
         def failure(reason):
             self.log.info('resync-failure', reason=reason)
             self._current_task = None
+            self._release_resync_slot()
 
             # if we continue to fail resync after configured number of times then give up
             # and reset the onu, reupload the mib db and start over. Setting last_mib_db_sync_value
@@ -620,9 +664,24 @@ class MibSynchronizer(object):
 
             self._deferred = reactor.callLater(self._timeout_delay, self.timeout)
 
-        self._current_task = self._resync_task(self._agent, self._device_id)
-        self._task_deferred = self._device.task_runner.queue_task(self._current_task)
-        self._task_deferred.addCallbacks(success, failure)
+        def start_resync(_):
+            self._current_task = self._resync_task(self._agent, self._device_id)
+            self._task_deferred = self._device.task_runner.queue_task(self._current_task)
+            self._task_deferred.addCallbacks(success, failure)
+
+        def slot_cancelled(_):
+            pass        # Stopped while waiting for a PON resync slot
+
+        self._resync_slot = self._agent.audit_scheduler.acquire_resync(self._device_id,
+                                                                       self._device.pon_key)
+        self._resync_slot.addCallbacks(start_resync, slot_cancelled)
+
+    def on_exit_resynchronizing(self):
+        """
+        Give up the PON resync slot (or the wait for one) whichever way the
+        resynchronization ends, including a 'timeout' back to starting
+        """
+        self._release_resync_slot()
 
     def on_mib_reset_response(self, _topic, msg):
         """
@@ -749,10 +808,11 @@ class MibSynchronizer(object):
                     if class_id in {OntData.class_id, Omci.class_id}:
                         return
 
-                    attributes = {k: v for k, v in omci_msg['object_data'].items()}
+                    # Save to the database in batches
+                    self._upload_batch.append((class_id, entity_id, omci_msg['object_data']))
 
-                    # Save to the database
-                    self._database.set(self._device_id, class_id, entity_id, attributes)
+                    if len(self._upload_batch) >= self.UPLOAD_BATCH_SIZE:
+                        self._save_upload_batch()
 
             except KeyError:
                 pass            # NOP
@@ -1007,7 +1067,7 @@ class MibSynchronizer(object):
                 RC.InstanceExists: "Instance Exists"
             }.get(success_code, 'Unknown status code: {}'.format(success_code))
 
-    def query_mib(self, class_id=None, instance_id=None, attributes=None):
+    def query_mib(self, class_id=None, instance_id=None, attributes=None, read_only=False):
         """
         Get MIB database information.
 
@@ -1017,6 +1077,8 @@ class MibSynchronizer(object):
         :param class_id:  (int) Managed Entity class ID
         :param instance_id: (int) Managed Entity instance
         :param attributes: (list or str) Managed Entity instance's attributes
+        :param read_only: (bool) If True, the caller will not modify the results
+                                 and an immutable, shared view may be returned
 
         :return: (dict) The value(s) requested. If class/inst/attribute is
                         not found, an empty dictionary is returned
@@ -1031,7 +1093,23 @@ class MibSynchronizer(object):
 
         return self._database.query(self._device_id, class_id=class_id,
                                     instance_id=instance_id,
-                                    attributes=attributes)
+                                    attributes=attributes,
+                                    read_only=read_only)
+
+    def query_mib_digests(self):
+        """
+        Get the content digests of the MIB database ME instances
+
+        :return: (dict) (class_id, instance_id) -> digest, or None if the
+                        database does not keep instance digests
+        :raises DatabaseStateError: If the database is not enabled or does not exist
+        """
+        from pyvoltha.adapters.extensions.omci.database.mib_db_api import DatabaseStateError
+
+        if self._database is None:
+            raise DatabaseStateError('Database does not yet exist')
+
+        return self._database.digests(self._device_id)
 
     def mib_set(self, class_id, entity_id, attributes):
         """
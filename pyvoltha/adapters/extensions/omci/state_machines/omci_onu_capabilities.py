@@ -222,7 +222,8 @@ class OnuOmciCapabilities(object):
         self._cancel_deferred()
 
         def success(results):
-            self.log.debug('capabilities-success', results=results)
+            self.log.debug('capabilities-success', results=results,
+                           from_cache=getattr(self._current_task, 'from_cache', False))
             self._supported_entities = self._current_task.supported_managed_entities
             self._supported_msg_types = self._current_task.supported_message_types
             self._current_task = None
@@ -235,7 +236,9 @@ class OnuOmciCapabilities(object):
             self._current_task = None
             self._deferred = reactor.callLater(self._timeout_delay, self.failure)
 
-        # Schedule a task to read the ONU's OMCI capabilities
+        # Schedule a task to read the ONU's OMCI capabilities. If the agent's
+        # capabilities cache knows this ONU model, the task skips the OMCI ME
+        # table walk
         self._current_task = self._get_capabilities_task(self._agent, self._device_id)
         self._task_deferred = self._device.task_runner.queue_task(self._current_task)
         self._task_deferred.addCallbacks(success, failure)
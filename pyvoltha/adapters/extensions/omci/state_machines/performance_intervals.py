@@ -18,7 +18,7 @@ import structlog
 import arrow
 from transitions import Machine
 from datetime import datetime, timedelta
-from random import uniform, shuffle
+from random import shuffle
 from twisted.internet import reactor
 from twisted.internet.defer import inlineCallbacks
 from pyvoltha.common.utils.asleep import asleep
@@ -87,7 +87,7 @@ class PerformanceIntervals(object):
     ]
     DEFAULT_RETRY = 10               # Seconds to delay after task failure/timeout/poll
     DEFAULT_TICK_DELAY = 15          # Seconds between checks for collection tick
-    DEFAULT_INTERVAL_SKEW = 10 * 60  # Seconds to skew past interval boundary
+    DEFAULT_INTERVAL_SKEW = 10 * 60  # Seconds to spread collections past interval boundary
     DEFAULT_COLLECT_ATTEMPTS = 3     # Maximum number of collection fetch attempts
     DEFAULT_CREATE_ATTEMPTS = 15     # Maximum number of attempts to create a PM Managed Entities
 
@@ -113,8 +113,8 @@ class PerformanceIntervals(object):
         :param initial_state: (str) Initial state machine state
         :param timeout_delay: (int/float) Number of seconds after a timeout to pause
         :param tick_delay: (int/float) Collection poll check delay while idle
-        :param interval_skew: (int/float) Seconds to randomly skew the next interval
-                              collection to spread out requests for PM intervals
+        :param interval_skew: (int/float) Seconds the interval collections of all ONUs
+                              are spread over to spread out requests for PM intervals
         :param collect_attempts: (int) Max requests for a single PM interval before fail
         :param create_attempts: (int) Max attempts to create PM Managed entities before stopping state machine
         """
@@ -158,11 +158,15 @@ class PerformanceIntervals(object):
         self._add_me_deferred = None
         self._delete_me_deferred = None
         self._next_interval = None
+        self._interval = None           # Interval number of the next collection
+        self._interval_due = None       # Time (seconds since the epoch) collection is due
+        self._collect_slot = None       # Deferred while waiting/holding a PON collection slot
         self._enet_entity_id = IndexPool(1024, 1)
         self._add_pm_me_retry = 0
 
         # (Class ID, Instance ID) -> Collect attempts remaining
         self._pm_me_collect_retries = dict()
+        self._pm_me_collect_exhausted = set()   # Keys that ran out of attempts this interval
         self._pm_me_extended_info = dict()
         self._add_pm_me = dict()        # (pm cid, pm eid) -> (me cid, me eid, upstream)
         self._del_pm_me = set()
@@ -207,6 +211,14 @@ class PerformanceIntervals(object):
             except:
                 pass
 
+    def _release_collect_slot(self, collected=False):
+        d, self._collect_slot = self._collect_slot, None
+        if d is not None:
+            if not d.called:
+                d.cancel()
+            self._agent.pm_collection_scheduler.release_collection(self._device_id,
+                                                                   collected=collected)
+
     def _cancel_tasks(self):
         task, self._current_task = self._current_task, None
         if task is not None:
@@ -341,6 +353,7 @@ class PerformanceIntervals(object):
         self.advertise(OpenOmciEventType.state_change, self.state)
         self._cancel_deferred()
         self._cancel_tasks()
+        self._release_collect_slot()
         self._next_interval = None
 
         # Drop OMCI ME Response subscriptions
@@ -466,7 +479,7 @@ class PerformanceIntervals(object):
             self._current_task = None
             self._deferred = reactor.callLater(0, self.success)
             # Calculate next interval time
-            self._next_interval = self.get_next_interval
+            self._schedule_next_interval()
 
         def failure(reason):
             self.log.info('sync-time-failure', reason=reason)
@@ -609,6 +622,39 @@ class PerformanceIntervals(object):
         self.advertise(OpenOmciEventType.state_change, self.state)
         self._cancel_deferred()
         self._cancel_tasks()
+
+        # The number of ONUs collecting at once on a PON is limited by the agent,
+        # so this may have to wait for others to complete first
+        if self._collect_slot is None:
+            scheduler = self._agent.pm_collection_scheduler
+            self._collect_slot = scheduler.acquire_collection(self._device_id,
+                                                              self._device.pon_key,
+                                                              self._interval,
+                                                              due=self._interval_due)
+        if not self._collect_slot.called:
+            def slot_granted(_):
+                if self.state == 'collect_data':
+                    self._collect_next_me()
+
+            def slot_cancelled(_):
+                pass        # Stopped while waiting for a PON collection slot
+
+            self._collect_slot.addCallbacks(slot_granted, slot_cancelled)
+            return
+
+        self._collect_next_me()
+
+    def _collect_next_me(self):
+        """
+        Collect the next PM interval ME not yet collected for this interval
+
+        All MEs are collected back to back (failed requests are retried after
+        the timeout delay) without returning to idle, so the PON collection
+        slot is not held while waiting for idle ticks.
+        """
+        if self.state != 'collect_data':
+            return      # Stopped, the slot was released on exit
+
         keys = list(self._pm_me_collect_retries.keys())
         shuffle(keys)
 
@@ -627,14 +673,17 @@ class PerformanceIntervals(object):
                                    entity_id=results.get('entity_id'))
                     self._current_task = None
                     self._pm_me_collect_retries[key] = 0
-                    self._deferred = reactor.callLater(0, self.success)
+                    self._deferred = reactor.callLater(0, self._collect_next_me)
                     return results
 
                 def failure(reason):
                     self.log.info('collect-failure', reason=reason)
                     self._current_task = None
                     self._pm_me_collect_retries[key] -= 1
-                    self._deferred = reactor.callLater(self._timeout_delay, self.failure)
+                    if self._pm_me_collect_retries[key] <= 0:
+                        self._pm_me_collect_exhausted.add(key)
+                    self._deferred = reactor.callLater(self._timeout_delay,
+                                                       self._collect_next_me)
                     return reason   # Halt callback processing
 
                 # start the task
@@ -660,8 +709,16 @@ class PerformanceIntervals(object):
                 self._task_deferred.addCallback(self.publish_data)
                 return
 
-        # Here if all intervals have been collected (we are up to date)
-        self._next_interval = self.get_next_interval
+        # Here if all intervals have been collected (we are up to date), or
+        # have run out of attempts. The interval only counts as collected if
+        # every ME was read.
+        exhausted, self._pm_me_collect_exhausted = self._pm_me_collect_exhausted, set()
+        if exhausted:
+            self.log.warn('collect-attempts-exhausted', keys=sorted(exhausted),
+                          interval=self._interval)
+
+        self._release_collect_slot(collected=not exhausted)
+        self._schedule_next_interval()
         self.log.debug('collect-calculate-next', next=self._next_interval)
 
         self._pm_me_collect_retries = dict.fromkeys(self._pm_me_collect_retries, self._collect_attempts)
@@ -673,31 +730,28 @@ class PerformanceIntervals(object):
         """
         pass  # TODO: Not sure if we want this state. Need to get alarm synchronizer working first
 
-    @property
-    def get_next_interval(self):
+    def _schedule_next_interval(self):
         """
         Determine the time for the next interval collection for all of this
         ONUs PM Intervals. Earliest fetch time is at least 1 minute into the
         next interval.
 
-        :return: (datetime) UTC time to get the next interval
+        The agent places each ONU at a fixed offset (derived from its device ID)
+        within the interval skew so collections of all ONUs are spread out.
         """
-        now = datetime.utcnow()
-
-        # Get delta seconds to at least 1 minute into next interval
-        next_delta_secs = (16 - (now.minute % 15)) * 60
-        next_interval = now + timedelta(seconds=next_delta_secs)
+        scheduler = self._agent.pm_collection_scheduler
 
         # NOTE: For debugging, uncomment next section to perform collection
         #       right after initial code startup/mib-sync
         if self._next_interval is None:
-            return now     # Do it now  (just for debugging purposes)
+            # Do it now  (just for debugging purposes)
+            self._interval = scheduler.interval() - 1
+            self._interval_due = scheduler.reactor.seconds()
+        else:
+            self._interval, self._interval_due = \
+                scheduler.next_collection(self._device_id, self._interval_skew)
 
-        # Skew the next time up to the maximum specified
-        # TODO: May want to skew in a shorter range and select the minute
-        #       based off some device property value to make collection a
-        #       little more predictable on a per-ONU basis.
-        return next_interval + timedelta(seconds=uniform(0, self._interval_skew))
+        self._next_interval = datetime.utcfromtimestamp(self._interval_due)
 
     def pm_collected(self, key):
         """
@@ -19,9 +19,9 @@ from twisted.internet.defer import inlineCallbacks, TimeoutError, failure, retur
 from twisted.internet import reactor
 from pyvoltha.common.utils.asleep import asleep
 from pyvoltha.adapters.extensions.omci.database.mib_db_dict import *
+from pyvoltha.adapters.extensions.omci.database.mib_diff import lhs_only, attribute_diffs
 from pyvoltha.adapters.extensions.omci.omci_defs import AttributeAccess
 from pyvoltha.adapters.extensions.omci.database.alarm_db_ext import AlarmDbExternal
-import six
 from six.moves import range
 
 AA = AttributeAccess
@@ -148,7 +148,8 @@ class AlarmResyncTask(Task):
                     onu_db_copy = self._db_active.query(self.device_id)
 
                     on_olt_only, on_onu_only, attr_diffs = \
-                        self.compare_mibs(olt_db_copy, onu_db_copy)
+                        self.compare_mibs(olt_db_copy, onu_db_copy,
+                                          active_digests=self._db_active.digests(self.device_id))
 
                     on_olt_only = on_olt_only if len(on_olt_only) else None
                     on_onu_only = on_onu_only if len(on_onu_only) else None
@@ -289,12 +290,14 @@ class AlarmResyncTask(Task):
 
         returnValue(seq_no + 1)     # seq_no is zero based and alarm table.
 
-    def compare_mibs(self, db_copy, db_active):
+    def compare_mibs(self, db_copy, db_active, copy_digests=None, active_digests=None):
         """
         Compare the our db_copy with the ONU's active copy
 
         :param db_copy: (dict) OpenOMCI's copy of the database
         :param db_active: (dict) ONU's database snapshot
+        :param copy_digests: (dict) Instance digests of db_copy, None if not kept
+        :param active_digests: (dict) Instance digests of db_active, None if not kept
         :return: (dict), (dict), dict()  Differences
         """
         self.strobe_watchdog()
@@ -310,7 +313,8 @@ class AlarmResyncTask(Task):
         # thinks should be on the remote (ONU)
 
         me_map = self.omci_agent.get_device(self.device_id).me_map
-        attr_diffs = self.get_attribute_diffs(db_copy, db_active, me_map)
+        attr_diffs = self.get_attribute_diffs(db_copy, db_active, me_map,
+                                              copy_digests, active_digests)
 
         return on_olt_only, on_onu_only, attr_diffs
 
@@ -326,31 +330,10 @@ class AlarmResyncTask(Task):
 
         return: (list(int,int)) List of tuples where (class_id, inst_id)
         """
-        results = list()
-
-        for cls_id, cls_data in lhs.items():
-            # Get unique classes
-            #
-            # Skip keys that are not class IDs
-            if not isinstance(cls_id, int):
-                continue
-
-            if cls_id not in rhs:
-                results.extend([(cls_id, inst_id) for inst_id in cls_data.keys()
-                                if isinstance(inst_id, int)])
-            else:
-                # Get unique instances of a class
-                lhs_cls = cls_data
-                rhs_cls = rhs[cls_id]
-
-                for inst_id, _ in lhs_cls.items():
-                    # Skip keys that are not instance IDs
-                    if isinstance(cls_id, int) and inst_id not in rhs_cls:
-                        results.extend([(cls_id, inst_id)])
-
-        return results
+        return lhs_only(lhs, rhs)
 
-    def get_attribute_diffs(self, omci_copy, onu_copy, me_map):
+    def get_attribute_diffs(self, omci_copy, onu_copy, me_map, omci_digests=None,
+                            onu_digests=None):
         """
         Compare two OMCI MIBs and return the ME class and instance IDs that exists
         on both the local copy and the remote ONU that have different attribute
@@ -360,37 +343,11 @@ class AlarmResyncTask(Task):
         :param omci_copy: (dict) OpenOMCI copy (OLT-side) of the MIB Database
         :param onu_copy: (dict) active ONU latest copy its database
         :param me_map: (dict) ME Class ID MAP for this ONU
+        :param omci_digests: (dict) Instance digests of omci_copy, None if not kept
+        :param onu_digests: (dict) Instance digests of onu_copy, None if not kept
 
         return: (list(int,int,str)) List of tuples where (class_id, inst_id, attribute)
                                     points to the specific ME instance where attributes
                                     are different
         """
-        results = list()
-
-        # Get class ID's that are in both
-        class_ids = {cls_id for cls_id, _ in omci_copy.items()
-                     if isinstance(cls_id, int) and cls_id in onu_copy}
-
-        for cls_id in class_ids:
-            # Get unique instances of a class
-            olt_cls = omci_copy[cls_id]
-            onu_cls = onu_copy[cls_id]
-
-            # Get set of common instance IDs
-            inst_ids = {inst_id for inst_id, _ in olt_cls.items()
-                        if isinstance(inst_id, int) and inst_id in onu_cls}
-
-            for inst_id in inst_ids:
-                omci_attributes = {k for k in six.iterkeys(olt_cls[inst_id][ATTRIBUTES_KEY])}
-                onu_attributes = {k for k in six.iterkeys(onu_cls[inst_id][ATTRIBUTES_KEY])}
-
-                # Get attributes that exist in one database, but not the other
-                sym_diffs = (omci_attributes ^ onu_attributes)
-                results.extend([(cls_id, inst_id, attr) for attr in sym_diffs])
-
-                # Get common attributes with different values
-                common_attributes = (omci_attributes & onu_attributes)
-                results.extend([(cls_id, inst_id, attr) for attr in common_attributes
-                               if olt_cls[inst_id][ATTRIBUTES_KEY][attr] !=
-                                onu_cls[inst_id][ATTRIBUTES_KEY][attr]])
-        return results
+        return attribute_diffs(omci_copy, onu_copy, omci_digests, onu_digests)
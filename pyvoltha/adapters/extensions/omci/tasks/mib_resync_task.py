@@ -19,11 +19,10 @@ from twisted.internet.defer import inlineCallbacks, TimeoutError, failure, retur
 from twisted.internet import reactor
 from pyvoltha.common.utils.asleep import asleep
 from pyvoltha.adapters.extensions.omci.database.mib_db_dict import *
+from pyvoltha.adapters.extensions.omci.database.mib_diff import lhs_only, attribute_diffs
 from pyvoltha.adapters.extensions.omci.omci_entities import OntData, Omci
 from pyvoltha.adapters.extensions.omci.omci_defs import AttributeAccess, EntityOperations
-from pyvoltha.adapters.extensions.omci.omci_fields import OmciTableField
 from pyvoltha.adapters.extensions.omci.omci_me import OntDataFrame
-import six
 from six.moves import range
 
 AA = AttributeAccess
@@ -61,6 +60,7 @@ class MibResyncTask(Task):
     max_mib_upload_next_retries = 3
     mib_upload_next_delay = 10          # Max * delay < 60 seconds
     watchdog_timeout = 15               # Should be > max delay
+    upload_batch_size = 64              # ME instances saved per database update
 
     def __init__(self, omci_agent, device_id):
         """
@@ -76,6 +76,7 @@ class MibResyncTask(Task):
                                             exclusive=False)
         self._local_deferred = None
         self._device = omci_agent.get_device(device_id)
+        self._olt_digests = None
         self._db_active = MibDbVolatileDict(omci_agent)
         self._db_active.start()
 
@@ -153,7 +154,8 @@ class MibResyncTask(Task):
                     # Compare the databases
                     active_copy = self._db_active.query(self.device_id)
                     on_olt_only, on_onu_only, attr_diffs = \
-                        self.compare_mibs(db_copy, active_copy)
+                        self.compare_mibs(db_copy, active_copy, self._olt_digests,
+                                          self._db_active.digests(self.device_id))
 
                     self.deferred.callback(
                             {
@@ -201,8 +203,10 @@ class MibResyncTask(Task):
                     yield asleep(MibResyncTask.db_copy_retry_delay)
                     continue
 
-                # Get a snapshot of the local MIB database
-                db_copy = self._device.query_mib()
+                # Get a snapshot of the local MIB database. It is only read
+                # (compared and audited), so a shared read-only view will do
+                db_copy = self._device.query_mib(read_only=True)
+                self._olt_digests = self._device.query_mib_digests()
                 # if we made it this far, no need to keep trying
                 break
 
@@ -253,7 +257,10 @@ class MibResyncTask(Task):
     def upload_mib(self, number_of_commands):
         ########################################
         # Begin MIB Upload
+        #
+        # Responses are accumulated and saved to the active database in batches
         seq_no = None
+        batch = []
 
         for seq_no in range(number_of_commands):
             max_tries = MibResyncTask.max_mib_upload_next_retries
@@ -270,7 +277,6 @@ class MibResyncTask(Task):
                     # Filter out the 'mib_data_sync' from the database. We save that at
                     # the device level and do not want it showing up during a re-sync
                     # during data comparison
-                    from binascii import hexlify
                     if class_id in (OntData.class_id, Omci.class_id):
                         break
 
@@ -279,10 +285,11 @@ class MibResyncTask(Task):
                         self.log.warn('invalid-class-id', class_id=class_id)
                         break
 
-                    attributes = {k: v for k, v in omci_msg['object_data'].items()}
+                    batch.append((class_id, entity_id, omci_msg['object_data']))
 
-                    # Save to the database
-                    self._db_active.set(self.device_id, class_id, entity_id, attributes)
+                    if len(batch) >= MibResyncTask.upload_batch_size:
+                        self.save_batch(batch)
+                        batch = []
                     break
 
                 except TimeoutError:
@@ -299,14 +306,41 @@ class MibResyncTask(Task):
                     self.log.exception('resync', e=e, seq_no=seq_no,
                                        number_of_commands=number_of_commands)
 
+        self.save_batch(batch)
         returnValue(seq_no + 1)     # seq_no is zero based.
 
-    def compare_mibs(self, db_copy, db_active):
+    def save_batch(self, batch):
+        """
+        Save a batch of uploaded ME instances to the active database. If the
+        batch cannot be saved as a whole, the instances are saved one at a time
+        so that only the bad ones are skipped.
+
+        :param batch: (list) (class_id, entity_id, attributes) tuples
+        """
+        if not batch:
+            return
+
+        try:
+            self._db_active.bulk_set(self.device_id, batch)
+
+        except Exception as e:
+            self.log.warn('resync-batch', e=e, size=len(batch))
+
+            for class_id, entity_id, attributes in batch:
+                try:
+                    self._db_active.set(self.device_id, class_id, entity_id, attributes)
+
+                except Exception as e:
+                    self.log.exception('resync', e=e, class_id=class_id, entity_id=entity_id)
+
+    def compare_mibs(self, db_copy, db_active, copy_digests=None, active_digests=None):
         """
         Compare the our db_copy with the ONU's active copy
 
         :param db_copy: (dict) OpenOMCI's copy of the database
         :param db_active: (dict) ONU's database snapshot
+        :param copy_digests: (dict) Instance digests of db_copy, None if not kept
+        :param active_digests: (dict) Instance digests of db_active, None if not kept
         :return: (dict), (dict), (list)  Differences
         """
         self.strobe_watchdog()
@@ -335,7 +369,8 @@ class MibResyncTask(Task):
         # are different on the ONU.  This is the value that the local (OpenOMCI)
         # thinks should be on the remote (ONU)
 
-        attr_diffs = self.get_attribute_diffs(db_copy, db_active, me_map)
+        attr_diffs = self.get_attribute_diffs(db_copy, db_active, me_map,
+                                              copy_digests, active_digests)
 
         # TODO: Note that certain MEs are excluded from the MIB upload.  In particular,
         #       instances of some general purpose MEs, such as the Managed Entity ME and
@@ -357,31 +392,10 @@ class MibResyncTask(Task):
 
         return: (list(int,int)) List of tuples where (class_id, inst_id)
         """
-        results = list()
-
-        for cls_id, cls_data in lhs.items():
-            # Get unique classes
-            #
-            # Skip keys that are not class IDs
-            if not isinstance(cls_id, int):
-                continue
-
-            if cls_id not in rhs:
-                results.extend([(cls_id, inst_id) for inst_id in cls_data.keys()
-                                if isinstance(inst_id, int)])
-            else:
-                # Get unique instances of a class
-                lhs_cls = cls_data
-                rhs_cls = rhs[cls_id]
-
-                for inst_id, _ in lhs_cls.items():
-                    # Skip keys that are not instance IDs
-                    if isinstance(cls_id, int) and inst_id not in rhs_cls:
-                        results.extend([(cls_id, inst_id)])
+        return lhs_only(lhs, rhs)
 
-        return results
-
-    def get_attribute_diffs(self, omci_copy, onu_copy, me_map):
+    def get_attribute_diffs(self, omci_copy, onu_copy, me_map, omci_digests=None,
+                            onu_digests=None):
         """
         Compare two OMCI MIBs and return the ME class and instance IDs that exists
         on both the local copy and the remote ONU that have different attribute
@@ -391,53 +405,25 @@ class MibResyncTask(Task):
         :param omci_copy: (dict) OpenOMCI copy (OLT-side) of the MIB Database
         :param onu_copy: (dict) active ONU latest copy its database
         :param me_map: (dict) ME Class ID MAP for this ONU
+        :param omci_digests: (dict) Instance digests of omci_copy, None if not kept
+        :param onu_digests: (dict) Instance digests of onu_copy, None if not kept
 
         return: (list(int,int,str)) List of tuples where (class_id, inst_id, attribute)
                                     points to the specific ME instance where attributes
                                     are different
         """
-        results = list()
         ro_set = {AA.R}
 
-        # Get class ID's that are in both
-        class_ids = {cls_id for cls_id, _ in omci_copy.items()
-                     if isinstance(cls_id, int) and cls_id in onu_copy}
-
-        for cls_id in class_ids:
-            # Get unique instances of a class
-            olt_cls = omci_copy[cls_id]
-            onu_cls = onu_copy[cls_id]
-
-            # Weed out read-only and table attributes. Attributes on onu may be read-only.
+        def ignored(cls_id):
+            # Weed out read-only attributes. Attributes on onu may be read-only.
             # These will only show up it the OpenOMCI (OLT-side) database if it changed
             # and an AVC Notification was sourced by the ONU
-            # TODO: These class IDs could be calculated once at ONU startup (at device add)
             if cls_id in me_map:
-                ro_attrs = {attr.field.name for attr in me_map[cls_id].attributes
-                            if attr.access == ro_set}
-                table_attrs = {attr.field.name for attr in me_map[cls_id].attributes
-                               if isinstance(attr.field, OmciTableField)}
+                return {attr.field.name for attr in me_map[cls_id].attributes
+                        if attr.access == ro_set}
 
-            else:
-                # Here if partially defined ME (not defined in ME Map)
-                from pyvoltha.adapters.extensions.omci.omci_cc import UNKNOWN_CLASS_ATTRIBUTE_KEY
-                ro_attrs = {UNKNOWN_CLASS_ATTRIBUTE_KEY}
-
-            # Get set of common instance IDs
-            inst_ids = {inst_id for inst_id, _ in olt_cls.items()
-                        if isinstance(inst_id, int) and inst_id in onu_cls}
-
-            for inst_id in inst_ids:
-                omci_attributes = {k for k in six.iterkeys(olt_cls[inst_id][ATTRIBUTES_KEY])}
-                onu_attributes = {k for k in six.iterkeys(onu_cls[inst_id][ATTRIBUTES_KEY])}
-
-                # Get attributes that exist in one database, but not the other
-                sym_diffs = (omci_attributes ^ onu_attributes) - ro_attrs
-                results.extend([(cls_id, inst_id, attr) for attr in sym_diffs])
-
-                # Get common attributes with different values
-                common_attributes = (omci_attributes & onu_attributes) - ro_attrs
-                results.extend([(cls_id, inst_id, attr) for attr in common_attributes
-                               if olt_cls[inst_id][ATTRIBUTES_KEY][attr] !=
-                                onu_cls[inst_id][ATTRIBUTES_KEY][attr]])
-        return results
+            # Here if partially defined ME (not defined in ME Map)
+            from pyvoltha.adapters.extensions.omci.omci_cc import UNKNOWN_CLASS_ATTRIBUTE_KEY
+            return {UNKNOWN_CLASS_ATTRIBUTE_KEY}
+
+        return attribute_diffs(omci_copy, onu_copy, omci_digests, onu_digests, ignored)
@@ -21,7 +21,7 @@ from pyvoltha.adapters.extensions.omci.omci_defs import ReasonCodes, EntityOpera
 from pyvoltha.adapters.extensions.omci.omci_me import MEFrame
 from pyvoltha.adapters.extensions.omci.omci_frame import OmciFrame
 from pyvoltha.adapters.extensions.omci.omci_messages import OmciGet, OmciGetNext
-from pyvoltha.adapters.extensions.omci.omci_fields import OmciTableField
+from pyvoltha.adapters.extensions.omci.omci_fields import OmciTableField, MultipleTypeField
 from six.moves import range
 
 RC = ReasonCodes
@@ -32,6 +32,105 @@ class GetException(Exception):
     pass
 
 
+class OmciTableReader(object):
+    """
+    Reassembles an OMCI table attribute from its Get-Next response PDUs
+
+    The reassembly buffer is preallocated from the table size in the Get
+    response and each Get-Next PDU is copied into place, rather than growing
+    an immutable byte string. Table rows are decoded incrementally.
+    """
+    def __init__(self, entity_class, entity_id, attr_index, attr_size):
+        """
+        :param entity_class: (EntityClass) ME Class with the table attribute
+        :param entity_id: (int) ME Instance ID
+        :param attr_index: (int) Attribute index of the table
+        :param attr_size: (int) Table size (octets) from the Get response
+        """
+        self._field = entity_class.attributes[attr_index].field
+        self._size = attr_size
+        self._buffer = bytearray(attr_size)
+        self._view = memoryview(self._buffer)
+        self._length = 0
+        self._class_id = entity_class.class_id
+        self._entity_id = entity_id
+        self._mask = entity_class.mask_for(self._field.name)
+
+    @property
+    def name(self):
+        return self._field.name
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def complete(self):
+        return self._length >= self._size
+
+    @property
+    def requests(self):
+        """ Number of Get-Next requests needed to read the whole table """
+        return (self._size + OmciTableField.PDU_SIZE - 1) // OmciTableField.PDU_SIZE
+
+    def get_next_frame(self, seq_no):
+        """
+        Get the Get-Next request frame for a sequence number. A new frame is
+        built for each request since OMCI-CC keeps (and publishes) the frames
+        it sends.
+
+        :param seq_no: (int) Command sequence number
+        :return: (OmciFrame) Get-Next request
+        """
+        return OmciFrame(
+            transaction_id=None,                    # OMCI-CC will set
+            message_type=OmciGetNext.message_id,
+            omci_message=OmciGetNext(
+                entity_class=self._class_id,
+                entity_id=self._entity_id,
+                attributes_mask=self._mask,
+                command_sequence_number=seq_no
+            )
+        )
+
+    def add(self, data):
+        """
+        Copy the table data of a Get-Next response into the reassembly buffer
+
+        :param data: (bytes) Table attribute data of the Get-Next response
+        :return: (int) Number of octets added
+        """
+        octets = min(len(data), self._size - self._length, OmciTableField.PDU_SIZE)
+        end = self._length + octets
+        self._view[self._length:end] = memoryview(data)[:octets]
+        self._length = end
+        return octets
+
+    def rows(self):
+        """
+        Decode the table rows received so far
+
+        :return: (generator) Decoded table rows
+        """
+        row_field = self._field
+        if isinstance(row_field, MultipleTypeField):
+            row_field = row_field.default
+        length_from = getattr(row_field, 'length_from', None)
+        row_size = length_from(None) if length_from is not None else 0
+
+        if not row_size:
+            # Variable length rows, decode the remaining data one row at a time
+            data = bytes(self._view[:self._length])
+            while data:
+                data, val = row_field.getfield(None, data)
+                yield val
+            return
+
+        for offset in range(0, self._length, row_size):
+            _, val = row_field.getfield(None, bytes(self._view[offset:offset + row_size]))
+            yield val
+
+
 class OmciGetRequest(Task):
     """
     OpenOMCI Get an OMCI ME Instance Attributes
@@ -77,6 +176,7 @@ class OmciGetRequest(Task):
         self._attributes = attributes
         self._allow_failure = allow_failure
         self._failed_or_unknown_attributes = set()
+        self._table_sizes = dict()      # table attribute name -> size (octets)
         self._results = None
         self._local_deferred = None
 
@@ -112,6 +212,14 @@ class OmciGetRequest(Task):
         omci_msg = self._results.fields['omci_message'].fields
         return omci_msg['data'] if 'data' in omci_msg else None
 
+    @property
+    def table_sizes(self):
+        """
+        Return a dictionary of the sizes (octets) the ONU reported for the
+        table attributes that were retrieved
+        """
+        return dict(self._table_sizes)
+
     @property
     def success_code(self):
         """
@@ -382,22 +490,12 @@ class OmciGetRequest(Task):
                     self.log.error('omcc-get-table-huge', count=attr_size, name=eca.field.name)
                     raise ValueError('Huge Table Size: {}'.format(attr_size))
 
-                # Start the loop
-                seq_no = 0
-                data_buffer = b''
+                self._table_sizes[eca.field.name] = attr_size
+                reader = OmciTableReader(self._entity_class, self._entity_id,
+                                         attr_index, attr_size)
 
-                for offset in range(0, attr_size, OmciTableField.PDU_SIZE):
-                    frame = OmciFrame(
-                        transaction_id=None,                    # OMCI-CC will set
-                        message_type=OmciGetNext.message_id,
-                        omci_message=OmciGetNext(
-                            entity_class=self._entity_class.class_id,
-                            entity_id=self._entity_id,
-                            attributes_mask=attr_mask,
-                            command_sequence_number=seq_no
-                        )
-                    )
-                    get_results = yield self._device.omci_cc.send(frame)
+                for seq_no in range(reader.requests):
+                    get_results = yield self._device.omci_cc.send(reader.get_next_frame(seq_no))
 
                     omci_fields = get_results.fields['omci_message'].fields
                     status = omci_fields['success_code']
@@ -408,18 +506,9 @@ class OmciGetRequest(Task):
                                         ' sqn=' + str(seq_no) + ' omci-status ' + str(status))
 
                     # Extract the data
-                    num_octets = attr_size - offset
-                    if num_octets > OmciTableField.PDU_SIZE:
-                        num_octets = OmciTableField.PDU_SIZE
-
-                    data = omci_fields['data'][eca.field.name]
-                    data_buffer += data[:num_octets]
-                    seq_no += 1
-
-                vals = []
-                while data_buffer:
-                    data_buffer, val = eca.field.getfield(None, data_buffer)
-                    vals.append(val)
+                    reader.add(omci_fields['data'][eca.field.name])
+
+                vals = list(reader.rows())
 
                 # Save off the retrieved data
                 results_omci['attributes_mask'] |= attr_mask
@@ -21,6 +21,7 @@ from twisted.internet import reactor
 from pyvoltha.adapters.extensions.omci.omci_defs import ReasonCodes
 from pyvoltha.adapters.extensions.omci.omci_me import OmciFrame, Omci
 from pyvoltha.adapters.extensions.omci.omci import EntityOperations
+from pyvoltha.adapters.extensions.omci.omci_messages import OmciGet
 from pyvoltha.adapters.extensions.omci.tasks.omci_get_request import OmciGetRequest
 
 
@@ -42,6 +43,11 @@ class OnuCapabilitiesTask(Task):
     This task should be ran after MIB Synchronization and before any MIB
     Downloads to the ONU.
 
+    If the OpenOMCI agent has a capabilities cache, the capabilities of other
+    ONUs of the same model are used instead of walking the OMCI ME tables. If
+    the cache requires validation, the table sizes reported by the ONU must
+    first match the ones reported by the ONU the capabilities were read from.
+
     Upon completion, the Task deferred callback is invoked with dictionary
     containing the supported managed entities and message types.
 
@@ -57,6 +63,9 @@ class OnuCapabilitiesTask(Task):
     mib_get_next_delay = 5
     DEFAULT_OCTETS_PER_MESSAGE = 29
 
+    # OMCI ME tables whose reported sizes are compared to validate cached capabilities
+    VALIDATED_TABLES = ('me_type_table', 'message_type_table')
+
     def __init__(self, omci_agent, device_id, omci_pdu_size=DEFAULT_OCTETS_PER_MESSAGE):
         """
         Class initialization
@@ -76,6 +85,8 @@ class OnuCapabilitiesTask(Task):
         self._pdu_size = omci_pdu_size
         self._supported_entities = set()
         self._supported_msg_types = set()
+        self._table_sizes = dict()      # table attribute name -> octets
+        self._from_cache = False
 
     def cancel_deferred(self):
         super(OnuCapabilitiesTask, self).cancel_deferred()
@@ -109,6 +120,11 @@ class OnuCapabilitiesTask(Task):
         """
         return frozenset(self._supported_msg_types) if len(self._supported_msg_types) else None
 
+    @property
+    def from_cache(self):
+        """ True if the capabilities came from the agent's capabilities cache """
+        return self._from_cache
+
     def start(self):
         """
         Start MIB Capabilities task
@@ -137,17 +153,46 @@ class OnuCapabilitiesTask(Task):
 
         Then a loop is entered and get-next commands are sent for each sequence
         requested.
+
+        The sequence is skipped if the capabilities of this ONU model are cached.
         """
         self.log.debug('perform-get')
 
         try:
             self.strobe_watchdog()
-            self._supported_entities = yield self.get_supported_entities()
-            self.strobe_watchdog()
-            self._supported_msg_types = yield self.get_supported_message_types()
-            self.strobe_watchdog()
-
-            self.log.debug('get-success',
+            cache = getattr(self.omci_agent, 'capabilities_cache', None)
+            identity = cache.onu_identity(self._device) if cache is not None else None
+            cached = None
+
+            if identity is not None:
+                cached = yield cache.lookup(identity)
+                self.strobe_watchdog()
+
+                if cached is not None and cache.validate:
+                    valid = yield self.validate_cached(cached)
+                    self.strobe_watchdog()
+
+                    if not valid:
+                        self.log.info('cached-capabilities-mismatch', identity=identity)
+                        cache.invalidate(identity)
+                        cached = None
+
+            if cached is not None:
+                self._from_cache = True
+                self._supported_entities = set(cached.managed_entities)
+                self._supported_msg_types = set(cached.message_types)
+
+            else:
+                self._supported_entities = yield self.get_supported_entities()
+                self.strobe_watchdog()
+                self._supported_msg_types = yield self.get_supported_message_types()
+                self.strobe_watchdog()
+
+                if identity is not None and self._supported_entities and self._supported_msg_types:
+                    cache.set(identity, self._supported_entities, self._supported_msg_types,
+                              self._table_sizes)
+
+            self.log.debug('get-success', from_cache=self._from_cache,
                            supported_entities=self.supported_managed_entities,
                            supported_msg_types=self.supported_message_types)
             results = {
@@ -167,6 +212,56 @@ class OnuCapabilitiesTask(Task):
         self.log.debug('get-count-buffer', data=hexlify(data))
         return int(hexlify(data[:4]), 16)
 
+    @inlineCallbacks
+    def get_table_size(self, table_attribute):
+        """
+        Get the size of an OMCI ME table without walking the table
+
+        :param table_attribute: (str) Table attribute name
+        :return: (Deferred) Fires with the table size (octets)
+        """
+        frame = OmciFrame(
+            transaction_id=None,  # OMCI-CC will set
+            message_type=OmciGet.message_id,
+            omci_message=OmciGet(
+                entity_class=Omci.class_id,
+                entity_id=0,
+                attributes_mask=Omci.mask_for(table_attribute)
+            )
+        )
+        results = yield self._device.omci_cc.send(frame)
+
+        omci_fields = results.fields['omci_message'].fields
+        if omci_fields['success_code'] != ReasonCodes.Success.value:
+            raise GetCapabilitiesFailure('Get {} size failed with status code: {}'.
+                                         format(table_attribute, omci_fields['success_code']))
+
+        returnValue(omci_fields['data'][table_attribute + '_size'])
+
+    @inlineCallbacks
+    def validate_cached(self, cached):
+        """
+        Check that the ONU reports the same table sizes as the ONU the cached
+        capabilities were read from
+
+        :param cached: (CachedCapabilities) Cached capabilities of this ONU model
+        :return: (Deferred) Fires with True if the cached capabilities apply
+        """
+        for table_attribute in self.VALIDATED_TABLES:
+            expected = cached.table_sizes.get(table_attribute)
+            if expected is None:
+                returnValue(False)
+
+            size = yield self.get_table_size(table_attribute)
+            self.strobe_watchdog()
+
+            if size != expected:
+                self.log.debug('table-size-mismatch', table=table_attribute,
+                               size=size, expected=expected)
+                returnValue(False)
+
+        returnValue(True)
+
     @inlineCallbacks
     def get_supported_entities(self):
         """
@@ -183,6 +278,7 @@ class OnuCapabilitiesTask(Task):
                 raise GetCapabilitiesFailure('Get supported managed entities table failed with status code: {}'.
                                              format(results.success_code))
 
+            self._table_sizes.update(results.table_sizes)
             returnValue({attr.fields['me_type'] for attr in results.attributes['me_type_table']})
 
         except Exception as e:
@@ -205,6 +301,7 @@ class OnuCapabilitiesTask(Task):
                 raise GetCapabilitiesFailure('Get supported msg types table failed with status code: {}'.
                                              format(results.success_code))
 
+            self._table_sizes.update(results.table_sizes)
             returnValue({attr.fields['msg_type'] for attr in results.attributes['message_type_table']})
 
         except Exception as e:
@@ -15,8 +15,9 @@
 #
 from __future__ import absolute_import
 import structlog
-from twisted.internet import defer, reactor
+from twisted.internet import defer
 from twisted.internet.defer import failure
+from pyvoltha.adapters.extensions.omci.tasks.task_watchdog import TaskWatchdog
 
 
 class WatchdogTimeoutFailure(Exception):
@@ -60,6 +61,9 @@ class Task(object):
                                  OMCI Communications channel when it runs
         :param watchdog_timeout (int or float) Watchdog timeout (seconds) after task start, to
                                 run longer, periodically call 'strobe_watchdog()' to reschedule.
+
+        The watchdog is shared with all other tasks of the OpenOMCI agent (see
+        TaskWatchdog) so strobing it is cheap enough to do for every frame.
         """
         assert Task.MIN_PRIORITY <= priority <= Task.MAX_PRIORITY, \
             'Priority should be {}..{}'.format(Task.MIN_PRIORITY, Task.MAX_PRIORITY)
@@ -77,7 +81,9 @@ class Task(object):
         self._running = False
         self._exclusive = exclusive
         self._deferred = defer.Deferred()       # Fires upon completion
-        self._watchdog = None
+        self._watchdog = None                   # TaskWatchdog while running
+        self._watchdog_deadline = None
+        self._watchdog_tripped = False
         self._watchdog_timeout = watchdog_timeout
         self._priority = priority
 
@@ -101,6 +107,11 @@ class Task(object):
     def watchdog_timeout(self):
         return self._watchdog_timeout
 
+    @property
+    def watchdog_deadline(self):
+        """ Time (watchdog clock seconds) the watchdog expires if not strobed """
+        return self._watchdog_deadline
+
     @property
     def deferred(self):
         return self._deferred
@@ -115,15 +126,14 @@ class Task(object):
         return self._running
 
     def cancel_deferred(self):
-        d1, self._deferred = self._deferred, None
-        d2, self._watchdog = self._watchdog, None
+        d, self._deferred = self._deferred, None
+        self._stop_watchdog()
 
-        for d in [d1, d2]:
-            try:
-                if d is not None and not d.called:
-                    d.cancel()
-            except:
-                pass
+        try:
+            if d is not None and not d.called:
+                d.cancel()
+        except:
+            pass
 
     def start(self):
         """
@@ -151,39 +161,50 @@ class Task(object):
         clearing of the 'running' flag and canceling of the watchdog time
         """
         self._running = False
-        d, self._watchdog = self._watchdog, None
-        try:
-            if d is not None and not d.called:
-                d.cancel()
-        except:
-            pass
+        self._stop_watchdog()
+
+    def _stop_watchdog(self):
+        watchdog, self._watchdog = self._watchdog, None
+        self._watchdog_deadline = None
+
+        if watchdog is not None:
+            watchdog.unregister(self)
+
+    def _get_task_watchdog(self):
+        return getattr(self.omci_agent, 'task_watchdog', None) or TaskWatchdog.default()
 
     def strobe_watchdog(self):
         """
         Signal that we have not hung/deadlocked
         """
-        # Create if first time (called at Task start)
-
-        def watchdog_timeout():
-            # Task may have hung (blocked) or failed to call proper success/error
-            # completion callback/errback
-            if not self.deferred.called:
-                err_msg = 'Task {}:{} watchdog timeout'.format(self.name, self.task_id)
-                self.log.error("task-watchdog-timeout", running=self.running,
-                               timeout=self.watchdog_timeout, error=err_msg)
-
-                self.deferred.errback(failure.Failure(WatchdogTimeoutFailure(err_msg)))
-                self.deferred.cancel()
-
-        if self._watchdog is not None:
-            if self._watchdog.called:
-                # Too late, timeout failure in progress
-                self.log.warn('task-watchdog-tripped', running=self.running,
-                              timeout=self.watchdog_timeout)
-                return
-
-            d, self._watchdog = self._watchdog, None
-            d.cancel()
-
-        # Schedule/re-schedule the watchdog timer
-        self._watchdog = reactor.callLater(self.watchdog_timeout, watchdog_timeout)
+        if self._watchdog_tripped:
+            # Too late, timeout failure in progress
+            self.log.warn('task-watchdog-tripped', running=self.running,
+                          timeout=self.watchdog_timeout)
+            return
+
+        # Register if first time (called at Task start)
+        if self._watchdog is None:
+            self._watchdog = self._get_task_watchdog()
+            self._watchdog.register(self)
+
+        # Move the deadline out, the shared watchdog checks it periodically
+        self._watchdog_deadline = self._watchdog.seconds() + self.watchdog_timeout
+
+    def watchdog_expired(self):
+        """
+        Called by the TaskWatchdog once the deadline has passed without a strobe
+        """
+        self._watchdog_tripped = True
+        self._watchdog = None
+        self._watchdog_deadline = None
+
+        # Task may have hung (blocked) or failed to call proper success/error
+        # completion callback/errback
+        if self.deferred is not None and not self.deferred.called:
+            err_msg = 'Task {}:{} watchdog timeout'.format(self.name, self.task_id)
+            self.log.error("task-watchdog-timeout", running=self.running,
+                           timeout=self.watchdog_timeout, error=err_msg)
+
+            self.deferred.errback(failure.Failure(WatchdogTimeoutFailure(err_msg)))
+            self.deferred.cancel()
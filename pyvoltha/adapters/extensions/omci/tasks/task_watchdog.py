@@ -0,0 +1,125 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+import structlog
+from twisted.internet import reactor
+from twisted.internet.task import LoopingCall
+
+
+class TaskWatchdog(object):
+    """
+    Shared, coarse grained watchdog for OpenOMCI Tasks
+
+    Rather than each task scheduling (and on every strobe, canceling and
+    re-scheduling) its own reactor timer, running tasks register with a
+    watchdog and keep a deadline timestamp.  Strobing a task only moves the
+    deadline forward. A single periodic LoopingCall checks the deadlines of
+    all registered tasks and runs only while tasks are registered.
+
+    Watchdog expiration is detected within 'resolution' seconds of the
+    deadline, which is small compared to the task watchdog timeouts.
+    """
+    DEFAULT_RESOLUTION = 0.5            # Seconds between deadline checks
+
+    _default = None
+
+    def __init__(self, clock=None, resolution=DEFAULT_RESOLUTION):
+        """
+        Class initialization
+
+        :param clock: (IReactorTime) Reactor or clock (tests) to use
+        :param resolution: (float) Seconds between deadline checks
+        """
+        assert resolution > 0, 'Resolution must be greater than zero'
+
+        self.log = structlog.get_logger()
+        self.reactor = clock if clock is not None else reactor
+        self._resolution = resolution
+        self._tasks = dict()            # task -> None (set with O(1) removal)
+        self._checker = None            # LoopingCall while tasks registered
+        self._timeouts = 0
+
+    def __str__(self):
+        return 'TaskWatchdog: Tasks: {}, Timeouts: {}'.format(len(self._tasks),
+                                                              self._timeouts)
+
+    @classmethod
+    def default(cls):
+        """ Process wide watchdog for tasks not associated with an OpenOMCI agent """
+        if cls._default is None:
+            cls._default = TaskWatchdog()
+        return cls._default
+
+    @property
+    def resolution(self):
+        return self._resolution
+
+    @property
+    def tasks(self):
+        """ Number of tasks being watched """
+        return len(self._tasks)
+
+    @property
+    def timeouts(self):
+        """ Number of task watchdog expirations detected """
+        return self._timeouts
+
+    def seconds(self):
+        return self.reactor.seconds()
+
+    def register(self, task):
+        """
+        Start watching a task. The task's 'watchdog_deadline' is checked
+        periodically until it is unregistered
+
+        :param task: (Task) Task to watch
+        """
+        self._tasks[task] = None
+
+        if self._checker is None:
+            self._checker = LoopingCall(self._check_deadlines)
+            self._checker.clock = self.reactor
+            self._checker.start(self._resolution, now=False)
+
+    def unregister(self, task):
+        """
+        Stop watching a task
+
+        :param task: (Task) Task to stop watching
+        """
+        self._tasks.pop(task, None)
+
+        if not self._tasks:
+            self._stop_checker()
+
+    def _stop_checker(self):
+        checker, self._checker = self._checker, None
+        if checker is not None and checker.running:
+            checker.stop()
+
+    def _check_deadlines(self):
+        now = self.reactor.seconds()
+        expired = [task for task in self._tasks
+                   if task.watchdog_deadline is not None and task.watchdog_deadline <= now]
+
+        for task in expired:
+            self._timeouts += 1
+            self.unregister(task)
+            try:
+                task.watchdog_expired()
+
+            except Exception as e:
+                self.log.exception('watchdog-expired', task=task.name, e=e)
@@ -209,10 +209,12 @@ class IAdapter(object):
         raise NotImplementedError()
 
     def suppress_alarm(self, filter):
-        raise NotImplementedError()
+        log.info('suppress-alarm', filter=filter)
+        self.core_proxy.event_filters.add(filter)
 
     def unsuppress_alarm(self, filter):
-        raise NotImplementedError()
+        log.info('unsuppress-alarm', filter=filter)
+        self.core_proxy.event_filters.remove(filter.id)
 
     def _get_handler(self, device):
         if device.id in self.devices_handlers:
@@ -249,14 +249,15 @@ class IAdapterInterface(Interface):
     def suppress_alarm(filter):
         """
         Inform an adapter that all incoming alarms should be suppressed
-        :param filter: A Voltha.AlarmFilter object.
+        :param filter: A Voltha.EventFilter object.
+        :raises ValueError: if the filter is not valid
         :return: (Deferred) Shall be fired to acknowledge the suppression.
         """
 
     def unsuppress_alarm(filter):
         """
         Inform an adapter that all incoming alarms should resume
-        :param filter: A Voltha.AlarmFilter object.
+        :param filter: A Voltha.EventFilter object.
         :return: (Deferred) Shall be fired to acknowledge the unsuppression.
         """
 
@@ -30,7 +30,7 @@ from voltha_protos.inter_container_pb2 import IntType, InterAdapterMessage, StrT
 from voltha_protos.device_pb2 import Device, Port, ImageDownload, SimulateAlarmRequest, PmConfigs
 from voltha_protos.openflow_13_pb2 import FlowChanges, FlowGroups, Flows, \
     FlowGroupChanges, ofp_packet_out
-from voltha_protos.voltha_pb2 import OmciTestRequest
+from voltha_protos.voltha_pb2 import OmciTestRequest, EventFilter
 from pyvoltha.adapters.kafka.kafka_inter_container_library import IKafkaMessagingProxy, \
     get_messaging_proxy, KAFKA_OFFSET_LATEST, KAFKA_OFFSET_EARLIEST, ARG_FROM_TOPIC
 
@@ -347,10 +347,28 @@ class AdapterRequestFacade(object):
         return (True, self.adapter.update_flows_incrementally(d, f, g))
 
     def suppress_alarm(self, filter, **kwargs):
-        return self.adapter.suppress_alarm(filter)
+        f = EventFilter()
+        if filter:
+            filter.Unpack(f)
+        else:
+            return False, Error(code=ErrorCode.INVALID_PARAMETERS,
+                                reason="filter-invalid")
+        try:
+            return (True, self.adapter.suppress_alarm(f))
+
+        except ValueError as e:
+            return False, Error(code=ErrorCode.INVALID_PARAMETERS,
+                                reason=str(e))
 
     def unsuppress_alarm(self, filter, **kwargs):
-        return self.adapter.unsuppress_alarm(filter)
+        f = EventFilter()
+        if filter:
+            filter.Unpack(f)
+        else:
+            return False, Error(code=ErrorCode.INVALID_PARAMETERS,
+                                reason="filter-invalid")
+
+        return (True, self.adapter.unsuppress_alarm(f))
 
     def process_inter_adapter_message(self, msg, **kwargs):
         m = InterAdapterMessage()
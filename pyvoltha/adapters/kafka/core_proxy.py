@@ -24,11 +24,12 @@ from google.protobuf.message import Message
 from twisted.internet.defer import inlineCallbacks, returnValue
 
 from .container_proxy import ContainerProxy
+from .event_filter import EventFilters
 
 from voltha_protos.common_pb2 import ID, ConnectStatus, OperStatus
 from voltha_protos.inter_container_pb2 import StrType, BoolType, IntType, Packet
 from voltha_protos.device_pb2 import Device, Ports, Devices
-from voltha_protos.voltha_pb2 import CoreInstance, EventFilterRuleKey
+from voltha_protos.voltha_pb2 import CoreInstance
 from voltha_protos.events_pb2 import Event
 from voltha_protos.events_pb2 import KpiEvent2, KpiEventType, MetricInformation, MetricMetaData
 import six
@@ -47,6 +48,7 @@ class CoreProxy(ContainerProxy):
         self.core_default_topic = default_core_topic
         self.event_default_topic = default_event_topic
         self.deviceId_to_core_map = dict()
+        self.event_filters = EventFilters()
 
     def update_device_core_reference(self, device_id, core_topic):
         log.debug("update_device_core_reference")
@@ -495,49 +497,20 @@ class CoreProxy(ContainerProxy):
 
     # ~~~~~~~~~~~~~~~~~~~ Handle event submissions ~~~~~~~~~~~~~~~~~~~~~
 
-    def filter_alarm(self, device_id, alarm_event):
-        '''
-        TODO
-        alarm filtering functionality is not implemented
-        in Voltha 1.x
-        '''
-        log.warn('filter_alarm is not implemented')
-        return
-        #alarm_filters = self.root_proxy.get('/alarm_filters')
-
-        rule_values = {
-            'id': alarm_event.id,
-            'type': AlarmEventType.AlarmEventType.Name(alarm_event.type),
-            'category': AlarmEventCategory.AlarmEventCategory.Name(
-                alarm_event.category),
-            'severity': AlarmEventSeverity.AlarmEventSeverity.Name(
-                alarm_event.severity),
-            'resource_id': alarm_event.resource_id,
-            'device_id': device_id
-        }
-
-        for alarm_filter in alarm_filters:
-            if alarm_filter.rules:
-                exclude = True
-                for rule in alarm_filter.rules:
-                    log.debug("compare-alarm-event",
-                                   key=EventFilterRuleKey.EventFilterRuleKey.Name(
-                                       rule.key),
-                                   actual=rule_values[
-                                       EventFilterRuleKey.EventFilterRuleKey.Name(
-                                           rule.key)].lower(),
-                                   expected=rule.value.lower())
-                    exclude = exclude and \
-                              (rule_values[
-                                   EventFilterRuleKey.EventFilterRuleKey.Name(
-                                       rule.key)].lower() == rule.value.lower())
-                    if not exclude:
-                        break
-
-                if exclude:
-                    log.info("filtered-alarm-event", alarm=alarm_event)
-                    return True
-
+    def filter_alarm(self, device_id, event_header, event_body=None):
+        """
+        Check if an event is suppressed by the event filters of this adapter
+
+        :param device_id: (str) Device that raised the event
+        :param event_header: (EventHeader) Event header
+        :param event_body: (message) Device, KPI or config event
+        :return: (bool) True if the event should not be sent
+        """
+        filter_id = self.event_filters.match(device_id, event_header, event_body)
+        if filter_id is not None:
+            log.debug('filtered-event', device_id=device_id, filter_id=filter_id,
+                      event_id=event_header.id)
+            return True
         return False
 
     @inlineCallbacks
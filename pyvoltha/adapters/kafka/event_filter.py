@@ -0,0 +1,204 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Compiled event filters of an adapter
+"""
+from __future__ import absolute_import
+import structlog
+from voltha_protos.voltha_pb2 import EventFilterRuleKey
+from voltha_protos.events_pb2 import EventType, EventCategory, EventSubCategory, \
+    KpiEventType, ConfigEventType
+import six
+
+log = structlog.get_logger()
+
+RuleKey = EventFilterRuleKey
+
+# Rule key -> (enum of the rule value or None for a string, event field getter)
+_RULE_FIELDS = {
+    RuleKey.category: (EventCategory, lambda header, body: header.category),
+    RuleKey.sub_category: (EventSubCategory, lambda header, body: header.sub_category),
+    RuleKey.kpi_event_type: (KpiEventType, lambda header, body: body.type),
+    RuleKey.config_event_type: (ConfigEventType, lambda header, body: body.type),
+    RuleKey.device_event_type: (None, lambda header, body: body.device_event_name.lower()),
+}
+
+# Event types that have the body field used by a rule key
+_RULE_EVENT_TYPES = {
+    RuleKey.kpi_event_type: {EventType.KPI_EVENT, EventType.KPI_EVENT2},
+    RuleKey.config_event_type: {EventType.CONFIG_EVENT},
+    RuleKey.device_event_type: {EventType.DEVICE_EVENT},
+}
+
+
+def _enum_value(enum, name):
+    # Enum values (of the 'Types' enum nested in the message) are matched by name,
+    # regardless of case
+    values = {value.name.lower(): value.number
+              for value in enum.DESCRIPTOR.enum_types[0].values}
+    value = values.get(name.strip().lower())
+    if value is None:
+        raise ValueError('unknown value {!r}, expected one of {}'.format(name, sorted(values)))
+    return value
+
+
+class _CompiledFilter(object):
+    __slots__ = ('id', 'match_all', 'rules')
+
+    def __init__(self, filter_id, match_all, rules):
+        self.id = filter_id
+        self.match_all = match_all
+        self.rules = rules          # ((rule key, event field getter, expected value), ...)
+
+    def matches(self, event_type, header, body):
+        if self.match_all:
+            return True
+
+        for key, getter, expected in self.rules:
+            if key in _RULE_EVENT_TYPES and (body is None or
+                                             event_type not in _RULE_EVENT_TYPES[key]):
+                return False
+
+            if getter(header, body) != expected:
+                return False
+
+        return True
+
+
+class EventFilters(object):
+    """
+    Event filters (suppression rules) of an adapter
+
+    Each enabled EventFilter is compiled once, when it is added: its rule values
+    are converted to the enum values (or lowercase strings) of the event fields
+    they match, and the filter is indexed by its device ID and event type. An
+    event is then only compared with the filters of its device and event type
+    and the filters for all devices and/or all event types.
+
+    A filter matches an event if all its rules match, or if it has a
+    'filter_all' rule. A filter without rules matches nothing.
+    """
+    ANY = ''
+
+    def __init__(self):
+        self._filters = dict()      # ID -> EventFilter
+        self._index = dict()        # (device ID, EventType) -> [_CompiledFilter]
+        self._statistics = {
+            'evaluated': 0,
+            'filtered': 0,
+        }
+
+    def __len__(self):
+        return len(self._filters)
+
+    def __str__(self):
+        return 'EventFilters: filters: {}, filtered: {}'.format(len(self._filters),
+                                                               self._statistics['filtered'])
+
+    @property
+    def statistics(self):
+        """ Filter counters """
+        return dict(self._statistics)
+
+    @property
+    def filters(self):
+        """ Filters currently applied, by ID """
+        return dict(self._filters)
+
+    def add(self, event_filter):
+        """
+        Add (or replace) an event filter. Disabled filters are removed.
+
+        :param event_filter: (EventFilter) Filter to apply
+        :raises ValueError: if an event type or rule value is not valid
+        """
+        if not event_filter.enable:
+            self.remove(event_filter.id)
+            return
+
+        event_type = _enum_value(EventType, event_filter.event_type) \
+            if event_filter.event_type else EventFilters.ANY
+
+        match_all = False
+        rules = list()
+
+        for rule in event_filter.rules:
+            if rule.key == RuleKey.filter_all:
+                match_all = True
+                continue
+
+            enum, getter = _RULE_FIELDS[rule.key]
+            expected = _enum_value(enum, rule.value) if enum is not None \
+                else rule.value.strip().lower()
+            rules.append((rule.key, getter, expected))
+
+        if not match_all and not len(rules):
+            log.info('event-filter-without-rules', filter_id=event_filter.id)
+
+        self.remove(event_filter.id)
+        self._filters[event_filter.id] = event_filter
+
+        compiled = _CompiledFilter(event_filter.id, match_all, tuple(rules))
+        key = (event_filter.device_id or EventFilters.ANY, event_type)
+        self._index.setdefault(key, list()).append(compiled)
+        log.debug('event-filter-added', filter_id=event_filter.id,
+                  device_id=event_filter.device_id, event_type=event_filter.event_type)
+
+    def remove(self, filter_id):
+        """
+        Remove an event filter
+
+        :param filter_id: (str) Filter ID
+        :return: (bool) True if the filter was applied
+        """
+        if self._filters.pop(filter_id, None) is None:
+            return False
+
+        for key, compiled in list(six.iteritems(self._index)):
+            compiled = [f for f in compiled if f.id != filter_id]
+            if len(compiled):
+                self._index[key] = compiled
+            else:
+                del self._index[key]
+
+        log.debug('event-filter-removed', filter_id=filter_id)
+        return True
+
+    def match(self, device_id, event_header, event_body=None):
+        """
+        Find the filter that suppresses an event
+
+        :param device_id: (str) Device that raised the event
+        :param event_header: (EventHeader) Event header
+        :param event_body: (message) Device, KPI or config event
+        :return: (str) ID of the first matching filter, None if not filtered
+        """
+        if not self._index:
+            return None
+
+        self._statistics['evaluated'] += 1
+        event_type = event_header.type
+        index, any_ = self._index, EventFilters.ANY
+
+        for key in ((device_id, event_type), (device_id, any_),
+                    (any_, event_type), (any_, any_)):
+            for compiled in index.get(key, ()):
+                if compiled.matches(event_type, event_header, event_body):
+                    self._statistics['filtered'] += 1
+                    return compiled.id
+
+        return None
@@ -18,7 +18,7 @@
 A simple internal pub/sub event bus with topics and filter-based registration.
 """
 from __future__ import absolute_import
-import re
+from collections import OrderedDict, deque
 
 import structlog
 import six
@@ -37,19 +37,63 @@ class _Subscription(object):
         self.topic = topic
 
 
+class _DeliveryQueue(object):
+    """ Publications queued for delivery on one reactor/clock """
+
+    __slots__ = ('clock', 'pending', 'coalesced', 'drain_call')
+    def __init__(self, clock):
+        self.clock = clock
+        self.pending = deque()      # [topic, msg] entries awaiting delivery
+        self.coalesced = {}         # topic -> pending entry for coalesced topics
+        self.drain_call = None      # DelayedCall of the next batch delivery
+
+
 class EventBus(object):
 
-    def __init__(self):
-        self.subscriptions = {}  # topic -> list of _Subscription objects
+    # Upper bound on the number of distinct topics whose resolved subscriber
+    # tuples are cached. Per-ONU topics are bounded by devices x events, so the
+    # cache is simply dropped and rebuilt should it ever exceed this size.
+    MAX_CACHED_TOPICS = 65536
+
+    # Default maximum backlog of publications waiting for delivery via
+    # publish_later(). Beyond it, new publications are dropped (and counted)
+    # unless they are published as reliable.
+    DEFAULT_MAX_PENDING = 100000
+
+    def __init__(self, clock=None, max_pending=DEFAULT_MAX_PENDING):
+        """
+        :param clock: (IReactorTime) Optional default reactor/clock used for queued
+                      delivery. The twisted reactor is used if not provided
+        :param max_pending: (int) Maximum backlog of publications that are not
+                            reliable
+        """
+        self.subscriptions = {}  # topic -> OrderedDict of _Subscription objects
                                  # topic None holds regexp based topic subs.
         self.subs_topic_map = {} # to aid fast lookup when unsubscribing
+        self._publish_cache = {} # topic -> tuple of explicit + matching regexp
+                                 # subscribers, rebuilt on (un)subscribe
+        # Queued (deferred) delivery
+        self._clock = clock
+        self._max_pending = max_pending
+        self._queues = {}            # clock -> _DeliveryQueue
+        self._backlog = 0            # Publications queued on all clocks
+        self._over_limit = False     # Backlog full warning logged
+
+        # Queued delivery statistics
+        self._queued = 0
+        self._delivered = 0
+        self._coalesced_count = 0
+        self._dropped = 0
+        self._batches = 0
+        self._max_backlog = 0
 
     def list_subscribers(self, topic=None):
         if topic is None:
-            return sum(six.itervalues(self.subscriptions), [])
+            return [sub for subs in six.itervalues(self.subscriptions)
+                    for sub in subs]
         else:
             if topic in self.subscriptions:
-                return self.subscriptions[topic]
+                return list(self.subscriptions[topic])
             else:
                 return []
 
@@ -62,6 +106,30 @@ class EventBus(object):
         else:
             raise AttributeError('topic not a string nor a compiled regex')
 
+    def _invalidate(self, topic_key):
+        if topic_key is None:
+            # A regexp subscription may match any topic
+            self._publish_cache.clear()
+        else:
+            self._publish_cache.pop(topic_key, None)
+
+    def _resolve(self, topic):
+        """
+        Build the (immutable) tuple of subscribers for a topic. Explicit topic
+        subscribers come first followed by the matching regexp subscribers, both
+        in subscription order.
+        """
+        subscribers = tuple(self.subscriptions.get(topic, ()))
+        regex_subs = self.subscriptions.get(None)
+        if regex_subs:
+            subscribers += tuple(s for s in regex_subs if s.topic.match(topic))
+
+        if len(self._publish_cache) >= self.MAX_CACHED_TOPICS:
+            self._publish_cache.clear()
+
+        self._publish_cache[topic] = subscribers
+        return subscribers
+
     def subscribe(self, topic, callback, predicate=None):
         """
         Subscribe to given topic with predicate and register the callback
@@ -72,8 +140,12 @@ class EventBus(object):
         """
         subscription = _Subscription(self, predicate, callback, topic)
         topic_key = self._get_topic_key(topic)
-        self.subscriptions.setdefault(topic_key, []).append(subscription)
+        subs = self.subscriptions.get(topic_key)
+        if subs is None:
+            subs = self.subscriptions[topic_key] = OrderedDict()
+        subs[subscription] = None
         self.subs_topic_map[subscription] = topic_key
+        self._invalidate(topic_key)
         return subscription
 
     def unsubscribe(self, subscription):
@@ -83,10 +155,15 @@ class EventBus(object):
         :return: None
         """
         try:
-           topic_key = self.subs_topic_map[subscription]
-           self.subscriptions[topic_key].remove(subscription)
+            topic_key = self.subs_topic_map.pop(subscription)
+            subs = self.subscriptions[topic_key]
+            del subs[subscription]
+            if not subs:
+                del self.subscriptions[topic_key]
+            self._invalidate(topic_key)
+
         except KeyError:
-           log.error('key not found', key=subscription)
+            log.error('key not found', key=subscription)
 
     def publish(self, topic, msg):
         """
@@ -96,29 +173,135 @@ class EventBus(object):
         :param msg: Arbitrary python data as message
         :return: None
         """
-        from copy import copy
-
-        def passes(msg, predicate):
+        # Subscribers are resolved once per topic and cached as a tuple, so a
+        # callback that (un)subscribes while being called does not affect the
+        # delivery of this message.
+        subscribers = self._publish_cache.get(topic)
+        if subscribers is None:
+            subscribers = self._resolve(topic)
+
+        for candidate in subscribers:
+            predicate = candidate.predicate
+            if predicate is not None:
+                try:
+                    if not predicate(msg):
+                        continue
+                except Exception:
+                    continue  # failed predicate function treated as no match
             try:
-                return predicate(msg)
+                candidate.callback(topic, msg)
             except Exception as e:
-                return False  # failed predicate function treated as no match
+                log.exception('callback-failed', e=repr(e), topic=topic)
 
-        # lookup subscribers with explicit topic subscriptions
-        subscribers = self.subscriptions.get(topic, [])
+    def publish_later(self, topic, msg, coalesce=False, clock=None, reliable=False):
+        """
+        Queue the given message for delivery on a later reactor turn. All
+        messages queued on a clock before its next delivery are published from
+        a single reactor call instead of one zero-delay call per message.
 
-        # add matching regexp topic subscribers
-        subscribers.extend(s for s in self.subscriptions.get(None, [])
-                           if s.topic.match(topic))
+        If coalesce is True and a message for the same topic is already waiting
+        for delivery, it is replaced with this one (keeping its original place
+        in the queue). Only use this for topics whose messages are idempotent
+        state updates where only the latest value matters.
 
-        # iterate over a shallow-copy of subscribers
-        for candidate in copy(subscribers):
-            predicate = candidate.predicate
-            if predicate is None or passes(msg, predicate):
-                try:
-                    candidate.callback(topic, msg)
-                except Exception as e:
-                    log.exception('callback-failed', e=repr(e), topic=topic)
+        Once the backlog reaches 'max_pending', new publications are dropped
+        and counted, unless they are reliable. Reliable publications, such as
+        responses a requester waits for, are always queued but count towards
+        the backlog.
+
+        :param topic: String topic
+        :param msg: Arbitrary python data as message
+        :param coalesce: (bool) Replace an undelivered message on the same topic
+        :param clock: (IReactorTime) Reactor/clock to deliver on, the bus clock
+                      if not provided
+        :param reliable: (bool) Never drop this publication
+        :return: (bool) True if queued or coalesced, False if dropped
+        """
+        clock = clock or self.clock
+        queue = self._queues.get(clock)
+        if queue is None:
+            queue = self._queues[clock] = _DeliveryQueue(clock)
+
+        if coalesce:
+            entry = queue.coalesced.get(topic)
+            if entry is not None:
+                entry[1] = msg
+                self._coalesced_count += 1
+                return True
+
+        if self._backlog >= self._max_pending and not reliable:
+            self._dropped += 1
+            if not self._over_limit:
+                self._over_limit = True
+                log.warn('publication-backlog-full', backlog=self._backlog,
+                         max_pending=self._max_pending, topic=topic)
+            return False
+
+        entry = [topic, msg]
+        queue.pending.append(entry)
+        self._backlog += 1
+        self._queued += 1
+        self._max_backlog = max(self._max_backlog, self._backlog)
+
+        if coalesce:
+            queue.coalesced[topic] = entry
+
+        if queue.drain_call is None:
+            queue.drain_call = clock.callLater(0, self._drain, queue)
+        return True
+
+    def _drain(self, queue):
+        """ Deliver the batch of publications queued on a clock before this reactor turn """
+        queue.drain_call = None
+        self._batches += 1
+        pending, coalesced = queue.pending, queue.coalesced
+
+        # Anything published by the subscribers while draining is delivered in
+        # the next batch
+        for _ in range(len(pending)):
+            topic, msg = entry = pending.popleft()
+            if coalesced.get(topic) is entry:
+                del coalesced[topic]
+
+            self._backlog -= 1
+            self._delivered += 1
+            self.publish(topic, msg)
+
+        if not pending and queue.drain_call is None and \
+                self._queues.get(queue.clock) is queue:
+            del self._queues[queue.clock]
+
+        if self._over_limit and self._backlog < self._max_pending:
+            self._over_limit = False
+
+    @property
+    def clock(self):
+        if self._clock is None:
+            from twisted.internet import reactor
+            self._clock = reactor
+        return self._clock
+
+    @property
+    def backlog(self):
+        """ Number of queued publications awaiting delivery """
+        return self._backlog
+
+    @property
+    def delivery_stats(self):
+        """
+        Statistics for queued (publish_later) delivery
+        :return: (dict) Counters
+        """
+        return {
+            'backlog': self._backlog,
+            'max-backlog': self._max_backlog,
+            'max-pending': self._max_pending,
+            'queued': self._queued,
+            'delivered': self._delivered,
+            'coalesced': self._coalesced_count,
+            'dropped': self._dropped,
+            'batches': self._batches,
+        }
 
 
 
@@ -134,6 +317,9 @@ class EventBusClient(object):
     >>> msg = dict(a=1, b='foo')
     >>> events.publish('a.topic', msg)
 
+    Publish on a later reactor turn, batched with other queued messages:
+    >>> events.publish_later('a.topic', msg)
+
     Subscribe to get all messages on specific topic:
     >>> def got_event(topic, msg):
     >>>     print topic, ':', msg
@@ -152,14 +338,17 @@ class EventBusClient(object):
     >>> events.subscribe('a.topic', lambda _, msg: queue.put(msg))
 
     """
-    def __init__(self, bus=None):
+    def __init__(self, bus=None, clock=None):
         """
         Obtain a client interface for the pub/sub event bus.
         :param bus: An optional specific event bus. Inteded for mainly test
         use. If not provided, the process default bus will be used, which is
         the preferred use (a process shall not need more than one bus).
+        :param clock: (IReactorTime) Optional reactor/clock publish_later()
+        delivers on. The clock of the bus is used if not provided
         """
         self.bus = bus or default_bus
+        self.clock = clock
 
     def publish(self, topic, msg):
         """
@@ -170,6 +359,21 @@ class EventBusClient(object):
         """
         self.bus.publish(topic, msg)
 
+    def publish_later(self, topic, msg, coalesce=False, reliable=False):
+        """
+        Queue given msg for batched delivery to given topic on a later reactor
+        turn.
+        :param topic: String topic
+        :param msg: Arbitrary python data as message
+        :param coalesce: (bool) If True, replace any undelivered message on the
+                         same topic. For idempotent (latest state) topics only
+        :param reliable: (bool) If True, queue the message even if the backlog
+                         is full
+        :return: (bool) False if the message was dropped due to a full backlog
+        """
+        return self.bus.publish_later(topic, msg, coalesce=coalesce, clock=self.clock,
+                                      reliable=reliable)
+
     def subscribe(self, topic, callback, predicate=None):
         """
         Subscribe to given topic with predicate and register the callback
@@ -197,3 +401,11 @@ class EventBusClient(object):
         :return: List of subscriptions
         """
         return self.bus.list_subscribers(topic)
+
+    @property
+    def delivery_stats(self):
+        """
+        Queued delivery statistics of the underlying bus
+        :return: (dict) Counters
+        """
+        return self.bus.delivery_stats
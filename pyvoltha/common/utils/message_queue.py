@@ -14,9 +14,12 @@
 # limitations under the License.
 #
 from __future__ import absolute_import
+from collections import deque
+from itertools import count
 from twisted.internet.defer import Deferred
 from twisted.internet.defer import succeed
-from six.moves import range
+
+_NO_KEY = object()      # Sentinel for 'no key requested' since None is a valid key
 
 
 class MessageQueue(object):
@@ -25,21 +28,56 @@ class MessageQueue(object):
     but which allows selective dequeing based on a predicate function.
     Unlike DeferredQueue, there is no limit on backlog, and there is no queue
     limit.
+
+    Getters without a predicate and messages are kept in deques, so unfiltered
+    get/put are O(1). If a key function is provided, messages are also indexed
+    by key and get(key=...) selectively dequeues in O(1) instead of scanning
+    the backlog with a predicate.
+
+    Waiters are always served in the order they called get().
     """
 
-    def __init__(self):
-        self.waiting = []  # tuples of (d, predicate)
-        self.queue = []  # messages piling up here if no one is waiting
+    # Entry fields for the keyed backlog
+    _MSG = 0
+    _KEY = 1
+    _ALIVE = 2
+
+    def __init__(self, key=None):
+        """
+        :param key: (callable) Optional key function, def key(obj), used to index
+                    queued messages and waiters for O(1) selective dequeue
+        """
+        self._key = key
+        self._seq = count()
+        self.waiting = deque()   # tuples of (seq, d, None) for unfiltered getters
+        self._waiting_predicate = []  # tuples of (seq, d, predicate)
+        self._waiting_keyed = {}      # key -> deque of (seq, d, None)
+        self.queue = deque()     # messages piling up here if no one is waiting
+                                 # (entries of [msg, key, alive] if keyed)
+        self._keyed = {}         # key -> deque of entries shared with self.queue
+        self._size = 0           # live entries in the keyed backlog
+
+    def __len__(self):
+        return self._size if self._key is not None else len(self.queue)
 
     def reset(self):
         """
         Purge all content as well as waiters (by errback-ing their entries).
         :return: None
         """
-        for d, _ in self.waiting:
+        waiters = list(self.waiting) + self._waiting_predicate
+        for keyed in self._waiting_keyed.values():
+            waiters.extend(keyed)
+
+        self.waiting = deque()
+        self._waiting_predicate = []
+        self._waiting_keyed = {}
+        self.queue = deque()
+        self._keyed = {}
+        self._size = 0
+
+        for _, d, _ in sorted(waiters, key=lambda w: w[0]):
             d.errback(Exception('mesage queue reset() was called'))
-        self.waiting = []
-        self.queue = []
 
     def _cancelGet(self, d):
         """
@@ -47,9 +85,53 @@ class MessageQueue(object):
         :param d: The deferred that was been canceled.
         :return: None
         """
-        for i in range(len(self.waiting)):
-            if self.waiting[i][0] is d:
-                self.waiting.pop(i)
+        def remove(waiters):
+            for waiter in waiters:
+                if waiter[1] is d:
+                    waiters.remove(waiter)
+                    return True
+            return False
+
+        if remove(self.waiting) or remove(self._waiting_predicate):
+            return
+
+        for key, waiters in list(self._waiting_keyed.items()):
+            if remove(waiters):
+                if not waiters:
+                    del self._waiting_keyed[key]
+                return
+
+    def _pop_waiter(self, obj, key):
+        """
+        Find and remove the earliest waiter interested in the given object
+        :return: (Deferred) waiter or None
+        """
+        best = self.waiting[0] if self.waiting else None
+        source = self.waiting
+
+        if key is not _NO_KEY:
+            keyed = self._waiting_keyed.get(key)
+            if keyed and (best is None or keyed[0][0] < best[0]):
+                best, source = keyed[0], keyed
+
+        for waiter in self._waiting_predicate:
+            if best is not None and waiter[0] > best[0]:
+                break           # Ordered by seq, no earlier waiter left
+            if waiter[2](obj):
+                best, source = waiter, self._waiting_predicate
+                break
+
+        if best is None:
+            return None
+
+        if source is self._waiting_predicate:
+            source.remove(best)
+        else:
+            source.popleft()
+            if not source and source is not self.waiting:
+                del self._waiting_keyed[key]
+
+        return best[1]
 
     def put(self, obj):
         """
@@ -57,35 +139,102 @@ class MessageQueue(object):
         :param obj: arbitrary object that will be added to the queue
         :return:
         """
+        key = self._key(obj) if self._key is not None else _NO_KEY
 
         # if someone is waiting for this, return right away
-        for i in range(len(self.waiting)):
-            d, predicate = self.waiting[i]
-            if predicate is None or predicate(obj):
-                self.waiting.pop(i)
-                d.callback(obj)
-                return
+        d = self._pop_waiter(obj, key)
+        if d is not None:
+            d.callback(obj)
+            return
 
         # otherwise...
-        self.queue.append(obj)
+        if key is _NO_KEY:
+            self.queue.append(obj)
+        else:
+            entry = [obj, key, True]
+            self.queue.append(entry)
+            self._keyed.setdefault(key, deque()).append(entry)
+            self._size += 1
+
+    def _consume(self, entry):
+        """ Remove an entry from the keyed backlog """
+        entry[MessageQueue._ALIVE] = False
+        self._size -= 1
+
+        # Stale entries are dropped lazily from the front of the deques
+        key = entry[MessageQueue._KEY]
+        keyed = self._keyed[key]
+        while keyed and not keyed[0][MessageQueue._ALIVE]:
+            keyed.popleft()
+        if not keyed:
+            del self._keyed[key]
+
+        while self.queue and not self.queue[0][MessageQueue._ALIVE]:
+            self.queue.popleft()
+
+        # Compact if removals from the middle left too many stale entries
+        if len(self.queue) > 2 * self._size + 64:
+            self.queue = deque(e for e in self.queue if e[MessageQueue._ALIVE])
+            self._keyed = {k: deque(e for e in entries if e[MessageQueue._ALIVE])
+                           for k, entries in self._keyed.items()}
+
+        return entry[MessageQueue._MSG]
+
+    def _get_queued(self, predicate, key):
+        """
+        Retrieve and remove a matching message from the backlog
+        :return: (list) [msg] if found, otherwise None
+        """
+        if self._key is None:
+            if predicate is None:
+                return [self.queue.popleft()] if self.queue else None
+
+            for i, msg in enumerate(self.queue):
+                if predicate(msg):
+                    del self.queue[i]
+                    return [msg]
+            return None
 
-    def get(self, predicate=None):
+        entries = self.queue if key is _NO_KEY else self._keyed.get(key, ())
+        for entry in entries:
+            if entry[MessageQueue._ALIVE] and \
+                    (predicate is None or predicate(entry[MessageQueue._MSG])):
+                return [self._consume(entry)]
+        return None
+
+    def get(self, predicate=None, key=_NO_KEY):
         """
         Attempt to retrieve and remove an object from the queue that
-        matches the optional predicate.
+        matches the optional predicate and/or key.
+        :param predicate: (callable) Optional, def predicate(obj) -> bool
+        :param key: Optional key to match. Only valid if the queue was created
+                    with a key function.
         :return: Deferred which fires with the next object available.
         If predicate was provided, only objects for which
-        predicate(obj) is True will be considered.
+        predicate(obj) is True will be considered. If key was provided, only
+        objects for which key_function(obj) == key are considered.
         """
-        for i in range(len(self.queue)):
-            msg = self.queue[i]
-            if predicate is None or predicate(msg):
-                self.queue.pop(i)
-                return succeed(msg)
+        if key is not _NO_KEY and self._key is None:
+            raise ValueError('get by key requires a keyed MessageQueue')
+
+        found = self._get_queued(predicate, key)
+        if found is not None:
+            return succeed(found[0])
 
         # there were no matching entries if we got here, so we wait
         d = Deferred(canceller=self._cancelGet)
-        self.waiting.append((d, predicate))
-        return d
+        seq = next(self._seq)
+
+        if predicate is not None:
+            if key is not _NO_KEY:
+                key_func, wanted, match = self._key, key, predicate
+                predicate = lambda obj: key_func(obj) == wanted and match(obj)
+            self._waiting_predicate.append((seq, d, predicate))
 
+        elif key is not _NO_KEY:
+            self._waiting_keyed.setdefault(key, deque()).append((seq, d, None))
 
+        else:
+            self.waiting.append((seq, d, None))
+
+        return d
@@ -0,0 +1,66 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main
+from voltha_protos.events_pb2 import EventHeader, EventType, EventCategory, EventSubCategory
+from pyvoltha.adapters.extensions.events.adapter_events import AdapterEvents
+from pyvoltha.adapters.extensions.events.device_events.onu.onu_los_event import OnuLosEvent
+from test.unit.extensions.events.mock.mock_core_proxy import MockCoreProxy
+from six.moves import range
+
+NUM_EVENTS = 20000
+
+
+class AdapterEventsBenchmark(TestCase):
+    def setUp(self):
+        self.core_proxy = MockCoreProxy()
+        self.event_mgr = AdapterEvents(self.core_proxy, 'onu-1', 'logical-1', 'SN1')
+
+    def legacy_header(self, _type, category, sub_category, event, raised_ts):
+        """ Event header built field by field for every event """
+        hdr = EventHeader(id='voltha.{}.{}.{}'.format(self.event_mgr.adapter_name,
+                                                      self.event_mgr.device_id, event),
+                          category=category, sub_category=sub_category,
+                          type=_type, type_version=self.event_mgr.type_version)
+        hdr.raised_ts.FromSeconds(raised_ts)
+        hdr.reported_ts.GetCurrentTime()
+        return hdr
+
+    def test_send_event_rate(self):
+        event_mgr = self.event_mgr
+        body = OnuLosEvent(event_mgr, 1, 0, 'SN1', 100).get_device_event_data(True)
+        args = (EventType.DEVICE_EVENT, EventCategory.COMMUNICATION, EventSubCategory.ONU, 'ONU_LOS')
+
+        start = time()
+        for _ in range(NUM_EVENTS):
+            event_mgr.send_event(self.legacy_header(*args, raised_ts=100), body)
+        legacy = time() - start
+
+        start = time()
+        reported_ts = time()
+        for _ in range(NUM_EVENTS):
+            event_mgr.send_event(event_mgr.get_event_header(*args, raised_ts=100,
+                                                            reported_ts=reported_ts), body)
+        cached = time() - start
+
+        self.assertEqual(len(self.core_proxy.events), 2 * NUM_EVENTS)
+        print('send_event: {:.0f} events/s with per-event headers, {:.0f} with header '
+              'templates'.format(NUM_EVENTS / legacy, NUM_EVENTS / cached))
+
+
+if __name__ == '__main__':
+    main()
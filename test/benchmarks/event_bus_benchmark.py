@@ -0,0 +1,52 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+import re
+from time import time
+from unittest import TestCase, main
+from mock import Mock
+from pyvoltha.common.event_bus import EventBusClient, EventBus
+from six.moves import range
+
+
+class EventBusBenchmark(TestCase):
+    def test_publish_throughput_10k_onu_topics(self):
+        ebc = EventBusClient(EventBus())
+        onus, events = 10000, 3
+        topics = ['omci-rx:onu-{}:{}'.format(onu, event)
+                  for onu in range(onus) for event in range(events)]
+
+        counter = Mock()
+        for topic in topics:
+            ebc.subscribe(topic, counter)
+
+        # A couple of regexp subscribers, typical of debug/monitoring clients
+        wildcard_sub = Mock()
+        ebc.subscribe(re.compile(r'omci-rx:onu-1.*:0'), wildcard_sub)
+
+        passes = 5
+        start = time()
+        for _ in range(passes):
+            for topic in topics:
+                ebc.publish(topic, None)
+        elapsed = time() - start
+
+        self.assertEqual(counter.call_count, passes * len(topics))
+        print('EventBus publish: {} topics, {:.0f} msgs/s'.format(
+            len(topics), (passes * len(topics)) / max(elapsed, 1e-9)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main
+from pyvoltha.adapters.kafka.event_filter import EventFilters
+from test.unit.kafka.event_filter_test import event_filter, device_event, NUM_DEVICES
+from six.moves import range
+
+NUM_EVENTS = 100000
+
+
+class EventFilterBenchmark(TestCase):
+    def test_match(self):
+        filters = EventFilters()
+        for device in range(NUM_DEVICES):
+            filters.add(event_filter('f{}'.format(device), device_id='onu-{}'.format(device),
+                                     event_type='device_event',
+                                     device_event_type='onu_los_raise_event'))
+        filters.add(event_filter('dying-gasp', device_event_type='onu_dying_gasp_raise_event'))
+        events = [device_event(name='ONU_LOB_RAISE_EVENT'), device_event()]
+
+        start = time()
+        for n in range(NUM_EVENTS):
+            filters.match('onu-{}'.format(n % NUM_DEVICES), *events[n % 2])
+        elapsed = time() - start
+
+        print('{} filters, {} events: {:.2f} uS per event'.format(
+            len(filters), NUM_EVENTS, elapsed * 1e6 / NUM_EVENTS))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main
+from twisted.internet.task import Clock
+from pyvoltha.adapters.extensions.events.adapter_events import AdapterEvents
+from pyvoltha.adapters.extensions.events.kpi.kpi_aggregator import KpiEventAggregator
+from test.unit.extensions.events.mock.mock_core_proxy import MockCoreProxy
+from test.unit.extensions.events.kpi.test_kpi_aggregator import metric_slice, NUM_ONUS, \
+    PM_MES_PER_ONU
+from six.moves import range
+
+
+class KpiAggregatorBenchmark(TestCase):
+    def setUp(self):
+        self.core_proxy = MockCoreProxy()
+        self.event_mgr = AdapterEvents(self.core_proxy, 'olt-1', 'logical-1', 'OLTSN')
+        self.clock = Clock()
+
+    def aggregator(self, **kwargs):
+        return KpiEventAggregator(self.event_mgr, clock=self.clock, **kwargs)
+
+    def sent(self):
+        events, self.core_proxy.events = self.core_proxy.events, []
+        return len(events), sum(len(event.SerializeToString()) for event in events)
+
+    def test_publication_rate(self):
+        slices = [metric_slice(onu, me) for onu in range(NUM_ONUS)
+                  for me in range(PM_MES_PER_ONU)]
+
+        start = time()
+        for info in slices:
+            self.aggregator(max_delay=0).add([info])
+        single_time = time() - start
+        single_events, single_bytes = self.sent()
+
+        aggregator = self.aggregator()
+
+        start = time()
+        aggregator.add(slices)
+        aggregator.flush()
+        batched_time = time() - start
+        batched_events, batched_bytes = self.sent()
+
+        print('{} PM intervals: {} events in {:.1f} mS ({} bytes) unbatched, '
+              '{} events in {:.1f} mS ({} bytes) batched'.format(
+                len(slices), single_events, single_time * 1000, single_bytes,
+                batched_events, batched_time * 1000, batched_bytes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.omci.me_frame import MEFrame
+from pyvoltha.adapters.extensions.omci.omci_entities import Tcont
+from six.moves import range
+
+
+class MEFrameBenchmark(TestCase):
+    def test_set_frame_rate(self):
+        frames = 10000
+
+        start = time()
+        for alloc_id in range(frames):
+            bytes(MEFrame(Tcont, 0x8000, {'alloc_id': alloc_id, 'policy': alloc_id % 3}).set())
+        elapsed = time() - start
+
+        print('{} Set frames built and encoded in {:.1f} mS ({:.0f} frames/S)'.format(
+            frames, elapsed * 1000, frames / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main
+from pyvoltha.common.utils.message_queue import MessageQueue
+from six.moves import range
+
+
+def result_of(d):
+    results = []
+    d.addBoth(results.append)
+    return results[0]
+
+
+class MessageQueueBenchmark(TestCase):
+    def test_100k_backlog(self):
+        entries = 100000
+        q = MessageQueue(key=lambda msg: msg % 1000)
+
+        start = time()
+        for i in range(entries):
+            q.put(i)
+        # Drain selectively by key, then whatever is left in FIFO order
+        keyed = [result_of(q.get(key=k)) for k in range(1000) for _ in range(50)]
+        rest = [result_of(q.get()) for _ in range(entries - len(keyed))]
+        elapsed = time() - start
+
+        self.assertEqual(len(keyed) + len(rest), entries)
+        print('MessageQueue: {} entries, {:.0f} put+get/s'.format(
+            entries, entries / max(elapsed, 1e-9)))
+
+
+if __name__ == '__main__':
+    main()
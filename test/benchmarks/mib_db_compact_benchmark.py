@@ -0,0 +1,55 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+import gc
+import tracemalloc
+from time import time
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.omci.database.mib_db_dict import MibDbVolatileDict
+from pyvoltha.adapters.extensions.omci.database.mib_db_compact import MibDbCompactDict
+from test.unit.extensions.omci.test_mib_db_compact import MockAgent, onu_template
+from six.moves import range
+
+NUM_ONUS = 10000
+
+
+class MibDbCompactBenchmark(TestCase):
+    def memory_per_onu(self, db_class, onus):
+        db = db_class(MockAgent())
+        db.start()
+
+        gc.collect()
+        tracemalloc.start()
+        start = time()
+        for onu in range(onus):
+            db.load_from_template('onu-{}'.format(onu), onu_template('SN{:06d}'.format(onu)))
+        elapsed = time() - start
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        return used // onus, elapsed
+
+    def test_10k_template_onus(self):
+        volatile_bytes, _ = self.memory_per_onu(MibDbVolatileDict, NUM_ONUS // 20)
+        compact_bytes, elapsed = self.memory_per_onu(MibDbCompactDict, NUM_ONUS)
+
+        print('MIB memory per template ONU: {} bytes volatile, {} bytes compact '
+              '({} ONUs loaded in {:.1f} S)'.format(volatile_bytes, compact_bytes,
+                                                     NUM_ONUS, elapsed))
+
+
+if __name__ == '__main__':
+    main()
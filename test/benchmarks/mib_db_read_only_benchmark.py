@@ -0,0 +1,55 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.omci.omci_entities import PriorityQueueG
+from pyvoltha.adapters.extensions.omci.database.mib_db_dict import MibDbVolatileDict
+from test.unit.extensions.omci.mock.mock_adapter_agent import MockDevice
+from test.unit.extensions.omci.test_mib_db_read_only import MockAgent
+from six.moves import range
+
+_DEVICE_ID = 'br-549'
+NUM_INSTANCES = 200
+
+
+class MibDbReadOnlyBenchmark(TestCase):
+    def setUp(self):
+        self.db = MibDbVolatileDict(MockAgent(MockDevice(_DEVICE_ID)))
+        self.db.start()
+        self.db.add(_DEVICE_ID)
+        self.db.bulk_set(_DEVICE_ID, [(PriorityQueueG.class_id, inst,
+                                       {'maximum_queue_size': inst, 'related_port': 0x80000000 + inst})
+                                      for inst in range(NUM_INSTANCES)])
+
+    def test_snapshot_reads(self):
+        reads = 100
+
+        start = time()
+        for _ in range(reads):
+            self.db.query(_DEVICE_ID)
+        copy_time = time() - start
+
+        start = time()
+        for _ in range(reads):
+            self.db.query(_DEVICE_ID, read_only=True)
+        view_time = time() - start
+
+        print('{} MIB snapshots of {} MEs: {:.1f} mS deep-copied, {:.1f} mS read-only'.format(
+            reads, NUM_INSTANCES, copy_time * 1000, view_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.omci.omci_entities import PriorityQueueG
+from pyvoltha.adapters.extensions.omci.database.mib_diff import attribute_diffs
+from pyvoltha.adapters.extensions.omci.database.mib_db_dict import MibDbVolatileDict
+from test.unit.extensions.omci.mock.mock_adapter_agent import MockDevice
+from test.unit.extensions.omci.test_mib_diff import MockAgent, NUM_INSTANCES
+from six.moves import range
+
+_DEVICE_ID = 'br-549'
+NUM_CHANGED = 10
+
+
+class MibDiffBenchmark(TestCase):
+    def setUp(self):
+        self.agent = MockAgent(MockDevice(_DEVICE_ID))
+        self.olt_db = self.new_db()
+        self.onu_db = self.new_db()
+
+    def new_db(self):
+        db = MibDbVolatileDict(self.agent)
+        db.start()
+        db.add(_DEVICE_ID)
+        db.bulk_set(_DEVICE_ID, [(PriorityQueueG.class_id, inst,
+                                  {'maximum_queue_size': 100,
+                                   'related_port': 0x80000000 + inst,
+                                   'weight': 1})
+                                 for inst in range(NUM_INSTANCES)])
+        return db
+
+    def test_1000_instance_diff(self):
+        for inst in range(0, NUM_INSTANCES, NUM_INSTANCES // NUM_CHANGED):
+            self.onu_db.set(_DEVICE_ID, PriorityQueueG.class_id, inst, {'maximum_queue_size': 50})
+
+        olt, onu = self.olt_db.query(_DEVICE_ID), self.onu_db.query(_DEVICE_ID)
+        runs = 20
+
+        start = time()
+        for _ in range(runs):
+            walked = attribute_diffs(olt, onu)
+        walk_time = time() - start
+
+        start = time()
+        for _ in range(runs):
+            diffs = attribute_diffs(olt, onu, self.olt_db.digests(_DEVICE_ID),
+                                    self.onu_db.digests(_DEVICE_ID))
+        digest_time = time() - start
+
+        self.assertEqual(len(diffs), NUM_CHANGED)
+        self.assertEqual(sorted(diffs), sorted(walked))
+        print('{} diffs of {} instance MIBs with {} changed: {:.1f} mS compared, '
+              '{:.1f} mS with digests'.format(runs, NUM_INSTANCES, NUM_CHANGED,
+                                              walk_time * 1000, digest_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
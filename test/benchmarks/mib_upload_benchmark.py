@@ -0,0 +1,62 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.omci.tasks.mib_resync_task import MibResyncTask
+from test.unit.extensions.omci.mock.mock_adapter_agent import MockDevice
+from test.unit.extensions.omci.test_mib_upload_batch import MockAgent, MockOmciCC, \
+    upload_next_responses
+
+_DEVICE_ID = 'br-549'
+NUM_MES = 500
+
+
+class MibUploadBenchmark(TestCase):
+    def setUp(self):
+        self.device = MockDevice(_DEVICE_ID)
+        self.device.omci_cc = MockOmciCC(upload_next_responses(NUM_MES))
+        self.agent = MockAgent(self.device)
+
+    def upload(self, batch_size):
+        MibResyncTask.upload_batch_size = batch_size
+        task = MibResyncTask(self.agent, _DEVICE_ID)
+        task._db_active.add(_DEVICE_ID)
+
+        start = time()
+        results = []
+        task.upload_mib(NUM_MES).addCallback(results.append)
+        elapsed = time() - start
+
+        task.deferred.addErrback(lambda _: None)     # Never started, cancelled on stop
+        task.stop()
+        self.assertEqual(results, [NUM_MES])
+        return elapsed
+
+    def test_500_me_upload(self):
+        original = MibResyncTask.upload_batch_size
+        try:
+            per_me_time = self.upload(1)
+            batched_time = self.upload(original)
+
+        finally:
+            MibResyncTask.upload_batch_size = original
+
+        print('MIB upload of {} MEs: {:.1f} mS per-ME, {:.1f} mS batched'.format(
+            NUM_MES, per_me_time * 1000, batched_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.omci.omci_entities import \
+    ExtendedVlanTaggingOperationConfigurationData, VlanTaggingOperation
+from pyvoltha.adapters.extensions.omci.tasks.omci_get_request import OmciTableReader
+from test.unit.extensions.omci.test_omci_get_request import get_next_responses
+from six.moves import range
+
+
+class OmciTableReaderBenchmark(TestCase):
+    def test_large_vlan_tagging_table(self):
+        rules = 1000
+        table = b''.join(bytes(VlanTaggingOperation(filter_outer_vid=vid,
+                                                    treatment_inner_vid=vid))
+                         for vid in range(rules))
+        entity_class = ExtendedVlanTaggingOperationConfigurationData
+        attr_index = entity_class.attribute_name_to_index_map[
+            'received_frame_vlan_tagging_operation_table']
+
+        start = time()
+        reader = OmciTableReader(entity_class, 0, attr_index, len(table))
+        for seq_no, data in enumerate(get_next_responses(table)):
+            reader.get_next_frame(seq_no)
+            reader.add(data)
+        rows = list(reader.rows())
+        elapsed = time() - start
+
+        self.assertEqual(len(rows), rules)
+        print('OmciTableReader: {} octet table, {:.0f} rows/s'.format(
+            len(table), rules / max(elapsed, 1e-9)))
+
+
+if __name__ == '__main__':
+    main()
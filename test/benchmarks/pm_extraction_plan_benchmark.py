@@ -0,0 +1,67 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.events.kpi.olt.olt_pm_metrics import OltPmMetrics
+from test.unit.extensions.events.mock.mock_core_proxy import MockCoreProxy
+from test.unit.extensions.events.kpi.test_pm_extraction_plans import MockPonPort, MockGem
+from six.moves import range
+
+NUM_GEMS = 64 * 1024
+
+
+class PmExtractionPlanBenchmark(TestCase):
+    def setUp(self):
+        self.pm = OltPmMetrics(None, MockCoreProxy('openolt'), 'olt-1', 'logical-1', 'SN1',
+                               grouped=True, freq_override=True,
+                               **{'nni-ports': [], 'pon-ports': [MockPonPort()]})
+        self.pm.make_proto()
+        self.names = self.pm.gem_pm_names
+        self.config = self.pm.gem_metrics_config
+
+    def collect(self, gem):
+        return self.pm.collect_group_metrics('GEM', gem, self.names, self.config)
+
+    def test_collection(self):
+        gems = [MockGem(gem_id) for gem_id in range(NUM_GEMS)]
+
+        start = time()
+        for gem in gems:
+            self.pm._extract_metrics(gem, self.names, self.config)
+        unplanned = time() - start
+
+        self.collect(gems[0])
+        plan = self.pm._extraction_plans[('GEM', MockGem)]
+        num_context = len(plan.context)
+
+        start = time()
+        for gem in gems:
+            dict(zip(plan.metrics, plan.getter(gem)[num_context:]))
+        planned = time() - start
+
+        start = time()
+        for gem in gems:
+            self.collect(gem)
+        collection = time() - start
+
+        print('{} GEM ports: extraction {:.0f} mS unplanned, {:.0f} mS planned, '
+              'collection {:.0f} mS'.format(NUM_GEMS, unplanned * 1000, planned * 1000,
+                                            collection * 1000))
+
+
+if __name__ == '__main__':
+    main()
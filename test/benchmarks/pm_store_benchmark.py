@@ -0,0 +1,65 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from __future__ import absolute_import
+from time import time
+from unittest import TestCase, main, skipIf
+import pyvoltha.adapters.extensions.events.kpi.pm_store as pm_store
+from pyvoltha.adapters.extensions.events.kpi.pm_store import PmStore
+from test.unit.extensions.events.kpi.test_pm_store import NUM_ONUS, FEC_COUNTERS
+from six.moves import range
+
+
+class PmStoreBenchmark(TestCase):
+    """ Runs with the Python list backend, see PmStoreNumpyBenchmark for NumPy """
+    numpy = None
+
+    def setUp(self):
+        self._numpy, pm_store.numpy = pm_store.numpy, self.numpy
+        self.store = PmStore()
+
+    def tearDown(self):
+        pm_store.numpy = self._numpy
+
+    def test_threshold_pass_rate(self):
+        table = self.store.add_table('PON', FEC_COUNTERS, widths=dict.fromkeys(FEC_COUNTERS, 32))
+        keys = [('onu-{}'.format(onu), 0) for onu in range(NUM_ONUS)]
+
+        for key in keys:
+            table.update(key, dict.fromkeys(FEC_COUNTERS, 0xfffffff0), 0.0)
+        table.process()
+
+        for onu, key in enumerate(keys):
+            table.update(key, dict.fromkeys(FEC_COUNTERS, onu % 100), 900.0)
+
+        start = time()
+        deltas = table.process()
+        deltas.crossings(dict.fromkeys(FEC_COUNTERS, 100))
+        for counter in FEC_COUNTERS:
+            deltas.rate(counter)
+        elapsed = time() - start
+
+        print('{} ONU x {} counter pass ({}): {:.1f} mS'.format(
+            NUM_ONUS, len(FEC_COUNTERS), 'numpy' if self.store.vectorised else 'python',
+            elapsed * 1000))
+
+
+@skipIf(pm_store.numpy is None, 'NumPy is not installed')
+class PmStoreNumpyBenchmark(PmStoreBenchmark):
+    numpy = pm_store.numpy
+
+
+if __name__ == '__main__':
+    main()
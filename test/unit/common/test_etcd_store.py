@@ -0,0 +1,60 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from unittest import TestCase, main
+from pyvoltha.adapters.common.kvstore import etcd_store
+from pyvoltha.adapters.common.kvstore.etcd_store import EtcdStore
+from six.moves import range
+
+
+class MockTransactions(object):
+    @staticmethod
+    def put(key, value):
+        return 'put', key
+
+    @staticmethod
+    def delete(key):
+        return 'delete', key
+
+
+class MockEtcd(object):
+    transactions = MockTransactions()
+
+    def __init__(self):
+        self.committed = []
+
+    def transaction(self, compare, success, failure):
+        self.committed.append(list(success))
+
+
+class TestEtcdStore(TestCase):
+    def setUp(self):
+        self.etcd = MockEtcd()
+        original, etcd_store.etcd3.client = etcd_store.etcd3.client, lambda **_: self.etcd
+        self.addCleanup(setattr, etcd_store.etcd3, 'client', original)
+        self.store = EtcdStore('localhost', 2379, 'mibs')
+
+    def test_set_many_deletes_last(self):
+        items = [('class-{}'.format(n), b'') for n in range(EtcdStore.MAX_TXN_OPS + 10)]
+        self.store.set_many(items, deletes=['class-stale'])
+
+        self.assertEqual([len(ops) for ops in self.etcd.committed], [EtcdStore.MAX_TXN_OPS, 11])
+        ops = [op for txn in self.etcd.committed for op in txn]
+        self.assertEqual(ops[0], ('put', 'mibs/class-0'))
+        self.assertEqual(ops[-1], ('delete', 'mibs/class-stale'))
+
+
+if __name__ == '__main__':
+    main()
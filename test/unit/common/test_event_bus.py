@@ -19,6 +19,7 @@ import re
 from mock import Mock
 from mock import call
 from twisted.internet.defer import DeferredQueue, inlineCallbacks
+from twisted.internet.task import Clock
 from twisted.trial.unittest import TestCase
 
 from pyvoltha.common.event_bus import EventBusClient, EventBus
@@ -220,3 +221,198 @@ class TestEventBus(TestCase):
         self.assertTrue(ebc1.called)
         self.assertTrue(ebc2.called)
         self.assertTrue(ebc3.called)
+
+    def test_publish_does_not_grow_subscriptions(self):
+
+        ebc = EventBusClient(EventBus())
+
+        topic_sub = Mock()
+        ebc.subscribe('news', topic_sub)
+
+        wildcard_sub = Mock()
+        ebc.subscribe(re.compile(r'.*'), wildcard_sub)
+
+        for _ in range(5):
+            ebc.publish('news', 'msg')
+
+        self.assertEqual(len(ebc.list_subscribers('news')), 1)
+        self.assertEqual(len(ebc.list_subscribers()), 2)
+        self.assertEqual(topic_sub.call_count, 5)
+        self.assertEqual(wildcard_sub.call_count, 5)
+
+    def test_regex_subscription_after_publish(self):
+
+        ebc = EventBusClient(EventBus())
+
+        topic_sub = Mock()
+        ebc.subscribe('news', topic_sub)
+        ebc.publish('news', 1)
+
+        # Subscribing/unsubscribing must invalidate the cached topic resolution
+        prefix_sub = Mock()
+        sub = ebc.subscribe(re.compile(r'ne.*'), prefix_sub)
+        ebc.publish('news', 2)
+
+        ebc.unsubscribe(sub)
+        ebc.publish('news', 3)
+
+        self.assertEqual(topic_sub.call_count, 3)
+        prefix_sub.assert_called_once_with('news', 2)
+
+    def test_unsubscribe_unknown(self):
+
+        ebc = EventBusClient(EventBus())
+        sub = ebc.subscribe('news', Mock())
+        ebc.unsubscribe(sub)
+        ebc.unsubscribe(sub)        # Logged, not raised
+        self.assertEqual(ebc.list_subscribers(), [])
+
+    def test_publish_later_batches_delivery(self):
+
+        clock = Clock()
+        ebc = EventBusClient(EventBus(clock=clock))
+
+        mock = Mock()
+        ebc.subscribe('news', mock)
+
+        for i in range(10):
+            self.assertTrue(ebc.publish_later('news', i))
+
+        # Single reactor call for the whole batch
+        self.assertEqual(len(clock.getDelayedCalls()), 1)
+        mock.assert_not_called()
+
+        clock.advance(0)
+        self.assertEqual(mock.call_count, 10)
+        mock.assert_has_calls([call('news', i) for i in range(10)])
+        self.assertEqual(len(clock.getDelayedCalls()), 0)
+
+        stats = ebc.delivery_stats
+        self.assertEqual(stats['queued'], 10)
+        self.assertEqual(stats['delivered'], 10)
+        self.assertEqual(stats['batches'], 1)
+        self.assertEqual(stats['backlog'], 0)
+
+    def test_publish_later_from_subscriber(self):
+
+        clock = Clock()
+        ebc = EventBusClient(EventBus(clock=clock))
+
+        received = []
+        ebc.subscribe('ping', lambda _, msg: ebc.publish_later('pong', msg))
+        ebc.subscribe('pong', lambda _, msg: received.append(msg))
+
+        ebc.publish_later('ping', 1)
+        clock.advance(0)
+
+        # The 'pong' is delivered in a second batch
+        self.assertEqual(received, [1])
+        self.assertEqual(ebc.delivery_stats['batches'], 2)
+
+    def test_publish_later_coalesce(self):
+
+        clock = Clock()
+        ebc = EventBusClient(EventBus(clock=clock))
+
+        mock = Mock()
+        ebc.subscribe('state', mock)
+        ebc.subscribe('news', mock)
+
+        ebc.publish_later('state', True, coalesce=True)
+        ebc.publish_later('news', 1)
+        ebc.publish_later('state', False, coalesce=True)
+        ebc.publish_later('news', 2)
+
+        clock.advance(0)
+        self.assertEqual(mock.call_args_list,
+                         [call('state', False), call('news', 1), call('news', 2)])
+        self.assertEqual(ebc.delivery_stats['coalesced'], 1)
+
+        # Once delivered, the topic is no longer coalesced
+        ebc.publish_later('state', True, coalesce=True)
+        clock.advance(0)
+        mock.assert_called_with('state', True)
+        self.assertEqual(mock.call_count, 4)
+
+    def test_publish_later_bounded_backlog(self):
+
+        clock = Clock()
+        ebc = EventBusClient(EventBus(clock=clock, max_pending=5))
+
+        mock = Mock()
+        ebc.subscribe('news', mock)
+        ebc.subscribe('state', mock)
+        ebc.subscribe('response', mock)
+
+        # Past the limit, publications are dropped and counted
+        results = [ebc.publish_later('news', i) for i in range(8)]
+        self.assertEqual(results, [True] * 5 + [False] * 3)
+        self.assertFalse(ebc.publish_later('state', True, coalesce=True))
+
+        # Reliable publications are always queued
+        self.assertTrue(ebc.publish_later('response', 1, reliable=True))
+
+        clock.advance(0)
+        self.assertEqual(mock.call_args_list,
+                         [call('news', i) for i in range(5)] + [call('response', 1)])
+
+        stats = ebc.delivery_stats
+        self.assertEqual(stats['dropped'], 4)
+        self.assertEqual(stats['max-backlog'], 6)
+
+        # Queued coalesced topics are still updated at the limit
+        ebc.publish_later('state', True, coalesce=True)
+        results = [ebc.publish_later('news', i) for i in range(5)]
+        self.assertEqual(results, [True] * 4 + [False])
+        self.assertTrue(ebc.publish_later('state', False, coalesce=True))
+
+        clock.advance(0)
+        self.assertEqual(mock.call_args_list[6], call('state', False))
+        self.assertEqual(mock.call_count, 11)
+        self.assertEqual(ebc.delivery_stats['dropped'], 5)
+
+    def test_publish_later_client_clock(self):
+
+        bus_clock, client_clock = Clock(), Clock()
+        bus = EventBus(clock=bus_clock)
+        ebc = EventBusClient(bus, clock=client_clock)
+        other = EventBusClient(bus)
+
+        mock = Mock()
+        ebc.subscribe('news', mock)
+
+        ebc.publish_later('news', 1)
+        other.publish_later('news', 2)
+        self.assertEqual(len(client_clock.getDelayedCalls()), 1)
+        self.assertEqual(len(bus_clock.getDelayedCalls()), 1)
+
+        # Each clock delivers its own publications
+        client_clock.advance(0)
+        mock.assert_called_once_with('news', 1)
+        bus_clock.advance(0)
+        mock.assert_called_with('news', 2)
+        self.assertEqual(ebc.delivery_stats['batches'], 2)
+        self.assertEqual(ebc.delivery_stats['backlog'], 0)
+
+    def test_publish_10k_onu_topics(self):
+        ebc = EventBusClient(EventBus())
+        onus, events = 10000, 3
+        topics = ['omci-rx:onu-{}:{}'.format(onu, event)
+                  for onu in range(onus) for event in range(events)]
+
+        counter = Mock()
+        for topic in topics:
+            ebc.subscribe(topic, counter)
+
+        # A couple of regexp subscribers, typical of debug/monitoring clients
+        wildcard_sub = Mock()
+        ebc.subscribe(re.compile(r'omci-rx:onu-1.*:0'), wildcard_sub)
+
+        passes = 5
+        for _ in range(passes):
+            for topic in topics:
+                ebc.publish(topic, None)
+
+        self.assertEqual(counter.call_count, passes * len(topics))
+        self.assertEqual(wildcard_sub.call_count, passes * 1111)
+        self.assertEqual(len(ebc.list_subscribers()), len(topics) + 1)
@@ -0,0 +1,124 @@
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+from __future__ import absolute_import
+from unittest import TestCase, main
+from twisted.internet.defer import CancelledError
+from pyvoltha.common.utils.message_queue import MessageQueue
+from six.moves import range
+
+
+def result_of(d):
+    if not d.called:
+        return None
+    results = []
+    d.addBoth(results.append)
+    return results[0]
+
+
+class TestMessageQueue(TestCase):
+
+    def test_fifo(self):
+        q = MessageQueue()
+        for i in range(5):
+            q.put(i)
+        self.assertEqual(len(q), 5)
+        self.assertEqual([result_of(q.get()) for _ in range(5)], list(range(5)))
+        self.assertEqual(len(q), 0)
+
+    def test_waiters_served_in_order(self):
+        q = MessageQueue()
+        d1 = q.get(lambda msg: msg > 10)
+        d2 = q.get()
+        d3 = q.get()
+
+        q.put(1)            # d1 does not match, d2 is next in line
+        self.assertIsNone(result_of(d1))
+        self.assertEqual(result_of(d2), 1)
+
+        q.put(42)           # d1 waited longer than d3
+        self.assertEqual(result_of(d1), 42)
+        self.assertIsNone(result_of(d3))
+
+    def test_predicate_get(self):
+        q = MessageQueue()
+        for i in range(10):
+            q.put(i)
+        self.assertEqual(result_of(q.get(lambda msg: msg % 5 == 4)), 4)
+        self.assertEqual(result_of(q.get()), 0)
+        self.assertEqual(len(q), 8)
+
+    def test_cancel(self):
+        q = MessageQueue()
+        d1 = q.get()
+        d2 = q.get()
+        d3 = q.get(lambda msg: True)
+        d1.cancel()
+        d3.cancel()
+        self.assertIsInstance(result_of(d1).value, CancelledError)
+        self.assertIsInstance(result_of(d3).value, CancelledError)
+
+        q.put('a')
+        self.assertEqual(result_of(d2), 'a')
+        self.assertEqual(len(q.waiting), 0)
+
+    def test_reset(self):
+        q = MessageQueue(key=lambda msg: msg[0])
+        d1 = q.get()
+        d2 = q.get(key='x')
+        q.reset()
+        self.assertIsInstance(result_of(d1).value, Exception)
+        self.assertIsInstance(result_of(d2).value, Exception)
+
+    def test_keyed_get(self):
+        q = MessageQueue(key=lambda msg: msg[0])
+        for msg in [('a', 1), ('b', 1), ('a', 2), ('b', 2)]:
+            q.put(msg)
+
+        self.assertEqual(result_of(q.get(key='b')), ('b', 1))
+        self.assertEqual(result_of(q.get()), ('a', 1))
+        self.assertEqual(result_of(q.get(key='b')), ('b', 2))
+        self.assertEqual(result_of(q.get(key='a',
+                                         predicate=lambda msg: msg[1] == 2)),
+                         ('a', 2))
+        self.assertEqual(len(q), 0)
+
+        d = q.get(key='c')
+        q.put(('a', 3))
+        self.assertIsNone(result_of(d))
+        q.put(('c', 1))
+        self.assertEqual(result_of(d), ('c', 1))
+        self.assertEqual(result_of(q.get()), ('a', 3))
+
+    def test_get_by_key_requires_key_function(self):
+        with self.assertRaises(ValueError):
+            MessageQueue().get(key='a')
+
+    def test_100k_backlog(self):
+        entries = 100000
+        q = MessageQueue(key=lambda msg: msg % 1000)
+
+        for i in range(entries):
+            q.put(i)
+        # Drain selectively by key, then whatever is left in FIFO order
+        keyed = [result_of(q.get(key=k)) for k in range(1000) for _ in range(50)]
+        rest = [result_of(q.get()) for _ in range(entries - len(keyed))]
+
+        self.assertEqual(len(keyed), 50000)
+        self.assertEqual(keyed[:2], [0, 1000])
+        self.assertEqual(rest[:2], [50000, 50001])
+        self.assertEqual(len(q), 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from unittest import TestCase, main
+from twisted.internet.task import Clock
+from voltha_protos.events_pb2 import MetricInformation, MetricMetaData
+from voltha_protos.events_pb2 import EventCategory, EventSubCategory
+from voltha_protos.device_pb2 import PmConfigs
+from pyvoltha.adapters.extensions.events.adapter_events import AdapterEvents
+from pyvoltha.adapters.extensions.events.kpi.kpi_aggregator import KpiEventAggregator
+from pyvoltha.adapters.extensions.events.kpi.adapter_pm_metrics import AdapterPmMetrics
+from pyvoltha.adapters.extensions.events.kpi.onu.onu_pm_interval_metrics import OnuPmIntervalMetrics
+from pyvoltha.adapters.extensions.omci.omci_entities import FecPerformanceMonitoringHistoryData
+from ..mock.mock_core_proxy import MockCoreProxy
+from six.moves import range
+
+NUM_ONUS = 2000
+PM_MES_PER_ONU = 4
+
+
+def metric_slice(onu, me):
+    return MetricInformation(metadata=MetricMetaData(title='FEC_History',
+                                                     ts=1234567890.0,
+                                                     device_id='onu-{}'.format(onu),
+                                                     serial_no='SN{:08d}'.format(onu),
+                                                     context={'entity_id': str(me)}),
+                             metrics={'corrected_bytes': onu, 'corrected_code_words': me,
+                                      'uncorrectable_code_words': 0, 'total_code_words': 1000,
+                                      'fec_seconds': 0})
+
+
+class TestKpiEventAggregator(TestCase):
+    def setUp(self):
+        self.core_proxy = MockCoreProxy()
+        self.event_mgr = AdapterEvents(self.core_proxy, 'olt-1', 'logical-1', 'OLTSN')
+        self.clock = Clock()
+
+    def aggregator(self, **kwargs):
+        return KpiEventAggregator(self.event_mgr, clock=self.clock, **kwargs)
+
+    def test_delayed_flush(self):
+        aggregator = self.aggregator(max_delay=2.0)
+        aggregator.add([metric_slice(1, 1)])
+        aggregator.add([metric_slice(2, 1), metric_slice(2, 2)])
+
+        self.assertEqual(aggregator.pending, 3)
+        self.assertEqual(len(self.core_proxy.events), 0)
+
+        self.clock.advance(2.0)
+        self.assertEqual(aggregator.pending, 0)
+        self.assertEqual(len(self.core_proxy.events), 1)
+
+        event = self.core_proxy.events[0]
+        self.assertEqual(len(event.kpi_event2.slice_data), 3)
+        self.assertEqual(event.kpi_event2.slice_data[1].metadata.device_id, 'onu-2')
+
+        # Nothing pending, nothing sent
+        self.clock.advance(10)
+        self.assertEqual(len(self.core_proxy.events), 1)
+
+    def test_size_bounds(self):
+        aggregator = self.aggregator(max_slices=10, max_bytes=0)
+        aggregator.add([metric_slice(onu, 1) for onu in range(25)])
+        self.assertEqual(len(self.core_proxy.events), 2)
+        aggregator.flush()
+        self.assertEqual([len(e.kpi_event2.slice_data) for e in self.core_proxy.events],
+                         [10, 10, 5])
+
+        slice_bytes = metric_slice(1, 1).ByteSize()
+        aggregator = self.aggregator(max_bytes=slice_bytes * 4)
+        aggregator.add([metric_slice(onu, 1) for onu in range(10)])
+        aggregator.stop()
+        self.assertEqual([len(e.kpi_event2.slice_data) for e in self.core_proxy.events[3:]],
+                         [4, 4, 2])
+        self.assertEqual(aggregator.statistics['events'], 3)
+        self.assertEqual(aggregator.statistics['slices'], 10)
+
+    def test_no_delay(self):
+        aggregator = self.aggregator(max_delay=0)
+        aggregator.add([metric_slice(1, 1)])
+        self.assertEqual(len(self.core_proxy.events), 1)
+
+    def test_batched_per_event_header(self):
+        aggregator = self.aggregator(max_slices=3)
+        aggregator.add([metric_slice(1, 1)])
+        aggregator.add([metric_slice(1, 2)], EventCategory.EQUIPMENT, EventSubCategory.OLT)
+        aggregator.add([metric_slice(2, 1), metric_slice(2, 2)])
+
+        # Full batches are sent separately for each event header
+        self.assertEqual(len(self.core_proxy.events), 1)
+        self.assertEqual(self.core_proxy.events[0].header.sub_category, EventSubCategory.ONU)
+        self.assertEqual(len(self.core_proxy.events[0].kpi_event2.slice_data), 3)
+        self.assertEqual(aggregator.pending, 1)
+
+        aggregator.add([metric_slice(3, 1)], EventCategory.EQUIPMENT, EventSubCategory.OLT)
+        aggregator.flush()
+        self.assertEqual(len(self.core_proxy.events), 2)
+        event = self.core_proxy.events[1]
+        self.assertEqual(event.header.sub_category, EventSubCategory.OLT)
+        self.assertEqual([info.metadata.device_id for info in event.kpi_event2.slice_data],
+                         ['onu-1', 'onu-3'])
+
+    def test_send_failure(self):
+        self.core_proxy.failure = Exception('kafka-down')
+        aggregator = self.aggregator()
+        aggregator.add([metric_slice(1, 1)])
+        aggregator.flush()
+        self.assertEqual(aggregator.statistics['send-failures'], 1)
+
+    def test_interval_metrics(self):
+        aggregator = self.aggregator()
+        kwargs = {AdapterPmMetrics.KPI_AGGREGATOR_KEY: aggregator}
+        interval_pm = OnuPmIntervalMetrics(self.event_mgr, self.core_proxy, 'onu-1', 'logical-1',
+                                           'SN00000001', **kwargs)
+        interval_pm.make_proto(PmConfigs(id='onu-1', grouped=True))
+
+        for entity_id in range(PM_MES_PER_ONU):
+            interval_pm.publish_metrics({'class_id': FecPerformanceMonitoringHistoryData.class_id,
+                                         'entity_id': entity_id,
+                                         'corrected_bytes': 10})
+
+        self.assertEqual(aggregator.pending, PM_MES_PER_ONU)
+        aggregator.flush()
+        self.assertEqual(len(self.core_proxy.events), 1)
+        self.assertEqual(len(self.core_proxy.events[0].kpi_event2.slice_data), PM_MES_PER_ONU)
+
+    def test_publication_count(self):
+        slices = [metric_slice(onu, me) for onu in range(NUM_ONUS)
+                  for me in range(PM_MES_PER_ONU)]
+
+        for info in slices:
+            self.aggregator(max_delay=0).add([info])
+        single_events = len(self.core_proxy.events)
+
+        self.core_proxy.events = []
+        aggregator = self.aggregator()
+        aggregator.add(slices)
+        aggregator.flush()
+
+        self.assertEqual(single_events, len(slices))
+        self.assertLess(len(self.core_proxy.events) * 10, single_events)
+        self.assertEqual(sum(len(e.kpi_event2.slice_data) for e in self.core_proxy.events),
+                         len(slices))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from unittest import TestCase, main
+from voltha_protos.device_pb2 import PmConfig, PmConfigs, PmGroupConfig
+from pyvoltha.adapters.extensions.events.kpi.adapter_pm_metrics import AdapterPmMetrics
+from pyvoltha.adapters.extensions.events.kpi.olt.olt_pm_metrics import OltPmMetrics
+from ..mock.mock_core_proxy import MockCoreProxy
+from six.moves import range
+
+NUM_GEMS = 4 * 1024
+
+
+class MockPonPort(object):
+    intf_id = 0
+
+
+class MockGem(object):
+    def __init__(self, gem_id):
+        self.intf_id = 0
+        self.onu_id = gem_id // 8
+        self.gem_id = gem_id
+        self.alloc_id = 1024 + self.onu_id
+        self.rx_packets = gem_id
+        self.rx_bytes = gem_id * 64
+        self.tx_packets = gem_id * 2
+        self.tx_bytes = gem_id * 128
+        self.timestamp = 100.0
+
+
+class MockPartialGem(object):
+    """ Only some GEM ports of this class have a rx_bytes counter and a timestamp """
+    def __init__(self, gem_id):
+        self.gem_id = gem_id
+        self.rx_packets = gem_id
+        if gem_id % 2:
+            self.rx_bytes = gem_id * 64
+            self.timestamp = 100.0
+
+
+class TestPmExtractionPlans(TestCase):
+    def setUp(self):
+        self.pm = OltPmMetrics(None, MockCoreProxy('openolt'), 'olt-1', 'logical-1', 'SN1',
+                               grouped=True, freq_override=True,
+                               **{'nni-ports': [], 'pon-ports': [MockPonPort()]})
+        self.pm.make_proto()
+        self.names = self.pm.gem_pm_names
+        self.config = self.pm.gem_metrics_config
+
+    def collect(self, gem):
+        return self.pm.collect_group_metrics('GEM', gem, self.names, self.config)
+
+    def slow_collect(self, gem):
+        return self.pm._extract_metrics(gem, self.names, self.config)
+
+    def test_same_result_as_unplanned(self):
+        gem = MockGem(1234)
+        info = self.collect(gem)
+        context, metrics = self.slow_collect(gem)
+
+        self.assertEqual(dict(info.metadata.context), context)
+        self.assertEqual(dict(info.metrics), metrics)
+        self.assertEqual(info.metadata.ts, 100.0)
+        self.assertEqual(info.metrics['rx_bytes'], 1234 * 64)
+        self.assertEqual(info.metadata.context['gem_id'], '1234')
+
+    def test_partial_objects(self):
+        names = {('gem_id', PmConfig.CONTEXT),
+                 ('rx_packets', PmConfig.COUNTER),
+                 ('rx_bytes', PmConfig.COUNTER)}
+        config = {m: PmConfig(name=m, type=t, enabled=True) for (m, t) in names}
+
+        for first in (1, 2):
+            pm = AdapterPmMetrics(None, MockCoreProxy('openolt'), 'olt-1', 'logical-1', 'SN1')
+            infos = [pm.collect_group_metrics('GEM', MockPartialGem(gem_id), names, config)
+                     for gem_id in (first, first + 1)]
+
+            self.assertEqual(sorted(len(info.metrics) for info in infos), [1, 2])
+
+            # The collection timestamp is looked up on each object
+            timestamps = {info.metadata.context['gem_id']: info.metadata.ts for info in infos}
+            odd = str(first if first % 2 else first + 1)
+            even = str(first + 1 if first % 2 else first)
+            self.assertEqual(timestamps[odd], 100.0)
+            self.assertGreater(timestamps[even], 100.0)
+
+    def test_plan_invalidated_on_update(self):
+        self.assertIn('rx_bytes', self.collect(MockGem(1)).metrics)
+
+        # Metrics disabled through the configuration are no longer extracted
+        self.config['rx_bytes'].enabled = False
+        self.pm.update(PmConfigs(id='olt-1', default_freq=150, grouped=True,
+                                 groups=[PmGroupConfig(group_name='GEM', enabled=True)]))
+
+        metrics = self.collect(MockGem(1)).metrics
+        self.assertNotIn('rx_bytes', metrics)
+        self.assertIn('rx_packets', metrics)
+
+    def test_plan_matches_unplanned(self):
+        gems = [MockGem(gem_id) for gem_id in range(NUM_GEMS)]
+        expected = [self.slow_collect(gem)[1] for gem in gems]
+
+        self.collect(gems[0])
+        plan = self.pm._extraction_plans[('GEM', MockGem)]
+        num_context = len(plan.context)
+
+        planned = [dict(zip(plan.metrics, plan.getter(gem)[num_context:])) for gem in gems]
+        self.assertEqual(planned, expected)
+
+        collected = [dict(self.collect(gem).metrics) for gem in gems]
+        self.assertEqual(collected, expected)
+
+
+if __name__ == '__main__':
+    main()
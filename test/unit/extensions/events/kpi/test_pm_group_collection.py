@@ -0,0 +1,176 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from unittest import TestCase, main
+from twisted.internet.task import Clock
+from voltha_protos.device_pb2 import PmConfigs, PmGroupConfig
+from pyvoltha.adapters.extensions.events.kpi.olt.olt_pm_metrics import OltPmMetrics
+from ..mock.mock_core_proxy import MockCoreProxy
+from six.moves import range
+
+NUM_ONUS = 4
+GEMS_PER_ONU = 2
+
+
+class MockPort(object):
+    def __init__(self, intf_id):
+        self.intf_id = intf_id
+        self.rx_packets = 10
+        self.timestamp = 1.0
+
+
+class MockGem(MockPort):
+    def __init__(self, onu_id, gem_id):
+        super(MockGem, self).__init__(0)
+        self.onu_id = onu_id
+        self.gem_id = gem_id
+        self.multicast = False
+
+
+class MockOnu(MockPort):
+    def __init__(self, onu_id):
+        super(MockOnu, self).__init__(0)
+        self.onu_id = onu_id
+        self.rssi = -20
+        self.gem_ports = [MockGem(onu_id, 1024 + onu_id * GEMS_PER_ONU + gem)
+                          for gem in range(GEMS_PER_ONU)]
+
+
+class MockPonPort(MockPort):
+    def __init__(self, intf_id):
+        super(MockPonPort, self).__init__(intf_id)
+        self.onus = {onu_id: MockOnu(onu_id) for onu_id in range(NUM_ONUS)}
+        self.onu_walks = 0
+
+    @property
+    def onu_ids(self):
+        self.onu_walks += 1
+        return list(self.onus.keys())
+
+    def onu(self, onu_id):
+        return self.onus.get(onu_id)
+
+
+class TestPmGroupCollection(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+
+        self.pon = MockPonPort(0)
+        kwargs = {'nni-ports': [MockPort(65536)], 'pon-ports': [self.pon], 'clock': self.clock}
+        self.pm = OltPmMetrics(None, MockCoreProxy('openolt'), 'olt-1', 'logical-1', 'SN1',
+                               grouped=True, freq_override=True, **kwargs)
+        self.pm.make_proto()
+
+        # Frequencies in 1/10ths of a second
+        self.update_freqs(default=150, Ethernet=50, PON=100, ONU=600, GEM=300)
+
+    def update_freqs(self, default, **freqs):
+        pm_config = PmConfigs(id='olt-1', default_freq=default, grouped=True, freq_override=True)
+        pm_config.groups.extend([PmGroupConfig(group_name=name, group_freq=freq, enabled=True)
+                                 for name, freq in freqs.items()])
+        self.pm.update(pm_config)
+
+    def start(self):
+        collected = []
+
+        def collect():
+            collected.append((self.clock.seconds(), self.pm.due_groups()))
+
+        self.pm.start_collector(callback=collect)
+        self.addCleanup(self.pm.stop_collector)
+        return collected
+
+    def test_collection_scheduled_when_due(self):
+        collected = self.start()
+        self.clock.pump([5.0] * 12)
+
+        self.assertEqual([when for when, _ in collected],
+                         [0.0, 5.0, 10.0, 15.0, 20.0, 25.0, 30.0, 35.0, 40.0, 45.0, 50.0, 55.0, 60.0])
+        self.assertEqual(collected[6][1], {'Ethernet', 'PON', 'GEM'})
+        self.assertEqual(collected[12][1], {'Ethernet', 'PON', 'ONU', 'GEM'})
+
+        # Only one collection is pending at a time, set for the next group due
+        calls = self.clock.getDelayedCalls()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0].getTime(), 65.0)
+
+        self.pm.stop_collector()
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+
+    def test_close_frequencies(self):
+        # Collections are not run at the difference of close frequencies
+        self.update_freqs(default=150, Ethernet=150, PON=152)
+        self.pm.pm_group_metrics['ONU'].enabled = False
+        self.pm.pm_group_metrics['GEM'].enabled = False
+
+        collected = self.start()
+        self.clock.pump([1.0] * 60)
+
+        self.assertEqual(len(collected), 8)
+        self.assertEqual(sum('Ethernet' in groups for _, groups in collected), 5)
+        self.assertEqual(sum('PON' in groups for _, groups in collected), 4)
+
+    def test_without_freq_override(self):
+        # Without frequency overrides, every group is collected on the default frequency
+        pm = OltPmMetrics(None, MockCoreProxy('openolt'), 'olt-2', 'logical-1', 'SN2',
+                          grouped=True, freq_override=False,
+                          **{'nni-ports': [MockPort(65536)], 'pon-ports': [self.pon],
+                             'clock': self.clock})
+        pm.make_proto()
+        self.assertEqual(pm.collection_interval, pm.default_freq / 10)
+        self.assertIsNone(pm.due_groups())
+
+        collected = []
+        pm.start_collector(callback=lambda: collected.append(self.clock.seconds()))
+        self.addCleanup(pm.stop_collector)
+        self.clock.pump([pm.collection_interval] * 3)
+        self.assertEqual(collected, [0.0, 15.0, 30.0, 45.0])
+
+    def test_due_groups(self):
+        due = [self.pm.due_groups(now=tick * 5.0) for tick in range(13)]
+
+        self.assertEqual(due[0], {'Ethernet', 'PON', 'ONU', 'GEM'})
+        self.assertEqual(due[1], {'Ethernet'})
+        self.assertEqual(due[2], {'Ethernet', 'PON'})
+        self.assertEqual(due[6], {'Ethernet', 'PON', 'GEM'})
+        self.assertEqual(due[12], {'Ethernet', 'PON', 'ONU', 'GEM'})
+        self.assertEqual(sum('ONU' in groups for groups in due), 2)
+
+        # A little early (tick jitter) is still due
+        self.pm.due_groups(now=100.0)
+        self.assertIn('PON', self.pm.due_groups(now=109.95))
+
+        # Disabled groups are never due
+        self.pm.pm_group_metrics['GEM'].enabled = False
+        self.assertNotIn('GEM', self.pm.due_groups(now=1000.0))
+
+    def test_only_due_groups_walked(self):
+        data = self.pm.collect_metrics(groups={'Ethernet', 'PON'})
+        self.assertEqual(sorted(info.metadata.title for info in data), ['Ethernet', 'PON'])
+        self.assertEqual(self.pon.onu_walks, 0)
+
+        data = self.pm.collect_metrics(groups={'GEM'})
+        self.assertEqual(len(data), NUM_ONUS * GEMS_PER_ONU)
+        self.assertEqual(set(info.metadata.title for info in data), {'GEM'})
+        self.assertEqual(sorted(int(info.metadata.context['gem_id']) for info in data),
+                         list(range(1024, 1024 + NUM_ONUS * GEMS_PER_ONU)))
+        self.assertEqual(self.pon.onu_walks, 1)
+
+        data = self.pm.collect_metrics()
+        self.assertEqual(len(data), 2 + NUM_ONUS * (1 + GEMS_PER_ONU))
+
+
+if __name__ == '__main__':
+    main()
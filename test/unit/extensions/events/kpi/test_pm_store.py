@@ -0,0 +1,195 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from unittest import TestCase, main, skipIf
+from voltha_protos.device_pb2 import PmConfig, PmConfigs
+import pyvoltha.adapters.extensions.events.kpi.pm_store as pm_store
+from pyvoltha.adapters.extensions.events.kpi.pm_store import PmStore
+from pyvoltha.adapters.extensions.events.kpi.adapter_pm_metrics import AdapterPmMetrics
+from pyvoltha.adapters.extensions.events.kpi.onu.onu_pm_interval_metrics import OnuPmIntervalMetrics
+from pyvoltha.adapters.extensions.omci.omci_entities import FecPerformanceMonitoringHistoryData
+from ..mock.mock_core_proxy import MockCoreProxy
+from six.moves import range
+
+NUM_ONUS = 10000
+FEC_COUNTERS = ['corrected_bytes', 'corrected_code_words', 'uncorrectable_code_words',
+                'total_code_words', 'fec_seconds']
+
+
+class MockAggregator(object):
+    def __init__(self):
+        self.slices = []
+
+    def add(self, slice_data, category=None, sub_category=None, event=None):
+        self.slices.extend(slice_data)
+
+
+class MockGroup(object):
+    """ Collection object of a polled (cumulative) PM group """
+    def __init__(self, port_no, rx_packets, timestamp):
+        self.port_no = port_no
+        self.rx_packets = rx_packets
+        self.timestamp = timestamp
+
+
+class TestPmStore(TestCase):
+    """ Runs with the Python list backend, see TestPmStoreNumpy for NumPy """
+    numpy = None
+
+    def setUp(self):
+        self._numpy, pm_store.numpy = pm_store.numpy, self.numpy
+        self.store = PmStore()
+
+    def tearDown(self):
+        pm_store.numpy = self._numpy
+
+    def test_wraparound_deltas(self):
+        table = self.store.add_table('PON', ['rx_packets', 'tx_packets'],
+                                     widths={'rx_packets': 32})
+        table.update(('olt', 1), {'rx_packets': 0xfffffff0, 'tx_packets': 2 ** 64 - 10}, 100.0)
+        table.update(('olt', 2), {'rx_packets': 10, 'tx_packets': 10}, 100.0)
+
+        # First samples only set the baseline
+        self.assertEqual(len(table.process()), 0)
+        self.assertIsNone(table.process())
+
+        table.update(('olt', 1), {'rx_packets': 0x10, 'tx_packets': 5}, 110.0)
+        table.update(('olt', 2), {'rx_packets': 30}, 120.0)
+        deltas = self.store.process()['PON']
+
+        self.assertEqual(deltas.keys, [('olt', 1), ('olt', 2)])
+        self.assertEqual(list(deltas.delta('rx_packets')), [0x20, 20])
+        self.assertEqual(list(deltas.delta('tx_packets')), [15, 0])
+        self.assertEqual(list(deltas.rate('rx_packets')), [3.2, 1.0])
+        self.assertEqual(dict(deltas.items())[('olt', 2)], {'rx_packets': 20, 'tx_packets': 0})
+
+        self.assertEqual(deltas.crossings({'rx_packets': 25, 'unknown': 1}),
+                         [(('olt', 1), 'rx_packets', 0x20)])
+
+    def test_interval_counters(self):
+        table = self.store.add_table('FEC_History', FEC_COUNTERS, cumulative=False, period=900)
+        table.update(('onu-1', 312, 0), {'corrected_bytes': 100, 'fec_seconds': 3}, 900.0)
+        table.update(('onu-2', 312, 0), {'corrected_bytes': 5}, 900.0)
+
+        deltas = table.process()
+        self.assertEqual(list(deltas.delta('corrected_bytes')), [100, 5])
+        self.assertEqual(list(deltas.delta('fec_seconds')), [3, 0])
+        self.assertEqual(list(deltas.rate('fec_seconds')), [3 / 900.0, 0.0])
+
+        # Counters not reported in the next interval are zero
+        table.update(('onu-1', 312, 0), {'corrected_bytes': 1}, 1800.0)
+        deltas = table.process()
+        expected = dict.fromkeys(FEC_COUNTERS, 0)
+        expected['corrected_bytes'] = 1
+        self.assertEqual(dict(deltas.items()), {('onu-1', 312, 0): expected})
+
+    def test_growth_and_removal(self):
+        table = self.store.add_table('PON', ['rx_packets'])
+        for onu in range(200):
+            table.update(('onu-{}'.format(onu % 100), onu), {'rx_packets': onu}, 0.0)
+        table.process()
+        self.assertEqual(len(table), 200)
+
+        self.store.remove_device('onu-7')
+        self.assertEqual(len(table), 198)
+
+        for onu in range(200):
+            table.update(('onu-{}'.format(onu % 100), onu), {'rx_packets': onu + 10}, 10.0)
+        deltas = table.process()
+
+        # Removed instances start over with a new baseline
+        self.assertEqual(len(deltas), 198)
+        self.assertEqual(set(deltas.delta('rx_packets')), {10})
+        self.assertEqual(len(table), 200)
+
+    def test_pm_managers(self):
+        aggregator = MockAggregator()
+        kwargs = {AdapterPmMetrics.PM_STORE_KEY: self.store,
+                  AdapterPmMetrics.KPI_AGGREGATOR_KEY: aggregator}
+        interval_pm = OnuPmIntervalMetrics(None, MockCoreProxy(), 'onu-1', 'logical-1', 'SN1',
+                                           **kwargs)
+        interval_pm.make_proto(PmConfigs(id='onu-1', grouped=True))
+        interval_pm.publish_metrics({'class_id': FecPerformanceMonitoringHistoryData.class_id,
+                                     'entity_id': 1,
+                                     'corrected_bytes': 10})
+
+        deltas = self.store.process()['FEC_History']
+        self.assertEqual(deltas.keys, [('onu-1', FecPerformanceMonitoringHistoryData.class_id, 1)])
+        self.assertEqual(list(deltas.delta('corrected_bytes')), [10])
+        self.assertEqual(len(aggregator.slices), 1)       # Still published
+
+        # Polled groups are cumulative
+        olt_pm = AdapterPmMetrics(None, MockCoreProxy(), 'olt-1', 'logical-1', 'SN2',
+                                  **{AdapterPmMetrics.PM_STORE_KEY: self.store})
+        names = {('port_no', PmConfig.CONTEXT), ('rx_packets', PmConfig.COUNTER)}
+        config = {m: PmConfig(name=m, type=t, enabled=True) for (m, t) in names}
+
+        olt_pm.collect_group_metrics('PON', MockGroup(1, 100, 10.0), names, config)
+        self.store.process()
+        olt_pm.collect_group_metrics('PON', MockGroup(1, 150, 20.0), names, config)
+
+        deltas = self.store.process()['PON']
+        self.assertEqual(deltas.keys, [('olt-1', ('port_no', '1'))])
+        self.assertEqual(list(deltas.rate('rx_packets')), [5.0])
+
+    def test_counter_widths(self):
+        # OMCI interval counters get the width of their attribute
+        interval_pm = OnuPmIntervalMetrics(None, MockCoreProxy(), 'onu-1', 'logical-1', 'SN1',
+                                           **{AdapterPmMetrics.PM_STORE_KEY: self.store})
+        self.assertEqual(interval_pm.counter_widths['FEC_History']['corrected_bytes'], 32)
+        self.assertEqual(interval_pm.counter_widths['FEC_History']['fec_seconds'], 16)
+        self.assertEqual(interval_pm.counter_widths['Ethernet_Bridge_Port_History']['octets'], 64)
+
+        # Polled 32-bit counters given by the adapter wrap at 32 bits
+        kwargs = {AdapterPmMetrics.PM_STORE_KEY: self.store,
+                  AdapterPmMetrics.COUNTER_WIDTHS_KEY: {'PON': {'rx_packets': 32}}}
+        olt_pm = AdapterPmMetrics(None, MockCoreProxy(), 'olt-1', 'logical-1', 'SN2', **kwargs)
+        names = {('port_no', PmConfig.CONTEXT), ('rx_packets', PmConfig.COUNTER)}
+        config = {m: PmConfig(name=m, type=t, enabled=True) for (m, t) in names}
+
+        olt_pm.collect_group_metrics('PON', MockGroup(1, 0xffffff00, 10.0), names, config)
+        self.store.process()
+        olt_pm.collect_group_metrics('PON', MockGroup(1, 0x100, 20.0), names, config)
+
+        deltas = self.store.process()['PON']
+        self.assertEqual(list(deltas.delta('rx_packets')), [0x200])
+
+    def test_threshold_pass(self):
+        table = self.store.add_table('PON', FEC_COUNTERS, widths=dict.fromkeys(FEC_COUNTERS, 32))
+        keys = [('onu-{}'.format(onu), 0) for onu in range(NUM_ONUS)]
+
+        for key in keys:
+            table.update(key, dict.fromkeys(FEC_COUNTERS, 0xfffffff0), 0.0)
+        table.process()
+
+        for onu, key in enumerate(keys):
+            table.update(key, dict.fromkeys(FEC_COUNTERS, onu % 100), 900.0)
+
+        deltas = table.process()
+        crossed = deltas.crossings(dict.fromkeys(FEC_COUNTERS, 100))
+        rates = [deltas.rate(counter) for counter in FEC_COUNTERS]
+
+        self.assertEqual(len(deltas), NUM_ONUS)
+        self.assertEqual(len(rates), len(FEC_COUNTERS))
+        self.assertEqual(len(crossed), len(FEC_COUNTERS) * NUM_ONUS * 16 // 100)
+
+
+@skipIf(pm_store.numpy is None, 'NumPy is not installed')
+class TestPmStoreNumpy(TestPmStore):
+    numpy = pm_store.numpy
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from unittest import TestCase, main
+from twisted.internet.task import Clock
+from voltha_protos.device_pb2 import PmConfigs
+from pyvoltha.adapters.extensions.events.adapter_events import AdapterEvents
+from pyvoltha.adapters.extensions.events.kpi.adapter_pm_metrics import AdapterPmMetrics
+from pyvoltha.adapters.extensions.events.kpi.tca_engine import TcaEngine, PmThreshold
+from pyvoltha.adapters.extensions.events.kpi.onu.onu_pm_metrics import OnuPmMetrics
+from pyvoltha.adapters.extensions.omci.omci_entities import FecPerformanceMonitoringHistoryData
+from ..mock.mock_core_proxy import MockCoreProxy
+from six.moves import range
+
+NUM_ONUS = 500
+FEC_CLASS_ID = FecPerformanceMonitoringHistoryData.class_id
+
+
+class MockAggregator(object):
+    def __init__(self):
+        self.slices = []
+
+    def add(self, slice_data, category=None, sub_category=None, event=None):
+        self.slices.extend(slice_data)
+
+
+class TestTcaEngine(TestCase):
+    def setUp(self):
+        self.core_proxy = MockCoreProxy()
+        self.aggregator = MockAggregator()
+        self.engine = TcaEngine(kpi_aggregator=self.aggregator)
+        self.pm = dict()
+
+    def interval_pm(self, onu):
+        device_id = 'onu-{}'.format(onu)
+        pm = self.pm.get(device_id)
+        if pm is None:
+            event_mgr = AdapterEvents(self.core_proxy, device_id, 'logical-1', 'SN{}'.format(onu))
+            kwargs = {AdapterPmMetrics.TCA_ENGINE_KEY: self.engine,
+                      AdapterPmMetrics.KPI_AGGREGATOR_KEY: self.aggregator}
+            # Through the ONU PM manager, as device adapters create them
+            onu_pm = OnuPmMetrics(event_mgr, self.core_proxy, device_id, 'logical-1',
+                                  'SN{}'.format(onu), grouped=True, **kwargs)
+            pm = self.pm[device_id] = onu_pm.omci_pm.openomci_interval_pm
+            pm.make_proto(PmConfigs(id=device_id, grouped=True))
+        return pm
+
+    def fec_interval(self, onu, corrected_bytes, entity_id=1):
+        self.interval_pm(onu).publish_metrics({'class_id': FEC_CLASS_ID,
+                                               'entity_id': entity_id,
+                                               'corrected_bytes': corrected_bytes,
+                                               'fec_seconds': 0})
+
+    def device_events(self):
+        events, self.core_proxy.events = self.core_proxy.events, []
+        return [(event.device_event.resource_id,
+                 event.device_event.description.split(' - ')[-1],
+                 dict(event.device_event.context)) for event in events]
+
+    def test_interval_pm_shares_engine(self):
+        pm = self.interval_pm(1)
+        self.assertIs(pm.tca_engine, self.engine)
+        self.assertIs(pm.pm_store, self.engine.pm_store)
+        self.assertIs(pm.kpi_aggregator, self.aggregator)
+
+        self.assertFalse(pm.kpis_suppressed)
+        self.engine.suppress_kpis = True
+        self.assertTrue(pm.kpis_suppressed)
+
+    def test_absolute_threshold_hysteresis(self):
+        self.engine.add_threshold(PmThreshold('FEC_History', 'corrected_bytes', 100,
+                                              clear_value=50))
+        for value, expected in ((10, []), (120, ['Raised']), (200, []), (80, []),
+                                (40, ['Cleared']), (99, []), (100, ['Raised'])):
+            self.fec_interval(1, value)
+            self.fec_interval(2, 0)
+            self.engine.process()
+
+            events = self.device_events()
+            self.assertEqual([status for (_, status, _) in events], expected, value)
+
+            for device_id, _, context in events:
+                self.assertEqual(device_id, 'onu-1')
+                self.assertEqual(context['pm-group'], 'FEC_History')
+                self.assertEqual(context['pm-counter'], 'corrected_bytes')
+                self.assertEqual(context['value'], str(value))
+                self.assertEqual(context['instance'], '{}:1'.format(FEC_CLASS_ID))
+                self.assertEqual(context['serial-number'], 'SN1')
+
+        self.assertEqual(self.engine.statistics['raised'], 2)
+        self.assertEqual(self.engine.statistics['cleared'], 1)
+        self.assertEqual(len(self.engine.raised), 1)
+
+        self.engine.remove_device('onu-1')
+        self.assertEqual(len(self.engine.raised), 0)
+
+    def test_rate_threshold(self):
+        self.engine.add_threshold(PmThreshold('PON', 'rx_packets', 10.0, rate=True))
+        self.engine.add_device('olt-1', AdapterEvents(self.core_proxy, 'olt-1', 'logical-1', 'OLTSN'),
+                               object_type='olt')
+        table = self.engine.pm_store.add_table('PON', ['rx_packets'])
+
+        for ts, rx_packets in ((0.0, 0), (60.0, 300), (120.0, 1200), (180.0, 1500)):
+            table.update(('olt-1', ('intf_id', '0')), {'rx_packets': rx_packets}, ts)
+            self.engine.process()
+
+        events = self.device_events()
+        self.assertEqual([status for (_, status, _) in events], ['Raised', 'Cleared'])
+        self.assertEqual(events[0][2]['value'], '15.0')
+        self.assertEqual(events[0][2]['intf_id'], '0')
+        self.assertEqual(events[0][2]['threshold-type'], 'rate')
+        self.assertEqual(events[0][0], 'olt-1')
+
+    def test_periodic_evaluation(self):
+        clock = Clock()
+        engine = TcaEngine(clock=clock)
+        engine.add_threshold(PmThreshold('PON', 'rx_packets', 1))
+        engine.start(interval=60)
+        clock.pump([60] * 3)
+        self.assertEqual(engine.statistics['passes'], 3)
+
+        engine.stop()
+        clock.pump([60] * 3)
+        self.assertEqual(engine.statistics['passes'], 3)
+
+    def test_kpi_suppression(self):
+        for onu in range(NUM_ONUS):
+            self.fec_interval(onu, onu)
+        self.engine.process()
+        published = len(self.aggregator.slices)
+        self.assertEqual(published, NUM_ONUS)
+
+        # Steady state: only summaries and the crossings are published
+        self.engine.suppress_kpis = True
+        self.engine.add_threshold(PmThreshold('FEC_History', 'corrected_bytes', NUM_ONUS - 5))
+        self.aggregator.slices = []
+
+        for onu in range(NUM_ONUS):
+            self.fec_interval(onu, onu)
+        self.engine.process()
+
+        self.assertEqual(len(self.device_events()), 5)
+        self.assertEqual(len(self.aggregator.slices), 1)
+
+        summary = self.aggregator.slices[0]
+        self.assertEqual(summary.metadata.title, 'FEC_History_Summary')
+        self.assertEqual(summary.metadata.context['instances'], str(NUM_ONUS))
+        self.assertEqual(summary.metadata.context['raised'], '5')
+        self.assertEqual(summary.metrics['corrected_bytes_max'], NUM_ONUS - 1)
+        self.assertEqual(summary.metrics['corrected_bytes_sum'], sum(range(NUM_ONUS)))
+
+    def test_summary_send_failure(self):
+        event_mgr = AdapterEvents(self.core_proxy, 'olt-1', 'logical-1', 'OLTSN')
+        self.engine = TcaEngine(event_mgr=event_mgr, suppress_kpis=True)
+        for onu in range(2):
+            self.fec_interval(onu, onu)
+        self.engine.process()
+        self.assertEqual(len(self.core_proxy.events), 1)
+
+        self.core_proxy.failure = Exception('kafka-down')
+        for onu in range(2):
+            self.fec_interval(onu, onu)
+        self.engine.process()
+
+        self.assertEqual(len(self.core_proxy.events), 1)
+        self.assertEqual(self.engine.statistics['summaries'], 2)
+        self.assertEqual(self.engine.statistics['send-failures'], 1)
+
+
+if __name__ == '__main__':
+    main()
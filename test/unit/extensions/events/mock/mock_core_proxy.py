@@ -0,0 +1,40 @@
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from twisted.internet.defer import succeed, fail
+from pyvoltha.adapters.kafka.event_filter import EventFilters
+
+
+class MockCoreProxy(object):
+    """
+    Core proxy that records the events submitted to it. Events are filtered
+    with the event filters set on the proxy, and every submission fails with
+    'failure' while it is set.
+    """
+    def __init__(self, listening_topic='openonu'):
+        self.listening_topic = listening_topic
+        self.events = []
+        self.failure = None
+        self.event_filters = EventFilters()
+
+    def filter_alarm(self, device_id, event_header, event_body=None):
+        return self.event_filters.match(device_id, event_header, event_body) is not None
+
+    def submit_event(self, event):
+        if self.failure is not None:
+            return fail(self.failure)
+
+        self.events.append(event)
+        return succeed(None)
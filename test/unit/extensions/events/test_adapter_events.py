@@ -0,0 +1,135 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from unittest import TestCase, main
+from twisted.internet.task import Clock
+from voltha_protos.events_pb2 import EventHeader, EventType, EventCategory, EventSubCategory
+from voltha_protos.voltha_pb2 import EventFilter, EventFilterRule, EventFilterRuleKey
+from pyvoltha.adapters.extensions.events.adapter_events import AdapterEvents
+from pyvoltha.adapters.extensions.events.device_events.onu.onu_los_event import OnuLosEvent
+from .mock.mock_core_proxy import MockCoreProxy
+from six.moves import range
+
+
+class TestAdapterEvents(TestCase):
+    def setUp(self):
+        self.core_proxy = MockCoreProxy()
+        self.clock = Clock()
+
+    def event_mgr(self, **kwargs):
+        return AdapterEvents(self.core_proxy, 'onu-1', 'logical-1', 'SN1',
+                             clock=self.clock, **kwargs)
+
+    def test_unbatched(self):
+        event_mgr = self.event_mgr()
+        OnuLosEvent(event_mgr, 1, 0, 'SN1', 100).send(True)
+
+        self.assertEqual(len(self.core_proxy.events), 1)
+        self.assertEqual(event_mgr.statistics['sent'], 1)
+        self.assertEqual(event_mgr.statistics['batches'], 0)
+
+    def test_batched(self):
+        event_mgr = self.event_mgr(batch_delay=0.5, max_pending=8)
+        results = []
+
+        for onu_id in range(10):
+            d = event_mgr.send_event(*self.los_event(event_mgr, onu_id))
+            d.addCallback(results.append)
+
+        self.assertEqual(len(self.core_proxy.events), 0)
+        self.assertEqual(event_mgr.pending, 8)
+
+        self.clock.advance(0.5)
+        self.assertEqual(len(self.core_proxy.events), 8)
+        self.assertEqual(len(results), 10)       # Dropped events complete at once
+        self.assertEqual(event_mgr.statistics, {'sent': 8, 'batches': 1, 'dropped': 2,
+                                                'filtered': 0, 'send-failures': 0})
+
+        # Flushed on demand
+        event_mgr.send_event(*self.los_event(event_mgr, 1))
+        event_mgr.flush()
+        self.assertEqual(len(self.core_proxy.events), 9)
+        self.clock.advance(0.5)
+        self.assertEqual(event_mgr.statistics['batches'], 2)
+
+    def test_batch_failure(self):
+        event_mgr = self.event_mgr(batch_delay=0.5)
+        self.core_proxy.failure = Exception('kafka down')
+        errors = []
+
+        d = event_mgr.send_event(*self.los_event(event_mgr, 1))
+        d.addErrback(errors.append)
+        self.clock.advance(0.5)
+
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(event_mgr.statistics['send-failures'], 1)
+
+    def test_filtered(self):
+        event_mgr = self.event_mgr(batch_delay=0.5)
+        self.core_proxy.event_filters.add(EventFilter(
+            id='los', enable=True, device_id='onu-1', event_type='device_event',
+            rules=[EventFilterRule(key=EventFilterRuleKey.device_event_type,
+                                   value='onu_los_raise_event')]))
+
+        OnuLosEvent(event_mgr, 1, 0, 'SN1', 100).send(True)
+        self.assertEqual(event_mgr.pending, 0)
+        self.assertEqual(event_mgr.statistics['filtered'], 1)
+
+    def test_event_header(self):
+        event_mgr = self.event_mgr()
+        header = event_mgr.get_event_header(EventType.DEVICE_EVENT, EventCategory.COMMUNICATION,
+                                            EventSubCategory.ONU, 'ONU_LOS', 100,
+                                            reported_ts=200.25)
+        self.assertEqual(header.id, 'voltha.openonu.onu-1.ONU_LOS')
+        self.assertEqual(header.type_version, '0.1')
+        self.assertEqual(header.raised_ts.seconds, 100)
+        self.assertEqual((header.reported_ts.seconds, header.reported_ts.nanos), (200, 250000000))
+
+        # Headers do not share their timestamps
+        other = event_mgr.get_event_header(EventType.DEVICE_EVENT, EventCategory.COMMUNICATION,
+                                           EventSubCategory.ONU, 'ONU_LOS', 101)
+        self.assertEqual(header.raised_ts.seconds, 100)
+        self.assertEqual(other.raised_ts.seconds, 101)
+        self.assertGreater(other.reported_ts.seconds, 200)
+
+    def test_header_template(self):
+        event_mgr = self.event_mgr()
+        args = (EventType.DEVICE_EVENT, EventCategory.COMMUNICATION, EventSubCategory.ONU, 'ONU_LOS')
+
+        # Headers copied from a template are the same as headers built field by field
+        expected = EventHeader(id='voltha.{}.{}.{}'.format(event_mgr.adapter_name,
+                                                           event_mgr.device_id, 'ONU_LOS'),
+                               category=EventCategory.COMMUNICATION,
+                               sub_category=EventSubCategory.ONU,
+                               type=EventType.DEVICE_EVENT,
+                               type_version=event_mgr.type_version)
+        expected.raised_ts.FromSeconds(100)
+        expected.reported_ts.FromSeconds(200)
+        expected.reported_ts.nanos = 500000000
+
+        for _ in range(2):
+            self.assertEqual(event_mgr.get_event_header(*args, raised_ts=100, reported_ts=200.5),
+                             expected)
+
+    @staticmethod
+    def los_event(event_mgr, onu_id):
+        event = OnuLosEvent(event_mgr, onu_id, 0, 'SN1', 100)
+        header = event_mgr.get_event_header(event._type, event._category,
+                                            event._sub_category, event._event, 100)
+        return header, event.get_device_event_data(True)
+
+
+if __name__ == '__main__':
+    main()
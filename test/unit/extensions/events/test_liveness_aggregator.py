@@ -0,0 +1,146 @@
+# Copyright 2020-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import absolute_import
+from unittest import TestCase, main
+from twisted.internet.task import Clock
+from pyvoltha.adapters.extensions.events.adapter_events import AdapterEvents
+from pyvoltha.adapters.extensions.events.liveness_aggregator import LivenessAggregator
+from pyvoltha.adapters.extensions.omci.omci_cc import OMCI_CC, RxEvent, CONNECTED_KEY
+from pyvoltha.common.event_bus import EventBusClient
+from .mock.mock_core_proxy import MockCoreProxy
+from six.moves import range
+
+NUM_ONUS = 2000
+
+
+class TestLivenessAggregator(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.core_proxy = MockCoreProxy()
+        self.adapter_events = AdapterEvents(self.core_proxy, 'openonu', None, None)
+        self.aggregator = LivenessAggregator(event_mgr=self.adapter_events,
+                                             heartbeat_timeout=30, clock=self.clock)
+
+        for onu in range(NUM_ONUS):
+            device_id = 'onu-{}'.format(onu)
+            self.aggregator.add_device(device_id, AdapterEvents(self.core_proxy, device_id,
+                                                                'logical-1', 'SN{}'.format(onu)))
+
+    def tearDown(self):
+        self.aggregator.stop()
+
+    def sent(self):
+        events, self.core_proxy.events = self.core_proxy.events, []
+        return events
+
+    def device_events(self):
+        return [(event.device_event.resource_id, event.device_event.description)
+                for event in self.sent() if event.HasField('device_event')]
+
+    def test_events_only_on_transitions(self):
+        for _ in range(3):
+            for onu in range(NUM_ONUS):
+                self.aggregator.heartbeat('onu-{}'.format(onu))
+        self.assertEqual(self.sent(), [])
+
+        self.aggregator.heartbeat('onu-7', alive=False)
+        self.aggregator.heartbeat('onu-7', alive=False)
+        self.aggregator.connectivity('onu-9', False)
+        self.aggregator.connectivity('onu-9', False)
+
+        self.assertEqual(self.device_events(),
+                         [('onu-7', 'ONU Event - HEARTBEAT - Raised'),
+                          ('onu-9', 'ONU Event - CONNECTIVITY_LOSS - Raised')])
+        self.assertEqual(self.aggregator.down, {'onu-7'})
+        self.assertEqual(self.aggregator.unreachable, {'onu-9'})
+
+        self.aggregator.heartbeat('onu-7')
+        self.aggregator.connectivity('onu-9', True)
+        self.assertEqual(self.device_events(),
+                         [('onu-7', 'ONU Event - HEARTBEAT - Cleared'),
+                          ('onu-9', 'ONU Event - CONNECTIVITY_LOSS - Cleared')])
+        self.assertEqual(self.aggregator.statistics['raised'], 2)
+        self.assertEqual(self.aggregator.statistics['cleared'], 2)
+
+    def test_one_summary_per_interval(self):
+        self.aggregator.start(interval=60)
+        self.aggregator.connectivity('onu-3', False)
+        self.sent()
+
+        # Every device but onu-5 keeps sending heartbeats
+        for _ in range(3):
+            for onu in range(NUM_ONUS):
+                if onu != 5:
+                    self.aggregator.heartbeat('onu-{}'.format(onu))
+            self.clock.advance(20)
+
+        events = self.sent()
+        self.assertEqual(len(events), 2)
+
+        heartbeat = events[0].device_event
+        self.assertEqual(heartbeat.resource_id, 'onu-5')
+        self.assertEqual(heartbeat.context['heartbeats-missed'], '2')
+
+        summary = events[1].kpi_event2.slice_data[0]
+        self.assertEqual(summary.metadata.title, LivenessAggregator.SUMMARY_TITLE)
+        self.assertEqual(summary.metadata.context['heartbeat-failed'], 'onu-5')
+        self.assertEqual(summary.metadata.context['unreachable'], 'onu-3')
+        self.assertEqual(summary.metrics['devices'], NUM_ONUS)
+        self.assertEqual(summary.metrics['alive'], NUM_ONUS - 1)
+        self.assertEqual(summary.metrics['raised'], 2)
+
+        # Transitions are counted per summary, the other devices stopped reporting
+        self.clock.advance(60)
+        summary = self.sent()[-1].kpi_event2.slice_data[0]
+        self.assertEqual(summary.metrics['raised'], NUM_ONUS - 1)
+        self.assertEqual(summary.metrics['heartbeat_failed'], NUM_ONUS)
+
+    def test_summary_send_failure(self):
+        self.core_proxy.failure = Exception('kafka-down')
+        self.aggregator.process()
+
+        self.assertEqual(self.sent(), [])
+        self.assertEqual(self.aggregator.statistics['summaries'], 1)
+        self.assertEqual(self.aggregator.statistics['send-failures'], 1)
+
+    def test_listed_devices_capped(self):
+        for onu in range(100):
+            self.aggregator.heartbeat('onu-{}'.format(onu), alive=False)
+
+        summary = self.aggregator.process()
+        listed = summary.metadata.context['heartbeat-failed'].split(',')
+        self.assertEqual(len(listed), LivenessAggregator.MAX_LISTED + 1)
+        self.assertEqual(listed[-1], '...')
+        self.assertEqual(summary.metrics['heartbeat_failed'], 100)
+
+    def test_watch_omci(self):
+        event_bus = EventBusClient()
+        topic = OMCI_CC.event_bus_topic('onu-1', RxEvent.Connectivity)
+        self.aggregator.watch_omci('onu-1', event_bus)
+
+        event_bus.publish(topic, {CONNECTED_KEY: False})
+        self.assertEqual(self.aggregator.unreachable, {'onu-1'})
+        event_bus.publish(topic, {CONNECTED_KEY: True})
+        self.assertEqual(self.aggregator.unreachable, set())
+        self.assertEqual(len(self.device_events()), 2)
+
+        self.aggregator.remove_device('onu-1')
+        event_bus.publish(topic, {CONNECTED_KEY: False})
+        self.assertEqual(self.sent(), [])
+        self.assertEqual(len(self.aggregator), NUM_ONUS - 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -17,6 +17,7 @@
 from __future__ import absolute_import
 import structlog
 import six
+from pyvoltha.adapters.extensions.omci.tasks.task_watchdog import TaskWatchdog
 # from twisted.internet.defer import Deferred
 # from voltha.core.config.config_root import ConfigRoot
 # from pyvoltha.protos.voltha_pb2 import VolthaInstance
@@ -72,6 +73,7 @@ class MockAdapterAgent(object):
         self.core = MockCore()
         self.deferred = d
         self.timeout_the_message = False
+        self.task_watchdog = TaskWatchdog()
 
     @property
     def send_omci_defer(self):
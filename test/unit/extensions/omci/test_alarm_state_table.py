@@ -0,0 +1,163 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+from unittest import TestCase, main
+from unittest.mock import Mock, patch
+from twisted.internet.task import Clock
+from pyvoltha.adapters.extensions.omci import alarm_state_table
+from pyvoltha.adapters.extensions.omci.alarm_state_table import AlarmStateTable
+from pyvoltha.adapters.extensions.omci.state_machines.alarm_sync import AlarmSynchronizer
+from pyvoltha.adapters.extensions.omci.omci_entities import AniG, OntG
+from six.moves import range
+
+NUM_ONUS = 128
+LOS = (AniG.class_id, 257, 0)
+
+
+class TestAlarmStateTable(TestCase):
+    """
+    Test the per-device alarm event filter
+    """
+    def setUp(self):
+        self.clock = Clock()
+        self.sent = []
+
+    def table(self, **kwargs):
+        return AlarmStateTable('onu-1', lambda *alarm: self.sent.append(alarm),
+                               clock=self.clock, **kwargs)
+
+    def test_sent_without_delay(self):
+        table = self.table()
+        table.update(*LOS, raised=True)
+        self.assertEqual(self.sent, [LOS + (True,)])
+        self.assertTrue(table.is_raised(*LOS))
+
+        # Duplicates are not sent, a clear in the same reactor turn is
+        table.update(*LOS, raised=True)
+        table.update(*LOS, raised=False)
+        table.update(*LOS, raised=False)
+        self.assertEqual(self.sent, [LOS + (True,), LOS + (False,)])
+        self.assertEqual(table.statistics['duplicates'], 2)
+        self.assertEqual(table.statistics['suppressed'], 0)
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+
+        # First transition seen of an alarm raised before this table existed
+        table.update(OntG.class_id, 0, 7, raised=False)
+        self.assertEqual(self.sent[-1], (OntG.class_id, 0, 7, False))
+
+    def test_debounce_and_hold_down(self):
+        table = self.table(raise_delay=2, clear_delay=10)
+
+        # Raise reverted within its debounce delay is never sent
+        table.update(*LOS, raised=True)
+        self.clock.advance(1)
+        table.update(*LOS, raised=False)
+        self.clock.advance(5)
+        self.assertEqual(self.sent, [])
+        self.assertEqual(table.statistics['suppressed'], 1)
+
+        table.update(*LOS, raised=True)
+        self.clock.advance(2)
+        self.assertEqual(self.sent, [LOS + (True,)])
+
+        # Flapping within the hold-down keeps the alarm raised
+        for _ in range(5):
+            table.update(*LOS, raised=False)
+            self.clock.advance(3)
+            table.update(*LOS, raised=True)
+            self.clock.advance(3)
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(table.statistics['suppressed'], 6)
+
+        table.update(*LOS, raised=False)
+        self.assertEqual(table.pending, 1)
+        self.clock.advance(10)
+        self.assertEqual(self.sent[-1], LOS + (False,))
+        self.assertEqual(table.pending, 0)
+
+    def test_rate_limit(self):
+        table = self.table(max_rate=2, burst=4)
+        for entity_id in range(10):
+            table.update(AniG.class_id, entity_id, 0, raised=True)
+        self.clock.advance(0)
+
+        self.assertEqual(len(self.sent), 4)
+        self.assertEqual(table.statistics['rate-limited'], 6)
+
+        # Only the latest state of a rate-limited alarm is sent
+        table.update(AniG.class_id, 9, 0, raised=False)
+        self.clock.pump([0.5] * 6)
+        self.assertEqual([alarm[1] for alarm in self.sent], list(range(9)))
+        self.assertEqual(table.statistics['dropped'], 1)
+        self.assertFalse(table.is_raised(AniG.class_id, 9, 0))
+
+    def test_pon_flapping_storm(self):
+        tables = [self.table(raise_delay=1, clear_delay=5, max_rate=5)
+                  for _ in range(NUM_ONUS)]
+
+        # LOS/LOF flapping 10 times a second for 10 seconds, then LOS stays raised
+        for tick in range(100):
+            for table in tables:
+                for alarm_number in (0, 1):
+                    table.update(AniG.class_id, 257, alarm_number, raised=tick % 2 == 0)
+            self.clock.advance(0.1)
+
+        for table in tables:
+            table.update(AniG.class_id, 257, 0, raised=True)
+        self.clock.pump([1] * 10)
+
+        self.assertEqual(len(self.sent), NUM_ONUS)
+        self.assertTrue(all(alarm == (AniG.class_id, 257, 0, True) for alarm in self.sent))
+
+    def test_remove(self):
+        table = self.table(clear_delay=5)
+        table.update(*LOS, raised=True)
+        self.clock.advance(0)
+        table.update(*LOS, raised=False)
+
+        table.remove(class_id=AniG.class_id)
+        self.clock.advance(5)
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(table.pending, 0)
+
+
+class TestAlarmSynchronizerFilter(TestCase):
+    """
+    Test the alarm event filter of the Alarm Synchronizer
+    """
+    def setUp(self):
+        self.clock = Clock()
+        patcher = patch.object(alarm_state_table, 'reactor', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pending_dropped_on_disable(self):
+        sync = AlarmSynchronizer(Mock(), 'onu-1', {'alarm-resync': Mock()}, Mock(),
+                                 event_filter={'raise-delay': 5})
+        sync.machine.set_state('in_sync')
+        sync._alarm_states.update(*LOS, raised=True)
+        self.assertEqual(len(self.clock.getDelayedCalls()), 1)
+
+        sync.stop()
+        self.assertEqual(sync.state, 'disabled')
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+
+        self.clock.advance(5)
+        self.assertEqual(sync.alarm_statistics['raised'], 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+import random
+from unittest import TestCase, main
+from twisted.internet.defer import CancelledError
+from twisted.internet.task import Clock
+from pyvoltha.adapters.extensions.omci.audit_scheduler import MibAuditScheduler
+from six.moves import range
+
+AUDIT_INTERVAL = 60
+NUM_ONUS = 600
+
+
+class TestMibAuditScheduler(TestCase):
+    """
+    Test the agent-wide MIB audit scheduler
+    """
+    def setUp(self):
+        self.clock = Clock()
+        self.scheduler = MibAuditScheduler(clock=self.clock, resolution=1.0,
+                                           jitter=0.1, max_resyncs_per_pon=2,
+                                           rng=random.Random(42))
+        self.audits = []
+
+    def audit(self, device_id):
+        self.audits.append((self.clock.seconds(), device_id))
+        # Like the MIB synchronizer, schedule the next audit once done
+        self.scheduler.schedule_audit(device_id, AUDIT_INTERVAL, self.audit, device_id)
+
+    def test_audits_spread_over_interval(self):
+        # All ONUs reach in-sync at the same time
+        for onu in range(NUM_ONUS):
+            device_id = 'onu-{}'.format(onu)
+            self.scheduler.schedule_audit(device_id, AUDIT_INTERVAL, self.audit, device_id)
+
+        schedule = self.scheduler.schedule
+        self.assertEqual(len(schedule), NUM_ONUS)
+        self.assertTrue(all(0 < when <= AUDIT_INTERVAL for when, _ in schedule))
+
+        # Evenly spread, 10 audits per one second bucket
+        self.assertEqual(set(self.scheduler.bucket_load().values()), {NUM_ONUS // AUDIT_INTERVAL})
+
+        # Still spread, and each ONU audited once per interval, several intervals later
+        for _ in range(5 * AUDIT_INTERVAL):
+            self.clock.advance(1)
+
+        self.assertTrue(4 * NUM_ONUS < len(self.audits) <= 5 * NUM_ONUS)
+        self.assertLessEqual(max(self.scheduler.bucket_load().values()), 12)
+
+        last = {}
+        for when, device_id in self.audits:
+            if device_id in last:
+                delta = when - last[device_id]
+                self.assertTrue(AUDIT_INTERVAL * 0.9 - 1 <= delta <= AUDIT_INTERVAL * 1.1 + 1)
+            last[device_id] = when
+
+    def test_cancel_audit(self):
+        audit = self.scheduler.schedule_audit('onu-1', AUDIT_INTERVAL, self.audit, 'onu-1')
+        self.assertFalse(audit.called)
+
+        audit.cancel()
+        self.assertEqual(self.scheduler.schedule, [])
+        self.assertEqual(self.scheduler.bucket_load(), {})
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+
+        # Rescheduling replaces the previous audit
+        self.scheduler.schedule_audit('onu-1', AUDIT_INTERVAL, self.audit, 'onu-1')
+        self.scheduler.schedule_audit('onu-1', AUDIT_INTERVAL, self.audit, 'onu-1')
+        self.assertEqual(len(self.scheduler.schedule), 1)
+        self.assertEqual(len(self.clock.getDelayedCalls()), 1)
+
+        self.scheduler.remove_device('onu-1')
+        self.assertEqual(self.scheduler.schedule, [])
+
+    def test_resync_limit_per_pon(self):
+        granted = []
+        pon = ('olt-1', 0)
+
+        def request(device_id, pon_key=pon):
+            d = self.scheduler.acquire_resync(device_id, pon_key)
+            d.addCallback(granted.append)
+            return d
+
+        request('onu-1')
+        request('onu-2')
+        request('onu-3')
+        d4 = request('onu-4')
+        request('onu-5', ('olt-1', 1))      # Other PON is not limited by the first
+        request('onu-6', None)              # Unknown PON is never limited
+
+        self.assertEqual(granted, ['onu-1', 'onu-2', 'onu-5', 'onu-6'])
+        self.assertEqual(self.scheduler.resyncs_running, 3)
+        self.assertEqual(self.scheduler.resyncs_waiting, 2)
+        self.assertEqual(self.scheduler.resyncs_delayed, 2)
+
+        # ONU 4 gives up waiting
+        errors = []
+        d4.addErrback(errors.append)
+        d4.cancel()
+        self.assertIsInstance(errors[0].value, CancelledError)
+        self.assertEqual(self.scheduler.resyncs_waiting, 1)
+
+        self.scheduler.release_resync('onu-1')
+        self.assertEqual(granted[-1], 'onu-3')
+        self.assertEqual(self.scheduler.resyncs_waiting, 0)
+
+        for device_id in ('onu-2', 'onu-3', 'onu-5', 'onu-6'):
+            self.scheduler.release_resync(device_id)
+        self.assertEqual(self.scheduler.resyncs_running, 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+from unittest import TestCase, main
+from twisted.internet.defer import succeed
+from twisted.internet.task import Clock
+from pyvoltha.adapters.extensions.omci.capabilities_cache import OnuCapabilitiesCache
+from pyvoltha.adapters.extensions.omci.tasks.onu_capabilities_task import OnuCapabilitiesTask
+
+IDENTITY = ('ABCD', 'HW-1', 'EQUIP-1', 0xA0, 'V1.0.0')
+ENTITIES = {2, 5, 6, 7, 11, 256, 257, 287}
+MSG_TYPES = {4, 6, 8, 9, 11, 13}
+# Sizes as reported by the ONU, some vendors pad the tables
+TABLE_SIZES = {'me_type_table': 2 * len(ENTITIES) + 4, 'message_type_table': len(MSG_TYPES)}
+
+
+class MockKvStore(object):
+    def __init__(self):
+        self.data = dict()
+
+    def get(self, key):
+        return succeed(self.data.get(key))
+
+    def set(self, key, value):
+        self.data[key] = value
+        return succeed(True)
+
+    def delete(self, key):
+        return succeed(self.data.pop(key, None) is not None)
+
+
+class MockRow(object):
+    def __init__(self, **fields):
+        self.fields = fields
+
+
+class MockGetResults(object):
+    """ Results of the OMCI ME table Get request of an ONU """
+    success_code = 0
+
+    def __init__(self, table_attribute, rows, size):
+        self.attributes = {table_attribute: rows}
+        self.table_sizes = {table_attribute: size}
+
+
+class MockTaskRunner(object):
+    def __init__(self, table_sizes):
+        self.table_sizes = table_sizes
+        self.table_walks = 0
+
+    def queue_task(self, task):
+        table_attribute = task._attributes[0]
+        self.table_walks += 1
+
+        if table_attribute == 'me_type_table':
+            rows = [MockRow(me_type=me_type) for me_type in ENTITIES]
+        else:
+            rows = [MockRow(msg_type=msg_type) for msg_type in MSG_TYPES]
+        return succeed(MockGetResults(table_attribute, rows, self.table_sizes[table_attribute]))
+
+
+class MockOnu(object):
+    """ ONU device with just enough of a MIB to identify its model """
+    def __init__(self, vendor_id=b'ABCD', hardware_version=b'HW-1\x00', equipment_id=b'EQUIP-1\x00\x00',
+                 omcc_version=0xA0, version=b'V1.0.0\x00', task_runner=None):
+        self.mib = {
+            (256, 0, 'vendor_id'): vendor_id,
+            (256, 0, 'version'): hardware_version,
+            (257, 0, 'equipment_id'): equipment_id,
+            (257, 0, 'omcc_version'): omcc_version,
+            (7, 0, 'is_active'): 0,
+            (7, 1, 'is_active'): 1,
+            (7, 1, 'version'): version,
+        }
+        self.task_runner = task_runner
+
+    def query_mib_single_attribute(self, class_id, instance_id, attribute):
+        return self.mib.get((class_id, instance_id, attribute))
+
+
+class MockAgent(object):
+    def __init__(self, cache, device):
+        self.capabilities_cache = cache
+        self._device = device
+
+    def get_device(self, _device_id):
+        return self._device
+
+
+def result_of(d):
+    results = []
+    d.addBoth(results.append)
+    return results[0]
+
+
+class TestOnuCapabilitiesCache(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.kv_store = MockKvStore()
+        self.cache = OnuCapabilitiesCache(kv_store=self.kv_store, max_age=3600, clock=self.clock)
+
+    def test_onu_identity(self):
+        self.assertEqual(OnuCapabilitiesCache.onu_identity(MockOnu()), IDENTITY)
+        self.assertIsNone(OnuCapabilitiesCache.onu_identity(MockOnu(version=None)))
+        self.assertIsNone(OnuCapabilitiesCache.onu_identity(MockOnu(omcc_version=None)))
+
+        # Same vendor and equipment IDs, different hardware or OMCC version
+        self.assertNotEqual(OnuCapabilitiesCache.onu_identity(MockOnu(hardware_version=b'HW-2')),
+                            IDENTITY)
+        self.assertNotEqual(OnuCapabilitiesCache.onu_identity(MockOnu(omcc_version=0xA3)),
+                            IDENTITY)
+
+    def test_get_set_expire(self):
+        self.assertIsNone(self.cache.get(IDENTITY))
+
+        self.cache.set(IDENTITY, ENTITIES, MSG_TYPES, TABLE_SIZES)
+        entry = self.cache.get(IDENTITY)
+        self.assertEqual(entry.managed_entities, frozenset(ENTITIES))
+        self.assertEqual(entry.message_types, frozenset(MSG_TYPES))
+        self.assertEqual(entry.table_sizes, TABLE_SIZES)
+
+        self.clock.advance(3601)
+        self.assertIsNone(self.cache.get(IDENTITY))
+
+        stats = self.cache.statistics
+        self.assertEqual((stats['hits'], stats['misses'], stats['expired']), (1, 2, 1))
+
+    def test_persisted(self):
+        self.cache.set(IDENTITY, ENTITIES, MSG_TYPES, TABLE_SIZES)
+        self.assertEqual(len(self.kv_store.data), 1)
+
+        # New adapter instance, same KV store
+        cache = OnuCapabilitiesCache(kv_store=self.kv_store, clock=self.clock)
+        entry = result_of(cache.lookup(IDENTITY))
+        self.assertEqual(entry.managed_entities, frozenset(ENTITIES))
+        self.assertEqual(entry.table_sizes, TABLE_SIZES)
+
+        cache.invalidate(IDENTITY)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(self.kv_store.data, {})
+
+    def test_kv_path_escaped(self):
+        self.cache.set(IDENTITY, ENTITIES, MSG_TYPES, TABLE_SIZES)
+        self.assertEqual(list(self.kv_store.data), ['ABCD/HW-1/EQUIP-1/160/V1.0.0'])
+
+        # Each identity value is a single path level
+        identities = [('ABCD', 'HW/1', 'EQUIP-1', 0xA0, 'V1.0.0'),
+                      ('ABCD', 'HW', '1/EQUIP-1', 0xA0, 'V1.0.0'),
+                      ('ABCD', '', 'EQUIP-1', 0xA0, 'V1.0.0')]
+        for identity in identities:
+            self.cache.set(identity, ENTITIES, MSG_TYPES, TABLE_SIZES)
+
+        self.assertEqual(len(self.kv_store.data), 4)
+        for path in self.kv_store.data:
+            self.assertEqual(len(path.split('/')), 5)
+            self.assertNotIn('//', path)
+
+
+class TestOnuCapabilitiesTask(TestCase):
+    def setUp(self):
+        self.cache = OnuCapabilitiesCache(clock=Clock())
+        self.size_gets = 0
+        self.onu_table_sizes = dict(TABLE_SIZES)
+        self.task_runner = MockTaskRunner(self.onu_table_sizes)
+
+    @property
+    def table_walks(self):
+        return self.task_runner.table_walks // 2
+
+    def run_task(self):
+        onu = MockOnu(task_runner=self.task_runner)
+        task = OnuCapabilitiesTask(MockAgent(self.cache, onu), 'onu-1')
+
+        def get_table_size(table_attribute):
+            self.size_gets += 1
+            return succeed(self.onu_table_sizes[table_attribute])
+
+        task.get_table_size = get_table_size
+
+        task._running = True
+        task.perform_get_capabilities()
+        results = result_of(task.deferred)
+        task.stop()
+
+        self.assertEqual(results['supported-managed-entities'], frozenset(ENTITIES))
+        self.assertEqual(results['supported-message-types'], frozenset(MSG_TYPES))
+        return task
+
+    def test_table_walk_skipped_on_hit(self):
+        self.assertFalse(self.run_task().from_cache)
+        for _ in range(10):
+            self.assertTrue(self.run_task().from_cache)
+
+        self.assertEqual(self.table_walks, 1)
+        self.assertEqual(self.size_gets, 0)
+
+    def test_validated_hit(self):
+        self.cache._validate = True
+        self.run_task()
+        self.assertEqual(self.cache.get(IDENTITY).table_sizes, TABLE_SIZES)
+        self.assertTrue(self.run_task().from_cache)
+        self.assertEqual(self.table_walks, 1)
+        self.assertEqual(self.size_gets, 2)
+
+        # Same model, but different table sizes. Walk the tables again
+        self.onu_table_sizes['me_type_table'] += 2
+        self.assertFalse(self.run_task().from_cache)
+        self.assertEqual(self.table_walks, 2)
+        self.assertEqual(self.cache.statistics['invalidated'], 1)
+        self.assertTrue(self.run_task().from_cache)
+
+
+if __name__ == '__main__':
+    main()
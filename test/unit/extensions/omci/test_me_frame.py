@@ -19,7 +19,10 @@ from nose.tools import assert_raises
 from pyvoltha.adapters.extensions.omci.me_frame import *
 from pyvoltha.adapters.extensions.omci.omci_me import *
 from pyvoltha.adapters.extensions.omci.omci import *
+from pyvoltha.adapters.extensions.omci.omci_frame import OmciFrame
+import pyvoltha.adapters.extensions.omci.omci_entities as omci_entities
 import codecs
+from six.moves import range
 
 
 def hexify(frame):
@@ -282,7 +285,52 @@ class TestSelectMeFrameGeneration(TestCase):
         self.assertGeneratedFrameEquals(frame, ref)
 
     def test_constraint_errors(self):
-        self.assertTrue(True)  # TODO Also test some attribute constraint failures
+        MEFrame(Tcont, 0x8000, {'policy': 2}).set()
+
+        # Range check, then type check of the field
+        assert_raises(ValueError, MEFrame(Tcont, 0x8000, {'policy': 3}).set)
+        assert_raises(ValueError, MEFrame(Tcont, 0x8000, {'alloc_id': 0x10000}).set)
+        assert_raises(ValueError, MEFrame(Tcont, 0x8000, {'alloc_id': 'abc'}).set)
+        assert_raises(KeyError, MEFrame(Tcont, 0x8000, {'unknown': 1}).set)
+
+        # Validators are built once per attribute
+        self.assertIs(Tcont.attribute_validators['policy'],
+                      Tcont.attributes[Tcont.attribute_name_to_index_map['policy']].validator)
+
+    def test_template_encoding(self):
+        frames = [
+            TcontFrame(0x8000, alloc_id=0x400).set(),
+            MEFrame(Tcont, 0x8000, {'alloc_id', 'policy'}).get(),
+            GalEthernetProfileFrame(1, max_gem_payload_size=48).create(),
+            GalEthernetProfileFrame(1).delete(),
+            MacBridgePortConfigurationDataFrame(0x100, bridge_id_pointer=1, port_num=2,
+                                                tp_type=3, tp_pointer=4).create(),
+        ]
+        for frame in frames:
+            frame.fields['transaction_id'] = 0x1234
+            self.assertIsNotNone(frame.template.encode(frame))
+            self.assertEqual(bytes(frame), OmciFrame.build(frame))
+
+        # Same template for the same ME, message and attributes
+        self.assertIs(TcontFrame(0x8001, alloc_id=0x401).set().template, frames[0].template)
+
+        # Changed frames and ONU specific ME classes are encoded by Scapy
+        frame = TcontFrame(0x8000, alloc_id=0x400).set()
+        frame.fields['message_type'] = OmciGet.message_id
+        self.assertIsNone(frame.template.encode(frame))
+
+        saved_me_map = omci_entities.entity_id_to_class_map
+        try:
+            omci_entities.entity_id_to_class_map = dict(saved_me_map)
+            omci_entities.entity_id_to_class_map[Tcont.class_id] = \
+                type('CustomTcont', (Tcont,), dict())
+            self.assertIsNone(frames[0].template.encode(frames[0]))
+        finally:
+            omci_entities.entity_id_to_class_map = saved_me_map
+
+        # Bad attributes are never cached
+        for _ in range(2):
+            assert_raises(KeyError, MEFrame(Tcont, 0x8000, {'unknown': 1}).set)
 
     def test_mib_upload_next(self):
         # Test for VOL-649 error. SCAPY was only originally coded for a 'get'
@@ -0,0 +1,168 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+import gc
+import json
+import tracemalloc
+from datetime import datetime
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.omci.omci_entities import OntG, PriorityQueueG, \
+    GemPortNetworkCtp, MacBridgePortConfigurationData
+from pyvoltha.adapters.extensions.omci.database.mib_db_api import ATTRIBUTES_KEY, \
+    CREATED_KEY, MODIFIED_KEY, MDS_KEY, LAST_SYNC_KEY, DatabaseStateError
+from pyvoltha.adapters.extensions.omci.database.mib_db_dict import MibDbVolatileDict
+from pyvoltha.adapters.extensions.omci.database.mib_db_compact import MibDbCompactDict
+from .mock.mock_adapter_agent import MockDevice
+from six.moves import range
+
+_DEVICE_ID = 'br-549'
+NUM_ONUS = 10000
+
+
+class MockAgent(object):
+    def __init__(self):
+        self._device = MockDevice(_DEVICE_ID)
+
+    def get_device(self, _device_id):
+        return self._device
+
+
+def onu_template(serial_number):
+    """ A MIB template as returned by MibTemplateDb.get_template_instance() """
+    now = datetime.utcnow()
+    template = {OntG.class_id: {0: {ATTRIBUTES_KEY: {'vendor_id': 'ABCD',
+                                                     'serial_number': serial_number,
+                                                     'version': 'V1.0'}}}}
+
+    template[PriorityQueueG.class_id] = {
+        inst: {ATTRIBUTES_KEY: {'queue_configuration_option': 1, 'maximum_queue_size': 100,
+                                'allocated_queue_size': 100, 'related_port': 0x80000000 + inst}}
+        for inst in range(16)}
+
+    template[GemPortNetworkCtp.class_id] = {
+        inst: {ATTRIBUTES_KEY: {'port_id': 1024 + inst, 'tcont_pointer': 0x8001, 'direction': 3}}
+        for inst in range(8)}
+
+    for class_data in template.values():
+        for inst_data in class_data.values():
+            inst_data[CREATED_KEY] = now
+            inst_data[MODIFIED_KEY] = now
+
+    return template
+
+
+def strip_times(data):
+    """ Query results without timestamps, which differ between databases """
+    if isinstance(data, dict):
+        return {k: strip_times(v) for k, v in data.items()
+                if k not in (CREATED_KEY, MODIFIED_KEY)}
+    return data
+
+
+class TestMibDbCompact(TestCase):
+    def setUp(self):
+        self.agent = MockAgent()
+        self.db = MibDbCompactDict(self.agent)
+        self.db.start()
+
+    def test_same_as_volatile(self):
+        volatile = MibDbVolatileDict(self.agent)
+        volatile.start()
+
+        for db in (volatile, self.db):
+            db.add(_DEVICE_ID)
+            db.set(_DEVICE_ID, OntG.class_id, 0, {'vendor_id': 'ABCD', 'version': 'V1.0\x00\x00'})
+            db.bulk_set(_DEVICE_ID, [(PriorityQueueG.class_id, inst, {'maximum_queue_size': inst})
+                                     for inst in range(4)])
+            db.set(_DEVICE_ID, MacBridgePortConfigurationData.class_id, 1,
+                   {'mac_learning_depth': 3, 'port_mac_address': '00:11:22:33:44:55'})
+            db.delete(_DEVICE_ID, PriorityQueueG.class_id, 2)
+            db.save_mib_data_sync(_DEVICE_ID, 5)
+            db.save_last_sync(_DEVICE_ID, datetime(2020, 1, 2, 3, 4, 5, 6))
+
+        self.assertEqual(strip_times(self.db.query(_DEVICE_ID)),
+                         strip_times(volatile.query(_DEVICE_ID)))
+
+        for args in [(OntG.class_id,), (PriorityQueueG.class_id, 3),
+                     (PriorityQueueG.class_id, 3, 'maximum_queue_size'),
+                     (OntG.class_id, 0, ['version', 'vendor_id']), (0x1234,), (OntG.class_id, 9)]:
+            self.assertEqual(strip_times(self.db.query(_DEVICE_ID, *args)),
+                             strip_times(volatile.query(_DEVICE_ID, *args)))
+
+        self.assertFalse(self.db.set(_DEVICE_ID, OntG.class_id, 0, {'vendor_id': 'ABCD'}))
+        self.assertEqual(self.db.get_last_sync(_DEVICE_ID), datetime(2020, 1, 2, 3, 4, 5, 6))
+        self.assertEqual(self.db.get_mib_data_sync(_DEVICE_ID), 5)
+        self.assertIsInstance(self.db.query(_DEVICE_ID, OntG.class_id, 0)[CREATED_KEY], datetime)
+
+        self.db.on_mib_reset(_DEVICE_ID)
+        self.assertNotIn(OntG.class_id, self.db.query(_DEVICE_ID))
+        self.assertEqual(self.db.query(_DEVICE_ID)[MDS_KEY], 0)
+        self.assertIsNotNone(self.db.query(_DEVICE_ID)[LAST_SYNC_KEY])
+
+        self.db.stop()
+        with self.assertRaises(DatabaseStateError):
+            self.db.query(_DEVICE_ID)
+
+    def test_template_sharing(self):
+        self.db.load_from_template('onu-1', onu_template('SN000001'))
+        self.db.load_from_template('onu-2', onu_template('SN000002'))
+        onu_1, onu_2 = self.db._data['onu-1'], self.db._data['onu-2']
+
+        self.assertIs(onu_1.classes[PriorityQueueG.class_id], onu_2.classes[PriorityQueueG.class_id])
+        self.assertIsNot(onu_1.classes[OntG.class_id], onu_2.classes[OntG.class_id])
+        self.assertEqual(self.db.query('onu-2', OntG.class_id, 0, 'serial_number'),
+                         {'serial_number': 'SN000002'})
+
+        # Modifying one ONU copies the class, the other ONU is not affected
+        self.db.set('onu-1', PriorityQueueG.class_id, 3, {'maximum_queue_size': 50})
+        self.assertIsNot(onu_1.classes[PriorityQueueG.class_id], onu_2.classes[PriorityQueueG.class_id])
+        self.assertEqual(self.db.query('onu-2', PriorityQueueG.class_id, 3, 'maximum_queue_size'),
+                         {'maximum_queue_size': 100})
+
+        instance = self.db.query('onu-1', PriorityQueueG.class_id, 3)
+        self.assertEqual(instance[ATTRIBUTES_KEY]['maximum_queue_size'], 50)
+        self.assertGreaterEqual(instance[MODIFIED_KEY], instance[CREATED_KEY])
+
+        self.db.delete('onu-2', GemPortNetworkCtp.class_id, 0)
+        self.assertEqual(len(self.db.query('onu-1', GemPortNetworkCtp.class_id)) - 1, 8)
+        self.assertEqual(len(self.db.query('onu-2', GemPortNetworkCtp.class_id)) - 1, 7)
+
+        dumped = json.loads(self.db.dump_to_json('onu-1'))
+        self.assertEqual(dumped[str(OntG.class_id)]['0'][ATTRIBUTES_KEY]['serial_number'], 'SN000001')
+
+    def memory_per_onu(self, db_class, onus):
+        db = db_class(self.agent)
+        db.start()
+
+        gc.collect()
+        tracemalloc.start()
+        for onu in range(onus):
+            db.load_from_template('onu-{}'.format(onu), onu_template('SN{:06d}'.format(onu)))
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        return used // onus
+
+    def test_10k_template_onus(self):
+        volatile_bytes = self.memory_per_onu(MibDbVolatileDict, NUM_ONUS // 20)
+        compact_bytes = self.memory_per_onu(MibDbCompactDict, NUM_ONUS)
+
+        self.assertLess(compact_bytes * 5, volatile_bytes)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,7 +15,10 @@
 #
 from __future__ import absolute_import
 from unittest import main, TestCase
+from unittest.mock import patch
+from argparse import Namespace
 
+from pyvoltha.adapters.extensions.omci.database import mib_db_ext
 from pyvoltha.adapters.extensions.omci.database.mib_db_ext import *
 from pyvoltha.adapters.extensions.omci.database.mib_db_api import MODIFIED_KEY, CREATED_KEY,\
     DEVICE_ID_KEY, MDS_KEY, LAST_SYNC_KEY
@@ -376,6 +379,31 @@ class TestOmciMibDbExt(TestCase):
 
         self.assertFalse(any(isinstance(cls, int) for cls in six.iterkeys(dev_data)))
 
+    def test_load_from_template(self):
+        self.db.start()
+        self.db.add(_DEVICE_ID)
+        self.db.set(_DEVICE_ID, OntG.class_id, 0, {'vendor_id': 'WXYZ'})
+        self.db.set(_DEVICE_ID, Ont2G.class_id, 0, {'equipment_id': 'EQUIP'})
+        self.db.save_mib_data_sync(_DEVICE_ID, 10)
+
+        template = {
+            OntG.class_id: {0: {ATTRIBUTES_KEY: {'vendor_id': 'ABCD', 'version': 'V1.0'}}},
+            PriorityQueueG.class_id: {inst: {ATTRIBUTES_KEY: {'maximum_queue_size': inst}}
+                                      for inst in range(1, 9)},
+            'version': 1
+        }
+        self.db.load_from_template(_DEVICE_ID, template)
+
+        dev_data = self.db.query(_DEVICE_ID)
+        self.assertEqual(dev_data[MDS_KEY], 0)
+        self.assertEqual(dev_data[OntG.class_id][0][ATTRIBUTES_KEY],
+                         {'vendor_id': 'ABCD', 'version': 'V1.0'})
+        self.assertEqual(len([inst for inst in dev_data[PriorityQueueG.class_id]
+                              if isinstance(inst, int)]), 8)
+        self.assertNotIn(Ont2G.class_id, dev_data)
+
+        assert_raises(KeyError, self.db.load_from_template, 'unknown-device', template)
+
     def test_str_field_serialization(self):
         self.db.start()
         self.db.add(_DEVICE_ID)
@@ -535,5 +563,89 @@ class TestOmciMibDbExt(TestCase):
         self.assertTrue(all(data[k] == attributes[k] for k in attributes.keys()))
 
 
+class MockKvStore(object):
+    def __init__(self, *_args):
+        self.data = dict()
+        self.transactions = 0
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value):
+        self.data[key] = value
+
+    def set_many(self, items, deletes=None):
+        self.transactions += 1
+        for key in deletes or []:
+            self.data.pop(key, None)
+        self.data.update(items)
+
+    def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+
+class MockAgent(object):
+    core_proxy = None
+
+    def __init__(self, device):
+        self._device = device
+
+    def get_device(self, _device_id):
+        return self._device
+
+
+class MockRegistry(object):
+    def get_args(self):
+        return Namespace(etcd='localhost:2379')
+
+
+class TestMibDbExtTemplate(TestCase):
+    """ Template loads against a KV store stub """
+    def setUp(self):
+        for name, value in [('EtcdStore', MockKvStore),
+                            ('registry', lambda _name: MockRegistry())]:
+            patcher = patch.object(mib_db_ext, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.db = MibDbExternal(MockAgent(MockDevice(_DEVICE_ID)))
+        self.db.start()
+        self.db.add(_DEVICE_ID)
+
+    def tearDown(self):
+        self.db.stop()
+
+    def test_template_replaces_database(self):
+        self.db.set(_DEVICE_ID, OntG.class_id, 0, {'vendor_id': 'WXYZ'})
+        self.db.set(_DEVICE_ID, Ont2G.class_id, 0, {'equipment_id': 'EQUIP'})
+        self.db.save_mib_data_sync(_DEVICE_ID, 10)
+        self.db.save_last_sync(_DEVICE_ID, datetime.utcnow())
+
+        template = {
+            OntG.class_id: {0: {ATTRIBUTES_KEY: {'vendor_id': 'ABCD', 'version': 'V1.0'}}},
+            PriorityQueueG.class_id: {inst: {ATTRIBUTES_KEY: {'maximum_queue_size': inst}}
+                                      for inst in range(1, 9)},
+            'version': 1
+        }
+        self.db.load_from_template(_DEVICE_ID, template)
+        self.assertEqual(self.db._kv_store.transactions, 1)
+
+        dev_data = self.db.query(_DEVICE_ID)
+        self.assertEqual(dev_data[MDS_KEY], 0)
+        self.assertIsNone(dev_data[LAST_SYNC_KEY])
+        self.assertEqual(dev_data[OntG.class_id][0][ATTRIBUTES_KEY],
+                         {'vendor_id': 'ABCD', 'version': 'V1.0'})
+        self.assertEqual(sorted(inst for inst in dev_data[PriorityQueueG.class_id]
+                                if isinstance(inst, int)), list(range(1, 9)))
+
+        # Same classes as a volatile database loaded from the template
+        self.assertEqual(sorted(cls for cls in dev_data if isinstance(cls, int)),
+                         sorted([OntG.class_id, PriorityQueueG.class_id]))
+        self.assertIsNone(self.db._kv_store.get(self.db._get_class_path(_DEVICE_ID,
+                                                                        Ont2G.class_id)))
+
+        assert_raises(KeyError, self.db.load_from_template, 'unknown-device', template)
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,215 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+from unittest import TestCase, main
+from twisted.internet.defer import succeed, Deferred
+from pyvoltha.adapters.extensions.omci.omci_entities import PriorityQueueG
+from pyvoltha.adapters.extensions.omci.database.mib_db_api import ATTRIBUTES_KEY, MDS_KEY
+from pyvoltha.adapters.extensions.omci.database.mib_db_dict_lazy import MibDbLazyWriteDict, \
+    LAZY_DEFERRED_KEY
+from .mock.mock_adapter_agent import MockDevice
+from six.moves import range
+
+_DEVICE_ID = 'br-549'
+NUM_INSTANCES = 200
+
+
+class MockKvStore(object):
+    def __init__(self):
+        self.data = dict()
+
+    def get(self, key):
+        return succeed(self.data.get(key))
+
+    def set(self, key, value):
+        self.data[key] = value
+        return succeed(True)
+
+    def delete(self, key):
+        return succeed(self.data.pop(key, None) is not None)
+
+    def delete_prefix(self, prefix):
+        for key in [k for k in self.data if k.startswith(prefix)]:
+            del self.data[key]
+        return succeed(True)
+
+
+class SlowKvStore(MockKvStore):
+    """ Sets only complete when 'complete' is called """
+    def __init__(self):
+        super(SlowKvStore, self).__init__()
+        self.pending = []
+
+    def set(self, key, value):
+        d = Deferred()
+        self.pending.append((d, key, value))
+        return d
+
+    def complete(self):
+        pending, self.pending = self.pending, []
+        for d, key, value in pending:
+            self.data[key] = value
+            d.callback(True)
+
+
+class MockAgent(object):
+    def __init__(self, device):
+        self._device = device
+
+    def get_device(self, _device_id):
+        return self._device
+
+
+class TestMibDbLazyJournal(TestCase):
+    def setUp(self):
+        self.kv_store = MockKvStore()
+        self.agent = MockAgent(MockDevice(_DEVICE_ID))
+        self.databases = []
+
+    def tearDown(self):
+        for db in self.databases:
+            for metadata in db._lazymetadata.values():
+                metadata[LAZY_DEFERRED_KEY].stop()
+
+    def new_db(self, kv_store=None):
+        db = MibDbLazyWriteDict(self.agent, kv_store=kv_store or self.kv_store)
+        db.start()
+        db.add(_DEVICE_ID)
+        self.databases.append(db)
+        return db
+
+    def populate(self, db):
+        db.on_mib_reset(_DEVICE_ID)
+        db.bulk_set(_DEVICE_ID, [(PriorityQueueG.class_id, inst,
+                                  {'maximum_queue_size': inst, 'related_port': 0x80000000 + inst})
+                                 for inst in range(NUM_INSTANCES)])
+        db._sync(_DEVICE_ID)
+
+    def test_sync_writes_deltas(self):
+        db = self.new_db()
+        self.populate(db)
+        snapshot_bytes = db.statistics['last-sync-bytes']
+        self.assertEqual(db.statistics['snapshots'], 1)
+
+        db.set(_DEVICE_ID, PriorityQueueG.class_id, 7, {'maximum_queue_size': 1000})
+        db._check_dirty(_DEVICE_ID)
+
+        stats = db.statistics
+        self.assertEqual((stats['syncs'], stats['journal-writes']), (2, 1))
+        self.assertLess(stats['last-sync-bytes'] * 10, snapshot_bytes)
+
+        # Nothing dirty, nothing written
+        db._check_dirty(_DEVICE_ID)
+        self.assertEqual(db.statistics['syncs'], 2)
+
+    def test_reload_replays_journal(self):
+        db = self.new_db()
+        self.populate(db)
+
+        db.set(_DEVICE_ID, PriorityQueueG.class_id, 7, {'maximum_queue_size': 1000})
+        db._sync(_DEVICE_ID)
+        db.delete(_DEVICE_ID, PriorityQueueG.class_id, 8)
+        db.save_mib_data_sync(_DEVICE_ID, 42)
+        db._sync(_DEVICE_ID)
+
+        reloaded = self.new_db()
+        self.assertEqual(reloaded.query(_DEVICE_ID, PriorityQueueG.class_id, 7)[ATTRIBUTES_KEY],
+                         {'maximum_queue_size': 1000, 'related_port': 0x80000007})
+        self.assertEqual(reloaded.query(_DEVICE_ID, PriorityQueueG.class_id, 8), {})
+        self.assertEqual(reloaded.query(_DEVICE_ID)[MDS_KEY], 42)
+        self.assertEqual(len(reloaded.query(_DEVICE_ID, PriorityQueueG.class_id)) - 1,
+                         NUM_INSTANCES - 1)
+
+    def test_compaction(self):
+        db = self.new_db()
+        self.populate(db)
+
+        for count in range(1, MibDbLazyWriteDict.COMPACT_ENTRIES + 1):
+            db.set(_DEVICE_ID, PriorityQueueG.class_id, 7, {'maximum_queue_size': count})
+            db._sync(_DEVICE_ID)
+
+        self.assertEqual(db.statistics['journal-writes'], MibDbLazyWriteDict.COMPACT_ENTRIES)
+        self.assertEqual(len(self.kv_store.data), MibDbLazyWriteDict.COMPACT_ENTRIES + 1)
+
+        db.set(_DEVICE_ID, PriorityQueueG.class_id, 7, {'maximum_queue_size': 0})
+        db._sync(_DEVICE_ID)
+        self.assertEqual(db.statistics['snapshots'], 2)
+        self.assertEqual(list(self.kv_store.data.keys()), [_DEVICE_ID])
+
+        # Journal continues after the compacted snapshot
+        db.set(_DEVICE_ID, PriorityQueueG.class_id, 7, {'maximum_queue_size': 1})
+        db._sync(_DEVICE_ID)
+        reloaded = self.new_db()
+        self.assertEqual(reloaded.query(_DEVICE_ID, PriorityQueueG.class_id, 7,
+                                        'maximum_queue_size'), {'maximum_queue_size': 1})
+
+    def test_overlapping_syncs(self):
+        db = self.new_db()
+        self.populate(db)
+
+        slow = SlowKvStore()
+        slow.data = self.kv_store.data
+        db._kv_store = slow
+
+        db.set(_DEVICE_ID, PriorityQueueG.class_id, 7, {'maximum_queue_size': 1000})
+        first = db._check_dirty(_DEVICE_ID)
+        self.assertFalse(first.called)          # LoopingCall waits for the write
+
+        # A check while the first write is in progress does not start another
+        db.set(_DEVICE_ID, PriorityQueueG.class_id, 8, {'maximum_queue_size': 2000})
+        db._check_dirty(_DEVICE_ID)
+        self.assertEqual(len(slow.pending), 1)
+
+        slow.complete()
+        self.assertTrue(first.called)
+
+        # The second change is written by the next check, as the next journal entry
+        db._check_dirty(_DEVICE_ID)
+        self.assertEqual([key for _, key, _ in slow.pending],
+                         [MibDbLazyWriteDict.JOURNAL_PATH.format(_DEVICE_ID, 2)])
+        slow.complete()
+
+        reloaded = self.new_db()
+        self.assertEqual(reloaded.query(_DEVICE_ID, PriorityQueueG.class_id, 7,
+                                        'maximum_queue_size'), {'maximum_queue_size': 1000})
+        self.assertEqual(reloaded.query(_DEVICE_ID, PriorityQueueG.class_id, 8,
+                                        'maximum_queue_size'), {'maximum_queue_size': 2000})
+
+    def test_failed_journal_write_snapshots(self):
+        db = self.new_db()
+        self.populate(db)
+
+        slow = SlowKvStore()
+        slow.data = self.kv_store.data
+        db._kv_store = slow
+
+        db.set(_DEVICE_ID, PriorityQueueG.class_id, 7, {'maximum_queue_size': 1000})
+        db._check_dirty(_DEVICE_ID)
+        slow.pending.pop()[0].errback(Exception('etcd down'))
+
+        # The sequence number of the failed entry is not reused, a snapshot follows
+        db._kv_store = self.kv_store
+        db.set(_DEVICE_ID, PriorityQueueG.class_id, 8, {'maximum_queue_size': 2000})
+        db._check_dirty(_DEVICE_ID)
+        self.assertEqual(db.statistics['snapshots'], 2)
+
+        reloaded = self.new_db()
+        self.assertEqual(reloaded.query(_DEVICE_ID, PriorityQueueG.class_id, 7,
+                                        'maximum_queue_size'), {'maximum_queue_size': 1000})
+
+
+if __name__ == '__main__':
+    main()
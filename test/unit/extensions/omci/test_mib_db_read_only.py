@@ -0,0 +1,129 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.omci.omci_entities import PriorityQueueG, GemPortNetworkCtp
+from pyvoltha.adapters.extensions.omci.database.mib_db_api import ATTRIBUTES_KEY, ME_KEY, MDS_KEY
+from pyvoltha.adapters.extensions.omci.database.mib_db_dict import MibDbVolatileDict
+from .mock.mock_adapter_agent import MockDevice
+from six.moves import range
+
+_DEVICE_ID = 'br-549'
+NUM_INSTANCES = 200
+
+
+class MockAgent(object):
+    def __init__(self, device):
+        self._device = device
+
+    def get_device(self, device_id):
+        if device_id != self._device.id:
+            raise KeyError(device_id)
+        return self._device
+
+
+class TestMibDbReadOnlyQuery(TestCase):
+    def setUp(self):
+        self.db = MibDbVolatileDict(MockAgent(MockDevice(_DEVICE_ID)))
+        self.db.start()
+        self.db.add(_DEVICE_ID)
+        self.db.bulk_set(_DEVICE_ID, [(PriorityQueueG.class_id, inst,
+                                       {'maximum_queue_size': inst, 'related_port': 0x80000000 + inst})
+                                      for inst in range(NUM_INSTANCES)])
+
+    def test_same_results(self):
+        for args in [(), (PriorityQueueG.class_id,), (PriorityQueueG.class_id, 5),
+                     (PriorityQueueG.class_id, 5, 'maximum_queue_size'),
+                     (GemPortNetworkCtp.class_id,), (PriorityQueueG.class_id, 0xFFFF)]:
+            self.assertEqual(dict(self.db.query(_DEVICE_ID, *args, read_only=True)),
+                             self.db.query(_DEVICE_ID, *args))
+
+    def test_immutable(self):
+        view = self.db.query(_DEVICE_ID, read_only=True)
+
+        with self.assertRaises(TypeError):
+            view[PriorityQueueG.class_id][5][ATTRIBUTES_KEY]['maximum_queue_size'] = 1
+        with self.assertRaises(TypeError):
+            view[PriorityQueueG.class_id][5] = {}
+        with self.assertRaises(AttributeError):
+            view[ME_KEY].add(PriorityQueueG.class_id)
+
+    def test_shared_until_modified(self):
+        generation = self.db.generation(_DEVICE_ID)
+        view = self.db.query(_DEVICE_ID, PriorityQueueG.class_id, 5, read_only=True)
+        self.assertIs(self.db.query(_DEVICE_ID, PriorityQueueG.class_id, 5, read_only=True), view)
+        self.assertIs(self.db.query(_DEVICE_ID, read_only=True)[PriorityQueueG.class_id][5], view)
+
+        # No change, same generation
+        self.db.set(_DEVICE_ID, PriorityQueueG.class_id, 5, {'maximum_queue_size': 5})
+        self.assertEqual(self.db.generation(_DEVICE_ID), generation)
+        self.assertIs(self.db.query(_DEVICE_ID, PriorityQueueG.class_id, 5, read_only=True), view)
+
+        self.db.set(_DEVICE_ID, PriorityQueueG.class_id, 5, {'maximum_queue_size': 6})
+        self.assertGreater(self.db.generation(_DEVICE_ID), generation)
+
+        # Old view is a snapshot, new query sees the change
+        self.assertEqual(view[ATTRIBUTES_KEY]['maximum_queue_size'], 5)
+        new_view = self.db.query(_DEVICE_ID, PriorityQueueG.class_id, 5, read_only=True)
+        self.assertEqual(new_view[ATTRIBUTES_KEY]['maximum_queue_size'], 6)
+
+        self.db.delete(_DEVICE_ID, PriorityQueueG.class_id, 5)
+        self.assertNotIn(5, self.db.query(_DEVICE_ID, PriorityQueueG.class_id, read_only=True))
+
+        self.db.remove(_DEVICE_ID)
+        self.assertIsNone(self.db.generation(_DEVICE_ID))
+
+    def test_only_modified_views_dropped(self):
+        self.db.set(_DEVICE_ID, GemPortNetworkCtp.class_id, 1, {'port_id': 1025})
+        gem_view = self.db.query(_DEVICE_ID, GemPortNetworkCtp.class_id, read_only=True)
+        queue_view = self.db.query(_DEVICE_ID, PriorityQueueG.class_id, 5, read_only=True)
+        other_view = self.db.query(_DEVICE_ID, PriorityQueueG.class_id, 6, read_only=True)
+
+        self.db.set(_DEVICE_ID, PriorityQueueG.class_id, 5, {'maximum_queue_size': 6})
+        self.db.bulk_set(_DEVICE_ID, [(PriorityQueueG.class_id, 7, {'maximum_queue_size': 8})])
+        self.db.delete(_DEVICE_ID, PriorityQueueG.class_id, 8)
+
+        # Views of other classes and instances are still shared
+        self.assertIs(self.db.query(_DEVICE_ID, GemPortNetworkCtp.class_id, read_only=True),
+                      gem_view)
+        self.assertIs(self.db.query(_DEVICE_ID, PriorityQueueG.class_id, 6, read_only=True),
+                      other_view)
+
+        device_view = self.db.query(_DEVICE_ID, read_only=True)
+        self.assertIs(device_view[GemPortNetworkCtp.class_id], gem_view)
+        self.assertIsNot(device_view[PriorityQueueG.class_id][5], queue_view)
+        self.assertEqual(device_view[PriorityQueueG.class_id][5][ATTRIBUTES_KEY]['maximum_queue_size'], 6)
+        self.assertEqual(device_view[PriorityQueueG.class_id][7][ATTRIBUTES_KEY]['maximum_queue_size'], 8)
+        self.assertNotIn(8, device_view[PriorityQueueG.class_id])
+        self.assertEqual(dict(device_view), self.db.query(_DEVICE_ID))
+
+        # Changes outside of the ME instances only rebuild the device view
+        self.db.save_mib_data_sync(_DEVICE_ID, 10)
+        self.assertEqual(self.db.query(_DEVICE_ID, read_only=True)[MDS_KEY], 10)
+        self.assertIs(self.db.query(_DEVICE_ID, read_only=True)[PriorityQueueG.class_id],
+                      device_view[PriorityQueueG.class_id])
+
+    def test_unknown_device(self):
+        self.assertEqual(self.db.query('unknown'), dict())
+        self.assertEqual(dict(self.db.query('unknown', read_only=True)), dict())
+
+        for args in [(PriorityQueueG.class_id,), (PriorityQueueG.class_id, 5)]:
+            self.assertRaises(KeyError, self.db.query, 'unknown', *args)
+            self.assertRaises(KeyError, self.db.query, 'unknown', *args, read_only=True)
+
+
+if __name__ == '__main__':
+    main()
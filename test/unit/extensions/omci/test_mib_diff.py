@@ -0,0 +1,127 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.omci.omci_entities import PriorityQueueG, GemPortNetworkCtp
+from pyvoltha.adapters.extensions.omci.database.mib_db_dict import MibDbVolatileDict
+from pyvoltha.adapters.extensions.omci.database.mib_diff import lhs_only, attribute_diffs, \
+    mib_digests, instance_digest
+from .mock.mock_adapter_agent import MockDevice
+from six.moves import range
+
+_DEVICE_ID = 'br-549'
+NUM_INSTANCES = 1000
+
+
+class MockAgent(object):
+    def __init__(self, device):
+        self._device = device
+
+    def get_device(self, _device_id):
+        return self._device
+
+
+class TestMibDiff(TestCase):
+    def setUp(self):
+        self.agent = MockAgent(MockDevice(_DEVICE_ID))
+        self.olt_db = self.new_db()
+        self.onu_db = self.new_db()
+
+    def new_db(self):
+        db = MibDbVolatileDict(self.agent)
+        db.start()
+        db.add(_DEVICE_ID)
+        db.bulk_set(_DEVICE_ID, [(PriorityQueueG.class_id, inst,
+                                  {'queue_configuration_option': 1,
+                                   'maximum_queue_size': 100,
+                                   'allocated_queue_size': 100,
+                                   'related_port': 0x80000000 + inst,
+                                   'traffic_scheduler_pointer': 0x8000 + inst % 8,
+                                   'weight': 1})
+                                 for inst in range(NUM_INSTANCES)])
+        return db
+
+    def test_digests_maintained(self):
+        digests = self.olt_db.digests(_DEVICE_ID)
+        self.assertEqual(dict(digests), mib_digests(self.olt_db.query(_DEVICE_ID)))
+        self.assertEqual(dict(digests), dict(self.onu_db.digests(_DEVICE_ID)))
+
+        self.olt_db.set(_DEVICE_ID, PriorityQueueG.class_id, 5, {'weight': 2})
+        self.olt_db.set(_DEVICE_ID, GemPortNetworkCtp.class_id, 1, {'port_id': 1025})
+        self.olt_db.delete(_DEVICE_ID, PriorityQueueG.class_id, 6)
+
+        # Earlier snapshot is not changed
+        self.assertEqual(dict(digests), dict(self.onu_db.digests(_DEVICE_ID)))
+
+        updated = self.olt_db.digests(_DEVICE_ID)
+        self.assertEqual(dict(updated), mib_digests(self.olt_db.query(_DEVICE_ID)))
+        self.assertNotEqual(updated[(PriorityQueueG.class_id, 5)],
+                            digests[(PriorityQueueG.class_id, 5)])
+        self.assertEqual(updated[(PriorityQueueG.class_id, 7)],
+                         digests[(PriorityQueueG.class_id, 7)])
+        self.assertNotIn((PriorityQueueG.class_id, 6), updated)
+
+        self.olt_db.on_mib_reset(_DEVICE_ID)
+        self.assertEqual(dict(self.olt_db.digests(_DEVICE_ID)), dict())
+        self.assertIsNone(self.olt_db.digests('unknown'))
+
+    def test_diffs(self):
+        self.olt_db.set(_DEVICE_ID, PriorityQueueG.class_id, 1, {'weight': 2})
+        self.olt_db.set(_DEVICE_ID, GemPortNetworkCtp.class_id, 1, {'port_id': 1025})
+        self.onu_db.set(_DEVICE_ID, PriorityQueueG.class_id, 2, {'back_pressure_time': 10})
+        self.onu_db.delete(_DEVICE_ID, PriorityQueueG.class_id, 3)
+
+        olt, onu = self.olt_db.query(_DEVICE_ID), self.onu_db.query(_DEVICE_ID)
+
+        self.assertEqual(sorted(lhs_only(olt, onu)), [(GemPortNetworkCtp.class_id, 1),
+                                                      (PriorityQueueG.class_id, 3)])
+        self.assertEqual(lhs_only(onu, olt), [])
+
+        diffs = attribute_diffs(olt, onu, self.olt_db.digests(_DEVICE_ID),
+                                self.onu_db.digests(_DEVICE_ID))
+        self.assertEqual(sorted(diffs), [(PriorityQueueG.class_id, 1, 'weight'),
+                                         (PriorityQueueG.class_id, 2, 'back_pressure_time')])
+
+        # Same results when the digests are calculated, or are not used at all
+        self.assertEqual(sorted(attribute_diffs(olt, onu)), sorted(diffs))
+        self.assertEqual(sorted(attribute_diffs(olt, onu, dict(), dict())), sorted(diffs))
+
+        ignored = attribute_diffs(olt, onu, ignored=lambda _cls_id: {'weight'})
+        self.assertEqual(ignored, [(PriorityQueueG.class_id, 2, 'back_pressure_time')])
+
+    def test_instance_digest(self):
+        attributes = {'weight': 1, 'related_port': 0x80000001}
+
+        self.assertEqual(instance_digest(attributes),
+                         instance_digest({'related_port': 0x80000001, 'weight': 1}))
+        self.assertNotEqual(instance_digest(attributes),
+                            instance_digest({'weight': 0x80000001, 'related_port': 1}))
+        self.assertNotEqual(instance_digest({'weight': 1}), instance_digest({'weight': '1'}))
+        self.assertNotEqual(instance_digest({'weight': 1}), instance_digest(dict()))
+        self.assertIsNotNone(instance_digest({'table': [1, 2], 'extra': {'a': 1}}))
+
+    def test_equal_digests_skipped(self):
+        self.onu_db.set(_DEVICE_ID, PriorityQueueG.class_id, 4, {'weight': 3})
+        olt, onu = self.olt_db.query(_DEVICE_ID), self.onu_db.query(_DEVICE_ID)
+
+        # Equal digests are trusted, the attributes of the instances are not compared
+        digests = dict(self.olt_db.digests(_DEVICE_ID))
+        self.assertEqual(attribute_diffs(olt, onu, digests, dict(digests)), [])
+        self.assertEqual(attribute_diffs(olt, onu, digests, self.onu_db.digests(_DEVICE_ID)),
+                         [(PriorityQueueG.class_id, 4, 'weight')])
+
+if __name__ == '__main__':
+    main()
@@ -16,6 +16,13 @@
 
 from __future__ import absolute_import
 from unittest import TestCase, main
+from unittest.mock import Mock, patch
+from twisted.internet.defer import Deferred
+from twisted.internet.task import Clock
+from pyvoltha.adapters.extensions.omci.audit_scheduler import MibAuditScheduler
+from pyvoltha.adapters.extensions.omci.state_machines import mib_sync
+from pyvoltha.adapters.extensions.omci.state_machines.mib_sync import MibSynchronizer
+from pyvoltha.common.event_bus import EventBus, EventBusClient
 from .mock.mock_adapter_agent import MockAdapterAgent
 
 
@@ -34,5 +41,80 @@ class TestMibSync(TestCase):
     # TODO: Add tests
 
 
+class MockTaskRunner(object):
+    def __init__(self):
+        self.queued = []
+
+    def queue_task(self, task):
+        self.queued.append(task)
+        return Deferred()       # Never completes
+
+
+class MockDevice(object):
+    def __init__(self):
+        self.pon_key = ('olt-1', 0)
+        self.task_runner = MockTaskRunner()
+        self.event_bus = EventBusClient(EventBus())
+        self.omci_cc = Mock(event_bus=self.event_bus)
+
+
+class MockAgent(object):
+    def __init__(self, clock):
+        self.audit_scheduler = MibAuditScheduler(clock=clock, max_resyncs_per_pon=1)
+        self.devices = dict()
+
+    def get_device(self, device_id):
+        return self.devices[device_id]
+
+
+TASKS = {name: Mock() for name in ('mib-upload', 'mib-template', 'get-mds',
+                                   'mib-audit', 'mib-resync', 'mib-reconcile')}
+
+
+class TestMibSyncResyncSlot(TestCase):
+    """
+    Test that the MIB Synchronizer gives up its PON resync slot
+    """
+    def setUp(self):
+        self.clock = Clock()
+        patcher = patch.object(mib_sync, 'reactor', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.agent = MockAgent(self.clock)
+        self.scheduler = self.agent.audit_scheduler
+
+    def resyncing(self, device_id):
+        device = self.agent.devices[device_id] = MockDevice()
+        sync = MibSynchronizer(self.agent, device_id, TASKS, Mock())
+        sync._device = device
+        sync.machine.set_state('examining_mds')
+        sync.mismatch()
+        self.assertEqual(sync.state, 'resynchronizing')
+        return sync
+
+    def test_timeout_releases_slot(self):
+        first, second = self.resyncing('onu-1'), self.resyncing('onu-2')
+        self.assertEqual(self.scheduler.resyncs_running, 1)
+        self.assertEqual(self.scheduler.resyncs_waiting, 1)
+        self.assertEqual(len(first._device.task_runner.queued), 1)
+
+        # Wildcard timeout out of resynchronizing, the waiting ONU gets the slot
+        first.timeout()
+        self.assertEqual(first.state, 'starting')
+        self.assertEqual(self.scheduler.resyncs_running, 1)
+        self.assertEqual(self.scheduler.resyncs_waiting, 0)
+        self.assertEqual(len(second._device.task_runner.queued), 1)
+
+        # Timeout while still waiting for a slot
+        third = self.resyncing('onu-3')
+        self.assertEqual(self.scheduler.resyncs_waiting, 1)
+        third.timeout()
+        self.assertEqual(self.scheduler.resyncs_waiting, 0)
+
+        second.timeout()
+        self.assertEqual(self.scheduler.resyncs_running, 0)
+
+
 if __name__ == '__main__':
     main()
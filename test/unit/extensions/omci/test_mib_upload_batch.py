@@ -0,0 +1,134 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+from unittest import TestCase, main
+from twisted.internet.defer import succeed
+from pyvoltha.adapters.extensions.omci.omci_entities import PriorityQueueG, GemPortNetworkCtp, OntData
+from pyvoltha.adapters.extensions.omci.omci_frame import OmciFrame
+from pyvoltha.adapters.extensions.omci.omci_messages import OmciMibUploadNextResponse
+from pyvoltha.adapters.extensions.omci.database.mib_db_api import ATTRIBUTES_KEY
+from pyvoltha.adapters.extensions.omci.database.mib_db_dict import MibDbVolatileDict
+from pyvoltha.adapters.extensions.omci.tasks.mib_resync_task import MibResyncTask
+from .mock.mock_adapter_agent import MockDevice
+from six.moves import range
+
+_DEVICE_ID = 'br-549'
+NUM_MES = 500
+
+
+def upload_next_responses(count):
+    """
+    MIB upload next responses, as received from an ONU, for 'count' ME instances
+    """
+    responses = []
+    for seq_no in range(count):
+        if seq_no == 0:
+            entity_class, entity_id, data = OntData.class_id, 0, {'mib_data_sync': 0}
+        elif seq_no % 2:
+            entity_class, entity_id = PriorityQueueG.class_id, seq_no
+            data = {'queue_configuration_option': 1, 'maximum_queue_size': 100 + seq_no,
+                    'allocated_queue_size': 100, 'related_port': 0x80000000 + seq_no}
+        else:
+            entity_class, entity_id = GemPortNetworkCtp.class_id, seq_no
+            data = {'port_id': 1024 + seq_no, 'tcont_pointer': 0x8001, 'direction': 3}
+
+        me_map = {OntData.class_id: OntData, PriorityQueueG.class_id: PriorityQueueG,
+                  GemPortNetworkCtp.class_id: GemPortNetworkCtp}
+        frame = OmciFrame(transaction_id=seq_no + 1,
+                          message_type=OmciMibUploadNextResponse.message_id,
+                          omci_message=OmciMibUploadNextResponse(
+                              entity_class=OntData.class_id,
+                              entity_id=0,
+                              object_entity_class=entity_class,
+                              object_entity_id=entity_id,
+                              object_attributes_mask=me_map[entity_class].mask_for(*data.keys()),
+                              object_data=data))
+        responses.append(OmciFrame(bytes(frame)))
+    return responses
+
+
+class MockOmciCC(object):
+    def __init__(self, responses):
+        self.responses = responses
+
+    def send_mib_upload_next(self, seq_no):
+        return succeed(self.responses[seq_no])
+
+
+class MockAgent(object):
+    def __init__(self, device):
+        self._device = device
+
+    def get_device(self, _device_id):
+        return self._device
+
+
+class TestMibUploadBatch(TestCase):
+    def setUp(self):
+        self.device = MockDevice(_DEVICE_ID)
+        self.device.omci_cc = MockOmciCC(upload_next_responses(NUM_MES))
+        self.agent = MockAgent(self.device)
+
+    def test_bulk_set(self):
+        db = MibDbVolatileDict(self.agent)
+        db.start()
+        db.add(_DEVICE_ID)
+
+        entities = [(PriorityQueueG.class_id, 1, {'maximum_queue_size': 100}),
+                    (PriorityQueueG.class_id, 2, {'maximum_queue_size': 200}),
+                    (PriorityQueueG.class_id, 1, {'allocated_queue_size': 50})]
+        self.assertEqual(db.bulk_set(_DEVICE_ID, entities), 3)
+        self.assertEqual(db.query(_DEVICE_ID, PriorityQueueG.class_id, 1)[ATTRIBUTES_KEY],
+                         {'maximum_queue_size': 100, 'allocated_queue_size': 50})
+
+        # Unchanged values are not counted
+        self.assertEqual(db.bulk_set(_DEVICE_ID, entities[:2]), 0)
+
+        with self.assertRaises(ValueError):
+            db.bulk_set(_DEVICE_ID, [(0x10000, 1, {})])
+
+    def upload(self, batch_size):
+        MibResyncTask.upload_batch_size = batch_size
+        task = MibResyncTask(self.agent, _DEVICE_ID)
+        task._db_active.add(_DEVICE_ID)
+
+        results = []
+        task.upload_mib(NUM_MES).addCallback(results.append)
+
+        db = task._db_active.query(_DEVICE_ID)
+        task.deferred.addErrback(lambda _: None)     # Never started, cancelled on stop
+        task.stop()
+        return results[0], db
+
+    def test_500_me_upload(self):
+        original = MibResyncTask.upload_batch_size
+        try:
+            count, per_me_db = self.upload(1)
+            count, batched_db = self.upload(original)
+
+        finally:
+            MibResyncTask.upload_batch_size = original
+
+        self.assertEqual(count, NUM_MES)
+        self.assertNotIn(OntData.class_id, batched_db)
+        self.assertEqual(len(batched_db[PriorityQueueG.class_id]) - 1, NUM_MES // 2)
+        self.assertEqual(len(batched_db[GemPortNetworkCtp.class_id]) - 1, NUM_MES // 2 - 1)
+        self.assertEqual(batched_db[GemPortNetworkCtp.class_id][2][ATTRIBUTES_KEY],
+                         per_me_db[GemPortNetworkCtp.class_id][2][ATTRIBUTES_KEY])
+
+
+if __name__ == '__main__':
+    main()
@@ -27,7 +27,8 @@ from pyvoltha.adapters.extensions.omci.omci_frame import *
 from pyvoltha.adapters.extensions.omci.omci_entities import *
 from pyvoltha.adapters.extensions.omci.omci_me import ExtendedVlanTaggingOperationConfigurationDataFrame
 from pyvoltha.adapters.extensions.omci.omci_cc import OMCI_CC, UNKNOWN_CLASS_ATTRIBUTE_KEY,\
-    MAX_OMCI_REQUEST_AGE
+    MAX_OMCI_REQUEST_AGE, RxEvent, CONNECTED_KEY
+from twisted.internet.task import Clock
 from six.moves import range
 
 DEFAULT_OLT_DEVICE_ID = 'default_olt_mock'
@@ -1231,5 +1232,29 @@ class TestOmciCc(TestCase):
     # rx and retries by the OMCI_CC transmitter.
 
 
+class TestOmciCcEventBus(TestCase):
+    """
+    Queued event bus publications are delivered on the reactor/clock given
+    to the OMCI_CC
+    """
+    def test_event_bus_delivery_on_clock(self):
+        clock = Clock()
+        omci_cc = OMCI_CC(None, None, DEFAULT_ONU_DEVICE_ID, clock=clock)
+        omci_cc.enabled = True
+
+        received = []
+        topic = OMCI_CC.event_bus_topic(DEFAULT_ONU_DEVICE_ID, RxEvent.Connectivity)
+        subscription = omci_cc.event_bus.subscribe(topic, lambda _, msg: received.append(msg))
+
+        omci_cc._publish_connectivity_event(False)
+        self.assertEqual(len(clock.getDelayedCalls()), 1)
+        self.assertEqual(received, [])
+
+        clock.advance(0)
+        self.assertEqual(received, [{CONNECTED_KEY: False}])
+        omci_cc.event_bus.unsubscribe(subscription)
+        omci_cc.enabled = False
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,85 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+from unittest import TestCase, main
+from pyvoltha.adapters.extensions.omci.omci_entities import Omci, \
+    ExtendedVlanTaggingOperationConfigurationData, VlanTaggingOperation
+from pyvoltha.adapters.extensions.omci.omci_fields import OmciTableField
+from pyvoltha.adapters.extensions.omci.tasks.omci_get_request import OmciTableReader
+from six.moves import range
+
+PDU_SIZE = OmciTableField.PDU_SIZE
+
+
+def get_next_responses(table):
+    """ Table data as carried in Get-Next responses (padded PDUs) """
+    for offset in range(0, len(table), PDU_SIZE):
+        yield table[offset:offset + PDU_SIZE].ljust(PDU_SIZE, b'\x00')
+
+
+class TestOmciTableReader(TestCase):
+
+    def read(self, entity_class, attr_name, table):
+        attr_index = entity_class.attribute_name_to_index_map[attr_name]
+        reader = OmciTableReader(entity_class, 0, attr_index, len(table))
+
+        for seq_no, data in enumerate(get_next_responses(table)):
+            frame = reader.get_next_frame(seq_no)
+            self.assertEqual(frame.omci_message.command_sequence_number, seq_no)
+            self.assertIsNone(frame.transaction_id)
+            frame.fields['transaction_id'] = seq_no + 1    # As OMCI-CC would
+            reader.add(data)
+
+        self.assertEqual(seq_no + 1, reader.requests)
+        self.assertTrue(reader.complete)
+        return list(reader.rows())
+
+    def test_me_type_table(self):
+        me_types = list(range(1, 301))
+        table = b''.join(bytes(bytearray([me >> 8, me & 0xff])) for me in me_types)
+
+        rows = self.read(Omci, 'me_type_table', table)
+        self.assertEqual([row.fields['me_type'] for row in rows], me_types)
+
+    def test_frame_per_request(self):
+        reader = OmciTableReader(Omci, 0, 1, 100)
+        first = reader.get_next_frame(0)
+        first.fields['transaction_id'] = 1          # As OMCI-CC would
+
+        # Frames already handed to OMCI-CC are not modified by later requests
+        second = reader.get_next_frame(1)
+        self.assertIsNot(second, first)
+        self.assertEqual(first.transaction_id, 1)
+        self.assertEqual(first.omci_message.command_sequence_number, 0)
+        self.assertIsNone(second.transaction_id)
+        self.assertEqual(second.omci_message.command_sequence_number, 1)
+        self.assertEqual(first.omci_message.attributes_mask, Omci.mask_for('me_type_table'))
+        self.assertEqual(first.omci_message.entity_class, Omci.class_id)
+
+    def test_large_vlan_tagging_table(self):
+        rules = 1000
+        table = b''.join(bytes(VlanTaggingOperation(filter_outer_vid=vid,
+                                                    treatment_inner_vid=vid))
+                         for vid in range(rules))
+        rows = self.read(ExtendedVlanTaggingOperationConfigurationData,
+                         'received_frame_vlan_tagging_operation_table', table)
+
+        self.assertEqual(len(rows), rules)
+        self.assertEqual(rows[-1].fields['treatment_inner_vid'], rules - 1)
+
+
+if __name__ == '__main__':
+    main()
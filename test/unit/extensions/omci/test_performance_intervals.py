@@ -0,0 +1,176 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+from unittest import TestCase, main
+from unittest.mock import patch
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.task import Clock
+from pyvoltha.adapters.extensions.omci.pm_collection_scheduler import PmCollectionScheduler
+from pyvoltha.adapters.extensions.omci.state_machines import performance_intervals
+from pyvoltha.adapters.extensions.omci.state_machines.performance_intervals import \
+    PerformanceIntervals
+from six.moves import range
+
+NUM_MES = 10
+PON = ('olt-1', 0)
+PM_CLASS_ID = 312       # FEC PM History Data
+
+
+class MockConfiguration(object):
+    ani_g_entities = None
+    uni_g_entities = None
+    gem_ctp_entities = None
+
+
+class MockTaskRunner(object):
+    def __init__(self):
+        self.queued = []
+        self.fail = 0
+
+    def queue_task(self, task):
+        self.queued.append(task)
+        if self.fail > 0:
+            self.fail -= 1
+            d = Deferred()
+            d.errback(Exception('timeout'))
+            return d
+        return succeed({'class_id': task.class_id, 'entity_id': task.entity_id})
+
+
+class MockDevice(object):
+    def __init__(self):
+        self.pon_key = PON
+        self.task_runner = MockTaskRunner()
+        self.configuration = MockConfiguration()
+
+
+class MockAgent(object):
+    def __init__(self, clock):
+        self.pm_collection_scheduler = PmCollectionScheduler(clock=clock,
+                                                             max_collections_per_pon=1)
+        self.devices = dict()
+
+    def get_device(self, device_id):
+        return self.devices[device_id]
+
+
+class MockCollectTask(object):
+    def __init__(self, _agent, _device_id, class_id, entity_id, **_kwargs):
+        self.class_id = class_id
+        self.entity_id = entity_id
+
+    def stop(self):
+        pass
+
+
+TASKS = {
+    'sync-time': None,
+    'collect-data': MockCollectTask,
+    'create-pm': None,
+    'delete-pm': None,
+}
+
+
+class TestPerformanceIntervals(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.clock.advance(100 * PmCollectionScheduler.INTERVAL + 100)
+        patcher = patch.object(performance_intervals, 'reactor', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.agent = MockAgent(self.clock)
+        self.scheduler = self.agent.pm_collection_scheduler
+
+    def onu(self, device_id):
+        device = self.agent.devices[device_id] = MockDevice()
+        pm = PerformanceIntervals(self.agent, device_id, TASKS, timeout_delay=10, tick_delay=15)
+        pm._device = device
+        pm._pm_me_collect_retries = {(PM_CLASS_ID, eid): 3 for eid in range(NUM_MES)}
+        pm._interval = self.scheduler.interval()
+        pm._interval_due = self.clock.seconds()
+        pm.machine.set_state('idle')
+        return pm
+
+    def test_mes_collected_back_to_back(self):
+        first, second = self.onu('onu-1'), self.onu('onu-2')
+        first.tick()
+        second.tick()
+
+        self.assertEqual(first.state, 'collect_data')
+        self.assertEqual(self.scheduler.collections_running, 1)
+        self.assertEqual(self.scheduler.collections_waiting, 1)
+
+        # All MEs of the first ONU are collected without waiting for idle ticks,
+        # then the slot goes to the second ONU, all without the clock moving
+        self.clock.advance(0)
+        self.assertEqual(len(first._device.task_runner.queued), NUM_MES)
+        self.assertEqual(len(second._device.task_runner.queued), NUM_MES)
+        self.assertEqual((first.state, second.state), ('idle', 'idle'))
+        self.assertEqual(self.scheduler.collections_running, 0)
+        self.assertEqual(self.scheduler.interval_statistics(100)['collected'], 2)
+
+        first.stop()
+        second.stop()
+
+    def test_failed_collection_retried_in_place(self):
+        pm = self.onu('onu-1')
+        pm._device.task_runner.fail = 2
+        pm.tick()
+        self.clock.advance(0)
+
+        self.assertEqual(pm.state, 'collect_data')
+        self.assertEqual(len(pm._device.task_runner.queued), 1)
+
+        self.clock.pump([10, 10])
+        self.assertEqual(len(pm._device.task_runner.queued), NUM_MES + 2)
+        self.assertEqual(pm.state, 'idle')
+        self.assertEqual(self.scheduler.collections_running, 0)
+        self.assertEqual(self.scheduler.interval_statistics(100)['collected'], 1)
+        pm.stop()
+
+    def test_exhausted_attempts_not_collected(self):
+        pm = self.onu('onu-1')
+        pm._pm_me_collect_retries = dict.fromkeys(pm._pm_me_collect_retries, 1)
+        pm._device.task_runner.fail = 1
+        pm.tick()
+        self.clock.advance(0)
+        self.clock.advance(10)
+
+        # One ME ran out of attempts, the rest were read
+        self.assertEqual(len(pm._device.task_runner.queued), NUM_MES)
+        self.assertEqual(pm.state, 'idle')
+        self.assertEqual(self.scheduler.collections_running, 0)
+        self.assertIsNone(self.scheduler.interval_statistics(100))
+        self.assertEqual(set(pm._pm_me_collect_retries.values()), {3})
+        pm.stop()
+
+    def test_stop_releases_slot(self):
+        pm = self.onu('onu-1')
+        pm._device.task_runner.fail = 1
+        pm.tick()
+        self.clock.advance(0)
+
+        pm.stop()
+        self.assertEqual(pm.state, 'disabled')
+        self.assertEqual(self.scheduler.collections_running, 0)
+
+        self.clock.advance(10)
+        self.assertEqual(len(pm._device.task_runner.queued), 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+from unittest import TestCase, main
+from twisted.internet.defer import CancelledError
+from twisted.internet.task import Clock
+from pyvoltha.adapters.extensions.omci.pm_collection_scheduler import PmCollectionScheduler
+from six.moves import range
+
+INTERVAL = PmCollectionScheduler.INTERVAL
+SKEW = 10 * 60
+NUM_ONUS = 1200
+
+
+class TestPmCollectionScheduler(TestCase):
+    """
+    Test the agent-wide PM interval collection scheduler
+    """
+    def setUp(self):
+        self.clock = Clock()
+        self.clock.advance(100 * INTERVAL + 100)        # 100 seconds into interval 100
+        self.scheduler = PmCollectionScheduler(clock=self.clock, min_delay=60,
+                                               max_collections_per_pon=2)
+
+    def test_collections_spread_over_skew(self):
+        self.assertEqual(self.scheduler.interval(), 100)
+
+        minutes = dict()
+        for onu in range(NUM_ONUS):
+            device_id = 'onu-{}'.format(onu)
+            interval, when = self.scheduler.next_collection(device_id, SKEW)
+
+            self.assertEqual(interval, 100)
+            self.assertTrue(101 * INTERVAL + 60 <= when < 101 * INTERVAL + 60 + SKEW)
+
+            # Same ONU, same offset, whatever the scheduler or interval
+            other = PmCollectionScheduler(clock=Clock())
+            self.assertEqual(other.next_collection(device_id, SKEW)[1] % INTERVAL,
+                             when % INTERVAL)
+
+            minute = int((when - 101 * INTERVAL - 60) // 60)
+            minutes[minute] = minutes.get(minute, 0) + 1
+
+        # Roughly even load for each minute of the skew window
+        average = NUM_ONUS // (SKEW // 60)
+        self.assertEqual(len(minutes), SKEW // 60)
+        self.assertTrue(all(average // 2 < load < average * 3 // 2
+                            for load in minutes.values()), minutes)
+
+    def test_collection_limit_per_pon(self):
+        granted = []
+        pon = ('olt-1', 0)
+
+        def request(device_id, due, pon_key=pon):
+            d = self.scheduler.acquire_collection(device_id, pon_key, 99, due=due)
+            d.addCallback(granted.append)
+            return d
+
+        now = self.clock.seconds()
+        request('onu-1', now)
+        request('onu-2', now)
+        request('onu-3', now - 10)
+        request('onu-4', now - 300)         # Overdue the longest
+        d5 = request('onu-5', now - 20)
+        request('onu-6', now, ('olt-1', 1))   # Other PON is not limited by the first
+        request('onu-7', now, None)           # Unknown PON is never limited
+
+        self.assertEqual(granted, ['onu-1', 'onu-2', 'onu-6', 'onu-7'])
+        self.assertEqual(self.scheduler.collections_running, 3)
+        self.assertEqual(self.scheduler.collections_waiting, 3)
+        self.assertEqual(self.scheduler.collections_delayed, 3)
+
+        # ONU 5 is stopped while waiting
+        errors = []
+        d5.addErrback(errors.append)
+        d5.cancel()
+        self.assertIsInstance(errors[0].value, CancelledError)
+        self.assertEqual(self.scheduler.collections_waiting, 2)
+
+        self.scheduler.release_collection('onu-1')
+        self.scheduler.release_collection('onu-2')
+        self.assertEqual(granted[-2:], ['onu-4', 'onu-3'])
+        self.assertEqual(self.scheduler.collections_waiting, 0)
+
+        for device_id in ('onu-3', 'onu-4', 'onu-6', 'onu-7'):
+            self.scheduler.release_collection(device_id)
+        self.assertEqual(self.scheduler.collections_running, 0)
+
+    def test_latency_and_missed_intervals(self):
+        def collect(device_id, interval, due, duration):
+            self.clock.advance(due - self.clock.seconds())
+            self.scheduler.acquire_collection(device_id, None, interval)
+            self.clock.advance(duration)
+            self.scheduler.release_collection(device_id)
+
+        collect('onu-1', 100, 101 * INTERVAL + 60, 5)
+        collect('onu-2', 100, 101 * INTERVAL + 70, 15)
+
+        stats = self.scheduler.interval_statistics(100)
+        self.assertEqual(stats['collected'], 2)
+        self.assertEqual(stats['missed'], 0)
+        self.assertAlmostEqual(stats['average-latency'], 10.0)
+        self.assertAlmostEqual(stats['max-latency'], 15.0)
+
+        # ONU 1 skips intervals 101 and 102, then collects 103 too late
+        collect('onu-1', 103, 105 * INTERVAL + 60, 5)
+
+        self.assertEqual(self.scheduler.missed_intervals('onu-1'), 3)
+        self.assertEqual(self.scheduler.missed_intervals('onu-2'), 0)
+        self.assertEqual(self.scheduler.missed_intervals(), 3)
+
+        stats = self.scheduler.interval_statistics()
+        self.assertEqual(sorted(stats), [100, 101, 102, 103])
+        self.assertEqual([stats[n]['missed'] for n in (101, 102, 103)], [1, 1, 1])
+        self.assertEqual(stats[103]['collected'], 0)
+
+        # Released without collecting is not counted
+        self.scheduler.acquire_collection('onu-2', None, 104)
+        self.scheduler.release_collection('onu-2', collected=False)
+        self.assertIsNone(self.scheduler.interval_statistics(104))
+
+        self.scheduler.remove_device('onu-1')
+        self.assertEqual(self.scheduler.missed_intervals(), 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -481,5 +481,75 @@ class TestTaskRunner(TestCase):
         return t.deferred
 
 
+class TestTaskWatchdog(TestCase):
+    """
+    Test the shared Task watchdog
+    """
+    def setUp(self):
+        from twisted.internet.task import Clock
+        from pyvoltha.adapters.extensions.omci.tasks.task_watchdog import TaskWatchdog
+
+        self.clock = Clock()
+        self.watchdog = TaskWatchdog(clock=self.clock, resolution=0.5)
+
+        class Agent(object):
+            task_watchdog = self.watchdog
+        self.agent = Agent()
+
+    def _start_task(self):
+        from pyvoltha.adapters.extensions.omci.tasks.task import Task
+
+        t = Task('Watched Task', self.agent, DEVICE_ID)
+        results = []
+        t.deferred.addBoth(results.append)
+        t.start()
+        return t, results
+
+    def test_strobe_moves_deadline(self):
+        from pyvoltha.adapters.extensions.omci.tasks.task import WatchdogTimeoutFailure
+
+        t, results = self._start_task()
+        self.assertEqual(self.watchdog.tasks, 1)
+        self.assertEqual(t.watchdog_deadline, t.watchdog_timeout)
+
+        # One periodic check, no matter how often tasks strobe
+        for _ in range(1000):
+            t.strobe_watchdog()
+        self.assertEqual(len(self.clock.getDelayedCalls()), 1)
+
+        for _ in range(3):
+            self.clock.advance(t.watchdog_timeout - 1)
+            t.strobe_watchdog()
+        self.assertEqual(results, [])
+
+        self.clock.advance(t.watchdog_timeout + self.watchdog.resolution)
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0].value, WatchdogTimeoutFailure)
+        self.assertEqual(self.watchdog.timeouts, 1)
+        self.assertEqual(self.watchdog.tasks, 0)
+        self.assertEqual(len(self.clock.getDelayedCalls()), 0)
+
+        # Strobing after expiration is ignored
+        t.strobe_watchdog()
+        self.assertEqual(self.watchdog.tasks, 0)
+
+    def test_cleanup_stops_watching(self):
+        t1, results1 = self._start_task()
+        t2, results2 = self._start_task()
+        self.assertEqual(self.watchdog.tasks, 2)
+
+        t1.deferred.callback('done')
+        t1.task_cleanup()
+        self.assertEqual(self.watchdog.tasks, 1)
+
+        t2.stop()
+        self.assertEqual(self.watchdog.tasks, 0)
+        self.assertEqual(len(self.clock.getDelayedCalls()), 0)
+
+        self.clock.advance(2 * t1.watchdog_timeout)
+        self.assertEqual(results1, ['done'])
+        self.assertEqual(self.watchdog.timeouts, 0)
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,127 @@
+#
+# Copyright 2020 the original author or authors.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from __future__ import absolute_import
+from unittest import TestCase, main
+from voltha_protos.events_pb2 import EventHeader, EventType, EventCategory, EventSubCategory, \
+    DeviceEvent, KpiEvent2, KpiEventType
+from voltha_protos.voltha_pb2 import EventFilter, EventFilterRule, EventFilterRuleKey
+from pyvoltha.adapters.kafka.core_proxy import CoreProxy
+from pyvoltha.adapters.iadapter import IAdapter
+from pyvoltha.adapters.kafka.event_filter import EventFilters
+from six.moves import range
+
+NUM_DEVICES = 1000
+NUM_EVENTS = 10000
+
+
+def event_filter(filter_id, device_id='', event_type='', enable=True, **rules):
+    return EventFilter(id=filter_id, enable=enable, device_id=device_id, event_type=event_type,
+                       rules=[EventFilterRule(key=getattr(EventFilterRuleKey, key), value=value)
+                              for key, value in rules.items()])
+
+
+def device_event(name='ONU_LOS_RAISE_EVENT', category=EventCategory.COMMUNICATION,
+                 sub_category=EventSubCategory.ONU):
+    header = EventHeader(type=EventType.DEVICE_EVENT, category=category,
+                         sub_category=sub_category)
+    return header, DeviceEvent(device_event_name=name)
+
+
+def kpi_event():
+    header = EventHeader(type=EventType.KPI_EVENT2, category=EventCategory.EQUIPMENT,
+                         sub_category=EventSubCategory.ONU)
+    return header, KpiEvent2(type=KpiEventType.slice)
+
+
+class TestEventFilters(TestCase):
+    def setUp(self):
+        self.filters = EventFilters()
+
+    def test_rules(self):
+        self.assertIsNone(self.filters.match('onu-1', *device_event()))
+
+        self.filters.add(event_filter('los', device_id='onu-1', event_type='DEVICE_EVENT',
+                                      device_event_type='onu_los_raise_event',
+                                      category='Communication'))
+        self.assertEqual(self.filters.match('onu-1', *device_event()), 'los')
+        self.assertIsNone(self.filters.match('onu-2', *device_event()))
+        self.assertIsNone(self.filters.match('onu-1', *device_event(name='ONU_LOB_RAISE_EVENT')))
+        self.assertIsNone(self.filters.match('onu-1', *device_event(category=EventCategory.EQUIPMENT)))
+        self.assertIsNone(self.filters.match('onu-1', *kpi_event()))
+
+        # Rules on the body of other event types never match
+        self.filters.add(event_filter('kpi', kpi_event_type='slice'))
+        self.assertIsNone(self.filters.match('onu-2', *device_event()))
+        self.assertEqual(self.filters.match('onu-2', *kpi_event()), 'kpi')
+
+        # Filter all events of a device
+        self.filters.add(event_filter('onu-3', device_id='onu-3', filter_all=''))
+        self.assertEqual(self.filters.match('onu-3', *device_event(name='anything')), 'onu-3')
+
+        self.assertEqual(self.filters.statistics['filtered'], 3)
+
+    def test_update_and_remove(self):
+        self.filters.add(event_filter('pon', sub_category='pon'))
+        self.assertEqual(self.filters.match('olt-1', *device_event(sub_category=EventSubCategory.PON)),
+                         'pon')
+
+        # Replaced by ID
+        self.filters.add(event_filter('pon', sub_category='olt'))
+        self.assertIsNone(self.filters.match('olt-1', *device_event(sub_category=EventSubCategory.PON)))
+        self.assertEqual(len(self.filters), 1)
+
+        # A disabled filter is removed
+        self.filters.add(event_filter('pon', sub_category='olt', enable=False))
+        self.assertEqual(len(self.filters), 0)
+        self.assertFalse(self.filters.remove('pon'))
+
+        with self.assertRaises(ValueError):
+            self.filters.add(event_filter('bad', category='not-a-category'))
+        with self.assertRaises(ValueError):
+            self.filters.add(event_filter('bad', event_type='not-a-type'))
+        self.assertEqual(len(self.filters), 0)
+
+    def test_adapter_suppression(self):
+        core_proxy = CoreProxy(kafka_proxy=None, default_core_topic='rwcore',
+                               default_event_topic='voltha.events',
+                               my_listening_topic='openonu')
+        adapter = IAdapter(core_proxy, None, None, None, 'openonu', 'ONF', '1.0',
+                           'brcm_openomci_onu', 'BRCM')
+        los = event_filter('los', device_event_type='ONU_LOS_RAISE_EVENT')
+
+        adapter.suppress_alarm(los)
+        self.assertTrue(core_proxy.filter_alarm('onu-1', *device_event()))
+
+        adapter.unsuppress_alarm(los)
+        self.assertFalse(core_proxy.filter_alarm('onu-1', *device_event()))
+
+    def test_many_device_filters(self):
+        for device in range(NUM_DEVICES):
+            self.filters.add(event_filter('f{}'.format(device), device_id='onu-{}'.format(device),
+                                          event_type='device_event',
+                                          device_event_type='onu_los_raise_event'))
+        self.filters.add(event_filter('dying-gasp', device_event_type='onu_dying_gasp_raise_event'))
+        events = [device_event(name='ONU_LOB_RAISE_EVENT'), device_event()]
+
+        filtered = sum(self.filters.match('onu-{}'.format(n % NUM_DEVICES), *events[n % 2])
+                       is not None for n in range(NUM_EVENTS))
+
+        self.assertEqual(filtered, NUM_EVENTS // 2)
+        self.assertEqual(len(self.filters), NUM_DEVICES + 1)
+
+
+if __name__ == '__main__':
+    main()